@@ -1081,72 +1081,6 @@ namespace {
     return name;
   }
 
-  // Create a FEN string with a piece removed at the given square
-  static std::string fen_without_piece(const std::string& fen, Square sq) {
-    // Parse board part of FEN
-    std::string result;
-    int file = 0, rank = 7;
-    size_t i = 0;
-    
-    for (; i < fen.size() && fen[i] != ' '; ++i) {
-      char c = fen[i];
-      if (c == '/') {
-        result += c;
-        rank--;
-        file = 0;
-      } else if (c >= '1' && c <= '8') {
-        int emptyCount = c - '0';
-        for (int j = 0; j < emptyCount; ++j) {
-          if (file == file_of(sq) && rank == rank_of(sq)) {
-            // This square should be empty - we're removing the piece
-            // But it's already counted as empty, so just continue
-          }
-          file++;
-        }
-        result += c;
-      } else {
-        // It's a piece
-        if (file == file_of(sq) && rank == rank_of(sq)) {
-          // Skip this piece - replace with empty square
-          // Need to merge with adjacent empty counts
-          if (!result.empty() && result.back() >= '1' && result.back() <= '7') {
-            result.back()++;
-          } else {
-            result += '1';
-          }
-        } else {
-          result += c;
-        }
-        file++;
-      }
-    }
-    
-    // Append the rest of the FEN (side to move, castling, etc.)
-    result += fen.substr(i);
-    
-    // Normalize consecutive empty squares (e.g., "11" -> "2")
-    std::string normalized;
-    for (size_t j = 0; j < result.size(); ++j) {
-      if (result[j] >= '1' && result[j] <= '8') {
-        int count = result[j] - '0';
-        while (j + 1 < result.size() && result[j + 1] >= '1' && result[j + 1] <= '8') {
-          count += result[j + 1] - '0';
-          j++;
-        }
-        if (count <= 8) {
-          normalized += ('0' + count);
-        } else {
-          // Shouldn't happen in valid FEN
-          normalized += '8';
-        }
-      } else {
-        normalized += result[j];
-      }
-    }
-    
-    return normalized;
-  }
-
   static void dump_debug_payload(const Position& pos,
                                  Value finalVal,
                                  bool usedNNUE,
@@ -1177,83 +1111,30 @@ namespace {
       }
     }
 
-    // Per-piece masked evaluations via FEN manipulation
-    // For each piece, create a new position with that piece removed and evaluate
+    // Per-piece masked evaluations. All masks are evaluated in one pass over a
+    // copy of the position, so NNUE only refreshes its accumulator once.
+    Eval::MaskAttribution attribution;
+    bool haveAttribution = false;
+
+    if (!Eval::dump_guard) {
+      StateListPtr states(new std::deque<StateInfo>(1));
+      Position p;
+      p.set(pos.fen(), Options["UCI_Chess960"], &states->back(), Threads.main());
+      Eval::mask_attribution(p, attribution);
+      haveAttribution = true;
+    }
+
+    auto to_cp = [](Value v) { return static_cast<long long>(v) * 100 / UCI::NormalizeToPawnValue; };
+
     std::vector<std::pair<std::string, long long>> maskedTotal;
     std::vector<std::pair<std::string, long long>> maskedClassical;
-    
-    if (!Eval::dump_guard) {
-      Eval::dump_guard = true; // prevent recursive dumps
-      
-      // Save current dump flags and disable them during masked evals
-      bool savedDumpNNUE = Eval::dumpNNUE;
-      bool savedDumpFeatures = Eval::dumpFeatures;
-      bool savedDumpActivations = Eval::dumpActivations;
-      bool savedDumpClassical = Eval::dumpClassical;
-      Eval::dumpNNUE = Eval::dumpFeatures = Eval::dumpActivations = Eval::dumpClassical = false;
-      
-      std::string originalFen = pos.fen();
-      
-      for (Square s = SQ_A1; s <= SQ_H8; ++s) {
-        Piece pc = pos.piece_on(s);
-        if (pc == NO_PIECE) continue;
-        
-        // Don't remove kings - that creates invalid positions
-        if (type_of(pc) == KING) {
-          std::string pid = piece_to_string(pc) + "_" + UCI::square(s);
-          maskedTotal.emplace_back(pid, 0LL);
-          maskedClassical.emplace_back(pid, 0LL);
-          continue;
-        }
-        
-        std::string pid = piece_to_string(pc) + "_" + UCI::square(s);
-        
-        // Create FEN without this piece
-        std::string maskedFen = fen_without_piece(originalFen, s);
-        
-        // Create new position from masked FEN
-        StateListPtr st(new std::deque<StateInfo>(1));
-        Position pMasked;
-        pMasked.set(maskedFen, Options["UCI_Chess960"], &st->back(), Threads.main());
-        
-        // Skip if position is in check (can happen after removing a blocking piece)
-        if (pMasked.checkers()) {
-          maskedTotal.emplace_back(pid, 0LL);
-          maskedClassical.emplace_back(pid, 0LL);
-          continue;
-        }
-        
-        // Evaluate with NNUE
-        bool savedUseNNUE = Eval::useNNUE;
-        Eval::useNNUE = true;
-        Value v_nnue = Eval::evaluate(pMasked);
-        long long cp_nnue = static_cast<long long>(v_nnue) * 100 / UCI::NormalizeToPawnValue;
-        maskedTotal.emplace_back(pid, cp_nnue);
-        
-        // Evaluate with classical (NNUE off)
-        Eval::useNNUE = false;
-        Value v_cl = Eval::evaluate(pMasked);
-        long long cp_cl = static_cast<long long>(v_cl) * 100 / UCI::NormalizeToPawnValue;
-        maskedClassical.emplace_back(pid, cp_cl);
-        
-        Eval::useNNUE = savedUseNNUE;
-      }
-      
-      // Restore dump flags
-      Eval::dumpNNUE = savedDumpNNUE;
-      Eval::dumpFeatures = savedDumpFeatures;
-      Eval::dumpActivations = savedDumpActivations;
-      Eval::dumpClassical = savedDumpClassical;
-      Eval::dump_guard = false;
-    } else {
-      // We're in a recursive call - just record placeholders
-      for (Square s = SQ_A1; s <= SQ_H8; ++s) {
-        Piece pc = pos.piece_on(s);
-        if (pc == NO_PIECE) continue;
-        std::string pid = piece_to_string(pc) + "_" + UCI::square(s);
-        maskedTotal.emplace_back(pid, 0LL);
-        maskedClassical.emplace_back(pid, 0LL);
-      }
+    for (Square s = SQ_A1; s <= SQ_H8; ++s) {
+      Piece pc = pos.piece_on(s);
+      if (pc == NO_PIECE) continue;
+      std::string pid = piece_to_string(pc) + "_" + UCI::square(s);
+      bool ok = haveAttribution && attribution.masked[s];
+      maskedTotal.emplace_back(pid, ok ? to_cp(attribution.total[s]) : 0LL);
+      maskedClassical.emplace_back(pid, ok ? to_cp(attribution.classical[s]) : 0LL);
     }
 
     auto ts = std::chrono::system_clock::now().time_since_epoch();
@@ -1333,7 +1214,28 @@ namespace {
       if (i) ofs << ", ";
       ofs << "\"" << maskedClassical[i].first << "\": " << maskedClassical[i].second;
     }
-    ofs << "}\n";
+    ofs << "}";
+
+    // Compact per-square deltas (base - masked, cp), indexed a1..h8, null when
+    // the square was not masked. Both sides come from the same evaluate() path.
+    if (haveAttribution) {
+      auto write_deltas = [&](const Value* masked, Value base) {
+        ofs << "[";
+        for (Square s = SQ_A1; s <= SQ_H8; ++s) {
+          if (s != SQ_A1) ofs << ",";
+          if (attribution.masked[s]) ofs << to_cp(base) - to_cp(masked[s]);
+          else ofs << "null";
+        }
+        ofs << "]";
+      };
+      ofs << ",\n  \"mask_deltas\": {\"base_total_cp\": " << to_cp(attribution.baseTotal)
+          << ", \"base_classical_cp\": " << to_cp(attribution.baseClassical) << ",\n    \"total\": ";
+      write_deltas(attribution.total, attribution.baseTotal);
+      ofs << ",\n    \"classical\": ";
+      write_deltas(attribution.classical, attribution.baseClassical);
+      ofs << "}";
+    }
+    ofs << "\n";
 
     ofs << "}\n";
   }
@@ -1405,6 +1307,54 @@ Value Eval::evaluate(const Position& pos) {
   return v;
 }
 
+/// mask_attribution() evaluates pos and then pos with each non-king piece
+/// removed, with and without NNUE. Masks are applied with Position::do_mask(),
+/// so every masked NNUE eval is an incremental update of the base accumulator
+/// and a full-board attribution costs roughly one eval. Dumping is suppressed.
+
+void Eval::mask_attribution(Position& pos, MaskAttribution& out) {
+
+  assert(!pos.checkers());
+
+  bool savedGuard = dump_guard;
+  bool savedUseNNUE = useNNUE;
+  dump_guard = true;
+
+  // NNUE first, so the base accumulator is computed before any mask
+  useNNUE = true;
+  out.baseTotal = evaluate(pos);
+  useNNUE = false;
+  out.baseClassical = evaluate(pos);
+
+  StateInfo st;
+  for (Square s = SQ_A1; s <= SQ_H8; ++s)
+  {
+      Piece pc = pos.piece_on(s);
+      out.total[s] = out.classical[s] = VALUE_ZERO;
+      out.masked[s] = false;
+
+      if (pc == NO_PIECE || type_of(pc) == KING)
+          continue;
+
+      pos.do_mask(s, st);
+
+      // Removing a blocker can leave the side to move in check
+      if (!pos.checkers())
+      {
+          useNNUE = true;
+          out.total[s] = evaluate(pos);
+          useNNUE = false;
+          out.classical[s] = evaluate(pos);
+          out.masked[s] = true;
+      }
+
+      pos.undo_mask(s, pc);
+  }
+
+  useNNUE = savedUseNNUE;
+  dump_guard = savedGuard;
+}
+
 /// trace() is like evaluate(), but instead of returning a value, it returns
 /// a string (suitable for outputting to stdout) that contains the detailed
 /// descriptions and values of each evaluation term. Useful for debugging.
@@ -41,6 +41,18 @@ namespace Eval {
   extern std::string dumpPath;
   void refresh_debug_options();
 
+  // Per-square attribution: the eval of pos with each non-king piece removed,
+  // computed in one pass with incremental NNUE updates (see Position::do_mask)
+  struct MaskAttribution {
+    Value baseTotal;
+    Value baseClassical;
+    Value total[SQUARE_NB];
+    Value classical[SQUARE_NB];
+    bool  masked[SQUARE_NB]; // false for empty squares, kings and masks leaving the side to move in check
+  };
+
+  void mask_attribution(Position& pos, MaskAttribution& out);
+
   extern bool useNNUE;
   extern std::string currentEvalFileName;
 
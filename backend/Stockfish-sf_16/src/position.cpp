@@ -1035,6 +1035,61 @@ void Position::undo_null_move() {
 }
 
 
+/// Position::do_mask() removes the (non-king) piece on square s without
+/// changing the side to move. It updates the incremental state the same way a
+/// capture does, so NNUE can update the accumulator from the parent state
+/// instead of refreshing it. Used only for per-piece eval attribution.
+
+void Position::do_mask(Square s, StateInfo& newSt) {
+
+  assert(&newSt != st);
+
+  Piece pc = piece_on(s);
+
+  assert(pc != NO_PIECE && type_of(pc) != KING);
+
+  std::memcpy(&newSt, st, offsetof(StateInfo, accumulator));
+
+  newSt.previous = st;
+  st = &newSt;
+
+  DirtyPiece& dp = st->dirtyPiece;
+  dp.dirty_num = 1;
+  dp.piece[0] = pc;
+  dp.from[0] = s;
+  dp.to[0] = SQ_NONE;
+  st->accumulator.computed[WHITE] = false;
+  st->accumulator.computed[BLACK] = false;
+
+  if (type_of(pc) == PAWN)
+      st->pawnKey ^= Zobrist::psq[pc][s];
+  else
+      st->nonPawnMaterial[color_of(pc)] -= PieceValue[MG][pc];
+
+  remove_piece(s);
+
+  st->key ^= Zobrist::psq[pc][s];
+  st->materialKey ^= Zobrist::psq[pc][pieceCount[pc]];
+  st->capturedPiece = NO_PIECE;
+  st->repetition = 0;
+
+  st->checkersBB = attackers_to(square<KING>(sideToMove)) & pieces(~sideToMove);
+
+  set_check_info();
+}
+
+
+/// Position::undo_mask() restores the piece removed by do_mask()
+
+void Position::undo_mask(Square s, Piece pc) {
+
+  assert(empty(s));
+
+  put_piece(pc, s);
+  st = st->previous;
+}
+
+
 /// Position::key_after() computes the new hash key after the given move. Needed
 /// for speculative prefetch. It doesn't recognize special moves like castling,
 /// en passant and promotions.
@@ -141,6 +141,8 @@ public:
   void undo_move(Move m);
   void do_null_move(StateInfo& newSt);
   void undo_null_move();
+  void do_mask(Square s, StateInfo& newSt);
+  void undo_mask(Square s, Piece pc);
 
   // Static Exchange Evaluation
   bool see_ge(Move m, Value threshold = VALUE_ZERO) const;
@@ -303,6 +303,39 @@ void UCI::loop(int argc, char* argv[]) {
                         << sync_endl;
           }
       }
+      else if (token == "maskall")
+      {
+          // Batched form of maskpiece: base eval plus every single-piece mask in
+          // one pass. Deltas are base - masked in cp, a1..h8, '-' if not masked.
+          StateListPtr states(new std::deque<StateInfo>(1));
+          Position p;
+          p.set(pos.fen(), Options["UCI_Chess960"], &states->back(), Threads.main());
+          if (p.checkers())
+              sync_cout << "info string maskall none (in check)" << sync_endl;
+          else
+          {
+              Eval::MaskAttribution attr;
+              Eval::mask_attribution(p, attr);
+
+              auto cp = [](Value v) { return int(v) * 100 / UCI::NormalizeToPawnValue; };
+              auto deltas = [&](const Value* masked, Value base) {
+                  std::string out;
+                  for (Square s = SQ_A1; s <= SQ_H8; ++s)
+                  {
+                      if (s != SQ_A1)
+                          out += ',';
+                      out += attr.masked[s] ? std::to_string(cp(base) - cp(masked[s])) : "-";
+                  }
+                  return out;
+              };
+              sync_cout << "info string maskall"
+                        << " base_cp=" << cp(attr.baseTotal)
+                        << " base_classical_cp=" << cp(attr.baseClassical)
+                        << " total=" << deltas(attr.total, attr.baseTotal)
+                        << " classical=" << deltas(attr.classical, attr.baseClassical)
+                        << sync_endl;
+          }
+      }
       else if (token == "compiler") sync_cout << compiler_info() << sync_endl;
       else if (token == "export_net")
       {
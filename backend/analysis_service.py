@@ -0,0 +1,144 @@
+"""
+Analysis Service
+
+One interface for the analysis endpoints that chat tools call
+(/analyze_position, /analyze_move, /board/tree/search), with two backends:
+
+- AnalysisService: in-process. Wraps the same coroutine the FastAPI route
+  runs and returns its native dict, so a tool call skips connection setup,
+  JSON encoding both ways and a second trip through the HTTP stack.
+- HttpAnalysisService: the old loopback/remote HTTP calls, for deployments
+  where analysis runs on another host (or an isolated script without the
+  server's globals).
+
+Both return the endpoint's response dict on success and {"error": "..."}
+on failure, so ToolExecutor formats results the same way either way.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+AnalyzePositionFn = Callable[..., Awaitable[Dict[str, Any]]]
+AnalyzeMoveFn = Callable[..., Awaitable[Dict[str, Any]]]
+TreeSearchFn = Callable[..., Awaitable[Dict[str, Any]]]
+
+# Query(ge=, le=) bounds of the routes; in-process calls skip FastAPI validation
+POSITION_LINES_RANGE = (1, 5)
+POSITION_DEPTH_RANGE = (10, 22)
+MOVE_DEPTH_RANGE = (10, 20)
+
+
+def _clamp(value: int, bounds: tuple) -> int:
+    lo, hi = bounds
+    return max(lo, min(hi, int(value)))
+
+
+def _error_text(e: Exception) -> str:
+    # HTTPException carries the message in .detail (same text the HTTP client used to see)
+    detail = getattr(e, "detail", None)
+    return str(detail) if detail else str(e)
+
+
+def backend_url() -> str:
+    """BACKEND_URL or NEXT_PUBLIC_BACKEND_URL if set, otherwise localhost with BACKEND_PORT."""
+    url = os.getenv("BACKEND_URL") or os.getenv("NEXT_PUBLIC_BACKEND_URL")
+    if not url:
+        url = f"http://localhost:{int(os.getenv('BACKEND_PORT', '8001'))}"
+    return url
+
+
+class AnalysisService:
+    """In-process analysis calls (same code path as the HTTP routes)."""
+
+    remote = False
+
+    def __init__(
+        self,
+        analyze_position_fn: AnalyzePositionFn,
+        analyze_move_fn: AnalyzeMoveFn,
+        tree_search_fn: Optional[TreeSearchFn] = None,
+    ):
+        self._analyze_position = analyze_position_fn
+        self._analyze_move = analyze_move_fn
+        self._tree_search = tree_search_fn
+
+    async def analyze_position(self, fen: str, *, lines: int = 3, depth: int = 14, light_mode: bool = False) -> Dict[str, Any]:
+        lines = _clamp(lines, POSITION_LINES_RANGE)
+        depth = _clamp(depth, POSITION_DEPTH_RANGE)
+        try:
+            return await self._analyze_position(fen=fen, lines=lines, depth=depth, light_mode=light_mode)
+        except Exception as e:
+            return {"error": f"Analysis failed: {_error_text(e)}"}
+
+    async def analyze_move(self, fen: str, move_san: str, *, depth: int = 14) -> Dict[str, Any]:
+        depth = _clamp(depth, MOVE_DEPTH_RANGE)
+        try:
+            return await self._analyze_move(fen=fen, move_san=move_san, depth=depth)
+        except Exception as e:
+            return {"error": f"analyze_move failed: {_error_text(e)}"}
+
+    async def tree_search(self, thread_id: str, query: str, *, limit: int = 25) -> Dict[str, Any]:
+        if self._tree_search is None:
+            # No local implementation registered: keep the HTTP route
+            return await HttpAnalysisService().tree_search(thread_id, query, limit=limit)
+        try:
+            return await self._tree_search(thread_id=thread_id, query=query, limit=limit)
+        except Exception as e:
+            return {"error": f"tree_search failed: {_error_text(e)}"}
+
+
+class HttpAnalysisService:
+    """Analysis calls over HTTP against `base_url` (remote deployments)."""
+
+    remote = True
+
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = base_url or backend_url()
+
+    async def _request(self, method: str, path: str, timeout_s: float, error_prefix: str, **kwargs) -> Dict[str, Any]:
+        import aiohttp
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.request(
+                    method,
+                    f"{self.base_url}{path}",
+                    timeout=aiohttp.ClientTimeout(total=timeout_s),
+                    **kwargs,
+                ) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        return {"error": f"{error_prefix}: {error_text}"}
+                    return await response.json()
+        except Exception as e:
+            return {"error": f"{error_prefix}: {str(e)}"}
+
+    async def analyze_position(self, fen: str, *, lines: int = 3, depth: int = 14, light_mode: bool = False) -> Dict[str, Any]:
+        # aiohttp requires string query params
+        params = {
+            "fen": fen,
+            "lines": str(lines),
+            "depth": str(depth),
+            "light_mode": "true" if light_mode else "false",
+        }
+        return await self._request("GET", "/analyze_position", 60, "Analysis failed", params=params)
+
+    async def analyze_move(self, fen: str, move_san: str, *, depth: int = 14) -> Dict[str, Any]:
+        params = {"fen": fen, "move_san": move_san, "depth": str(int(depth))}
+        return await self._request("POST", "/analyze_move", 90, "analyze_move failed", params=params)
+
+    async def tree_search(self, thread_id: str, query: str, *, limit: int = 25) -> Dict[str, Any]:
+        payload = {"thread_id": thread_id, "query": query, "limit": limit}
+        return await self._request("POST", "/board/tree/search", 30, "tree_search failed", json=payload)
+
+
+def resolve_analysis_service(local: Optional[AnalysisService] = None):
+    """
+    Service ToolExecutor should use: the in-process one when the server
+    injected it, unless ANALYSIS_SERVICE_MODE=http forces remote calls.
+    """
+    if local is not None and os.getenv("ANALYSIS_SERVICE_MODE", "local").strip().lower() != "http":
+        return local
+    return HttpAnalysisService()
@@ -0,0 +1,239 @@
+"""
+Anytime Analysis
+
+Progressive engine results: instead of one blocking analyse(Limit(depth=N)),
+a search runs on python-chess's engine.analysis() iterator and every
+completed depth (all multipv lines at that depth) is published as it lands.
+
+- AnytimeAnalysisHub.stream(fen, depth, multipv) is an async generator of
+  ("depth", SSEEngineDepth) events followed by one ("complete", SSEEngineDone)
+  or ("error", SSEError).
+- Subscribers to the same position (position key + multipv) share one
+  underlying search; late joiners get the depths already searched replayed
+  first. The search is stopped once its last subscriber leaves.
+- With stop_when_stable, a subscriber leaves as soon as is_stable() holds
+  (same best move and a settled score over the last few depths).
+
+Engines come from `lease_factory`: a callable returning an async context
+manager that yields a StockfishQueue-like object (`.engine` +
+`await .enqueue(fn, *args, timeout=...)`), e.g. EnginePool.lease or
+nullcontext(engine_queue). The whole search runs as one enqueued call, so a
+shared serialized engine stays serialized.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+import chess
+import chess.engine
+
+from position_key import position_key
+from sse_models import SSEEngineDepth, SSEEngineDone, SSEError
+
+# Defaults for is_stable(): best move unchanged and score within the window
+# over this many consecutive depths
+STABLE_DEPTHS = 4
+STABLE_WINDOW_CP = 20
+# Never call a result stable below this depth (early iterations are noise)
+STABLE_MIN_DEPTH = 10
+
+
+def _line_from_info(board: chess.Board, info: Dict[str, Any]) -> Dict[str, Any]:
+    """One multipv line as plain values (eval relative to the side to move)."""
+    score = info["score"].relative
+    if score.is_mate():
+        eval_cp = 10000 if score.mate() > 0 else -10000
+        mate_in = score.mate()
+    else:
+        eval_cp = score.score(mate_score=10000)
+        mate_in = None
+    pv = info.get("pv", [])
+    pv_san = []
+    board_copy = board.copy(stack=False)
+    for move in pv[:8]:
+        try:
+            pv_san.append(board_copy.san(move))
+            board_copy.push(move)
+        except Exception:
+            break
+    return {
+        "multipv": info.get("multipv", 1),
+        "eval_cp": eval_cp,
+        "mate_in": mate_in,
+        "pv": [m.uci() for m in pv],
+        "pv_san": pv_san,
+    }
+
+
+def is_stable(
+    history: List[Dict[str, Any]],
+    depths: int = STABLE_DEPTHS,
+    window_cp: int = STABLE_WINDOW_CP,
+    min_depth: int = STABLE_MIN_DEPTH,
+) -> bool:
+    """True when the last `depths` snapshots agree on the best move and score."""
+    if len(history) < depths or history[-1]["depth"] < min_depth:
+        return False
+    recent = history[-depths:]
+    best_moves = {(snap["lines"][0]["pv"] or [None])[0] for snap in recent if snap["lines"]}
+    if len(best_moves) != 1:
+        return False
+    evals = [snap["lines"][0]["eval_cp"] for snap in recent]
+    return max(evals) - min(evals) <= window_cp
+
+
+class _SharedSearch:
+    """One running engine.analysis() and the queues of everyone watching it."""
+
+    def __init__(self, fen: str, depth: int, multipv: int):
+        self.fen = fen
+        self.depth = depth
+        self.multipv = multipv
+        self.history: List[Dict[str, Any]] = []
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.joined = 0
+        self.done = False
+        self.error: Optional[str] = None
+        self.stop_requested = False
+        self.analysis: Optional[chess.engine.AnalysisResult] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def publish(self, item: Optional[Dict[str, Any]]) -> None:
+        if item is not None:
+            self.history.append(item)
+        for queue in list(self.subscribers):
+            queue.put_nowait(item)
+
+    def stop(self) -> None:
+        self.stop_requested = True
+        if self.analysis is not None:
+            self.analysis.stop()
+
+
+class AnytimeAnalysisHub:
+    """Shares progressive searches between subscribers to the same position."""
+
+    def __init__(self, lease_factory: Callable[[], Any]):
+        self._lease_factory = lease_factory
+        self._searches: Dict[Tuple[int, int], _SharedSearch] = {}
+
+    def _join(self, fen: str, depth: int, multipv: int) -> _SharedSearch:
+        key = (position_key(fen), multipv)
+        search = self._searches.get(key)
+        if search is not None and not search.done and not search.stop_requested and search.depth >= depth:
+            return search
+        # Nothing running deep enough: start a new search (an older one keeps its own subscribers)
+        search = _SharedSearch(fen, depth, multipv)
+        self._searches[key] = search
+        search.task = asyncio.create_task(self._run(key, search))
+        return search
+
+    async def _run(self, key: Tuple[int, int], search: _SharedSearch) -> None:
+        try:
+            async with self._lease_factory() as queue:
+                await queue.enqueue(self._search, queue.engine, search, timeout=None)
+        except Exception as e:
+            print(f"   ❌ [ANYTIME] Search failed for {search.fen[:50]}: {e}")
+            search.error = str(e)
+        finally:
+            search.done = True
+            if self._searches.get(key) is search:
+                del self._searches[key]
+            search.publish(None)
+
+    async def _search(self, engine: chess.engine.Protocol, search: _SharedSearch) -> None:
+        if search.stop_requested:
+            return
+        board = chess.Board(search.fen)
+        n_lines = min(search.multipv, board.legal_moves.count())
+        if n_lines == 0:
+            return
+        started = time.perf_counter()
+        last_depth = 0
+        with await engine.analysis(board, chess.engine.Limit(depth=search.depth), multipv=n_lines) as analysis:
+            search.analysis = analysis
+            if search.stop_requested:
+                analysis.stop()
+            async for info in analysis:
+                # A depth is complete once its last multipv line arrives with an exact score
+                if info.get("multipv", 1) != n_lines or "pv" not in info or "score" not in info:
+                    continue
+                if info.get("lowerbound") or info.get("upperbound"):
+                    continue
+                depth = info.get("depth", 0)
+                if depth <= last_depth:
+                    continue
+                lines = [
+                    _line_from_info(board, line)
+                    for line in analysis.multipv
+                    if "score" in line and line.get("pv")
+                ]
+                last_depth = depth
+                search.publish({
+                    "depth": depth,
+                    "seldepth": info.get("seldepth"),
+                    "nodes": info.get("nodes"),
+                    "nps": info.get("nps"),
+                    "time_s": round(time.perf_counter() - started, 3),
+                    "lines": lines,
+                })
+
+    async def stream(
+        self,
+        fen: str,
+        depth: int = 18,
+        multipv: int = 3,
+        stop_when_stable: bool = False,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Progressive results for one position.
+
+        Yields ("depth", SSEEngineDepth) per completed depth, then
+        ("complete", SSEEngineDone) or ("error", SSEError). Closing the
+        generator early (client disconnect, caller satisfied) unsubscribes.
+        """
+        search = self._join(fen, depth, multipv)
+        queue: asyncio.Queue = asyncio.Queue()
+        # Replay and subscribe without yielding to the loop, so no depth is missed
+        for snapshot in search.history:
+            queue.put_nowait(snapshot)
+        if search.done:
+            queue.put_nowait(None)
+        search.subscribers.add(queue)
+        search.joined += 1
+
+        history: List[Dict[str, Any]] = []
+        stop_reason = "depth_reached"
+        try:
+            while True:
+                snapshot = await queue.get()
+                if snapshot is None:
+                    if search.error:
+                        yield "error", SSEError(message="Engine search failed", detail=search.error)
+                        return
+                    if not history or history[-1]["depth"] < depth:
+                        stop_reason = "search_ended"
+                    break
+                history.append(snapshot)
+                stable = is_stable(history)
+                yield "depth", SSEEngineDepth(fen=fen, stable=stable, **snapshot)
+                if snapshot["depth"] >= depth:
+                    break
+                if stop_when_stable and stable:
+                    stop_reason = "stable"
+                    break
+            last = history[-1] if history else None
+            yield "complete", SSEEngineDone(
+                fen=fen,
+                depth=last["depth"] if last else 0,
+                stop_reason=stop_reason,
+                lines=last["lines"] if last else [],
+                shared=search.joined > 1,
+            )
+        finally:
+            search.subscribers.discard(queue)
+            if not search.subscribers and not search.done:
+                search.stop()
@@ -24,12 +24,18 @@ class ConfidenceNode(TypedDict, total=False):
     metadata: Dict[str, Any]
 
 
+class SnapshotDelta(TypedDict):
+    upserted: List[ConfidenceNode]
+    removed: List[str]
+
+
 class Snapshot(TypedDict):
+    """Nodes changed since the previous snapshot (confidence_engine.replay_snapshots rebuilds full views)."""
     label: str
     iteration: int
     min_confidence: int
     stats: Dict[str, Any]
-    nodes: List[ConfidenceNode]
+    delta: SnapshotDelta
 
 
 class ConfidenceResponse(TypedDict):
@@ -53,6 +59,6 @@ def validate_response(payload: ConfidenceResponse) -> None:
     for node in payload["nodes"]:
         validate_node(node)
     for snapshot in payload["snapshots"]:
-        for node in snapshot["nodes"]:
+        for node in snapshot["delta"]["upserted"]:
             validate_node(node)
 
@@ -10,6 +10,8 @@ from typing import Any, Dict, Optional
 
 import chess  # type: ignore
 
+from position_key import position_key_hex
+
 
 def _normalize_fen(fen: str) -> str:
     try:
@@ -62,15 +64,22 @@ class BaselineJobs:
         self._cache_ttl_s = float(os.getenv("BASELINE_CACHE_TTL_S", "86400"))  # 24h default
 
     def make_key(self, *, app_session_id: Optional[str], thread_id: Optional[str], fen: str) -> str:
-        nfen = _normalize_fen(fen)
-        # Use a stable short digest segment (avoid Python hash seed variance).
-        digest8 = hashlib.sha256(nfen.encode("utf-8")).hexdigest()[:10]
+        # Shared position key (stable across processes, unlike hash()).
+        digest8 = position_key_hex(fen)
         # Include a schema/version segment so we can evolve baseline artifacts without serving stale caches.
         # Bump BASELINE_CACHE_VERSION to invalidate old disk caches.
         ver = (os.getenv("BASELINE_CACHE_VERSION", "v1") or "v1").strip()
         return f"bi:{ver}:{_safe_key_part(app_session_id)}:{_safe_key_part(thread_id)}:{digest8}"
 
     def _cache_path(self, *, fen: str, include_second_pass: bool) -> str:
+        ver = (os.getenv("BASELINE_CACHE_VERSION", "v1") or "v1").strip()
+        return os.path.join(
+            self._cache_dir,
+            f"bi_{ver}_{position_key_hex(fen)}_sp{1 if include_second_pass else 0}.json",
+        )
+
+    def _digest_cache_path(self, *, fen: str, include_second_pass: bool) -> str:
+        # Pre-position-key file naming (sha256 of the normalized FEN); read-only fallback.
         nfen = _normalize_fen(fen)
         ver = (os.getenv("BASELINE_CACHE_VERSION", "v1") or "v1").strip()
         key = f"{ver}|{nfen}|second_pass={1 if include_second_pass else 0}"
@@ -89,9 +98,12 @@ class BaselineJobs:
         try:
             p = self._cache_path(fen=fen, include_second_pass=include_second_pass)
             if not os.path.exists(p):
-                # Legacy fallback: if the old path has the cache, load it and migrate into new dir.
+                # Legacy fallback: if an old path has the cache, load it and migrate to the new path.
+                dp = self._digest_cache_path(fen=fen, include_second_pass=include_second_pass)
                 lp = self._legacy_cache_path(fen=fen, include_second_pass=include_second_pass)
-                if lp and os.path.exists(lp):
+                if os.path.exists(dp):
+                    p = dp
+                elif lp and os.path.exists(lp):
                     p = lp
                 else:
                     return None
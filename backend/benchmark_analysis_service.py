@@ -0,0 +1,105 @@
+"""
+Benchmark for the in-process analysis service used by ToolExecutor.
+
+Usage: python benchmark_analysis_service.py [--calls 50]
+
+Measures the overhead a tool call pays on top of the analysis itself, with
+the analysis replaced by a coroutine that returns a prebuilt
+/analyze_position-sized payload (themes + tags for the start and PV-final
+positions), so only the transport is timed:
+1. Loopback HTTP: HttpAnalysisService against a local aiohttp server that
+   encodes the payload the way FastAPI does (jsonable_encoder + json), one
+   ClientSession per call like the old ToolExecutor code.
+2. In-process: AnalysisService awaiting the coroutine directly.
+
+Reports mean per-call overhead and tracemalloc peak for each.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict
+
+from aiohttp import web
+from fastapi.encoders import jsonable_encoder
+
+from analysis_service import AnalysisService, HttpAnalysisService
+from parallel_analyzer import compute_theme_scores, compute_themes_and_tags
+
+FENS = [
+    "r1bq1rk1/ppp2ppp/2np1n2/2b1p3/2B1P3/2NP1N2/PPP2PPP/R1BQ1RK1 w - - 0 7",
+    "r2q1rk1/ppp1bppp/2n2n2/3pp3/2PP4/2NBPN2/PP3PPP/R1BQ1RK1 b - - 0 8",
+]
+
+
+def _payload() -> Dict[str, Any]:
+    raw = []
+    for fen in FENS:
+        analysis = compute_themes_and_tags(fen)
+        analysis["theme_scores"] = compute_theme_scores(analysis["themes"])
+        raw.append(analysis)
+    return {
+        "fen": FENS[0],
+        "eval_cp": 35,
+        "candidate_moves": [{"move": "Bg5", "eval_cp": 35, "pv_san": ["Bg5", "h6", "Bh4"]}],
+        "raw_start": raw[0],
+        "raw_final": raw[1],
+    }
+
+
+async def _time_calls(call: Callable[[], Awaitable[Dict[str, Any]]], n: int):
+    await call()  # warm up
+    t0 = time.perf_counter()
+    for _ in range(n):
+        result = await call()
+        assert "error" not in result, result
+    elapsed_ms = (time.perf_counter() - t0) * 1000.0 / n
+    # Separate pass for memory: tracemalloc slows allocation-heavy code down
+    tracemalloc.start()
+    for _ in range(n):
+        await call()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    payload = _payload()
+    payload_kb = len(json.dumps(payload, default=str)) / 1024
+
+    async def analyze_position_fn(fen, lines, depth, light_mode):
+        return payload
+
+    async def handle(request: web.Request) -> web.Response:
+        body = json.dumps(jsonable_encoder(await analyze_position_fn(request.query["fen"], 3, 14, False)))
+        return web.Response(text=body, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/analyze_position", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        http = HttpAnalysisService(f"http://127.0.0.1:{port}")
+        local = AnalysisService(analyze_position_fn=analyze_position_fn, analyze_move_fn=analyze_position_fn)
+        http_ms, http_peak = await _time_calls(lambda: http.analyze_position(FENS[0]), args.calls)
+        local_ms, local_peak = await _time_calls(lambda: local.analyze_position(FENS[0]), args.calls)
+    finally:
+        await runner.cleanup()
+
+    print(f"⏱️  analyze_position tool-call overhead ({args.calls} calls, {payload_kb:.0f} KB payload)")
+    print(f"   loopback HTTP: {http_ms:.3f} ms/call, peak {http_peak / 1024:.0f} KB")
+    print(f"   in-process:    {local_ms:.4f} ms/call, peak {local_peak / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+Benchmark for engine-affinity scheduling in EnginePool.analyze_game_parallel.
+
+Usage: python benchmark_engine_affinity.py [--engines 4] [--depth 16] [--games 3]
+
+Runs the engine half of a game review (every unique position of a game,
+multipv=2) two ways, each on freshly started engines (cold hash):
+1. Shared queue: all engines pull positions in ply order from one queue,
+   so consecutive plies usually land on different engines.
+2. Ply segments: PlySegmentScheduler gives each engine a contiguous run of
+   plies, searched last ply first, with work stealing at the end.
+
+Reports total nodes searched and wall time for each.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+
+import chess
+import chess.engine
+
+from engine_pool import PlySegmentScheduler
+
+STOCKFISH_PATH = os.getenv("STOCKFISH_PATH", "./stockfish")
+
+
+def _game_fens(seed: int, plies: int = 80) -> List[str]:
+    """Plausible-ish game: random moves, biased to captures and checks."""
+    rng = random.Random(seed)
+    board = chess.Board()
+    fens = [board.fen()]
+    for _ in range(plies):
+        moves = list(board.legal_moves)
+        if not moves:
+            break
+        forcing = [m for m in moves if board.is_capture(m) or board.gives_check(m)]
+        board.push(rng.choice(forcing) if forcing and rng.random() < 0.5 else rng.choice(moves))
+        fens.append(board.fen())
+    return fens
+
+
+class _SharedQueue:
+    def __init__(self, items: List[str], n_workers: int):
+        self._items = list(items)
+
+    def next(self, worker_id: int) -> Optional[str]:
+        return self._items.pop(0) if self._items else None
+
+
+async def _run(fens: List[str], make_scheduler: Callable, n_engines: int, depth: int) -> Tuple[int, float]:
+    engines = []
+    for _ in range(n_engines):
+        _transport, engine = await chess.engine.popen_uci(STOCKFISH_PATH)
+        await engine.configure({"Threads": 1, "Hash": 32})
+        engines.append(engine)
+    scheduler = make_scheduler(fens, n_engines)
+    nodes = [0]
+
+    async def worker(worker_id: int):
+        engine = engines[worker_id]
+        while True:
+            fen = scheduler.next(worker_id)
+            if fen is None:
+                return
+            info = await engine.analyse(chess.Board(fen), chess.engine.Limit(depth=depth), multipv=2)
+            nodes[0] += info[0].get("nodes", 0)
+
+    try:
+        t0 = time.perf_counter()
+        await asyncio.gather(*[worker(i) for i in range(n_engines)])
+        return nodes[0], time.perf_counter() - t0
+    finally:
+        for engine in engines:
+            await engine.quit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engines", type=int, default=4)
+    parser.add_argument("--depth", type=int, default=16)
+    parser.add_argument("--games", type=int, default=3)
+    args = parser.parse_args()
+
+    totals = {"shared queue": [0, 0.0], "ply segments": [0, 0.0]}
+    for seed in range(args.games):
+        fens = _game_fens(seed)
+        for name, make in (("shared queue", _SharedQueue), ("ply segments", PlySegmentScheduler)):
+            nodes, elapsed = await _run(fens, make, args.engines, args.depth)
+            totals[name][0] += nodes
+            totals[name][1] += elapsed
+
+    print(f"⏱️  Engine pass over {args.games} games, {args.engines} engines, depth {args.depth}")
+    for name, (nodes, elapsed) in totals.items():
+        print(f"   {name}: {nodes:,} nodes, {elapsed:.2f}s")
+    base_nodes, base_time = totals["shared queue"]
+    new_nodes, new_time = totals["ply segments"]
+    print(f"   nodes: {new_nodes / base_nodes:.2f}x, wall time: {base_time / new_time:.2f}x speedup")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Benchmark for diagnostic logging on the request hot paths.
+
+Usage: python benchmark_logging.py [--calls 50] [--prompt-kb 40] [--nodes 120]
+
+/analyze_position and /llm_chat_stream need a live engine and LLM, so this
+times the logging share of their hot paths in-process, with stdout
+redirected to a temp file:
+1. LLMRouter.complete_json with a fake _create_chat_completion and a large
+   prompt (the router used to print full prompts and raw outputs).
+2. ConfidenceEngine node dump over a synthetic tree (json.dumps over every node).
+3. Investigator trace lines through the analysis print shim.
+
+Each is run with the old behaviour (everything formatted and written
+synchronously, i.e. DEBUG without the queue) and the new default
+(INFO through the queue handler). Reports mean per-call time for each.
+"""
+
+import argparse
+import contextlib
+import sys
+import tempfile
+import time
+from typing import Callable
+
+import structured_log
+from confidence_engine import _print_full_node_dump
+from investigator import _trace_print
+from llm_router import LLMRouter, LLMRouterConfig
+
+MODES = {
+    "legacy (DEBUG, sync)": {"level": "DEBUG", "use_queue": False},
+    "default (INFO, queued)": {"level": "INFO", "use_queue": True},
+}
+
+
+def _router(prompt_kb: int) -> Callable[[], None]:
+    router = LLMRouter(LLMRouterConfig(vllm_model="bench-model", log_calls=True))
+    router.check_vllm_health = lambda **_kw: None
+    answer = '{"core_message": "' + "x" * 2000 + '"}'
+    router._create_chat_completion = lambda *, client, kwargs: (None, answer, 5.0, 20.0)
+    user_text = ("FACTS: tag.center.control.e4 role.attacking.f7 " * 64)[: prompt_kb * 1024]
+
+    def _call() -> None:
+        router.complete_json(
+            session_id="bench", stage="summariser", system_prompt="sys " * 500,
+            user_text=user_text, provider="vllm",
+        )
+
+    return _call
+
+
+def _confidence(n_nodes: int) -> Callable[[], None]:
+    nodes = [
+        {"id": f"n{i}", "parent": f"n{i // 2}", "fen": "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+         "confidence": 80 - i % 30, "pv": ["e2e4", "e7e5", "g1f3", "b8c6"], "shape": "triangle"}
+        for i in range(n_nodes)
+    ]
+    return lambda: _print_full_node_dump(nodes, title="BENCH")
+
+
+def _investigator(n_lines: int) -> Callable[[], None]:
+    fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+
+    def _call() -> None:
+        print_ = _trace_print(False)
+        for i in range(n_lines):
+            print_(f"   🔍 [ANALYZE_DEPTH] depth=18 node={i} fen={fen}")
+        print_("   ⏱️ [INVESTIGATOR] done")
+
+    return _call
+
+
+def _time(fn: Callable[[], None], calls: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    structured_log.flush()
+    return (time.perf_counter() - start) / calls * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--prompt-kb", type=int, default=40)
+    parser.add_argument("--nodes", type=int, default=120)
+    args = parser.parse_args()
+
+    workloads = {
+        "LLMRouter.complete_json": _router(args.prompt_kb),
+        "confidence node dump": _confidence(args.nodes),
+        "investigator trace (200 lines)": _investigator(200),
+    }
+    results = {}
+    with tempfile.TemporaryFile("w", encoding="utf-8") as sink:
+        for mode, config in MODES.items():
+            structured_log.configure(levels={}, sample={}, **config)
+            with contextlib.redirect_stdout(sink):
+                for name, fn in workloads.items():
+                    results[(name, mode)] = _time(fn, args.calls)
+    structured_log.configure()
+
+    print(f"Logging overhead per call ({args.calls} calls, {args.prompt_kb} KB prompt, {args.nodes} nodes)")
+    for name in workloads:
+        legacy, default = (results[(name, mode)] for mode in MODES)
+        saved = legacy - default
+        print(f"  {name:32s} legacy {legacy:8.3f} ms   default {default:8.3f} ms   saved {saved:8.3f} ms")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
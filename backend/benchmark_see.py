@@ -0,0 +1,107 @@
+"""
+Benchmark for the shared static-exchange module.
+
+Usage: python benchmark_see.py
+
+Times per-position tactical tagging (hanging pieces, overworked defenders,
+capture exchanges) two ways on the same positions:
+1. Legacy: each detector re-derives attackers on its own, overworked pieces
+   loop over defenders x 64 squares, and exchanges use capture-only minimax
+   over legal moves (the old TwoMoveWinEngine helper).
+2. Shared: the same detectors on top of static_exchange.position_see, so
+   attack masks and swap lists are computed once per position.
+"""
+
+import random
+import time
+from typing import Callable, List
+
+import chess
+
+import static_exchange
+from static_exchange import PIECE_VALUES, position_see
+from tag_detector import detect_overworked_pieces_tags
+from threat_detector import detect_hanging_pieces, detect_undefended_pieces
+
+
+def _positions(n: int = 200, seed: int = 11) -> List[chess.Board]:
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < n:
+        board = chess.Board()
+        for _ in range(rng.randint(12, 50)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+        if not board.is_game_over():
+            boards.append(board)
+    return boards
+
+
+def _legacy_exchange(board: chess.Board, square: int, plies: int = 0) -> float:
+    if plies >= 8 or board.piece_at(square) is None:
+        return 0.0
+    caps = [m for m in board.legal_moves if board.is_capture(m) and m.to_square == square]
+    best = None
+    for move in caps:
+        value = PIECE_VALUES[board.piece_type_at(square)]
+        board.push(move)
+        total = value - _legacy_exchange(board, square, plies + 1)
+        board.pop()
+        best = total if best is None else max(best, total)
+    return best or 0.0
+
+
+def _legacy_tagging(board: chess.Board) -> None:
+    for color in (chess.WHITE, chess.BLACK):
+        for square in chess.SQUARES:
+            piece = board.piece_at(square)
+            if piece and piece.color != color:
+                attackers = board.attackers(color, square)
+                defenders = board.attackers(not color, square)
+                _ = len(attackers) > len(defenders) > 0 or (attackers and not defenders)
+        for piece_type in (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+            for defender_sq in board.pieces(piece_type, color):
+                for target_sq in chess.SQUARES:
+                    target = board.piece_at(target_sq)
+                    if target and target.color == color and target_sq != defender_sq:
+                        if target_sq in board.attacks(defender_sq) and board.is_attacked_by(not color, target_sq):
+                            list(board.attackers(color, target_sq))
+                            list(board.attackers(not color, target_sq))
+    for move in board.legal_moves:
+        if board.is_capture(move):
+            _legacy_exchange(board, move.to_square)
+
+
+def _shared_tagging(board: chess.Board) -> None:
+    for color in (chess.WHITE, chess.BLACK):
+        detect_hanging_pieces(board, color)
+        detect_undefended_pieces(board, color)
+    detect_overworked_pieces_tags(board)
+    see = position_see(board)
+    for move in board.legal_moves:
+        if board.is_capture(move):
+            see.capture_gain(move)
+
+
+def _time(fn: Callable[[chess.Board], None], boards: List[chess.Board]) -> float:
+    static_exchange.clear_memo()
+    t0 = time.perf_counter()
+    for board in boards:
+        fn(board)
+    return (time.perf_counter() - t0) * 1000.0 / len(boards)
+
+
+def main() -> None:
+    boards = _positions()
+    legacy_ms = _time(_legacy_tagging, boards)
+    shared_ms = _time(_shared_tagging, boards)
+    print(f"⏱️  Tactical tagging over {len(boards)} positions")
+    print(f"   legacy: {legacy_ms:.3f} ms/position")
+    print(f"   shared: {shared_ms:.3f} ms/position")
+    print(f"   speedup: {legacy_ms / shared_ms:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
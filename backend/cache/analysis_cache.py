@@ -1,208 +1,243 @@
 """
 Analysis Cache for Personal Review System
-Hybrid in-memory + Supabase caching
+Content-addressed in-memory LRU + Supabase fallback for game reviews
+
+Reviews are keyed on the game itself (start position + mainline moves +
+clock times), not on who asked for it, so both players of a game and
+repeated imports share one engine review. An entry stores the depth it was
+computed at and serves any request at that depth or lower. Stored reviews
+are perspective-neutral; callers derive side_focus / key points on read
+(key_moment_selector.apply_review_perspective).
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+import copy
+import hashlib
+import re
+import threading
 import time
-from datetime import datetime, timedelta
+
+import chess
+import chess.pgn
+
+# Review fields that depend on which player asked (derived on read)
+PERSPECTIVE_FIELDS = ("side_focus", "key_points", "all_key_moments")
+
+
+_CLOCK_RE = re.compile(r'\[%clk (\d+):(\d+):(\d+(?:\.\d+)?)\]')
+
+
+def pgn_clock_timestamps(game: chess.pgn.Game) -> Dict[int, float]:
+    """Mainline clock times in seconds by ply, from [%clk h:mm:ss(.s)] comments."""
+    timestamps: Dict[int, float] = {}
+    node = game
+    ply = 0
+    while node.variations:
+        node = node.variation(0)
+        ply += 1
+        if node.comment:
+            clk_match = _CLOCK_RE.search(node.comment)
+            if clk_match:
+                h, m, s_str = clk_match.groups()
+                timestamps[ply] = int(h) * 3600 + int(m) * 60 + float(s_str)
+    return timestamps
+
+
+def review_cache_key(game: chess.pgn.Game, timestamps: Optional[Dict[int, float]] = None) -> str:
+    """
+    Content key for a game review.
+
+    Hashes the normalized start FEN, the mainline moves in UCI and the clock
+    times (they feed time_spent_s), so headers, comments, variations and
+    SAN spelling don't matter.
+    """
+    parts: List[str] = [game.board().fen(), " ".join(move.uci() for move in game.mainline_moves())]
+    if timestamps:
+        parts.append(" ".join(f"{ply}:{timestamps[ply]:g}" for ply in sorted(timestamps)))
+    return hashlib.blake2b("\n".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def neutral_review(review: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the player-perspective fields from a review (in place) before caching it."""
+    for field in PERSPECTIVE_FIELDS:
+        review.pop(field, None)
+    for record in review.get("ply_records", []):
+        record["key_point_labels"] = []
+    return review
+
+
+def _satisfies(meta: Dict[str, Any], depth: int, adaptive: bool) -> bool:
+    """A stored review serves a request at its depth or lower; adaptive ones only serve adaptive requests."""
+    return int(meta.get("depth") or 0) >= depth and (adaptive or not meta.get("adaptive"))
 
 
 class AnalysisCache:
-    """Hybrid caching system for game analysis results"""
-    
-    def __init__(self, supabase_client=None, ttl_seconds: int = 24 * 60 * 60):
+    """Content-addressed, depth-dominating cache of game reviews"""
+
+    def __init__(self, supabase_client=None, ttl_seconds: int = 24 * 60 * 60, max_entries: int = 64):
         """
         Initialize cache.
-        
+
         Args:
             supabase_client: Optional Supabase client for persistent storage
             ttl_seconds: Time-to-live for in-memory cache entries
+            max_entries: Reviews kept in memory (least recently used evicted first)
         """
-        self._memory_cache: Dict[str, Dict[str, Any]] = {}
-        self._cache_timestamps: Dict[str, float] = {}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()  # lookups also run in worker threads (tools.game_evals)
         self.supabase_client = supabase_client
         self.ttl_seconds = ttl_seconds
-    
-    def _make_cache_key(self, username: str, platform: str, game_id: str, depth: int) -> str:
-        """Generate cache key"""
-        return f"{username}:{platform}:{game_id}:{depth}"
-    
-    def get_cached_analysis(
-        self, 
-        username: str, 
-        platform: str, 
-        game_id: str, 
-        depth: int
-    ) -> Optional[Dict[str, Any]]:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.supabase_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _memory_entry(self, content_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(content_key)
+            if entry is None:
+                return None
+            if time.time() - entry["stored_at"] >= self.ttl_seconds:
+                del self._entries[content_key]
+                return None
+            self._entries.move_to_end(content_key)
+            return entry
+
+    def _put(self, content_key: str, review: Dict[str, Any], meta: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[content_key] = {
+                "review": review,
+                "depth": meta["depth"],
+                "adaptive": meta["adaptive"],
+                "stored_at": time.time(),
+            }
+            self._entries.move_to_end(content_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_review(self, content_key: str, depth: int, adaptive: bool = False) -> Optional[Dict[str, Any]]:
         """
-        Get cached analysis result.
-        Checks in-memory cache first, then Supabase.
-        
-        Args:
-            username: Player username
-            platform: Platform name
-            game_id: Game identifier
-            depth: Analysis depth
-            
-        Returns:
-            Cached analysis result or None
+        Cached review for `content_key` computed at `depth` or deeper.
+        Checks memory first, then Supabase.
+
+        Returns a private copy (perspective fields still to be derived) or None.
         """
-        cache_key = self._make_cache_key(username, platform, game_id, depth)
-        
-        # Check in-memory cache first
-        if cache_key in self._memory_cache:
-            timestamp = self._cache_timestamps.get(cache_key, 0)
-            age = time.time() - timestamp
-            
-            if age < self.ttl_seconds:
-                print(f"   ✅ Cache HIT (memory): {cache_key}")
-                return self._memory_cache[cache_key]
-            else:
-                # Expired, remove from memory
-                del self._memory_cache[cache_key]
-                del self._cache_timestamps[cache_key]
-        
-        # Check Supabase (permanent cache)
-        if self.supabase_client:
-            try:
-                # Query games table for this game
-                # We need to find the game by external_id or game_id
-                result = self.supabase_client.client.table("games")\
-                    .select("game_review, review_type, analyzed_at")\
-                    .or_(f"external_id.eq.{game_id},id.eq.{game_id}")\
-                    .maybe_single()\
-                    .execute()
-                
-                if result.data:
-                    game_review = result.data.get("game_review")
-                    review_type = result.data.get("review_type", "full")
-                    
-                    # Check if review exists and is full analysis
-                    if game_review and review_type == "full":
-                        # Extract ply_records to check depth
-                        ply_records = game_review.get("ply_records", [])
-                        if ply_records:
-                            # Check if analysis depth matches (approximate check)
-                            # We'll accept cached analysis if it exists, depth matching is approximate
-                            print(f"   ✅ Cache HIT (Supabase): {cache_key}")
-                            
-                            # Store in memory cache for faster access
-                            self._memory_cache[cache_key] = game_review
-                            self._cache_timestamps[cache_key] = time.time()
-                            
-                            return game_review
-            except Exception as e:
-                print(f"   ⚠️ Error checking Supabase cache: {e}")
-        
-        print(f"   ❌ Cache MISS: {cache_key}")
+        entry = self._memory_entry(content_key)
+        if entry is not None and _satisfies(entry, depth, adaptive):
+            self.hits += 1
+            print(f"   ✅ Review cache HIT (memory): {content_key[:12]} depth {entry['depth']} >= {depth}")
+            return copy.deepcopy(entry["review"])
+
+        review = self._fetch_from_supabase(content_key, depth, adaptive)
+        if review is not None:
+            self.supabase_hits += 1
+            meta = review["review_meta"]
+            print(f"   ✅ Review cache HIT (Supabase): {content_key[:12]} depth {meta['depth']} >= {depth}")
+            review = neutral_review(review)
+            self._put(content_key, review, meta)
+            return copy.deepcopy(review)
+
+        self.misses += 1
+        print(f"   ❌ Review cache MISS: {content_key[:12]} depth {depth}")
         return None
-    
-    def cache_analysis(
-        self,
-        username: str,
-        platform: str,
-        game_id: str,
-        depth: int,
-        result: Dict[str, Any]
-    ) -> None:
+
+    def _fetch_from_supabase(self, content_key: str, depth: int, adaptive: bool) -> Optional[Dict[str, Any]]:
         """
-        Cache analysis result.
-        Stores in both in-memory cache and Supabase.
-        
-        Args:
-            username: Player username
-            platform: Platform name
-            game_id: Game identifier
-            depth: Analysis depth
-            result: Analysis result dictionary
+        Saved review of the same game at a sufficient depth, if any.
+
+        First reads only the small review_meta object of matching rows; the
+        game_review JSON is fetched for the one row that qualifies.
+        """
+        if not self.supabase_client:
+            return None
+        try:
+            rows = self.supabase_client.client.table("games")\
+                .select("id, review_meta:game_review->review_meta")\
+                .eq("review_type", "full")\
+                .eq("game_review->review_meta->>content_key", content_key)\
+                .limit(10)\
+                .execute()
+            candidates = [
+                row for row in (rows.data or [])
+                if row.get("review_meta") and _satisfies(row["review_meta"], depth, adaptive)
+            ]
+            if not candidates:
+                return None
+            best = max(candidates, key=lambda row: int(row["review_meta"].get("depth") or 0))
+            result = self.supabase_client.client.table("games")\
+                .select("game_review")\
+                .eq("id", best["id"])\
+                .maybe_single()\
+                .execute()
+            review = result.data.get("game_review") if result and result.data else None
+            if review and review.get("ply_records"):
+                return review
+        except Exception as e:
+            print(f"   ⚠️ Error checking Supabase review cache: {e}")
+        return None
+
+    def store_review(self, content_key: str, depth: int, review: Dict[str, Any], adaptive: bool = False) -> None:
+        """
+        Cache a review computed at `depth`.
+
+        A stored review that already dominates this one (at least as deep,
+        and not adaptive unless this one is) is kept. The review is copied,
+        so later edits by the caller don't leak into the cache.
         """
-        cache_key = self._make_cache_key(username, platform, game_id, depth)
-        
-        # Store in memory cache
-        self._memory_cache[cache_key] = result
-        self._cache_timestamps[cache_key] = time.time()
-        
-        # Note: Supabase storage happens in the main endpoint when saving games
-        # This cache is just for quick lookups
-        print(f"   💾 Cached (memory): {cache_key}")
-    
-    def invalidate_cache(
-        self,
-        username: Optional[str] = None,
-        platform: Optional[str] = None,
-        game_id: Optional[str] = None
-    ) -> None:
+        entry = self._memory_entry(content_key)
+        if entry is not None and _satisfies(entry, depth, adaptive):
+            return
+        meta = {"content_key": content_key, "depth": depth, "adaptive": adaptive}
+        stored = neutral_review(copy.deepcopy(review))
+        stored["review_meta"] = meta
+        self._put(content_key, stored, meta)
+        print(f"   💾 Cached review (memory): {content_key[:12]} depth {depth}")
+
+    def invalidate_cache(self, content_key: Optional[str] = None) -> None:
         """
         Invalidate cache entries.
-        If all params are None, clears entire cache.
-        
-        Args:
-            username: Optional username filter
-            platform: Optional platform filter
-            game_id: Optional game_id filter
+        If content_key is None, clears entire cache.
         """
-        if username is None and platform is None and game_id is None:
-            # Clear entire cache
-            self._memory_cache.clear()
-            self._cache_timestamps.clear()
+        if content_key is None:
+            with self._lock:
+                self._entries.clear()
             print(f"   🗑️ Cleared entire cache")
             return
-        
-        # Remove matching entries
-        keys_to_remove = []
-        for key in self._memory_cache.keys():
-            parts = key.split(":")
-            if len(parts) >= 4:
-                key_username, key_platform, key_game_id, _ = parts[:4]
-                
-                match = True
-                if username and key_username != username:
-                    match = False
-                if platform and key_platform != platform:
-                    match = False
-                if game_id and key_game_id != game_id:
-                    match = False
-                
-                if match:
-                    keys_to_remove.append(key)
-        
-        for key in keys_to_remove:
-            del self._memory_cache[key]
-            del self._cache_timestamps[key]
-        
-        print(f"   🗑️ Invalidated {len(keys_to_remove)} cache entries")
-    
+        with self._lock:
+            removed = self._entries.pop(content_key, None) is not None
+        print(f"   🗑️ Invalidated {int(removed)} cache entries")
+
     def cleanup_expired(self) -> int:
         """
         Clean up expired cache entries.
-        
+
         Returns:
             Number of entries removed
         """
         now = time.time()
-        keys_to_remove = []
-        
-        for key, timestamp in self._cache_timestamps.items():
-            age = now - timestamp
-            if age >= self.ttl_seconds:
-                keys_to_remove.append(key)
-        
-        for key in keys_to_remove:
-            del self._memory_cache[key]
-            del self._cache_timestamps[key]
-        
+        with self._lock:
+            keys_to_remove = [key for key, entry in self._entries.items() if now - entry["stored_at"] >= self.ttl_seconds]
+            for key in keys_to_remove:
+                del self._entries[key]
+
         if keys_to_remove:
             print(f"   🧹 Cleaned up {len(keys_to_remove)} expired cache entries")
-        
+
         return len(keys_to_remove)
-    
+
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         return {
-            "memory_entries": len(self._memory_cache),
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "supabase_hits": self.supabase_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
             "ttl_seconds": self.ttl_seconds,
             "has_supabase": self.supabase_client is not None
         }
 
-
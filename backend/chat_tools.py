@@ -789,12 +789,21 @@ TOOL_PLAYER_BASELINE = {
                     "items": {"type": "object"},
                     "description": "List of analyzed games with metrics"
                 },
+                "pgns": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Raw PGNs to evaluate instead of pre-analyzed games"
+                },
+                "player": {
+                    "type": "string",
+                    "description": "With pgns: only count this player's moves"
+                },
                 "exclude_outliers": {
                     "type": "boolean",
                     "description": "Remove statistical outliers (default True)"
                 }
             },
-            "required": ["games"]
+            "required": []
         }
     }
 }
@@ -812,12 +821,21 @@ TOOL_DETECT_ANOMALIES = {
                     "items": {"type": "object"},
                     "description": "Games to test for anomalies"
                 },
+                "test_pgns": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Raw PGNs to test instead of pre-analyzed games"
+                },
+                "player": {
+                    "type": "string",
+                    "description": "With test_pgns: only count this player's moves"
+                },
                 "baseline": {
                     "type": "object",
                     "description": "Historical baseline from calculate_baseline()"
                 }
             },
-            "required": ["test_games", "baseline"]
+            "required": ["baseline"]
         }
     }
 }
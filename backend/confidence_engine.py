@@ -9,6 +9,7 @@ import chess
 import chess.engine
 
 from confidence_helpers import analyse_multipv, analyse_pv
+from structured_log import DEBUG, get_logger
 
 if TYPE_CHECKING:
     from engine_queue import StockfishQueue
@@ -32,6 +33,8 @@ DEFAULT_MAX_ITERATIONS = 50
 DEFAULT_MAX_PLY = 18
 DEFAULT_DELTA2 = 30
 DEFAULT_TOPK = 1
+_log = get_logger("confidence_engine")
+
 ALT_SCORE_MARGIN = 5  # centipawn margin to consider a move "better"
 ALT_INITIAL_MAX = 4
 WIDTH_ADD_LIMIT = 2
@@ -55,7 +58,7 @@ def _compute_confidence(s18: int, s2: int, pv18: int, pv2: int) -> int:
     
     # Always log when result is 0 (critical issue)
     if result == 0:
-        print(json.dumps({
+        _log.warning(lambda: {
             "event": "confidence_calc_zero",
             "inputs": {"s18": s18, "s2": s2, "pv18": pv18, "pv2": pv2},
             "intermediates": {
@@ -69,11 +72,11 @@ def _compute_confidence(s18: int, s2: int, pv18: int, pv2: int) -> int:
             },
             "result": result,
             "note": "CRITICAL: Confidence calculation returned 0 - investigating"
-        }, ensure_ascii=False))
+        })
     
     # DEBUG: Log when result is exactly 70 (common issue)
     if result == 70:
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "confidence_is_70",
             "inputs": {"s18": s18, "s2": s2, "pv18": pv18, "pv2": pv2},
             "intermediates": {
@@ -85,11 +88,11 @@ def _compute_confidence(s18: int, s2: int, pv18: int, pv2: int) -> int:
             },
             "result": result,
             "note": "Confidence is exactly 70 - investigating pattern"
-        }, ensure_ascii=False))
+        })
     
     # DEBUG: Log confidence calculation details if result is zero or unusual
     if result == 0 or result < 0 or result > 100 or abs(s18 - s2) > 100 or abs(pv18 - pv2) > 100:
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "confidence_calc_unusual",
             "inputs": {"s18": s18, "s2": s2, "pv18": pv18, "pv2": pv2},
             "intermediates": {
@@ -100,13 +103,16 @@ def _compute_confidence(s18: int, s2: int, pv18: int, pv2: int) -> int:
                 "conf_raw": round(conf_raw, 3)
             },
             "result": result
-        }, ensure_ascii=False))
+        })
     
     return result
 
 
 def _print_full_node_dump(nodes: List[Dict[str, Any]], title: str = "NODE DUMP") -> None:
     """Print every node and its properties in JSON form for debugging."""
+    if not _log.enabled_for(DEBUG):
+        return
+
     def _safe(obj: Any) -> Any:
         if obj is None or isinstance(obj, (int, float, str, bool)):
             return obj
@@ -122,14 +128,17 @@ def _print_full_node_dump(nodes: List[Dict[str, Any]], title: str = "NODE DUMP")
         "nodes": [_safe(node) for node in nodes],
     }
     try:
-        print(json.dumps(payload, indent=2, ensure_ascii=False))
+        _log.debug(json.dumps(payload, indent=2, ensure_ascii=False))
     except TypeError:
         fallback = {
             "title": str(title),
             "total_nodes": len(nodes),
             "nodes": [{str(k): str(v) for k, v in node.items()} for node in nodes],
         }
-        print(json.dumps(fallback, indent=2, ensure_ascii=False))
+        _log.debug(json.dumps(fallback, indent=2, ensure_ascii=False))
+
+
+_UNSET = object()
 
 
 @dataclass
@@ -151,6 +160,20 @@ class NodeState:
     extended_moves: Dict[str, int] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Keep the owning NodeStore's indexes and dirty set in step with field changes
+        store = self.__dict__.get("_store")
+        if store is None or self.__dict__.get(name, _UNSET) == value:
+            object.__setattr__(self, name, value)
+            return
+        store.dirty[self.id] = None
+        if name in NodeStore.INDEXED_FIELDS:
+            store._unindex(self)
+            object.__setattr__(self, name, value)
+            store._index(self)
+        else:
+            object.__setattr__(self, name, value)
+
     def set_confidence(self, value: int, baseline: int) -> None:
         """Set confidence and immediately refresh color."""
         old_conf = self.confidence
@@ -176,14 +199,14 @@ class NodeState:
         
         # Log color changes for debugging
         if old_color != self.color:
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "color_changed_in_refresh",
                 "node_id": self.id,
                 "old_color": old_color,
                 "new_color": self.color,
                 "baseline": baseline,
                 "confidence": conf,
-            }, ensure_ascii=False))
+            })
 
     def mark_branch(self, baseline: int) -> None:
         """Mark node as having branches."""
@@ -223,6 +246,161 @@ class NodeState:
         }
 
 
+class NodeStore(dict):
+    """id → NodeState map with hash indexes (fen, parent, parent+move, role,
+    color) and running stats counters.
+
+    Nodes register themselves on insert, and NodeState.__setattr__ re-indexes
+    a node whenever an indexed field changes, so lookups that used to scan
+    every node are O(1) and stats never rescan the tree.
+
+    Inserts and field assignments also mark the node dirty, and removals
+    are recorded, so snapshots serialize only what changed (take_changes()).
+    In-place edits of tags/extended_moves/metadata bypass __setattr__; call
+    touch() after them.
+    """
+
+    INDEXED_FIELDS = frozenset({"fen", "parent_id", "move", "role", "color", "has_branches"})
+
+    def __init__(self) -> None:
+        super().__init__()
+        # Ordered sets (dicts with None values) keep insertion order
+        self.by_fen: Dict[str, Dict[str, None]] = {}
+        self.by_parent: Dict[Optional[str], Dict[str, None]] = {}
+        self.by_parent_move: Dict[Tuple[Optional[str], Optional[str]], str] = {}
+        self.by_role: Dict[str, Dict[str, None]] = {}
+        self.by_color: Dict[str, Dict[str, None]] = {}
+        self.pv_triangles = 0
+        self.pv_red = 0
+        # Ids inserted/changed and ids removed since the last take_changes()
+        self.dirty: Dict[str, None] = {}
+        self.removed: Dict[str, None] = {}
+
+    def touch(self, node_id: str) -> None:
+        if node_id in self:
+            self.dirty[node_id] = None
+
+    def take_changes(self) -> Tuple[List[str], List[str]]:
+        """(dirty ids, removed ids) since the last call; resets both."""
+        dirty, removed = list(self.dirty), list(self.removed)
+        self.dirty.clear()
+        self.removed.clear()
+        return dirty, removed
+
+    def _index(self, node: NodeState) -> None:
+        self.by_fen.setdefault(node.fen, {})[node.id] = None
+        self.by_parent.setdefault(node.parent_id, {})[node.id] = None
+        self.by_parent_move.setdefault((node.parent_id, node.move), node.id)
+        self.by_role.setdefault(node.role, {})[node.id] = None
+        self.by_color.setdefault(node.color, {})[node.id] = None
+        if node.role == "pv":
+            self.pv_triangles += node.has_branches
+            self.pv_red += node.color == "red"
+
+    def _unindex(self, node: NodeState) -> None:
+        for index, key in (
+            (self.by_fen, node.fen),
+            (self.by_parent, node.parent_id),
+            (self.by_role, node.role),
+            (self.by_color, node.color),
+        ):
+            ids = index.get(key)
+            if ids is not None:
+                ids.pop(node.id, None)
+                if not ids:
+                    del index[key]
+        if self.by_parent_move.get((node.parent_id, node.move)) == node.id:
+            del self.by_parent_move[(node.parent_id, node.move)]
+            # Another node may share parent+move; let it take the slot
+            for sibling_id in self.by_parent.get(node.parent_id, {}):
+                if self[sibling_id].move == node.move:
+                    self.by_parent_move[(node.parent_id, node.move)] = sibling_id
+                    break
+        if node.role == "pv":
+            self.pv_triangles -= node.has_branches
+            self.pv_red -= node.color == "red"
+
+    def __setitem__(self, node_id: str, node: NodeState) -> None:
+        if node_id in self:
+            self._detach(self[node_id])
+        super().__setitem__(node_id, node)
+        object.__setattr__(node, "_store", self)
+        self._index(node)
+        self.dirty[node_id] = None
+        self.removed.pop(node_id, None)
+
+    def __delitem__(self, node_id: str) -> None:
+        self._detach(self[node_id])
+        super().__delitem__(node_id)
+
+    def pop(self, node_id: str, *default: Any) -> Any:
+        if node_id not in self:
+            return super().pop(node_id, *default)
+        self._detach(self[node_id])
+        return super().pop(node_id)
+
+    def clear(self) -> None:
+        removed = {**self.removed, **dict.fromkeys(self)}
+        for node in list(self.values()):
+            object.__setattr__(node, "_store", None)
+        super().clear()
+        self.__init__()
+        self.removed = removed
+
+    def _detach(self, node: NodeState) -> None:
+        self._unindex(node)
+        object.__setattr__(node, "_store", None)
+        self.dirty.pop(node.id, None)
+        self.removed[node.id] = None
+
+    def find_by_fen(self, fen: str, exclude_id: Optional[str] = None) -> Optional[NodeState]:
+        for node_id in self.by_fen.get(fen, ()):
+            if node_id != exclude_id:
+                return self[node_id]
+        return None
+
+    def children_of(self, parent_id: Optional[str]) -> List[NodeState]:
+        return [self[node_id] for node_id in self.by_parent.get(parent_id, ())]
+
+    def has_children(self, parent_id: Optional[str]) -> bool:
+        return bool(self.by_parent.get(parent_id))
+
+    def child_by_move(self, parent_id: Optional[str], move: Optional[str]) -> Optional[NodeState]:
+        node_id = self.by_parent_move.get((parent_id, move))
+        return self[node_id] if node_id is not None else None
+
+    def with_role(self, *roles: str) -> List[NodeState]:
+        return [self[node_id] for role in roles for node_id in self.by_role.get(role, ())]
+
+    def with_color(self, color: str) -> List[NodeState]:
+        return [self[node_id] for node_id in self.by_color.get(color, ())]
+
+    def count_role(self, role: str) -> int:
+        return len(self.by_role.get(role, ()))
+
+
+def replay_snapshots(snapshots: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Rebuild the full node list at each snapshot from the recorded deltas.
+
+    Each snapshot carries ``delta.upserted`` (payloads of nodes added or
+    changed since the previous snapshot) and ``delta.removed`` (ids). Legacy
+    snapshots with a full ``nodes`` list reset the view.
+    """
+    view: Dict[str, Dict[str, Any]] = {}
+    frames: List[List[Dict[str, Any]]] = []
+    for snap in snapshots:
+        if "nodes" in snap:
+            view = {node["id"]: node for node in snap["nodes"]}
+        else:
+            delta = snap.get("delta", {})
+            for node_id in delta.get("removed", []):
+                view.pop(node_id, None)
+            for node in delta.get("upserted", []):
+                view[node["id"]] = node
+        frames.append(list(view.values()))
+    return frames
+
+
 class ConfidenceEngine:
     def __init__(
         self,
@@ -250,7 +428,7 @@ class ConfidenceEngine:
         self.max_iterations = max_iterations
         self.max_ply = max_ply
 
-        self.nodes: Dict[str, NodeState] = {}
+        self.nodes: NodeStore = NodeStore()
         self.order: List[str] = []
         self.snapshots: List[Dict[str, Any]] = []
         self.iteration = 0  # Used for snapshot tracking
@@ -298,14 +476,14 @@ class ConfidenceEngine:
             if "baseline" in first_node_meta:
                 previous_baseline = first_node_meta.get("baseline")
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "loading_existing_nodes",
             "count": len(existing_nodes),
             "current_baseline": self.baseline,
             "previous_baseline": previous_baseline,
             "baseline_changed": previous_baseline is not None and previous_baseline != self.baseline,
             "note": "If baseline changed, colors will be refreshed with new baseline"
-        }, ensure_ascii=False))
+        })
         
         # Validate tree consistency - check that start node matches our starting position
         # CRITICAL: Use "start" node instead of "pv-0" (which doesn't exist in new structure)
@@ -316,13 +494,13 @@ class ConfidenceEngine:
             expected_start_fen = self.start_board.fen()
             if start_fen != expected_start_fen:
                 tree_mismatch = True
-                print(json.dumps({
+                _log.warning(lambda: {
                     "event": "tree_mismatch_warning",
                     "expected_start_fen": expected_start_fen,
                     "received_start_fen": start_fen,
                     "tree_id": self.tree_id,
                     "note": "CRITICAL: Start node FEN mismatch - nodes may be from a different tree"
-                }, ensure_ascii=False))
+                })
         elif existing_nodes:
             # No start node found but we have nodes - this is suspicious
             # Check if any node has a FEN that matches our start position
@@ -330,22 +508,22 @@ class ConfidenceEngine:
             has_matching_fen = any(n.get("fen") == expected_start_fen for n in existing_nodes)
             if not has_matching_fen:
                 tree_mismatch = True
-                print(json.dumps({
+                _log.warning(lambda: {
                     "event": "tree_mismatch_no_start_node",
                     "expected_start_fen": expected_start_fen,
                     "existing_node_ids": [n.get("id") for n in existing_nodes[:5]],
                     "tree_id": self.tree_id,
                     "note": "CRITICAL: No start node found and no node matches start FEN - rejecting nodes"
-                }, ensure_ascii=False))
+                })
         
         if tree_mismatch:
             # Don't load nodes from a different tree - this prevents confusion
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "rejecting_different_tree_nodes",
                 "tree_id": self.tree_id,
                 "existing_nodes_count": len(existing_nodes),
                 "note": "CRITICAL: Rejecting existing nodes - they belong to a different tree. This will cause tree to be rebuilt from scratch."
-            }, ensure_ascii=False))
+            })
             return  # Don't load nodes from different tree - this causes tree to be rebuilt
         
         initial_conf_preserved = 0
@@ -353,12 +531,12 @@ class ConfidenceEngine:
         nodes_loaded = 0
         nodes_skipped = 0
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "starting_node_load_loop",
             "existing_nodes_to_load": len(existing_nodes),
             "current_nodes_count": len(self.nodes),
             "note": "Starting to load existing nodes into empty tree"
-        }, ensure_ascii=False))
+        })
         
         for node_data in existing_nodes:
             node_id = node_data.get("id", "")
@@ -403,7 +581,7 @@ class ConfidenceEngine:
             
             # Log if color changed during load
             if color_before_refresh != node.color:
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "color_changed_during_load",
                     "node_id": node.id,
                     "color_before": color_before_refresh,
@@ -411,7 +589,7 @@ class ConfidenceEngine:
                     "baseline": self.baseline,
                     "confidence": node.confidence,
                     "note": "Color changed when loading existing node"
-                }, ensure_ascii=False))
+                })
             
             # Track initial_confidence preservation
             if existing_initial_conf is not None:
@@ -419,13 +597,13 @@ class ConfidenceEngine:
                 if node.has_branches:
                     initial_conf_set += 1
                 # Log initial_confidence preservation
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "initial_confidence_preserved_in_load",
                     "node_id": node.id,
                     "initial_confidence": node.initial_confidence,
                     "confidence": node.confidence,
                     "note": "Preserved initial_confidence from existing node"
-                }, ensure_ascii=False))
+                })
             
             # CRITICAL: If node already exists, DO NOT overwrite it - keep the existing one
             # This prevents any modifications to nodes that are already loaded
@@ -440,7 +618,7 @@ class ConfidenceEngine:
                 
                 # Log if anything changed
                 if color_before != existing_node.color:
-                    print(json.dumps({
+                    _log.debug(lambda: {
                         "event": "existing_node_modified_during_load",
                         "node_id": node_id,
                         "color_before": color_before,
@@ -448,16 +626,16 @@ class ConfidenceEngine:
                         "baseline": self.baseline,
                         "confidence": existing_node.confidence,
                         "note": "Existing node color was refreshed during load"
-                    }, ensure_ascii=False))
+                    })
                 
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "skipping_node_reload",
                     "node_id": node_id,
                     "existing_initial_confidence": existing_node.initial_confidence,
                     "incoming_initial_confidence": existing_initial_conf,
                     "refreshed_color": existing_node.color,
                     "note": "Node already exists - keeping existing node, color refreshed with current baseline"
-                }, ensure_ascii=False))
+                })
                 nodes_skipped += 1
                 continue  # Skip adding this node - keep the existing one
             
@@ -497,7 +675,7 @@ class ConfidenceEngine:
             node.refresh_color(self.baseline)
         
         pv_nodes = [n for n in self.nodes.values() if n.id.startswith("pv-")]
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "existing_nodes_loaded",
             "total_nodes": len(self.nodes),
             "nodes_loaded": nodes_loaded,
@@ -514,11 +692,11 @@ class ConfidenceEngine:
             },
             "node_ids_loaded": [n.id for n in self.nodes.values()][:10],  # First 10 for debugging
             "note": "CRITICAL: If nodes_loaded + nodes_skipped != nodes_in_existing_list, some nodes were lost!"
-        }, ensure_ascii=False))
+        })
         
         # CRITICAL: Validate that we loaded all nodes
         if nodes_loaded + nodes_skipped != len(existing_nodes):
-            print(json.dumps({
+            _log.warning(lambda: {
                 "event": "CRITICAL_NODE_LOAD_MISMATCH",
                 "nodes_loaded": nodes_loaded,
                 "nodes_skipped": nodes_skipped,
@@ -526,27 +704,24 @@ class ConfidenceEngine:
                 "actual_sum": nodes_loaded + nodes_skipped,
                 "nodes_in_tree": len(self.nodes),
                 "note": "CRITICAL: Some nodes were not loaded! This will cause tree to be rebuilt."
-            }, ensure_ascii=False))
+            })
 
     def _find_node_by_fen(self, fen: str, exclude_id: Optional[str] = None) -> Optional[NodeState]:
         """Find a node with the same FEN (excluding a specific node ID)."""
-        for node in self.nodes.values():
-            if node.id != exclude_id and node.fen == fen:
-                return node
-        return None
+        return self.nodes.find_by_fen(fen, exclude_id=exclude_id)
     
     def _add_node(self, node: NodeState) -> None:
         # CRITICAL: If node with same ID already exists, preserve it and don't overwrite
         if node.id in self.nodes:
             existing_node = self.nodes[node.id]
             # Node already exists - preserve it, don't delete or overwrite
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "node_already_exists_preserving",
                 "node_id": node.id,
                 "existing_initial_confidence": existing_node.initial_confidence,
                 "new_initial_confidence": node.initial_confidence,
                 "note": "Node with this ID already exists - preserving existing node, NOT deleting or overwriting"
-            }, ensure_ascii=False))
+            })
             return  # Don't add the duplicate - preserve existing node
         
         # CRITICAL: Only merge nodes with same FEN AND same move AND same parent
@@ -559,19 +734,18 @@ class ConfidenceEngine:
             
             if same_move and same_parent:
                 # Same FEN, same move, same parent - merge the nodes
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "merging_duplicate_fen_nodes",
                     "new_node_id": node.id,
                     "existing_node_id": existing_fen_node.id,
                     "fen": node.fen,
                     "move": node.move,
                     "note": "Two nodes represent the same position and move - merging into existing node, NOT adding new one"
-                }, ensure_ascii=False))
+                })
                 
                 # Update all children to point to the existing node
-                for child in self.nodes.values():
-                    if child.parent_id == node.id:
-                        child.parent_id = existing_fen_node.id
+                for child in self.nodes.children_of(node.id):
+                    child.parent_id = existing_fen_node.id
                 
                 # Merge roles if different
                 if node.role != existing_fen_node.role:
@@ -613,7 +787,7 @@ class ConfidenceEngine:
                 return  # Don't add the duplicate node
             else:
                 # Same FEN but different move or parent - keep both as separate nodes
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "keeping_separate_nodes_same_fen",
                     "new_node_id": node.id,
                     "existing_node_id": existing_fen_node.id,
@@ -623,20 +797,20 @@ class ConfidenceEngine:
                     "new_parent": node.parent_id,
                     "existing_parent": existing_fen_node.parent_id,
                     "note": "Same FEN but different move/parent - keeping both nodes"
-                }, ensure_ascii=False))
+                })
         
         # CRITICAL: If node already exists with locked initial_confidence, DO NOT overwrite it
         if node.id in self.nodes:
             existing_node = self.nodes[node.id]
             # Preserve locked initial_confidence - NEVER overwrite it
             if existing_node.initial_confidence is not None:
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "preserving_existing_node",
                     "node_id": node.id,
                     "existing_initial_confidence": existing_node.initial_confidence,
                     "new_initial_confidence": node.initial_confidence,
                     "note": "Node exists with locked initial_confidence - preserving it, NOT overwriting"
-                }, ensure_ascii=False))
+                })
                 # Use existing node's locked values
                 node.initial_confidence = existing_node.initial_confidence
                 # Only update confidence if it comes from transferred_confidence (children changed)
@@ -646,62 +820,68 @@ class ConfidenceEngine:
                     node.transferred_confidence = existing_node.transferred_confidence
                     node.confidence = existing_node.confidence
         
+        is_new = node.id not in self.nodes
         self.nodes[node.id] = node
-        if node.id not in self.order:
+        if is_new:
             self.order.append(node.id)
 
     def _get_node(self, node_id: str) -> NodeState:
         return self.nodes[node_id]
 
     def _record_snapshot(self, label: str) -> None:
+        """Append a snapshot holding only the nodes changed since the last one.
+
+        NodeStore tracks the dirty ids, so this costs O(changed nodes), not
+        O(tree). Full per-snapshot views can be rebuilt with replay_snapshots().
+        """
+        dirty, removed = self.nodes.take_changes()
+        upserted = [self.nodes[nid].to_payload() for nid in dirty]
+
         snapshot = {
             "label": label,
             "iteration": self.iteration,
             "min_confidence": self.min_pv_confidence,
             "stats": self._compute_stats(),
-            "nodes": [self.nodes[nid].to_payload() for nid in self.order],
+            "delta": {"upserted": upserted, "removed": removed},
         }
         self.snapshots.append(snapshot)
     
     def _print_tree_summary(self, title: str) -> None:
         """Print a concise tree summary showing node states."""
+        if not _log.enabled_for(DEBUG):
+            return
         pv_nodes = [self.nodes[nid] for nid in self.order if self.nodes[nid].role == "pv"]
         branch_nodes = [self.nodes[nid] for nid in self.order if self.nodes[nid].role in ("branch-mid", "branch-leaf")]
         
-        print(f"\n{'='*80}")
-        print(f"📊 {title}")
-        print(f"{'='*80}")
-        print(f"Total nodes: {len(self.nodes)} | PV: {len(pv_nodes)} | Branches: {len(branch_nodes)}")
-        print(f"Min PV confidence: {self.min_pv_confidence} | Baseline: {self.baseline}")
-        print(f"\nPV Line:")
+        _log.debug(lambda: f"\n{'='*80}")
+        _log.debug(lambda: f"📊 {title}")
+        _log.debug(lambda: f"{'='*80}")
+        _log.debug(lambda: f"Total nodes: {len(self.nodes)} | PV: {len(pv_nodes)} | Branches: {len(branch_nodes)}")
+        _log.debug(lambda: f"Min PV confidence: {self.min_pv_confidence} | Baseline: {self.baseline}")
+        _log.debug("\nPV Line:")
         for node in pv_nodes:
             conf_str = f"{node.confidence}%"
             color_emoji = {"red": "🔴", "green": "🟢"}.get(node.color, "⚪")
             shape_char = {"square": "■", "circle": "●", "triangle": "▲"}.get(node.shape, "?")
-            print(f"  {shape_char} {color_emoji} {node.id:12s} conf={conf_str:15s} branches={len(node.extended_moves)}")
+            _log.debug(lambda: f"  {shape_char} {color_emoji} {node.id:12s} conf={conf_str:15s} branches={len(node.extended_moves)}")
         
         if branch_nodes:
-            print(f"\nBranches ({len(branch_nodes)}):")
+            _log.debug(lambda: f"\nBranches ({len(branch_nodes)}):")
             for node in branch_nodes[:10]:  # Show first 10 branches
                 color_emoji = {"red": "🔴", "blue": "🔵", "green": "🟢"}.get(node.color, "⚪")
-                print(f"  {color_emoji} {node.id:20s} conf={node.confidence}% parent={node.parent_id}")
+                _log.debug(lambda: f"  {color_emoji} {node.id:20s} conf={node.confidence}% parent={node.parent_id}")
             if len(branch_nodes) > 10:
-                print(f"  ... and {len(branch_nodes) - 10} more branches")
+                _log.debug(lambda: f"  ... and {len(branch_nodes) - 10} more branches")
         
-        print(f"{'='*80}\n")
+        _log.debug(lambda: f"{'='*80}\n")
 
     def _compute_stats(self) -> Dict[str, Any]:
-        pv_nodes = [node for node in self.nodes.values() if node.role == "pv"]
-        triangle_nodes = [node for node in pv_nodes if node.has_branches]
-        red_nodes = [node for node in pv_nodes if node.color == "red"]
-        branch_midpoints = [node for node in self.nodes.values() if node.role == "branch-mid"]
-        branch_leaves = [node for node in self.nodes.values() if node.role == "branch-leaf"]
         return {
-            "pv_length": len(pv_nodes),
-            "triangles": len(triangle_nodes),
-            "red_pv_nodes": len(red_nodes),
-            "branch_midpoints": len(branch_midpoints),
-            "branch_leaves": len(branch_leaves),
+            "pv_length": self.nodes.count_role("pv"),
+            "triangles": self.nodes.pv_triangles,
+            "red_pv_nodes": self.nodes.pv_red,
+            "branch_midpoints": self.nodes.count_role("branch-mid"),
+            "branch_leaves": self.nodes.count_role("branch-leaf"),
             "total_nodes": len(self.nodes),
             "iteration": self.iteration,
         }
@@ -716,11 +896,11 @@ class ConfidenceEngine:
         )
         
         if has_existing_nodes:
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "_build_pv_early_exit_with_existing_nodes",
                 "existing_nodes_count": len(self.nodes),
                 "note": "CRITICAL: _build_pv called but existing nodes present - exiting early to prevent recalculation"
-            }, ensure_ascii=False))
+            })
             # Just update confidence from children if we have a start node
             start_node = self.nodes.get("start")
             if start_node:
@@ -738,13 +918,13 @@ class ConfidenceEngine:
         
         if existing_start and existing_start.initial_confidence is not None:
             # CRITICAL: Node exists with locked initial_confidence - use it, do NOT recalculate
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "preserving_existing_initial_confidence",
                 "node_id": "start",
                 "initial_confidence": existing_start.initial_confidence,
                 "current_confidence": existing_start.confidence,
                 "note": "Using existing locked initial_confidence - will NOT recalculate"
-            }, ensure_ascii=False))
+            })
             start_node = existing_start
             self.start_confidence = existing_start.initial_confidence
             self.start_perspective_is_white = starting_perspective_is_white
@@ -825,12 +1005,12 @@ class ConfidenceEngine:
             played_move_conf = existing_played_move.initial_confidence
             # played_move_d2_score is stored separately, not in terminal_confidence
             # If we need it, we'll need to get it from metadata or recalculate
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "preserving_existing_initial_confidence",
                 "node_id": "played-move",
                 "initial_confidence": existing_played_move.initial_confidence,
                 "note": "Using existing initial_confidence - skipping all calculations"
-            }, ensure_ascii=False))
+            })
         else:
             # Analyze using FEN BEFORE the move (start_board), not after
             played_move_d18_before = await analyse_pv(self.engine_queue, self.start_board, depth=18)
@@ -879,10 +1059,10 @@ class ConfidenceEngine:
         
         if has_existing_preferences:
             # Extract existing preference numbers from nodes to preserve them
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "skipping_preference_ranking_recalculation",
                 "note": "Existing nodes have preference numbers - using them instead of recalculating"
-            }, ensure_ascii=False))
+            })
             for node in self.nodes.values():
                 if node.preference_number is not None and node.move:
                     preference_map[node.move] = node.preference_number
@@ -958,12 +1138,12 @@ class ConfidenceEngine:
         
         if played_equals_best:
             # Played move and best move are the same - connect them as one node
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "played_move_equals_best_move",
                 "move": self.move.uci(),
                 "fen": played_move_fen,
                 "note": "Played move and best move are the same - using played-move node as best-move"
-            }, ensure_ascii=False))
+            })
             # Use played-move node as best-move node (same FEN, same move)
             # Update played-move node to also be the best move
             played_move_node.role = "played-best"  # Mark as both
@@ -1027,12 +1207,12 @@ class ConfidenceEngine:
         else:
             # Played move != best move - create separate best-move node
             if existing_best_move and existing_best_move.initial_confidence is not None:
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "preserving_existing_initial_confidence",
                     "node_id": "best-move",
                     "initial_confidence": existing_best_move.initial_confidence,
                     "note": "Using existing initial_confidence - will NOT recalculate"
-                }, ensure_ascii=False))
+                })
                 # Preserve preference number if not set
                 if existing_best_move.preference_number is None and best_move_pref is not None:
                     existing_best_move.preference_number = best_move_pref
@@ -1121,10 +1301,10 @@ class ConfidenceEngine:
         # CRITICAL: Only process alternatives if we calculated move_evaluations
         # If we skipped preference ranking (has_existing_preferences), skip alternative nodes too
         if has_existing_preferences:
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "skipping_alternative_nodes_with_existing_preferences",
                 "note": "Skipping alternative node creation - existing nodes have preference numbers"
-            }, ensure_ascii=False))
+            })
         else:
             sorted_evals = sorted(move_evaluations, key=lambda item: item[1], reverse=True)
             for move, move_d2_score in sorted_evals:
@@ -1139,12 +1319,12 @@ class ConfidenceEngine:
                 
                 # CRITICAL: Check if node exists with locked initial_confidence BEFORE doing any analysis
                 if existing_alt and existing_alt.initial_confidence is not None:
-                    print(json.dumps({
+                    _log.debug(lambda: {
                         "event": "preserving_existing_initial_confidence",
                         "node_id": alt_node_id,
                         "initial_confidence": existing_alt.initial_confidence,
                         "note": "Using existing initial_confidence - skipping ALL calculations"
-                    }, ensure_ascii=False))
+                    })
                     # Use existing - skip ALL analysis and calculations
                     # Preserve preference number if not set
                     alt_pref = preference_map.get(move.uci())
@@ -1230,14 +1410,14 @@ class ConfidenceEngine:
         """
         # CRITICAL: Never recalculate initial_confidence for existing nodes
         if node.initial_confidence is None:
-            print(json.dumps({
+            _log.warning(lambda: {
                 "event": "error_node_missing_initial_confidence",
                 "node_id": node.id,
                 "note": "CRITICAL: Node should have initial_confidence before updating from children"
-            }, ensure_ascii=False))
+            })
             return
         
-        children = [n for n in self.nodes.values() if n.parent_id == node.id]
+        children = self.nodes.children_of(node.id)
         if children:
             # Get effective confidence from each child (prioritize transferred_confidence, then initial_confidence, then confidence)
             def get_effective_confidence(child: NodeState) -> int:
@@ -1256,7 +1436,7 @@ class ConfidenceEngine:
             node.set_confidence(min_child_conf, self.baseline)
             
             if old_conf != min_child_conf:
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "confidence_updated_via_transferred",
                     "node_id": node.id,
                     "old_confidence": old_conf,
@@ -1265,7 +1445,7 @@ class ConfidenceEngine:
                     "initial_confidence": node.initial_confidence,
                     "children_count": len(children),
                     "note": "Confidence updated ONLY via transferred_confidence from children - initial_confidence preserved"
-                }, ensure_ascii=False))
+                })
         else:
             # No children - use initial confidence (not transferred)
             # Leaf nodes don't have transferred_confidence, so they use initial_confidence
@@ -1282,8 +1462,7 @@ class ConfidenceEngine:
         sorted_nodes = sorted(self.nodes.values(), key=lambda n: n.ply_index, reverse=True)
         for node in sorted_nodes:
             # Only update nodes that have children - leaf nodes don't need updating
-            children = [n for n in self.nodes.values() if n.parent_id == node.id]
-            if children:
+            if self.nodes.has_children(node.id):
                 self._update_confidence_from_children(node)
     
     def _sync_confidences_with_transferred(self) -> None:
@@ -1298,7 +1477,7 @@ class ConfidenceEngine:
                 old_conf = node.confidence
                 if old_conf != node.transferred_confidence:
                     node.set_confidence(node.transferred_confidence, self.baseline)
-                    print(json.dumps({
+                    _log.debug(lambda: {
                         "event": "confidence_synced_with_transferred",
                         "node_id": node.id,
                         "old_confidence": old_conf,
@@ -1306,7 +1485,7 @@ class ConfidenceEngine:
                         "transferred_confidence": node.transferred_confidence,
                         "initial_confidence": node.initial_confidence,
                         "note": "Synced confidence field with transferred_confidence at end of confidence increase"
-                    }, ensure_ascii=False))
+                    })
     
     async def _intelligent_expand(self) -> None:
         """Intelligently expand tree to boost confidence by 5-10% per iteration.
@@ -1326,15 +1505,15 @@ class ConfidenceEngine:
         current_conf = start_node.confidence
         target_conf = min(100, current_conf + 7)  # Target ~7% boost (middle of 5-10%)
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "intelligent_expand_start",
             "current_confidence": current_conf,
             "target_confidence": target_conf,
             "baseline": self.baseline
-        }, ensure_ascii=False))
+        })
         
         # Get all children of start node
-        children = [n for n in self.nodes.values() if n.parent_id == "start"]
+        children = self.nodes.children_of("start")
         if not children:
             return
         
@@ -1349,26 +1528,26 @@ class ConfidenceEngine:
         
         # Choose best strategy based on ROI (gain / time)
         if depth_gain_estimate["roi"] > width_gain_estimate["roi"] and depth_gain_estimate["gain"] > 0:
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "choosing_depth_expansion",
                 "gain": depth_gain_estimate["gain"],
                 "time_estimate": depth_gain_estimate["time_estimate"],
                 "roi": depth_gain_estimate["roi"]
-            }, ensure_ascii=False))
+            })
             await self._expand_depth(lowest_child)
         elif width_gain_estimate["gain"] > 0:
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "choosing_width_expansion",
                 "gain": width_gain_estimate["gain"],
                 "time_estimate": width_gain_estimate["time_estimate"],
                 "roi": width_gain_estimate["roi"]
-            }, ensure_ascii=False))
+            })
             await self._expand_width(start_node, children)
         else:
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "no_expansion_beneficial",
                 "note": "Both strategies estimated low gain, checking for below-baseline leaf nodes"
-            }, ensure_ascii=False))
+            })
         
         # CRITICAL: Extend any below-baseline leaf nodes (up to 5 nodes per extension)
         # This is the ONLY way to increase confidence - by extending nodes with new children
@@ -1402,7 +1581,7 @@ class ConfidenceEngine:
                     continue
                 
                 # Check if it's a leaf (no children)
-                has_children = any(n.parent_id == node.id for n in self.nodes.values())
+                has_children = self.nodes.has_children(node.id)
                 if not has_children:
                     # Check max_ply limit
                     if node.ply_index >= self.max_ply:
@@ -1420,13 +1599,13 @@ class ConfidenceEngine:
             if not leaf_nodes:
                 break  # No more nodes to extend
             
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "extending_below_baseline_leaves",
                 "iteration": iteration + 1,
                 "count": len(leaf_nodes),
                 "force_extend_all": force_extend_all,
                 "node_ids": [n.id for n in leaf_nodes]
-            }, ensure_ascii=False))
+            })
             
             # Extend all leaf nodes (creates up to 5 nodes per extension)
             for node in leaf_nodes:
@@ -1435,10 +1614,10 @@ class ConfidenceEngine:
             iteration += 1
         
         if iteration >= max_iterations:
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "extend_below_baseline_max_iterations",
                 "note": "Reached max iterations for extending below-baseline leaves"
-            }, ensure_ascii=False))
+            })
     
     async def _extend_leaf_with_two_nodes(self, node: NodeState) -> None:
         """Extend a leaf node by creating up to 5 sequential nodes along a branch path.
@@ -1453,11 +1632,11 @@ class ConfidenceEngine:
         """
         # CRITICAL: Never re-analyze existing nodes - only extend with new children
         if node.initial_confidence is None:
-            print(json.dumps({
+            _log.warning(lambda: {
                 "event": "warning_node_missing_initial_confidence",
                 "node_id": node.id,
                 "note": "Node should have initial_confidence before extension"
-            }, ensure_ascii=False))
+            })
             return
         
         # Get the board position for this node
@@ -1468,12 +1647,12 @@ class ConfidenceEngine:
         
         # Check max_ply limit
         if node.ply_index >= self.max_ply:
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "cannot_extend_max_ply_reached",
                 "node_id": node.id,
                 "ply_index": node.ply_index,
                 "max_ply": self.max_ply
-            }, ensure_ascii=False))
+            })
             return
         
         # Create up to 5 sequential nodes along a single branch path
@@ -1565,11 +1744,11 @@ class ConfidenceEngine:
             current_board = next_board.copy()
         
         if not created_nodes:
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "no_nodes_created_extension",
                 "leaf_node_id": node.id,
                 "note": "No nodes could be created (game over or max_ply reached)"
-            }, ensure_ascii=False))
+            })
             return
         
         # CRITICAL: Update parent node confidence ONLY via transferred_confidence from children
@@ -1577,7 +1756,7 @@ class ConfidenceEngine:
         # Update from the first child (which will propagate up through the chain)
         self._update_confidence_from_children(node)
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "below_baseline_leaf_extended",
             "leaf_node_id": node.id,
             "nodes_created": len(created_nodes),
@@ -1586,7 +1765,7 @@ class ConfidenceEngine:
             "node_details": [{"id": nid, "confidence": conf} for nid, conf in created_nodes],
             "parent_updated_via_transferred": node.transferred_confidence,
             "note": f"Created {len(created_nodes)} sequential nodes along branch - parent confidence updated ONLY via transferred_confidence from new children"
-        }, ensure_ascii=False))
+        })
         
     async def _estimate_depth_expansion_gain(self, node: NodeState) -> Dict[str, float]:
         """Estimate confidence gain from extending a branch deeper."""
@@ -1712,12 +1891,12 @@ class ConfidenceEngine:
         self._add_node(new_node)
         node.has_branches = True
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "depth_expansion_complete",
             "new_node_id": new_node_id,
             "confidence": conf,
             "ply_index": new_node.ply_index
-        }, ensure_ascii=False))
+        })
             
     async def _expand_width(self, start_node: NodeState, existing_children: List[NodeState]) -> None:
         """Add more alternative moves from starting position."""
@@ -1762,15 +1941,15 @@ class ConfidenceEngine:
         missing_preference_moves.sort(key=lambda x: x[2])
         
         if not missing_preference_moves:
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "width_expansion_no_missing_moves",
                 "existing_moves": list(existing_move_ucis),
                 "note": "All preference moves already exist as children"
-            }, ensure_ascii=False))
-            print(json.dumps({
+            })
+            _log.debug(lambda: {
                 "event": "width_expansion_complete",
                 "alternatives_added": 0
-            }, ensure_ascii=False))
+            })
             return
         
         alt_counter = len([n for n in existing_children if n.id and str(n.id).startswith("alt-")])
@@ -1866,31 +2045,31 @@ class ConfidenceEngine:
             added += 1
             start_node.has_branches = True
             
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "width_expansion_added_alternative",
                 "node_id": alt_node.id,
                 "move": move.uci(),
                 "preference_number": pref_num,
                 "initial_confidence": move_conf,
                 "note": "Created node for missing preference number"
-            }, ensure_ascii=False))
+            })
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "width_expansion_complete",
             "alternatives_added": added
-        }, ensure_ascii=False))
+        })
 
     # DEPRECATED: This method is from the old iterative expansion system
     # It is NOT used in the new 3-phase system (Phase 1/2/3).
     # Kept for reference but should not be called.
     # The 3-phase system directly processes red nodes without using this candidate selection.
     def _eligible_candidates(self) -> List[Tuple[int, int, str, Dict[str, Any]]]:
-        print(json.dumps({
+        _log.warning(lambda: {
             "event": "deprecated_method_called",
             "method": "_eligible_candidates",
             "warning": "This method is deprecated. The 3-phase system does not use candidate selection.",
             "note": "If you see this, there may be old code still calling this method"
-        }, ensure_ascii=False))
+        })
         # Return empty heap to prevent old code from executing
         return []
 
@@ -1900,14 +2079,14 @@ class ConfidenceEngine:
         Args:
             blue_node: The blue triangle node to extend from
         """
-        print(f"    🔍 Analyzing position at ply {blue_node.ply_index}...")
+        _log.debug(lambda: f"    🔍 Analyzing position at ply {blue_node.ply_index}...")
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "phase2_extend_branch_start",
             "node_id": blue_node.id,
             "ply_index": blue_node.ply_index,
             "max_ply": self.max_ply
-        }, ensure_ascii=False))
+        })
         
         board_at = chess.Board(blue_node.fen)
         
@@ -1920,12 +2099,12 @@ class ConfidenceEngine:
         )
         
         if not candidates or len(candidates) < 2:
-            print(f"    ⚠️  No alternate moves found (only {len(candidates) if candidates else 0} candidate(s))")
-            print(json.dumps({
+            _log.warning(f"    ⚠️  No alternate moves found (only {len(candidates) if candidates else 0} candidate(s))")
+            _log.debug(lambda: {
                 "event": "phase2_no_alternates",
                 "node_id": blue_node.id,
                 "reason": "no_candidates_or_only_one"
-            }, ensure_ascii=False))
+            })
             return
         
         best_score = candidates[0].score_cp
@@ -1940,30 +2119,30 @@ class ConfidenceEngine:
             alternates.append((fallback.score_cp, fallback.move))
         
         if not alternates:
-            print(f"    ⚠️  No alternates within delta2 ({self.delta2} cp)")
-            print(json.dumps({
+            _log.warning(f"    ⚠️  No alternates within delta2 ({self.delta2} cp)")
+            _log.debug(lambda: {
                 "event": "phase2_no_alternates",
                 "node_id": blue_node.id,
                 "reason": "no_alternates_within_delta2"
-            }, ensure_ascii=False))
+            })
             return
         
-        print(f"    ✅ Found {len(alternates)} alternate move(s) to extend")
+        _log.debug(lambda: f"    ✅ Found {len(alternates)} alternate move(s) to extend")
         
         # Extend branch for each alternate move (only first one for now, can extend later)
         for score_cp, move in alternates[:1]:  # Start with first alternate
             if move.uci() in blue_node.extended_moves:
-                print(f"    ⏭️  Move {move.uci()} already extended, skipping")
+                _log.debug(lambda: f"    ⏭️  Move {move.uci()} already extended, skipping")
                 continue  # Already extended
             
-            print(f"    🌿 Extending branch with move {move.uci()} (score: {score_cp} cp)")
+            _log.debug(lambda: f"    🌿 Extending branch with move {move.uci()} (score: {score_cp} cp)")
             
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "phase2_extending_move",
                 "node_id": blue_node.id,
                 "move": move.uci(),
                 "score_cp": score_cp
-            }, ensure_ascii=False))
+            })
             
             # Analyze using FEN BEFORE the move (board_at), not after
             # Analyze the position before the move is applied
@@ -2017,33 +2196,34 @@ class ConfidenceEngine:
                     mid_node.metadata["tags"] = tags
                     mid_node.metadata["tag_count"] = len(tags)
                 except Exception as e:
-                    print(json.dumps({
+                    _log.warning(lambda: {
                         "event": "tag_detection_failed",
                         "node_id": mid_node.id,
                         "error": str(e),
                         "note": "Tag detection failed for branch node"
-                    }, ensure_ascii=False))
+                    })
             
             mid_node.refresh_color(self.baseline)
             self._add_node(mid_node)
             
-            print(f"      📍 Created branch node {mid_node.id} at ply {mid_node.ply_index} (confidence: {alt_conf}%)")
+            _log.debug(lambda: f"      📍 Created branch node {mid_node.id} at ply {mid_node.ply_index} (confidence: {alt_conf}%)")
             
             # Recursively extend until green or 18 ply from origin
             terminal_conf = await self._expand_branch_recursive(mid_node, alt_board, alt_deep)
             
             # Store terminal confidence for this move
             blue_node.extended_moves[move.uci()] = terminal_conf
+            self.nodes.touch(blue_node.id)
             
-            print(f"      ✅ Branch extended to terminal confidence: {terminal_conf}%")
+            _log.debug(lambda: f"      ✅ Branch extended to terminal confidence: {terminal_conf}%")
             
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "phase2_branch_extended",
                 "node_id": blue_node.id,
                 "move": move.uci(),
                 "initial_confidence": terminal_conf,
                 "terminal_ply": mid_node.ply_index + (self.max_ply - blue_node.ply_index - 1)
-            }, ensure_ascii=False))
+            })
     
     async def _freeze_and_recolor_blue_triangle(self, blue_node: NodeState) -> None:
         """Phase 3: Freeze blue triangle with terminal confidence, recolor based on frozen confidence.
@@ -2051,23 +2231,23 @@ class ConfidenceEngine:
         Args:
             blue_node: The blue triangle to freeze and recolor
         """
-        print(f"    🔍 Processing {blue_node.id}...")
+        _log.debug(lambda: f"    🔍 Processing {blue_node.id}...")
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "phase3_freeze_start",
             "node_id": blue_node.id,
             "extended_moves": dict(blue_node.extended_moves)
-        }, ensure_ascii=False))
+        })
         
         # Get minimum terminal confidence from all extended moves
         if blue_node.extended_moves:
             frozen_conf = min(blue_node.extended_moves.values())
             branch_confs = list(blue_node.extended_moves.values())
-            print(f"      📊 Terminal confidences: {branch_confs} → min: {frozen_conf}%")
+            _log.debug(lambda: f"      📊 Terminal confidences: {branch_confs} → min: {frozen_conf}%")
         else:
             # No branches extended, use current confidence
             frozen_conf = blue_node.confidence
-            print(f"      ⚠️  No branches extended, using current confidence: {frozen_conf}%")
+            _log.warning(f"      ⚠️  No branches extended, using current confidence: {frozen_conf}%")
         
         # Set frozen confidence and refresh color immediately
         blue_node.set_frozen_confidence(frozen_conf, self.baseline)
@@ -2078,21 +2258,21 @@ class ConfidenceEngine:
         
         if pv_endpoint or original_shape == "square":
             blue_node.shape = "square"
-            print(f"      🔲 Preserved square shape (original: {original_shape}, PV endpoint: {pv_endpoint})")
+            _log.debug(lambda: f"      🔲 Preserved square shape (original: {original_shape}, PV endpoint: {pv_endpoint})")
         else:
             blue_node.shape = "triangle"
-            print(f"      🔺 Set to triangle shape (original: {original_shape})")
+            _log.debug(lambda: f"      🔺 Set to triangle shape (original: {original_shape})")
         
         # Recolor based on frozen confidence using refresh_color to ensure consistency
         # This ensures that future refresh_color calls will work correctly
         old_color = blue_node.color
         blue_node.refresh_color(self.baseline)
         
-        print(f"      🎨 Recolored: {old_color} → {blue_node.color} (frozen: {frozen_conf}% vs baseline: {self.baseline}%)")
+        _log.debug(lambda: f"      🎨 Recolored: {old_color} → {blue_node.color} (frozen: {frozen_conf}% vs baseline: {self.baseline}%)")
         
         # Verify the color is correct (debug check)
         if frozen_conf >= self.baseline and blue_node.color != "green":
-            print(json.dumps({
+            _log.warning(lambda: {
                 "event": "phase3_color_mismatch",
                 "node_id": blue_node.id,
                 "expected_color": "green",
@@ -2101,9 +2281,9 @@ class ConfidenceEngine:
                 "baseline": self.baseline,
                 "has_branches": blue_node.has_branches,
                 "note": "CRITICAL: Color should be green but isn't - investigating"
-            }, ensure_ascii=False))
+            })
         elif frozen_conf < self.baseline and blue_node.color != "red":
-            print(json.dumps({
+            _log.warning(lambda: {
                 "event": "phase3_color_mismatch",
                 "node_id": blue_node.id,
                 "expected_color": "red",
@@ -2112,7 +2292,7 @@ class ConfidenceEngine:
                 "baseline": self.baseline,
                 "has_branches": blue_node.has_branches,
                 "note": "CRITICAL: Color should be red but isn't - investigating"
-            }, ensure_ascii=False))
+            })
         
         # Update branch summary
         all_branch_confs = list(blue_node.extended_moves.values())
@@ -2121,10 +2301,11 @@ class ConfidenceEngine:
             "min": min(all_branch_confs) if all_branch_confs else frozen_conf,
             "max": max(all_branch_confs) if all_branch_confs else frozen_conf,
         }
+        self.nodes.touch(blue_node.id)
         
-        print(f"      ✅ Final: {blue_node.shape} {blue_node.color}, frozen: {frozen_conf}%")
+        _log.debug(lambda: f"      ✅ Final: {blue_node.shape} {blue_node.color}, frozen: {frozen_conf}%")
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "phase3_freeze_complete",
             "node_id": blue_node.id,
             "frozen_confidence": frozen_conf,
@@ -2132,7 +2313,7 @@ class ConfidenceEngine:
             "final_color": blue_node.color,
             "baseline": self.baseline,
             "original_shape": original_shape
-        }, ensure_ascii=False))
+        })
     
     async def _expand_branch_recursive(self, branch_node: NodeState, board: chess.Board, pv_analysis: Any) -> int:
         """Recursively expand a branch until it hits green or 18 ply limit from origin.
@@ -2152,13 +2333,13 @@ class ConfidenceEngine:
             # Get the next move from PV
             if not current_pv:
                 # No more moves in PV, this is the terminal node
-                print(f"        ⚠️  Terminal node {current_node.id} - no more PV moves (ply {current_node.ply_index})")
-                print(json.dumps({
+                _log.warning(f"        ⚠️  Terminal node {current_node.id} - no more PV moves (ply {current_node.ply_index})")
+                _log.debug(lambda: {
                     "event": "phase2_branch_terminal_no_pv",
                     "node_id": current_node.id,
                     "ply_index": current_node.ply_index,
                     "confidence": current_node.confidence
-                }, ensure_ascii=False))
+                })
                 return current_node.confidence
             
             next_move = current_pv[0]
@@ -2166,17 +2347,17 @@ class ConfidenceEngine:
             
             # Check ply limit from origin (S0)
             if current_node.ply_index + 1 > self.max_ply:
-                print(f"        ⚠️  Terminal node at ply {current_node.ply_index + 1} - reached max ply limit ({self.max_ply})")
-                print(json.dumps({
+                _log.warning(f"        ⚠️  Terminal node at ply {current_node.ply_index + 1} - reached max ply limit ({self.max_ply})")
+                _log.debug(lambda: {
                     "event": "phase2_branch_terminal_ply_limit",
                     "node_id": current_node.id,
                     "ply_index": current_node.ply_index + 1,
                     "max_ply": self.max_ply,
                     "confidence": current_node.confidence
-                }, ensure_ascii=False))
+                })
                 return current_node.confidence
             
-            print(f"        ➡️  Extending to ply {current_node.ply_index + 1} with move {next_move.uci()}")
+            _log.debug(lambda: f"        ➡️  Extending to ply {current_node.ply_index + 1} with move {next_move.uci()}")
             
             # Analyze using FEN BEFORE the move (current_board before push), not after
             # Analyze the position before the move is applied
@@ -2230,25 +2411,25 @@ class ConfidenceEngine:
                     next_node.metadata["tags"] = tags
                     next_node.metadata["tag_count"] = len(tags)
                 except Exception as e:
-                    print(json.dumps({
+                    _log.warning(lambda: {
                         "event": "tag_detection_failed",
                         "node_id": next_node.id,
                         "error": str(e),
                         "note": "Tag detection failed for branch leaf node"
-                    }, ensure_ascii=False))
+                    })
             
             next_node.refresh_color(self.baseline)
             self._add_node(next_node)
             
             # Check if this node is green (stop if so)
             if next_node.color == "green":
-                print(f"        ✅ Terminal node {next_node.id} is GREEN (confidence: {next_node.confidence}%) - stopping branch")
-                print(json.dumps({
+                _log.debug(lambda: f"        ✅ Terminal node {next_node.id} is GREEN (confidence: {next_node.confidence}%) - stopping branch")
+                _log.debug(lambda: {
                     "event": "phase2_branch_terminal_green",
                     "node_id": next_node.id,
                     "ply_index": next_node.ply_index,
                     "confidence": next_node.confidence
-                }, ensure_ascii=False))
+                })
                 return next_node.confidence
             
             # Update current for next iteration
@@ -2256,13 +2437,13 @@ class ConfidenceEngine:
             current_pv = next_deep.moves if next_deep else []
         
         # Reached 18 ply limit
-        print(f"        ⚠️  Terminal node {current_node.id} - reached max ply limit ({self.max_ply})")
-        print(json.dumps({
+        _log.warning(f"        ⚠️  Terminal node {current_node.id} - reached max ply limit ({self.max_ply})")
+        _log.debug(lambda: {
             "event": "phase2_branch_terminal_max_ply",
             "node_id": current_node.id,
             "ply_index": current_node.ply_index,
             "confidence": current_node.confidence
-        }, ensure_ascii=False))
+        })
         return current_node.confidence
 
     # DEPRECATED: Old _expand_node method - no longer used in 3-phase system
@@ -2272,13 +2453,13 @@ class ConfidenceEngine:
     # - Phase 2: _extend_branch_from_blue_triangle (extends branches)
     # - Phase 3: _freeze_and_recolor_blue_triangle (freezes and recolors)
     async def _expand_node(self, node_id: str) -> bool:
-        print(json.dumps({
+        _log.warning(lambda: {
             "event": "deprecated_method_called",
             "method": "_expand_node",
             "node_id": node_id,
             "warning": "This method is deprecated. The 3-phase system should be used instead.",
             "note": "If you see this, there may be old code still calling this method"
-        }, ensure_ascii=False))
+        })
         # Return False to prevent execution of old logic
         return False
 
@@ -2303,14 +2484,14 @@ class ConfidenceEngine:
             for n in self.nodes.values()
         )
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "run_method_node_check",
             "total_nodes": len(self.nodes),
             "has_existing_nodes": has_existing_nodes,
             "has_nodes_with_initial_conf": has_nodes_with_initial_conf,
             "node_ids": [n.id for n in list(self.nodes.values())[:5]],
             "note": "Checking if we should skip _build_pv"
-        }, ensure_ascii=False))
+        })
         
         if not has_existing_nodes:
             # First time building the tree - calculate everything
@@ -2319,10 +2500,10 @@ class ConfidenceEngine:
             # Existing nodes present - skip _build_pv to avoid any recalculation
             # CRITICAL: Validate that we actually have nodes loaded
             if len(self.nodes) == 0:
-                print(json.dumps({
+                _log.warning(lambda: {
                     "event": "CRITICAL_NO_NODES_LOADED",
                     "note": "CRITICAL: has_existing_nodes was True but self.nodes is empty! This should never happen. Rebuilding tree."
-                }, ensure_ascii=False))
+                })
                 # Fallback: rebuild tree if somehow nodes weren't loaded
                 await self._build_pv()
                 await self._extend_below_baseline_leaves(force_extend_all=False)
@@ -2363,13 +2544,13 @@ class ConfidenceEngine:
             # played_move_d2_score is stored separately, not in terminal_confidence
             # If we need it, we'll need to get it from metadata or recalculate
             
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "skipping_build_pv_with_existing_nodes",
                 "existing_nodes_count": len(self.nodes),
                 "start_confidence": self.start_confidence,
                 "node_ids": [n.id for n in list(self.nodes.values())[:10]],
                 "note": "Skipping _build_pv to prevent Stockfish recalculation - only generating new nodes"
-            }, ensure_ascii=False))
+            })
         
         # Extend any below-baseline leaf nodes after initial tree is built
         # CRITICAL: This is the ONLY way to increase confidence - by extending nodes with new children
@@ -2447,42 +2628,42 @@ class ConfidenceEngine:
             # Update max_ply and continue with normal expansion
             old_max_ply = self.max_ply
             self.max_ply = max_depth
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "depth_expansion_mode",
                 "old_max_ply": old_max_ply,
                 "new_max_ply": self.max_ply,
                 "note": "Expanding tree to new maximum depth"
-            }, ensure_ascii=False))
+            })
         
         # Determine target baseline based on mode BEFORE refreshing colors
         old_baseline = self.baseline
         if mode == "line" and target_line_conf is not None:
             self.baseline = target_line_conf
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "line_confidence_mode",
                 "old_baseline": old_baseline,
                 "new_baseline": self.baseline,
                 "target_line_conf": target_line_conf,
                 "note": "Targeting line confidence (excluding last PV node)"
-            }, ensure_ascii=False))
+            })
         elif mode == "end" and target_end_conf is not None:
             self.baseline = target_end_conf
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "end_confidence_mode",
                 "old_baseline": old_baseline,
                 "new_baseline": self.baseline,
                 "target_end_conf": target_end_conf,
                 "note": "Targeting end confidence (last PV node only)"
-            }, ensure_ascii=False))
+            })
         
         # NOW refresh all nodes with the CORRECT baseline
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "pre_phase1_refresh_start",
             "baseline": self.baseline,
             "old_baseline": old_baseline,
             "total_nodes": len(self.nodes),
             "note": "Refreshing all node colors with NEW baseline before Phase 1"
-        }, ensure_ascii=False))
+        })
         
         def is_node_below_baseline(node: NodeState) -> bool:
             """Check if node is below baseline based on its confidence values."""
@@ -2490,7 +2671,7 @@ class ConfidenceEngine:
         
         def summarize_node_states(label: str) -> Dict[str, Any]:
             total_nodes = len(self.nodes)
-            pv_nodes = [n for n in self.nodes.values() if n.role == "pv"]
+            pv_nodes = self.nodes.with_role("pv")
             triangles = [n.id for n in self.nodes.values() if n.has_branches]
             red_nodes_list = [n.id for n in self.nodes.values() if is_node_below_baseline(n)]
             summary = {
@@ -2503,11 +2684,11 @@ class ConfidenceEngine:
             }
             return summary
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "pre_phase1_node_states",
             "summary": summarize_node_states("before_refresh"),
             "note": "Node state summary BEFORE refresh_color"
-        }, ensure_ascii=False))
+        })
         
         # CRITICAL: Identify red nodes BEFORE refreshing colors
         # Use actual confidence/frozen_confidence values, not color (which might be stale)
@@ -2515,29 +2696,29 @@ class ConfidenceEngine:
         # Identify red nodes based on actual confidence values
         red_nodes_before_refresh = [n for n in self.nodes.values() if is_node_below_baseline(n)]
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "red_nodes_identified_before_refresh",
             "red_nodes_count": len(red_nodes_before_refresh),
             "red_node_ids": [n.id for n in red_nodes_before_refresh],
             "baseline": self.baseline,
             "note": "Red nodes identified based on confidence values BEFORE refresh_color"
-        }, ensure_ascii=False))
+        })
         
         # NOW refresh colors with the NEW baseline
         for node in self.nodes.values():
             node.refresh_color(self.baseline)
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "post_refresh_node_states",
             "summary": summarize_node_states("after_refresh"),
             "baseline": self.baseline,
             "note": "Node state summary AFTER refresh_color"
-        }, ensure_ascii=False))
+        })
         
         # Use the red nodes identified BEFORE refresh (they're the ones that need branching)
         red_nodes = red_nodes_before_refresh
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "red_nodes_before_mode_filtering",
             "red_nodes_count": len(red_nodes),
             "red_node_ids": [n.id for n in red_nodes],
@@ -2554,19 +2735,19 @@ class ConfidenceEngine:
             ],
             "mode": mode,
             "note": "Red nodes BEFORE mode filtering"
-        }, ensure_ascii=False))
+        })
         
         # Filter red nodes based on mode
         if mode == "end":
             # Only process last PV node for end confidence
-            pv_nodes = [n for n in self.nodes.values() if n.role == "pv"]
+            pv_nodes = self.nodes.with_role("pv")
             if pv_nodes:
                 pv_nodes_sorted = sorted(pv_nodes, key=lambda n: n.ply_index)
                 last_pv = pv_nodes_sorted[-1]
                 excluded_count = len(red_nodes)
                 red_nodes = [n for n in red_nodes if n.id == last_pv.id]
                 excluded_count -= len(red_nodes)
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "end_mode_filtering",
                     "last_pv_node_id": last_pv.id,
                     "last_pv_confidence": last_pv.confidence,
@@ -2575,17 +2756,17 @@ class ConfidenceEngine:
                     "filtered_red_nodes": [n.id for n in red_nodes],
                     "excluded_count": excluded_count,
                     "note": f"End mode: only processing last PV node (excluded {excluded_count} other red nodes)"
-                }, ensure_ascii=False))
+                })
         elif mode == "line":
             # Exclude last PV node for line confidence
-            pv_nodes = [n for n in self.nodes.values() if n.role == "pv"]
+            pv_nodes = self.nodes.with_role("pv")
             if pv_nodes:
                 pv_nodes_sorted = sorted(pv_nodes, key=lambda n: n.ply_index)
                 last_pv_id = pv_nodes_sorted[-1].id
                 last_pv_node = pv_nodes_sorted[-1]
                 excluded_count = sum(1 for n in red_nodes if n.id == last_pv_id)
                 red_nodes = [n for n in red_nodes if n.id != last_pv_id]
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "line_mode_filtering",
                     "last_pv_node_id": last_pv_id,
                     "last_pv_confidence": last_pv_node.confidence,
@@ -2594,16 +2775,16 @@ class ConfidenceEngine:
                     "filtered_red_nodes": [n.id for n in red_nodes],
                     "excluded_count": excluded_count,
                     "note": f"Line mode: excluding last PV node (excluded {excluded_count} red node(s))"
-                }, ensure_ascii=False))
+                })
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "red_nodes_identified_after_filtering",
             "red_nodes_count": len(red_nodes),
             "red_node_ids": [n.id for n in red_nodes],
             "mode": mode,
             "filtered_from": len(red_nodes_before_refresh),
             "note": f"Red nodes identified for Phase 1 processing (filtered from {len(red_nodes_before_refresh)} to {len(red_nodes)} by mode '{mode}')"
-        }, ensure_ascii=False))
+        })
         
         # For now, if branching is disabled or no red nodes, just return the tree
         if not enable_branching or not red_nodes:
@@ -2626,17 +2807,17 @@ class ConfidenceEngine:
         # ============================================================
         # PHASE 1: Convert all red circles/triangles/squares to blue triangles
         # ============================================================
-        print("\n" + "="*80)
-        print("🌳 PHASE 1: CONVERTING RED NODES TO BLUE TRIANGLES")
-        print("="*80)
-        print(f"📊 Found {len(red_nodes)} red node(s) to convert")
-        print(f"🎯 Baseline confidence: {self.baseline}%")
+        _log.debug("\n" + "="*80)
+        _log.debug("🌳 PHASE 1: CONVERTING RED NODES TO BLUE TRIANGLES")
+        _log.debug("="*80)
+        _log.debug(lambda: f"📊 Found {len(red_nodes)} red node(s) to convert")
+        _log.debug(lambda: f"🎯 Baseline confidence: {self.baseline}%")
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "phase1_start",
             "red_nodes_count": len(red_nodes),
             "baseline": self.baseline
-        }, ensure_ascii=False))
+        })
         
         blue_triangles: List[NodeState] = []
         # Reset phase info for this run
@@ -2647,6 +2828,7 @@ class ConfidenceEngine:
             # Store original shape and confidence before conversion
             if "original_shape" not in node.metadata:
                 node.metadata["original_shape"] = node.shape
+                self.nodes.touch(node.id)
             
             # CRITICAL: initial_confidence should already be set when node was created
             # Only set it here if it's somehow None (shouldn't happen for new nodes)
@@ -2655,33 +2837,33 @@ class ConfidenceEngine:
                 # This is a fallback - node should have had initial_confidence set at creation
                 # Set it to current confidence, but log a warning
                 was_set = node.set_initial_confidence(node.confidence)
-                print(json.dumps({
+                _log.debug(lambda: {
                     "event": "initial_confidence_set_in_phase1_fallback",
                     "node_id": node.id,
                     "initial_confidence": node.initial_confidence,
                     "confidence": node.confidence,
                     "note": "WARNING: initial_confidence was None in Phase 1 - this should not happen. Setting as fallback."
-                }, ensure_ascii=False))
+                })
             else:
                 # initial_confidence already set - verify it hasn't changed
                 if node.initial_confidence != node.confidence:
                     # Log if confidence has changed from initial (this is expected after refresh_color)
-                    print(json.dumps({
+                    _log.debug(lambda: {
                         "event": "initial_confidence_preserved_in_phase1",
                         "node_id": node.id,
                         "existing_initial_confidence": node.initial_confidence,
                         "current_confidence": node.confidence,
                         "confidence_difference": node.confidence - node.initial_confidence,
                         "note": "Initial confidence preserved (immutable) - current confidence may differ after refresh_color"
-                    }, ensure_ascii=False))
+                    })
                 else:
-                    print(json.dumps({
+                    _log.debug(lambda: {
                         "event": "initial_confidence_unchanged_in_phase1",
                         "node_id": node.id,
                         "initial_confidence": node.initial_confidence,
                         "current_confidence": node.confidence,
                         "note": "Initial confidence matches current confidence"
-                    }, ensure_ascii=False))
+                    })
             
             original_shape = node.metadata.get("original_shape")
             original_color = node.color
@@ -2695,46 +2877,46 @@ class ConfidenceEngine:
             blue_triangles.append(node)
             self.phase_info["phase1_nodes_converted"] += 1
             
-            print(f"  [{idx}/{len(red_nodes)}] {node.id}: {original_shape} {original_color} → {node.shape} {node.color}")
-            print(f"      Confidence: {node.confidence}% (initial: {node.initial_confidence}%)")
+            _log.debug(lambda: f"  [{idx}/{len(red_nodes)}] {node.id}: {original_shape} {original_color} → {node.shape} {node.color}")
+            _log.debug(lambda: f"      Confidence: {node.confidence}% (initial: {node.initial_confidence}%)")
             if pv_endpoint:
-                print(f"      ⚠️  Preserved square shape (PV endpoint)")
+                _log.warning(f"      ⚠️  Preserved square shape (PV endpoint)")
             
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "phase1_convert_to_blue_triangle",
                 "node_id": node.id,
                 "original_shape": original_shape,
                 "new_shape": node.shape,
                 "confidence": node.confidence,
                 "initial_confidence": node.initial_confidence
-            }, ensure_ascii=False))
+            })
         
         self._record_snapshot("phase1_complete")
-        print(f"\n✅ PHASE 1 COMPLETE: {len(blue_triangles)} node(s) converted to blue triangles")
-        print("="*80)
+        _log.debug(lambda: f"\n✅ PHASE 1 COMPLETE: {len(blue_triangles)} node(s) converted to blue triangles")
+        _log.debug("="*80)
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "phase1_complete",
             "blue_triangles_count": len(blue_triangles)
-        }, ensure_ascii=False))
+        })
         
         # ============================================================
         # PHASE 2: Extend branches from blue triangles until green or 18 ply
         # ============================================================
-        print("\n" + "="*80)
-        print("🌳 PHASE 2: EXTENDING BRANCHES FROM BLUE TRIANGLES")
-        print("="*80)
-        print(f"📊 Extending branches from {len(blue_triangles)} blue triangle(s)")
-        print(f"🎯 Max distance from origin: {self.max_ply} ply")
+        _log.debug("\n" + "="*80)
+        _log.debug("🌳 PHASE 2: EXTENDING BRANCHES FROM BLUE TRIANGLES")
+        _log.debug("="*80)
+        _log.debug(lambda: f"📊 Extending branches from {len(blue_triangles)} blue triangle(s)")
+        _log.debug(lambda: f"🎯 Max distance from origin: {self.max_ply} ply")
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "phase2_start",
             "blue_triangles_to_extend": len(blue_triangles)
-        }, ensure_ascii=False))
+        })
         
         nodes_before = len(self.nodes)
         for idx, blue_node in enumerate(blue_triangles, 1):
-            print(f"\n  [{idx}/{len(blue_triangles)}] Extending branch from {blue_node.id} (ply {blue_node.ply_index})")
+            _log.debug(lambda: f"\n  [{idx}/{len(blue_triangles)}] Extending branch from {blue_node.id} (ply {blue_node.ply_index})")
             await self._extend_branch_from_blue_triangle(blue_node)
         
         nodes_after = len(self.nodes)
@@ -2742,40 +2924,40 @@ class ConfidenceEngine:
         self.phase_info["phase2_nodes_added"] = nodes_added
         
         self._record_snapshot("phase2_complete")
-        print(f"\n✅ PHASE 2 COMPLETE: Added {nodes_added} new node(s) (total: {nodes_after})")
-        print("="*80)
+        _log.debug(lambda: f"\n✅ PHASE 2 COMPLETE: Added {nodes_added} new node(s) (total: {nodes_after})")
+        _log.debug("="*80)
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "phase2_complete",
             "total_nodes_after_extension": nodes_after,
             "nodes_added": nodes_added
-        }, ensure_ascii=False))
+        })
         
         # ============================================================
         # PHASE 3: Freeze blue shapes with terminal confidence, recolor
         # ============================================================
-        print("\n" + "="*80)
-        print("🌳 PHASE 3: FREEZING AND RECOLORING BLUE TRIANGLES")
-        print("="*80)
-        print(f"📊 Freezing {len(blue_triangles)} blue triangle(s) with terminal confidence")
-        print(f"🎯 Baseline confidence: {self.baseline}%")
+        _log.debug("\n" + "="*80)
+        _log.debug("🌳 PHASE 3: FREEZING AND RECOLORING BLUE TRIANGLES")
+        _log.debug("="*80)
+        _log.debug(lambda: f"📊 Freezing {len(blue_triangles)} blue triangle(s) with terminal confidence")
+        _log.debug(lambda: f"🎯 Baseline confidence: {self.baseline}%")
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "phase3_start"
-        }, ensure_ascii=False))
+        })
         
         for idx, blue_node in enumerate(blue_triangles, 1):
-            print(f"\n  [{idx}/{len(blue_triangles)}] Freezing {blue_node.id}")
+            _log.debug(lambda: f"\n  [{idx}/{len(blue_triangles)}] Freezing {blue_node.id}")
             await self._freeze_and_recolor_blue_triangle(blue_node)
             self.phase_info["phase3_nodes_frozen"] += 1
         
         self._record_snapshot("phase3_complete")
-        print(f"\n✅ PHASE 3 COMPLETE: All nodes frozen and recolored")
-        print("="*80)
+        _log.debug("\n✅ PHASE 3 COMPLETE: All nodes frozen and recolored")
+        _log.debug("="*80)
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "phase3_complete"
-        }, ensure_ascii=False))
+        })
         
         # Update confidence calculations after all phases
         pv_nodes = [self.nodes[nid] for nid in self.order if self.nodes[nid].role == "pv"]
@@ -2820,7 +3002,7 @@ class ConfidenceEngine:
                 # Only one PV node, line confidence equals end confidence
                 self.min_pv_confidence = self.end_confidence
             
-            print(json.dumps({
+            _log.debug(lambda: {
                 "event": "confidence_calculations_complete",
                 "line_confidence": self.min_pv_confidence,
                 "end_confidence": self.end_confidence,
@@ -2828,7 +3010,7 @@ class ConfidenceEngine:
                 "last_pv_node_id": last_pv_node.id,
                 "last_pv_confidence": last_pv_node.confidence,
                 "last_pv_frozen": last_pv_node.frozen_confidence
-            }, ensure_ascii=False))
+            })
         
         self.stats = self._compute_stats()
         final_payload = self._final_payload()
@@ -2836,13 +3018,13 @@ class ConfidenceEngine:
         # Print concise AFTER summary
         self._print_tree_summary("AFTER CONFIDENCE RAISE")
         
-        print("\n" + "="*80)
-        print("✅ CONFIDENCE RAISE COMPLETE")
-        print("="*80)
-        print(f"📊 Total nodes: {len(self.nodes)}")
-        print(f"🎯 Line confidence: {self.min_pv_confidence}%")
-        print(f"🎯 End confidence: {self.end_confidence}%")
-        print(f"📸 Snapshots recorded: {len(final_payload['snapshots'])}")
+        _log.debug("\n" + "="*80)
+        _log.debug("✅ CONFIDENCE RAISE COMPLETE")
+        _log.debug("="*80)
+        _log.debug(lambda: f"📊 Total nodes: {len(self.nodes)}")
+        _log.debug(lambda: f"🎯 Line confidence: {self.min_pv_confidence}%")
+        _log.debug(lambda: f"🎯 End confidence: {self.end_confidence}%")
+        _log.debug(lambda: f"📸 Snapshots recorded: {len(final_payload['snapshots'])}")
         
         # Count nodes by color
         color_counts = {"red": 0, "green": 0, "blue": 0}
@@ -2851,15 +3033,15 @@ class ConfidenceEngine:
             color_counts[node.color] = color_counts.get(node.color, 0) + 1
             shape_counts[node.shape] = shape_counts.get(node.shape, 0) + 1
         
-        print(f"🎨 Colors: {color_counts['red']} red, {color_counts['green']} green, {color_counts['blue']} blue")
-        print(f"🔷 Shapes: {shape_counts['circle']} circles, {shape_counts['triangle']} triangles, {shape_counts['square']} squares")
-        print("="*80 + "\n")
+        _log.debug(lambda: f"🎨 Colors: {color_counts['red']} red, {color_counts['green']} green, {color_counts['blue']} blue")
+        _log.debug(lambda: f"🔷 Shapes: {shape_counts['circle']} circles, {shape_counts['triangle']} triangles, {shape_counts['square']} squares")
+        _log.debug("="*80 + "\n")
         
         # Add phase information to stats for frontend logging
         self.phase_info["phases_executed"] = ["phase1", "phase2", "phase3"]
         self.stats["phase_info"] = self.phase_info
         
-        print(json.dumps({
+        _log.debug(lambda: {
             "event": "confidence_raise_complete",
             "total_nodes": len(self.nodes),
             "snapshots_recorded": len(final_payload['snapshots']),
@@ -2868,7 +3050,7 @@ class ConfidenceEngine:
             "color_counts": color_counts,
             "shape_counts": shape_counts,
             "phase_info": self.phase_info
-        }, ensure_ascii=False))
+        })
         
         return final_payload, self.stats
 
@@ -2962,28 +3144,28 @@ async def compute_move_confidence(
         }
         
         # DEBUG: Print what's being returned from compute_move_confidence
-        print("\n" + "="*80)
-        print("📤 RETURNING FROM compute_move_confidence")
-        print("="*80)
-        print(f"Overall confidence: {overall_conf}")
-        print(f"Line confidence: {min_conf}")
-        print(f"End confidence: {end_conf}")
-        print(f"Lowest confidence: {lowest_conf}")
-        print(f"Nodes count: {len(nodes_payload)}")
-        print(f"Snapshots count: {len(snapshots)}")
+        _log.debug("\n" + "="*80)
+        _log.debug("📤 RETURNING FROM compute_move_confidence")
+        _log.debug("="*80)
+        _log.debug(lambda: f"Overall confidence: {overall_conf}")
+        _log.debug(lambda: f"Line confidence: {min_conf}")
+        _log.debug(lambda: f"End confidence: {end_conf}")
+        _log.debug(lambda: f"Lowest confidence: {lowest_conf}")
+        _log.debug(lambda: f"Nodes count: {len(nodes_payload)}")
+        _log.debug(lambda: f"Snapshots count: {len(snapshots)}")
         if nodes_payload:
-            print(f"First node: {json.dumps(nodes_payload[0], indent=2)}")
-            print(f"Last node: {json.dumps(nodes_payload[-1], indent=2)}")
+            _log.debug(lambda: f"First node: {json.dumps(nodes_payload[0], indent=2)}")
+            _log.debug(lambda: f"Last node: {json.dumps(nodes_payload[-1], indent=2)}")
         else:
-            print("⚠️  WARNING: nodes_payload is EMPTY!")
-        print("="*80 + "\n")
+            _log.warning("⚠️  WARNING: nodes_payload is EMPTY!")
+        _log.debug("="*80 + "\n")
         
         return result
     except Exception as exc:
         import traceback
 
-        print(json.dumps({"event": "confidence_exception", "error": str(exc)}, ensure_ascii=False))
-        print(traceback.format_exc())
+        _log.warning(lambda: {"event": "confidence_exception", "error": str(exc)})
+        _log.warning(traceback.format_exc())
         return neutral_confidence()
 
 
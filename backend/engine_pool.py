@@ -6,18 +6,25 @@ concurrently, significantly speeding up game reviews.
 """
 
 import asyncio
+import math
 import chess
 import chess.engine
 import json
 import urllib.request
 import urllib.parse
 from concurrent.futures import ProcessPoolExecutor
-from typing import List, Dict, Any, Optional, Tuple, Callable
+from contextlib import asynccontextmanager
+from collections import deque
+from typing import List, Dict, Any, Optional, Tuple, Callable, Sequence
 from dataclasses import dataclass
 import time
 
 # Import parallel computation function (for ProcessPoolExecutor)
 from parallel_analyzer import compute_themes_and_tags, compute_theme_scores
+from position_key import position_key
+from structured_log import get_logger
+
+_log = get_logger("engine_pool")
 
 
 def check_lichess_masters(fen: str) -> dict:
@@ -41,6 +48,21 @@ def check_lichess_masters(fen: str) -> dict:
         return {'isTheory': False, 'totalGames': 0, 'opening': '', 'eco': '', 'theoryMoves': []}
 
 
+class EngineLease:
+    """
+    One pooled engine, exposed with the StockfishQueue interface
+    (`.engine` + `await .enqueue(fn, *args, timeout=...)`) so code written
+    against engine_queue can run on a pool engine unchanged.
+    """
+
+    def __init__(self, engine_id: int, engine: chess.engine.UciProtocol):
+        self.engine_id = engine_id
+        self.engine = engine
+
+    async def enqueue(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        return await asyncio.wait_for(fn(*args, **kwargs), timeout=timeout)
+
+
 @dataclass
 class EngineStatus:
     """Status of a single engine in the pool"""
@@ -50,6 +72,59 @@ class EngineStatus:
     last_used: Optional[float] = None
 
 
+class PlySegmentScheduler:
+    """
+    Engine-affinity work split for one game's positions (given in ply order).
+    
+    Each worker (= one engine for the whole pass) owns a contiguous run of
+    plies and walks it last ply first, so every search starts with the hash
+    already holding the subtree of the position that follows it. A worker
+    that runs dry steals the earliest half of the largest remaining segment,
+    which is the part furthest from where the owner is searching.
+    """
+    
+    def __init__(self, items: Sequence[Any], n_workers: int):
+        n_workers = max(1, n_workers)
+        size = max(1, math.ceil(len(items) / n_workers))
+        self._segments = [deque(items[i * size:(i + 1) * size]) for i in range(n_workers)]
+        self.steals = 0
+    
+    def next(self, worker_id: int) -> Optional[Any]:
+        """Next item for `worker_id`, or None when the whole game is handed out."""
+        own = self._segments[worker_id]
+        if not own:
+            victim = max(self._segments, key=len)
+            if not victim:
+                return None
+            for _ in range((len(victim) + 1) // 2):
+                own.append(victim.popleft())
+            self.steals += 1
+        return own.pop()
+
+
+@dataclass
+class AdaptiveDepthConfig:
+    """
+    Two-pass review schedule for analyze_game_parallel.
+    
+    Every unique position is searched at `shallow_depth` first. Moves whose
+    shallow result looks critical (eval swing >= swing_cp, best/second-best
+    gap <= gap_cp, or complexity score >= complexity_threshold) then have
+    their before/after positions re-searched at the full review depth,
+    highest priority first, until `node_budget` engine nodes are spent. A
+    re-search the node cap stops before the full depth is discarded.
+    
+    A move only uses full-depth evals when both of its positions were
+    re-searched; otherwise it keeps the shallow evals for both, so cp_loss
+    never compares evals from different depths.
+    """
+    shallow_depth: int = 10
+    swing_cp: int = 30
+    gap_cp: int = 20
+    complexity_threshold: float = 0.55
+    node_budget: int = 40_000_000
+
+
 class EnginePool:
     """
     Pool of Stockfish engine instances for parallel analysis.
@@ -91,7 +166,7 @@ class EnginePool:
             if self._initialized:  # Double-check after acquiring lock
                 return True
                 
-            print(f"🔧 Initializing engine pool with {self.pool_size} instances...")
+            _log.info(lambda: f"🔧 Initializing engine pool with {self.pool_size} instances...")
             
             try:
                 for i in range(self.pool_size):
@@ -112,18 +187,18 @@ class EnginePool:
                         analyses_completed=0,
                         last_used=None
                     )
-                    print(f"   ✓ Engine {i+1}/{self.pool_size} initialized")
+                    _log.debug(lambda: f"   ✓ Engine {i+1}/{self.pool_size} initialized")
                 
                 # Initialize ProcessPoolExecutor for CPU-bound theme/tag calculations
                 self.process_pool = ProcessPoolExecutor(max_workers=self.pool_size)
-                print(f"   ✓ ProcessPool initialized with {self.pool_size} workers")
+                _log.info(lambda: f"   ✓ ProcessPool initialized with {self.pool_size} workers")
                 
                 self._initialized = True
-                print(f"✅ Engine pool ready: {self.pool_size} engines + {self.pool_size} CPU workers")
+                _log.info(lambda: f"✅ Engine pool ready: {self.pool_size} engines + {self.pool_size} CPU workers")
                 return True
                 
             except Exception as e:
-                print(f"❌ Failed to initialize engine pool: {e}")
+                _log.warning(f"❌ Failed to initialize engine pool: {e}")
                 # Clean up any engines that were created
                 await self.shutdown()
                 return False
@@ -151,7 +226,7 @@ class EnginePool:
             try:
                 engine_id, engine = await asyncio.wait_for(self.available.get(), timeout=timeout)
             except asyncio.TimeoutError:
-                print(f"   ⚠️ [ENGINE_POOL] Timeout waiting for available engine after {timeout}s")
+                _log.warning(f"   ⚠️ [ENGINE_POOL] Timeout waiting for available engine after {timeout}s")
                 raise
         
         self.engine_status[engine_id].is_available = False
@@ -164,6 +239,20 @@ class EnginePool:
         self.engine_status[engine_id].analyses_completed += 1
         await self.available.put((engine_id, engine))
     
+    @asynccontextmanager
+    async def lease(self, timeout: float = 60.0):
+        """
+        Hold one engine for a block of work:
+
+            async with pool.lease() as queue:
+                info = await queue.enqueue(queue.engine.analyse, board, limit)
+        """
+        engine_id, engine = await self.acquire(timeout=timeout)
+        try:
+            yield EngineLease(engine_id, engine)
+        finally:
+            await self.release(engine_id, engine)
+    
     async def analyze_single(
         self,
         fen: str,
@@ -192,10 +281,12 @@ class EnginePool:
             engine_id, engine = await self.acquire(timeout=acquire_timeout)
             
             board = chess.Board(fen)
-            print(f"      🔍 [ENGINE_POOL] analyze_single:", flush=True)
-            print(f"         - Input FEN: {fen}", flush=True)
-            print(f"         - Board FEN: {board.fen()}", flush=True)
-            print(f"         - Side to move: {'WHITE' if board.turn == chess.WHITE else 'BLACK'}", flush=True)
+            _log.debug(
+                "      🔍 [ENGINE_POOL] analyze_single:",
+                input_fen=fen,
+                board_fen=board.fen,
+                side_to_move=lambda: "WHITE" if board.turn == chess.WHITE else "BLACK",
+            )
             
             # Run analysis with timeout
             result = await asyncio.wait_for(
@@ -210,7 +301,7 @@ class EnginePool:
             }
         except asyncio.TimeoutError as e:
             error_msg = f"Analysis timeout after {analysis_timeout}s" if engine_id is not None else f"Engine acquisition timeout after {acquire_timeout}s"
-            print(f"   ⚠️ [ENGINE_POOL] {error_msg}")
+            _log.warning(f"   ⚠️ [ENGINE_POOL] {error_msg}")
             return {
                 "success": False,
                 "engine_id": engine_id,
@@ -339,13 +430,124 @@ class EnginePool:
         finally:
             await self.release(engine_id, engine)
     
+    async def _analyse_with_recovery(
+        self,
+        engine_id: int,
+        engine: chess.engine.UciProtocol,
+        board: chess.Board,
+        limit: chess.engine.Limit,
+        multipv: int,
+        max_retries: int = 2
+    ) -> Tuple[chess.engine.UciProtocol, List[Dict[str, Any]]]:
+        """Run engine.analyse, recreating the engine once if it crashed. Returns (engine, info)."""
+        for retry in range(max_retries):
+            try:
+                info = await engine.analyse(board, limit, multipv=multipv)
+                return engine, info
+            except chess.engine.EngineTerminatedError:
+                if retry < max_retries - 1:
+                    _log.warning(f"   ⚠️ Engine {engine_id} crashed, recreating...")
+                    await self._recreate_engine(engine_id)
+                    # Get the recreated engine
+                    engine = self.engines[engine_id]
+                    _log.info(lambda: f"   ✓ Engine {engine_id} recreated, retrying...")
+                else:
+                    raise  # Last retry failed, propagate error
+    
+    @staticmethod
+    def _serialize_engine_info(info: List[Dict[str, Any]], depth: int) -> Dict[str, Any]:
+        """Plain-value engine fields for a cached position (PovScores -> cp/mate)."""
+        score = info[0]["score"].relative
+        if score.is_mate():
+            eval_cp = 10000 if score.mate() > 0 else -10000
+        else:
+            eval_cp = score.score(mate_score=10000)
+        
+        best_move_obj = info[0]["pv"][0] if info[0].get("pv") else None
+        
+        serialized_info = []
+        for pv_info in info:
+            pv_score = pv_info["score"].relative
+            if pv_score.is_mate():
+                pv_eval = 10000 if pv_score.mate() > 0 else -10000
+                pv_mate = pv_score.mate()
+            else:
+                pv_eval = pv_score.score(mate_score=10000)
+                pv_mate = None
+            serialized_info.append({
+                "eval_cp": pv_eval,
+                "mate_in": pv_mate,
+                "pv": [m.uci() for m in pv_info.get("pv", [])],
+                "depth": pv_info.get("depth", depth)
+            })
+        
+        return {
+            "engine_info": serialized_info,
+            "eval_cp": eval_cp,
+            "best_move_uci": best_move_obj.uci() if best_move_obj else None,
+            "search_depth": info[0].get("depth", depth),
+        }
+    
+    @staticmethod
+    def _plan_deep_pass(
+        positions: List[Tuple[str, chess.Move]],
+        fen_after_list: List[str],
+        fen_analysis_cache: Dict[int, Dict],
+        theory_cache: Dict[int, Dict],
+        config: AdaptiveDepthConfig
+    ) -> List[str]:
+        """
+        Pick the positions worth a full-depth re-search after the shallow sweep.
+        
+        Returns unique FENs (before and after each flagged move), most critical
+        move first. Book moves are skipped: they are classified as theory
+        whatever the engine says.
+        """
+        from tools.complexity_scorer import complexity_score_from_evals
+        
+        flagged: List[Tuple[float, int]] = []
+        for idx, (fen_before, move) in enumerate(positions):
+            before = fen_analysis_cache.get(position_key(fen_before), {})
+            after = fen_analysis_cache.get(position_key(fen_after_list[idx]), {})
+            if before.get("error") or after.get("error") or "eval_cp" not in before or "eval_cp" not in after:
+                continue
+            theory = theory_cache.get(position_key(fen_before))
+            if theory and move.uci() in theory.get("theoryMoves", []):
+                continue
+            
+            # Both evals are side-to-move relative; the mover's result is -eval_after
+            swing = abs(before["eval_cp"] + after["eval_cp"])
+            line_evals = [line.get("eval_cp", 0) for line in before.get("engine_info", [])]
+            gap = abs(line_evals[0] - line_evals[1]) if len(line_evals) >= 2 else None
+            
+            priority = 0.0
+            if swing >= config.swing_cp:
+                priority += swing
+            if gap is not None and gap <= config.gap_cp:
+                priority += config.gap_cp - gap + 1
+            if priority == 0.0:
+                # Cheaper checks didn't fire; fall back to the static complexity score
+                complexity = complexity_score_from_evals(chess.Board(fen_before), line_evals)
+                if complexity >= config.complexity_threshold:
+                    priority += 100 * complexity
+            if priority > 0:
+                flagged.append((priority, idx))
+        
+        flagged.sort(key=lambda item: -item[0])
+        deep_fens: Dict[int, str] = {}
+        for _priority, idx in flagged:
+            for fen in (positions[idx][0], fen_after_list[idx]):
+                deep_fens.setdefault(position_key(fen), fen)
+        return list(deep_fens.values())
+    
     async def analyze_game_parallel(
         self,
         positions: List[Tuple[str, chess.Move]],
         depth: int = 14,
         multipv: int = 2,
         timestamps: Dict[int, float] = None,
-        progress_callback=None
+        progress_callback=None,
+        adaptive: Optional[AdaptiveDepthConfig] = None
     ) -> List[Dict[str, Any]]:
         """
         Analyze a full game's positions in parallel, building complete ply records.
@@ -353,12 +555,16 @@ class EnginePool:
         Uses a work-queue approach where all engines pull from a shared queue.
         Returns complete ply records ready for use (no second pass needed).
         
+        With `adaptive`, positions are first swept at adaptive.shallow_depth and
+        only critical moves are re-searched at `depth` (see AdaptiveDepthConfig).
+        
         Args:
             positions: List of (fen_before, move) tuples for the entire game
             depth: Engine analysis depth
             multipv: Number of principal variations
             timestamps: Optional dict mapping ply -> clock time (for time spent calc)
             progress_callback: Optional async callback(positions_done, total) for progress
+            adaptive: Optional two-pass schedule (shallow sweep + budgeted deep pass)
         
         Returns:
             List of complete ply records in move order
@@ -371,25 +577,40 @@ class EnginePool:
         
         # === OPTIMIZATION: Collect unique FENs to avoid duplicate analysis ===
         # fen_after of move N == fen_before of move N+1, so we only need to analyze each once!
-        unique_fens = set()
+        # Deduped by the shared position key, so repetitions/transpositions are analyzed once too.
+        unique_by_key: Dict[int, str] = {}
         fen_after_list = []  # Store fen_after for each move
         
         for fen_before, move in positions:
-            unique_fens.add(fen_before)
             board = chess.Board(fen_before)
+            unique_by_key.setdefault(position_key(board), fen_before)
             board.push(move)
             fen_after = board.fen()
             fen_after_list.append(fen_after)
-            unique_fens.add(fen_after)
+            unique_by_key.setdefault(position_key(board), fen_after)
         
-        unique_fens = list(unique_fens)
+        unique_fens = list(unique_by_key.values())
         n_unique = len(unique_fens)
-        print(f"   📊 Analyzing {n_unique} unique positions (saved {n_positions * 2 - n_unique} duplicates)")
+        _log.info(lambda: f"   📊 Analyzing {n_unique} unique positions (saved {n_positions * 2 - n_unique} duplicates)")
+        
+        if adaptive is not None and adaptive.shallow_depth >= depth:
+            adaptive = None
+        sweep_depth = adaptive.shallow_depth if adaptive else depth
+        # Share of the move progress bar covered by the first sweep
+        sweep_share = 0.6 if adaptive else 1.0
         
         # Results storage
         results: List[Optional[Dict[str, Any]]] = [None] * n_positions
-        fen_analysis_cache: Dict[str, Dict] = {}  # Cache for theme/tag results
+        fen_analysis_cache: Dict[int, Dict] = {}  # Cache for theme/tag results (by position key)
         fen_engine_cache: Dict[str, Any] = {}  # Cache for engine results
+        deep_results: Dict[int, Dict] = {}  # Full-depth engine fields from the deep pass (by position key)
+        deep_views: Dict[int, Dict] = {}  # Shallow entry overlaid with its deep engine fields
+        
+        def deep_view(key: int) -> Dict:
+            view = deep_views.get(key)
+            if view is None:
+                view = deep_views[key] = {**fen_analysis_cache[key], **deep_results[key]}
+            return view
         
         # Progress tracking
         progress_counter = {"done": 0}
@@ -405,20 +626,22 @@ class EnginePool:
         loop = asyncio.get_event_loop()
         
         # === THEORY CHECK PHASE: Batch check opening theory for early moves ===
-        theory_cache: Dict[str, Dict] = {}
+        theory_cache: Dict[int, Dict] = {}  # By position key
         theory_fens = []
         theory_indices = []  # Track which moves need theory checks
+        theory_keys = set()
         
         for idx, (fen_before, move) in enumerate(positions):
             ply = idx + 1
             if ply <= 30:  # Only check theory for first 30 moves
-                if fen_before not in theory_cache:
+                if position_key(fen_before) not in theory_keys:
+                    theory_keys.add(position_key(fen_before))
                     theory_fens.append(fen_before)
                     theory_indices.append((idx, fen_before))
         
         # Batch theory checks in parallel
         if theory_fens:
-            print(f"   📚 Checking opening theory for {len(theory_fens)} positions...")
+            _log.info(lambda: f"   📚 Checking opening theory for {len(theory_fens)} positions...")
             
             if progress_callback:
                 try:
@@ -433,7 +656,7 @@ class EnginePool:
                     result = await loop.run_in_executor(None, check_lichess_masters, fen)
                     return (fen, result)
                 except Exception as e:
-                    print(f"   ⚠️ Theory check error for FEN: {e}")
+                    _log.warning(f"   ⚠️ Theory check error for FEN: {e}", every=5.0, key="theory_check")
                     return (fen, {'isTheory': False, 'theoryMoves': [], 'opening': '', 'eco': '', 'totalGames': 0})
             
             # Run all theory checks in parallel
@@ -449,12 +672,12 @@ class EnginePool:
             
             # Cache results
             for fen, result in theory_results:
-                theory_cache[fen] = result
+                theory_cache[position_key(fen)] = result
         
         # === PHASE 1: Analyze all unique positions ===
-        fen_queue: asyncio.Queue = asyncio.Queue()
-        for fen in unique_fens:
-            await fen_queue.put(fen)
+        # unique_fens is in ply order; each engine searches its own stretch of the game backward
+        n_workers = min(self.pool_size, n_unique)
+        scheduler = PlySegmentScheduler(unique_fens, n_workers)
         
         async def analyze_fen_worker(worker_id: int):
             """Worker that analyzes unique FENs."""
@@ -462,9 +685,8 @@ class EnginePool:
             
             try:
                 while True:
-                    try:
-                        fen = fen_queue.get_nowait()
-                    except asyncio.QueueEmpty:
+                    fen = scheduler.next(worker_id)
+                    if fen is None:
                         break
                     
                     try:
@@ -478,7 +700,7 @@ class EnginePool:
                             )
                         except RuntimeError as e:
                             if "process pool is not usable" in str(e):
-                                print(f"   ⚠️ Process pool died, recreating...")
+                                _log.warning(f"   ⚠️ Process pool died, recreating...")
                                 await self._recreate_process_pool()
                                 themes_future = loop.run_in_executor(
                                     self.process_pool, compute_themes_and_tags, fen
@@ -487,32 +709,16 @@ class EnginePool:
                                 raise
                         
                         # Engine analysis (multipv=2 for all positions) with crash recovery
-                        info = None
-                        max_retries = 2
-                        for retry in range(max_retries):
-                            try:
-                                info = await engine.analyse(
-                                    board,
-                                    chess.engine.Limit(depth=depth),
-                                    multipv=multipv
-                                )
-                                break  # Success, exit retry loop
-                            except chess.engine.EngineTerminatedError:
-                                if retry < max_retries - 1:
-                                    print(f"   ⚠️ Engine {engine_id} crashed, recreating...")
-                                    await self._recreate_engine(engine_id)
-                                    # Get the recreated engine
-                                    engine = self.engines[engine_id]
-                                    print(f"   ✓ Engine {engine_id} recreated, retrying...")
-                                else:
-                                    raise  # Last retry failed, propagate error
+                        engine, info = await self._analyse_with_recovery(
+                            engine_id, engine, board, chess.engine.Limit(depth=sweep_depth), multipv
+                        )
                         
                         # Get theme/tag results (with recovery)
                         try:
                             raw = await themes_future
                         except RuntimeError as e:
                             if "process pool is not usable" in str(e):
-                                print(f"   ⚠️ Process pool died during execution, recreating...")
+                                _log.warning(f"   ⚠️ Process pool died during execution, recreating...")
                                 await self._recreate_process_pool()
                                 themes_future = loop.run_in_executor(
                                     self.process_pool, compute_themes_and_tags, fen
@@ -523,32 +729,8 @@ class EnginePool:
                         
                         raw["theme_scores"] = compute_theme_scores(raw["themes"])
                         
-                        # Extract engine eval
-                        score = info[0]["score"].relative
-                        if score.is_mate():
-                            eval_cp = 10000 if score.mate() > 0 else -10000
-                        else:
-                            eval_cp = score.score(mate_score=10000)
-                        
-                        best_move_obj = info[0]["pv"][0] if info[0].get("pv") else None
-                        best_move_uci = best_move_obj.uci() if best_move_obj else None
-                        
                         # Serialize engine_info (convert PovScore to plain values)
-                        serialized_info = []
-                        for pv_info in info:
-                            pv_score = pv_info["score"].relative
-                            if pv_score.is_mate():
-                                pv_eval = 10000 if pv_score.mate() > 0 else -10000
-                                pv_mate = pv_score.mate()
-                            else:
-                                pv_eval = pv_score.score(mate_score=10000)
-                                pv_mate = None
-                            serialized_info.append({
-                                "eval_cp": pv_eval,
-                                "mate_in": pv_mate,
-                                "pv": [m.uci() for m in pv_info.get("pv", [])],
-                                "depth": pv_info.get("depth", depth)
-                            })
+                        engine_fields = self._serialize_engine_info(info, sweep_depth)
                         
                         # Add scoring and compartmentalization
                         from significance_scorer import SignificanceScorer
@@ -564,11 +746,9 @@ class EnginePool:
                         })
                         
                         # Cache results
-                        fen_analysis_cache[fen] = {
+                        fen_analysis_cache[position_key(fen)] = {
                             "fen": fen,
-                            "engine_info": serialized_info,
-                            "eval_cp": eval_cp,
-                            "best_move_uci": best_move_uci,
+                            **engine_fields,
                             "scored_insights": scored_insights,
                             "compartments": compartments,
                             **raw
@@ -576,16 +756,16 @@ class EnginePool:
                         
                     except Exception as e:
                         error_msg = str(e)
-                        print(f"   ⚠️ Analysis error for FEN: {error_msg}")
+                        _log.warning(f"   ⚠️ Analysis error for FEN: {error_msg}", every=5.0, key="analysis_error")
                         
                         # Check if process pool died
                         if "process pool is not usable" in error_msg or "child process terminated" in error_msg.lower():
                             try:
                                 await self._recreate_process_pool()
                             except Exception as pool_err:
-                                print(f"   ❌ Failed to recreate process pool: {pool_err}")
+                                _log.warning(f"   ❌ Failed to recreate process pool: {pool_err}")
                         
-                        fen_analysis_cache[fen] = {"error": error_msg}
+                        fen_analysis_cache[position_key(fen)] = {"error": error_msg}
                     
                     # Update progress - report as move analysis progress
                     async with progress_lock:
@@ -596,22 +776,79 @@ class EnginePool:
                         try:
                             # Estimate move progress: we analyze ~1.5 unique positions per move
                             # So when we've done n_unique positions, we're roughly done with all moves
-                            estimated_moves_done = min(n_positions, int((done / n_unique) * n_positions))
+                            estimated_moves_done = min(n_positions, int((done / n_unique) * n_positions * sweep_share))
                             await progress_callback(estimated_moves_done, n_positions, "Analyzing moves...")
                         except Exception:
                             pass
-                    
-                    fen_queue.task_done()
             finally:
                 await self.release(engine_id, engine)
         
         # Run FEN analysis workers
-        n_workers = min(self.pool_size, n_unique)
         workers = [asyncio.create_task(analyze_fen_worker(i)) for i in range(n_workers)]
         await asyncio.gather(*workers)
+        _log.info(lambda: f"   🧭 {n_workers} ply segments, {scheduler.steals} steals")
+        
+        # === PHASE 1b (adaptive): re-search critical positions at full depth ===
+        if adaptive:
+            deep_fens = self._plan_deep_pass(positions, fen_after_list, fen_analysis_cache, theory_cache, adaptive)
+            _log.info(lambda: f"   🔬 Deep pass: {len(deep_fens)}/{n_unique} positions flagged at depth {sweep_depth}, "
+                  f"re-searching at depth {depth} (budget {adaptive.node_budget:,} nodes)")
+            deep_queue: asyncio.Queue = asyncio.Queue()
+            for fen in deep_fens:
+                deep_queue.put_nowait(fen)
+            budget = {"nodes": adaptive.node_budget, "searched": 0, "truncated": 0}
+            n_deep_workers = min(self.pool_size, len(deep_fens))
+            
+            async def deep_worker(worker_id: int):
+                """Worker that re-searches flagged FENs until the node budget is spent."""
+                engine_id, engine = await self.acquire()
+                try:
+                    while budget["nodes"] > 0:
+                        try:
+                            fen = deep_queue.get_nowait()
+                        except asyncio.QueueEmpty:
+                            break
+                        # Reserve this worker's share of what is left, so concurrent
+                        # searches can't overrun the budget together; refund the rest
+                        share = max(1, budget["nodes"] // n_deep_workers)
+                        budget["nodes"] -= share
+                        used = 0
+                        try:
+                            limit = chess.engine.Limit(depth=depth, nodes=share)
+                            engine, info = await self._analyse_with_recovery(
+                                engine_id, engine, chess.Board(fen), limit, multipv
+                            )
+                            used = max(1, info[0].get("nodes") or 0)
+                            budget["searched"] += 1
+                            reached = info[0].get("depth", depth)
+                            if reached >= depth:
+                                deep_results[position_key(fen)] = self._serialize_engine_info(info, depth)
+                            else:
+                                # The node cap cut the search short: keep the shallow result
+                                budget["truncated"] += 1
+                        except Exception as e:
+                            # Keep the shallow result for this position
+                            _log.warning(f"   ⚠️ Deep search error for FEN: {e}", every=5.0, key="deep_search_error")
+                        budget["nodes"] += share - used
+                        
+                        if progress_callback:
+                            try:
+                                done = budget["searched"]
+                                estimated_moves_done = int(n_positions * (sweep_share + (1 - sweep_share) * done / len(deep_fens)))
+                                await progress_callback(min(n_positions, estimated_moves_done), n_positions, "Analyzing moves...")
+                            except Exception:
+                                pass
+                finally:
+                    await self.release(engine_id, engine)
+            
+            if deep_fens:
+                await asyncio.gather(*[asyncio.create_task(deep_worker(i)) for i in range(n_deep_workers)])
+            _log.info(lambda: f"   ✅ Deep pass re-searched {budget['searched']}/{len(deep_fens)} positions "
+                  f"({adaptive.node_budget - max(0, budget['nodes']):,} nodes, "
+                  f"{budget['truncated']} stopped short of depth {depth})")
         
         # === PHASE 2: Build ply records from cached results ===
-        print(f"   📝 Building move records from cached results...")
+        _log.info("   📝 Building move records from cached results...")
         
         # Track if progress callback is failing (stream might be closed)
         callback_failures = 0
@@ -631,14 +868,18 @@ class EnginePool:
                 except Exception as e:
                     callback_failures += 1
                     if callback_failures == 1:  # Only log first failure with traceback
-                        print(f"   ⚠️ Progress callback error (stream may be closed): {e}")
+                        _log.warning(f"   ⚠️ Progress callback error (stream may be closed): {e}")
                         import traceback
                         traceback.print_exc()
                     # Continue processing even if callback fails
             
-            # Look up cached results
-            analysis_before = fen_analysis_cache.get(fen_before, {})
-            analysis_after = fen_analysis_cache.get(fen_after, {})
+            # Look up cached results; deep evals only when both sides of the move have one
+            key_before, key_after = position_key(fen_before), position_key(fen_after)
+            if key_before in deep_results and key_after in deep_results:
+                analysis_before, analysis_after = deep_view(key_before), deep_view(key_after)
+            else:
+                analysis_before = fen_analysis_cache.get(key_before, {})
+                analysis_after = fen_analysis_cache.get(key_after, {})
             
             if analysis_before.get("error") or analysis_after.get("error"):
                 results[idx] = {
@@ -688,8 +929,8 @@ class EnginePool:
                 accuracy_pct = 100 / (1 + (cp_loss / 50) ** 0.7)
                 
                 # Opening theory check (use cached result from batched phase)
-                if ply <= 30 and fen_before in theory_cache:
-                    theory_check = theory_cache[fen_before]
+                if ply <= 30 and position_key(fen_before) in theory_cache:
+                    theory_check = theory_cache[position_key(fen_before)]
                     is_theory_move = move_uci in theory_check.get('theoryMoves', [])
                 else:
                     theory_check = {'isTheory': False, 'theoryMoves': [], 'opening': '', 'eco': '', 'totalGames': 0}
@@ -731,7 +972,7 @@ class EnginePool:
                         fen_after_best = board_best.fen()
                         
                         # Check cache first
-                        best_move_analysis = fen_analysis_cache.get(fen_after_best)
+                        best_move_analysis = fen_analysis_cache.get(position_key(fen_after_best))
                         if not best_move_analysis:
                             # Compute themes/tags for best move position (with recovery)
                             try:
@@ -741,7 +982,7 @@ class EnginePool:
                                 best_move_tags = raw_best.get("tags", [])
                             except RuntimeError as e:
                                 if "process pool is not usable" in str(e) or "child process terminated" in str(e).lower():
-                                    print(f"   ⚠️ Process pool died during best move analysis, recreating...")
+                                    _log.warning(f"   ⚠️ Process pool died during best move analysis, recreating...")
                                     await self._recreate_process_pool()
                                     raw_best = await loop.run_in_executor(
                                         self.process_pool, compute_themes_and_tags, fen_after_best
@@ -752,7 +993,7 @@ class EnginePool:
                         else:
                             best_move_tags = best_move_analysis.get("tags", [])
                     except Exception as e:
-                        print(f"   ⚠️ Error computing best move tags for ply {ply}: {e}")
+                        _log.warning(f"   ⚠️ Error computing best move tags for ply {ply}: {e}", every=5.0, key="best_move_tags")
                         best_move_tags = []
                 
                 # === Threat Category Classification ===
@@ -766,7 +1007,7 @@ class EnginePool:
                     threat_category = threat_cat_result["type"]
                     threat_description = threat_cat_result["description"]
                 except Exception as e:
-                    print(f"   ⚠️ Error categorizing threat for ply {ply}: {e}")
+                    _log.warning(f"   ⚠️ Error categorizing threat for ply {ply}: {e}", every=5.0, key="threat_category")
                     threat_category = None
                     threat_description = None
                 
@@ -864,7 +1105,7 @@ class EnginePool:
                         )
                         ply_record["structured_analysis"] = structured_analysis
                     except Exception as e:
-                        print(f"   ⚠️ Error generating explanation for ply {ply}: {e}")
+                        _log.warning(f"   ⚠️ Error generating explanation for ply {ply}: {e}", every=5.0, key="explanation")
                         import traceback
                         traceback.print_exc()
                         # Continue without structured analysis
@@ -872,7 +1113,7 @@ class EnginePool:
                 results[idx] = ply_record
                 
             except Exception as e:
-                print(f"   ⚠️ Error building ply record {ply}: {e}")
+                _log.warning(f"   ⚠️ Error building ply record {ply}: {e}", every=5.0, key="ply_record")
                 results[idx] = {
                     "success": False,
                     "ply": ply,
@@ -943,20 +1184,20 @@ class EnginePool:
     
     async def shutdown(self):
         """Gracefully shutdown all engines in the pool."""
-        print("🔧 Shutting down engine pool...")
+        _log.info("🔧 Shutting down engine pool...")
         
         for i, engine in enumerate(self.engines):
             try:
                 await engine.quit()
-                print(f"   ✓ Engine {i+1} stopped")
+                _log.info(lambda: f"   ✓ Engine {i+1} stopped")
             except Exception as e:
-                print(f"   ⚠️ Error stopping engine {i+1}: {e}")
+                _log.warning(f"   ⚠️ Error stopping engine {i+1}: {e}")
         
         # Shutdown ProcessPoolExecutor
         if self.process_pool:
             self.process_pool.shutdown(wait=True)
             self.process_pool = None
-            print(f"   ✓ ProcessPool stopped")
+            _log.info("   ✓ ProcessPool stopped")
         
         self.engines = []
         self.engine_status = {}
@@ -969,7 +1210,7 @@ class EnginePool:
             except asyncio.QueueEmpty:
                 break
         
-        print("✅ Engine pool shutdown complete")
+        _log.info("✅ Engine pool shutdown complete")
     
     async def _recreate_process_pool(self):
         """Recreate ProcessPoolExecutor after it becomes unusable."""
@@ -983,9 +1224,9 @@ class EnginePool:
             
             try:
                 self.process_pool = ProcessPoolExecutor(max_workers=self.pool_size)
-                print(f"   ✓ ProcessPool recreated with {self.pool_size} workers")
+                _log.info(lambda: f"   ✓ ProcessPool recreated with {self.pool_size} workers")
             except Exception as e:
-                print(f"   ❌ Failed to recreate ProcessPool: {e}")
+                _log.warning(f"   ❌ Failed to recreate ProcessPool: {e}")
                 raise
     
     async def _recreate_engine(self, engine_id: int):
@@ -1019,9 +1260,9 @@ class EnginePool:
                     last_used=None
                 )
                 
-                print(f"   ✓ Engine {engine_id} recreated")
+                _log.info(lambda: f"   ✓ Engine {engine_id} recreated")
             except Exception as e:
-                print(f"   ❌ Failed to recreate engine {engine_id}: {e}")
+                _log.warning(f"   ❌ Failed to recreate engine {engine_id}: {e}")
                 raise
 
 
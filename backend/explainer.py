@@ -13,6 +13,7 @@ from investigator import InvestigationResult
 from openai import OpenAI
 from minimal_prompts import MIN_SYSTEM_PROMPT_V1, EXPLAINER_CONTRACT_V1
 from command_protocol import render_command
+from prompt_compiler import count_tokens
 
 
 class Explainer:
@@ -281,23 +282,21 @@ GOAL ANCHOR (optional): {goal_anchoring if goal_anchoring else "Connect to the u
         if relaxed:
             prompt = prompt.replace("MUST", "should").replace("must", "should")
 
-        # Prompt size audit
-        def _approx_tokens(s: str) -> int:
-            return int(len(s) / 4) if isinstance(s, str) else 0
-
+        # Prompt size audit (tokens measured locally, before sending)
         section_sizes = {
-            "rules_contract_chars": len(rules_contract or ""),
-            "facts_card_chars": len(facts_card or ""),
-            "pgn_section_chars": len(pgn_section or ""),
+            "rules_contract_tokens": count_tokens(rules_contract),
+            "facts_card_tokens": count_tokens(facts_card),
+            "pgn_section_tokens": count_tokens(pgn_section),
             "total_prompt_chars": len(prompt),
         }
+        prompt_tokens = count_tokens(prompt)
         print("   📏 [EXPLAINER_PROMPT_AUDIT] section_sizes:", section_sizes)
-        print("   📏 [EXPLAINER_PROMPT_AUDIT] approx_total_tokens:", _approx_tokens(prompt))
+        print("   📏 [EXPLAINER_PROMPT_AUDIT] total_tokens:", prompt_tokens)
 
         try:
             self._last_prompt_audit = {
                 "section_sizes": section_sizes,
-                "approx_total_tokens": _approx_tokens(prompt),
+                "approx_total_tokens": prompt_tokens,
                 "include_pgn": bool(include_pgn),
             }
         except Exception:
@@ -342,7 +341,7 @@ GOAL ANCHOR (optional): {goal_anchoring if goal_anchoring else "Connect to the u
             except Exception:
                 prompt_tokens = None
                 completion_tokens = None
-            if _pipeline_timer:
+            if _pipeline_timer and response is not None:  # router calls are recorded by the LLMRouter
                 _pipeline_timer.record_llm("explainer", _dt, tokens_in=prompt_tokens, tokens_out=completion_tokens, model=self.model)
             
             # Extract content
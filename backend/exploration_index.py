@@ -0,0 +1,225 @@
+"""
+Exploration Move Index
+
+Structured form of the Investigator's exploration PGN: one node per move
+with its parent, SAN/UCI, FEN before/after and the tag/role deltas computed
+while the PGN was built. The summariser queries this index instead of
+regex-parsing the PGN comments and replaying boards to recompute deltas.
+
+Node order matches the exported PGN text (mainline move, its sibling
+variations, then the mainline continuation), so consumers that used the
+parsed comment sequence see the same moves in the same order.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import chess
+import chess.pgn
+
+_SAN_DECORATIONS = "+#!?"
+_RESULT_TOKENS = {"*", "1-0", "0-1", "1/2-1/2"}
+
+
+def _role_keys(roles: Optional[Dict[str, List[str]]]) -> List[str]:
+    """Flatten {piece_id: [role, ...]} into "piece_id:role" keys."""
+    return [f"{piece_id}:{role}" for piece_id, roles_list in (roles or {}).items() for role in (roles_list or [])]
+
+
+def record_node_deltas(
+    node_deltas: Optional[Dict[int, Dict[str, Any]]],
+    node: chess.pgn.GameNode,
+    *,
+    tags_gained: Iterable[str],
+    tags_lost: Iterable[str],
+    roles_gained: Iterable[str],
+    roles_lost: Iterable[str],
+    threats: Iterable[str] = (),
+) -> None:
+    """
+    Remember the deltas annotated on a PGN node while the PGN is being built.
+
+    Tags are raw tag names and roles full "piece_id:role" keys (the PGN
+    comments carry shortened / humanized forms capped at 10 items).
+    """
+    if node_deltas is None:
+        return
+    node_deltas[id(node)] = {
+        "tags_gained": sorted(t for t in tags_gained if t),
+        "tags_lost": sorted(t for t in tags_lost if t),
+        "roles_gained": sorted(roles_gained),
+        "roles_lost": sorted(roles_lost),
+        "threats": [t for t in threats if t],
+    }
+
+
+def build_exploration_index(
+    game: chess.pgn.Game,
+    node_deltas: Dict[int, Dict[str, Any]],
+    *,
+    starting_tags: List[str],
+    starting_roles: Dict[str, List[str]],
+) -> Dict[str, Any]:
+    """
+    Walk the built exploration game once and emit the move index.
+
+    Args:
+        game: Exploration PGN game (before export)
+        node_deltas: Deltas recorded per node via record_node_deltas
+        starting_tags: Tag names at the start position
+        starting_roles: Roles at the start position
+
+    Returns:
+        {"starting_fen", "starting_tags", "starting_roles", "nodes": [...]}
+    """
+    nodes: List[Dict[str, Any]] = []
+    root = game.board()
+
+    def _entry(child: chess.pgn.ChildNode, parent_id: Optional[int], board: chess.Board) -> int:
+        san = board.san(child.move)
+        number = f"{board.fullmove_number}." if board.turn == chess.WHITE else f"{board.fullmove_number}..."
+        fen_before = board.fen()
+        board.push(child.move)
+        deltas = node_deltas.get(id(child))
+        nodes.append({
+            "id": len(nodes),
+            "parent": parent_id,
+            "ply": board.ply() - root.ply(),
+            "move": f"{number} {san}",
+            "san": san,
+            "uci": child.move.uci(),
+            "fen_before": fen_before,
+            "fen_after": board.fen(),
+            "annotated": deltas is not None,
+            **(deltas or {"tags_gained": [], "tags_lost": [], "roles_gained": [], "roles_lost": [], "threats": []}),
+        })
+        board.pop()
+        return len(nodes) - 1
+
+    def _walk(parent: chess.pgn.GameNode, parent_id: Optional[int], board: chess.Board) -> None:
+        if not parent.variations:
+            return
+        main, *sides = parent.variations
+        main_id = _entry(main, parent_id, board)
+        for side in sides:
+            side_id = _entry(side, parent_id, board)
+            board.push(side.move)
+            _walk(side, side_id, board)
+            board.pop()
+        board.push(main.move)
+        _walk(main, main_id, board)
+        board.pop()
+
+    _walk(game, None, root.copy())
+    return {
+        "starting_fen": root.fen(),
+        "starting_tags": list(starting_tags or []),
+        "starting_roles": {piece_id: list(roles) for piece_id, roles in (starting_roles or {}).items() if roles},
+        "nodes": nodes,
+    }
+
+
+def _strip_san(token: str) -> str:
+    return token.rstrip(_SAN_DECORATIONS)
+
+
+def line_tokens(pgn_line: str) -> List[str]:
+    """SAN/UCI tokens of a move line ("1. e4 e5 2. Nf3" -> ["e4", "e5", "Nf3"])."""
+    tokens = []
+    for token in (pgn_line or "").split():
+        token = token.split(".")[-1] if "." in token else token
+        if token and token not in _RESULT_TOKENS:
+            tokens.append(_strip_san(token))
+    return tokens
+
+
+class ExplorationIndex:
+    """Query view over an exploration index dict (see build_exploration_index)"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.starting_fen: Optional[str] = data.get("starting_fen")
+        self.starting_tags: List[str] = list(data.get("starting_tags") or [])
+        self.starting_roles: Dict[str, List[str]] = dict(data.get("starting_roles") or {})
+        self.nodes: List[Dict[str, Any]] = list(data.get("nodes") or [])
+        self._children: Dict[Optional[int], Dict[str, int]] = {}
+        self._main_child: Dict[Optional[int], int] = {}
+        for node in self.nodes:
+            self._main_child.setdefault(node["parent"], node["id"])  # main move precedes its siblings
+            children = self._children.setdefault(node["parent"], {})
+            children.setdefault(_strip_san(node["san"]), node["id"])
+            children.setdefault(node["uci"], node["id"])
+
+    @classmethod
+    def from_result(cls, inv: Any) -> Optional["ExplorationIndex"]:
+        """Index attached to an InvestigationResult, or None when it has no nodes."""
+        data = getattr(inv, "exploration_index", None)
+        if isinstance(data, dict) and data.get("nodes"):
+            return cls(data)
+        return None
+
+    def main_sequence(self) -> List[Dict[str, Any]]:
+        """Annotated moves in PGN order, shaped like the parsed PGN comment deltas."""
+        return [
+            {
+                "move": node["move"],
+                "san": node["san"],
+                "uci": node["uci"],
+                "fen_before": node["fen_before"],
+                "fen_after": node["fen_after"],
+                "tags_gained": list(node["tags_gained"]),
+                "tags_lost": list(node["tags_lost"]),
+                "roles_gained": list(node["roles_gained"]),
+                "roles_lost": list(node["roles_lost"]),
+                "threats_output": list(node["threats"]),
+            }
+            for node in self.nodes
+            if node.get("annotated")
+        ]
+
+    def starting_role_keys(self) -> List[str]:
+        return _role_keys(self.starting_roles)
+
+    def mainline(self, max_plies: Optional[int] = None) -> List[str]:
+        """SAN moves of the main variation from the start position."""
+        moves: List[str] = []
+        node_id = self._main_child.get(None)
+        while node_id is not None and (max_plies is None or len(moves) < max_plies):
+            moves.append(self.nodes[node_id]["san"])
+            node_id = self._main_child.get(node_id)
+        return moves
+
+    def follow(self, moves: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Nodes along a SAN/UCI move path from the start position, or None if it leaves the tree."""
+        path: List[Dict[str, Any]] = []
+        parent: Optional[int] = None
+        for move in moves:
+            node_id = self._children.get(parent, {}).get(_strip_san(move))
+            if node_id is None:
+                return None
+            path.append(self.nodes[node_id])
+            parent = node_id
+        return path
+
+    def net_changes(self, pgn_line: str) -> Optional[Tuple[List[str], List[str], List[str], List[str]]]:
+        """
+        Net tag and role changes along a line, from the recorded per-move deltas.
+
+        A change undone later in the line cancels out. Returns None when the
+        line isn't fully in the index or a move on it carries no deltas.
+        """
+        path = self.follow(line_tokens(pgn_line))
+        if not path or not all(node.get("annotated") for node in path):
+            return None
+        tags = _net_counts((node["tags_gained"], node["tags_lost"]) for node in path)
+        roles = _net_counts((node["roles_gained"], node["roles_lost"]) for node in path)
+        return tags[0], tags[1], roles[0], roles[1]
+
+
+def _net_counts(deltas: Iterable[Tuple[List[str], List[str]]]) -> Tuple[List[str], List[str]]:
+    """Accumulate gained/lost items across moves, cancelling opposite changes."""
+    net: Dict[str, int] = {}
+    for gained, lost in deltas:
+        for item in gained:
+            net[item] = net.get(item, 0) + 1
+        for item in lost:
+            net[item] = net.get(item, 0) - 1
+    return [k for k, v in net.items() if v > 0], [k for k, v in net.items() if v < 0]
@@ -26,6 +26,9 @@ class ResourceBudget:
     max_context_tokens: int = 8000   # Maximum tokens for LLM context
     max_retries_per_action: int = 2  # Retries per failed action
     max_validation_errors: int = 3   # Max invalid LLM outputs before fallback
+    max_parallel_fetch: int = 2      # Concurrent fetch/search actions
+    max_parallel_engine: int = 2     # Concurrent engine-backed actions
+    max_parallel_compute: int = 4    # Concurrent compute actions
     
     @classmethod
     def default(cls) -> 'ResourceBudget':
@@ -35,6 +35,54 @@ class ActionType(str, Enum):
     SIMULATE_SEQUENCE = "simulate_sequence"  # Play out a sequence of moves
 
 
+# Concurrency class per action type; each class gets its own semaphore sized
+# by ResourceBudget.max_parallel_<class>
+RESOURCE_CLASSES = {
+    ActionType.FETCH: "fetch",
+    ActionType.SEARCH: "fetch",
+    ActionType.ANALYZE: "engine",
+    ActionType.TEST_MOVE: "engine",
+    ActionType.EXAMINE_PV: "engine",
+    ActionType.CHECK_CONSEQUENCE: "engine",
+    ActionType.SIMULATE_SEQUENCE: "engine",
+    ActionType.COMPUTE: "compute",
+}
+
+# ResourceUsage counter each action type is budgeted against
+# (chess actions count as analysis)
+BUDGET_COUNTERS = {
+    ActionType.FETCH: "fetches",
+    ActionType.ANALYZE: "analyses",
+    ActionType.SEARCH: "searches",
+    ActionType.COMPUTE: "computes",
+    ActionType.TEST_MOVE: "analyses",
+    ActionType.EXAMINE_PV: "analyses",
+    ActionType.CHECK_CONSEQUENCE: "analyses",
+    ActionType.SIMULATE_SEQUENCE: "analyses",
+}
+
+# Action types whose result depends only on their params (not on accumulated data)
+PURE_ACTIONS = {
+    ActionType.FETCH,
+    ActionType.SEARCH,
+    ActionType.TEST_MOVE,
+    ActionType.CHECK_CONSEQUENCE,
+    ActionType.SIMULATE_SEQUENCE,
+}
+
+
+def _normalize_param(key: str, value: Any) -> Any:
+    """Canonical form of a param value for memoization"""
+    if isinstance(value, str):
+        value = value.strip()
+        if key == "fen":
+            # Move counters don't change the position
+            return " ".join(value.split()[:4])
+        if key == "username":
+            return value.lower()
+    return value
+
+
 @dataclass
 class InterpreterAction:
     """A single action requested by the interpreter"""
@@ -49,6 +97,24 @@ class InterpreterAction:
         content = f"{self.action_type.value}:{json.dumps(self.params, sort_keys=True)}"
         return hashlib.md5(content.encode()).hexdigest()[:8]
     
+    @property
+    def memo_key(self) -> Optional[str]:
+        """
+        Key for reusing this action's result across passes, or None if the
+        result depends on accumulated data. Params are normalized so
+        trivially different requests (FEN move counters, username case,
+        unset params) share a result.
+        """
+        position_analysis = self.action_type == ActionType.ANALYZE and (self.params.get("fen") or self.params.get("pgn"))
+        if self.action_type not in PURE_ACTIONS and not position_analysis:
+            return None
+        params = {
+            key: _normalize_param(key, value)
+            for key, value in self.params.items()
+            if value is not None and value != ""
+        }
+        return f"{self.action_type.value}:{json.dumps(params, sort_keys=True, default=str)}"
+    
     def to_dict(self) -> Dict[str, Any]:
         return {
             "action_type": self.action_type.value,
@@ -154,6 +220,7 @@ class InterpreterState:
     investigation_plan: Optional[Any] = None  # InvestigationPlan
     current_step_id: Optional[str] = None
     step_results: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # step_id -> result
+    action_memo: Dict[str, ActionResult] = field(default_factory=dict)  # memo_key -> successful result
     
     @classmethod
     def create(cls, message: str, context: Dict[str, Any]) -> 'InterpreterState':
@@ -505,10 +572,134 @@ class InterpreterLoop:
         status_callback: Optional[Callable] = None,
         cancel_token: Optional[CancellationToken] = None
     ) -> Dict[str, ActionResult]:
-        """Execute actions, handling parallelism and dependencies"""
+        """
+        Execute actions as a dependency DAG.
+        
+        Each action starts as soon as the action it depends on has succeeded,
+        with at most max_parallel_<class> actions of each resource class
+        (fetch / engine / compute) running at once. Budget counters are checked
+        when an action starts, counting actions still in flight, so parallel
+        branches can't overshoot. Successful results of param-only actions are
+        memoized on the state and reused by identical actions in later passes.
+        """
         results: Dict[str, ActionResult] = {}
+        action_to_step_map = self._map_actions_to_steps(actions, state)
+        
+        nodes: Dict[str, InterpreterAction] = {}
+        for action in actions:
+            nodes.setdefault(action.id, action)
+        done = {action_id: asyncio.Event() for action_id in nodes}
+        cyclic = self._find_dependency_cycles(nodes)
+        # depends_on may also name an action that succeeded in an earlier pass
+        completed_before = {
+            action_id
+            for record in state.passes
+            for action_id, result in record.action_results.items()
+            if result.success
+        }
+        semaphores = {
+            resource: asyncio.Semaphore(max(1, getattr(self.budget, f"max_parallel_{resource}")))
+            for resource in set(RESOURCE_CLASSES.values())
+        }
+        in_flight: Dict[str, int] = {}
+        pending_memo: Dict[str, asyncio.Future] = {}
+        pass_number = len(state.passes) + 1
+        
+        def failed(action: InterpreterAction, error: str) -> ActionResult:
+            return ActionResult(action_id=action.id, success=False, error=error)
+        
+        def dependency_data(action: InterpreterAction) -> Dict[str, Any]:
+            """Accumulated data plus the results of this action's ancestors in this pass"""
+            if action.depends_on not in nodes:
+                return state.accumulated_data
+            data = dict(state.accumulated_data)
+            ancestor_id = action.depends_on
+            while ancestor_id in nodes and ancestor_id in results:
+                ancestor = nodes[ancestor_id]
+                if results[ancestor_id].success:
+                    data[f"{ancestor.action_type.value}_{pass_number}_{ancestor_id}"] = results[ancestor_id].data
+                ancestor_id = ancestor.depends_on
+            return data
+        
+        async def execute(action: InterpreterAction) -> ActionResult:
+            if cancel_token and cancel_token.is_cancelled:
+                return failed(action, "cancelled")
+            
+            resource = RESOURCE_CLASSES.get(action.action_type, "compute")
+            counter = BUDGET_COUNTERS.get(action.action_type)
+            async with semaphores[resource]:
+                if cancel_token and cancel_token.is_cancelled:
+                    return failed(action, "cancelled")
+                if state.usage.elapsed_seconds > self.budget.timeout_seconds:
+                    return failed(action, "timeout")
+                if not self._can_execute_action(action, state, in_flight):
+                    return failed(action, "budget_exceeded")
+                
+                if counter:
+                    in_flight[counter] = in_flight.get(counter, 0) + 1
+                try:
+                    return await self._execute_single_action(
+                        action, state, status_callback, cancel_token,
+                        accumulated_data=dependency_data(action)
+                    )
+                finally:
+                    if counter:
+                        in_flight[counter] -= 1
         
-        # Map actions to investigation steps if investigation plan exists
+        async def execute_memoized(action: InterpreterAction) -> ActionResult:
+            memo_key = action.memo_key
+            if memo_key is None:
+                return await execute(action)
+            
+            if memo_key in state.action_memo:
+                return self._memo_hit(action, state.action_memo[memo_key])
+            if memo_key in pending_memo:
+                # Same action already running in this pass
+                shared = await pending_memo[memo_key]
+                if shared.success:
+                    return self._memo_hit(action, shared)
+                return failed(action, shared.error)
+            
+            pending_memo[memo_key] = asyncio.get_running_loop().create_future()
+            result = failed(action, "cancelled")
+            try:
+                result = await execute(action)
+                if result.success and not (isinstance(result.data, dict) and result.data.get("error")):
+                    state.action_memo[memo_key] = result
+            finally:
+                pending_memo[memo_key].set_result(result)
+            return result
+        
+        async def run_node(action: InterpreterAction):
+            try:
+                if action.id in cyclic:
+                    result = failed(action, "dependency_cycle")
+                elif action.depends_on and action.depends_on in nodes:
+                    await done[action.depends_on].wait()
+                    if results[action.depends_on].success:
+                        result = await execute_memoized(action)
+                    else:
+                        result = failed(action, "dependency_failed")
+                elif action.depends_on and action.depends_on not in completed_before:
+                    result = failed(action, "dependency_not_found")
+                else:
+                    result = await execute_memoized(action)
+            except Exception as e:
+                result = failed(action, str(e))
+            
+            results[action.id] = result
+            self._update_action_step(action, result, state, action_to_step_map)
+            done[action.id].set()
+        
+        await asyncio.gather(*[run_node(action) for action in nodes.values()])
+        return results
+    
+    def _map_actions_to_steps(
+        self,
+        actions: List[InterpreterAction],
+        state: InterpreterState
+    ) -> Dict[str, str]:
+        """Map actions to investigation steps and mark those steps in_progress"""
         action_to_step_map = {}
         if state.investigation_plan:
             for action in actions:
@@ -521,138 +712,73 @@ class InterpreterLoop:
                             # Mark step as in_progress
                             step.status = "in_progress"
                             break
+        return action_to_step_map
+    
+    def _update_action_step(
+        self,
+        action: InterpreterAction,
+        result: ActionResult,
+        state: InterpreterState,
+        action_to_step_map: Dict[str, str]
+    ):
+        """Mark the investigation step mapped to an action as completed or failed"""
+        step_id = action_to_step_map.get(action.id)
+        if not step_id:
+            return
         
-        # Separate independent and dependent actions
-        independent = [a for a in actions if not a.depends_on]
-        dependent = [a for a in actions if a.depends_on]
-        
-        # Execute independent actions in parallel
-        if independent:
-            # Check budget before executing
-            for action in independent:
-                if not self._can_execute_action(action, state):
-                    results[action.id] = ActionResult(
-                        action_id=action.id,
-                        success=False,
-                        error="budget_exceeded"
-                    )
-                    continue
-            
-            # Filter to only executable actions
-            executable = [a for a in independent if a.id not in results]
-            
-            if executable:
-                parallel_results = await asyncio.gather(
-                    *[self._execute_single_action(a, state, status_callback, cancel_token) 
-                      for a in executable],
-                    return_exceptions=True
-                )
-                
-                for action, result in zip(executable, parallel_results):
-                    if isinstance(result, Exception):
-                        results[action.id] = ActionResult(
-                            action_id=action.id,
-                            success=False,
-                            error=str(result)
-                        )
-                        # Mark step as failed if mapped
-                        if action.id in action_to_step_map:
-                            step_id = action_to_step_map[action.id]
-                            if state.investigation_plan:
-                                for step in state.investigation_plan.steps:
-                                    if step.step_id == step_id:
-                                        step.status = "failed"
-                                        break
-                    else:
-                        results[action.id] = result
-                        # Mark step as completed if mapped
-                        if action.id in action_to_step_map:
-                            step_id = action_to_step_map[action.id]
-                            insights = []
-                            if result.success and result.data:
-                                # Extract insights from result
-                                if isinstance(result.data, dict):
-                                    if "insights" in result.data:
-                                        insights = result.data["insights"]
-                                    elif "consequences" in result.data:
-                                        consequences = result.data["consequences"]
-                                        if consequences:
-                                            insights.append(f"Consequences: {consequences}")
-                            state.mark_step_completed(step_id, result.data if result.success else None, insights)
-        
-        # Execute dependent actions sequentially
-        for action in dependent:
-            if cancel_token and cancel_token.is_cancelled:
-                results[action.id] = ActionResult(
-                    action_id=action.id,
-                    success=False,
-                    error="cancelled"
-                )
-                continue
-            
-            # Check if dependency succeeded
-            if action.depends_on and action.depends_on not in results:
-                results[action.id] = ActionResult(
-                    action_id=action.id,
-                    success=False,
-                    error="dependency_not_found"
-                )
-                continue
-            
-            if action.depends_on and not results[action.depends_on].success:
-                results[action.id] = ActionResult(
-                    action_id=action.id,
-                    success=False,
-                    error="dependency_failed"
-                )
-                continue
-            
-            if not self._can_execute_action(action, state):
-                results[action.id] = ActionResult(
-                    action_id=action.id,
-                    success=False,
-                    error="budget_exceeded"
-                )
-                continue
-            
-            result = await self._execute_single_action(
-                action, state, status_callback, cancel_token
-            )
-            results[action.id] = result
-            
-            # Mark step as completed if mapped
-            if action.id in action_to_step_map:
-                step_id = action_to_step_map[action.id]
-                insights = []
-                if result.success and result.data:
-                    # Extract insights from result
-                    if isinstance(result.data, dict):
-                        if "insights" in result.data:
-                            insights = result.data["insights"]
-                        elif "consequences" in result.data:
-                            consequences = result.data["consequences"]
-                            if consequences:
-                                insights.append(f"Consequences: {consequences}")
-                state.mark_step_completed(step_id, result.data if result.success else None, insights)
-            elif not result.success and action.id in action_to_step_map:
-                # Mark step as failed
-                step_id = action_to_step_map[action.id]
-                if state.investigation_plan:
-                    for step in state.investigation_plan.steps:
-                        if step.step_id == step_id:
-                            step.status = "failed"
-                            break
+        if not result.success:
+            if state.investigation_plan:
+                for step in state.investigation_plan.steps:
+                    if step.step_id == step_id:
+                        step.status = "failed"
+                        break
+            return
         
-        return results
+        insights = []
+        if isinstance(result.data, dict):
+            # Extract insights from result
+            if "insights" in result.data:
+                insights = result.data["insights"]
+            elif result.data.get("consequences"):
+                insights.append(f"Consequences: {result.data['consequences']}")
+        state.mark_step_completed(step_id, result.data, insights)
+    
+    @staticmethod
+    def _find_dependency_cycles(nodes: Dict[str, InterpreterAction]) -> set:
+        """IDs of actions that (transitively) depend on themselves"""
+        cyclic = set()
+        for start in nodes:
+            path = []
+            current = start
+            while current in nodes and current not in path:
+                path.append(current)
+                current = nodes[current].depends_on
+            if current in path:
+                cyclic.update(path[path.index(current):])
+        return cyclic
+    
+    @staticmethod
+    def _memo_hit(action: InterpreterAction, memoized: ActionResult) -> ActionResult:
+        """Result for an action served from the memo (no execution, no budget charged)"""
+        print(f"   📦 Reusing {action.action_type.value} result ({action.id})")
+        return ActionResult(
+            action_id=action.id,
+            success=True,
+            data=memoized.data,
+            from_cache=True
+        )
     
     async def _execute_single_action(
         self,
         action: InterpreterAction,
         state: InterpreterState,
         status_callback: Optional[Callable] = None,
-        cancel_token: Optional[CancellationToken] = None
+        cancel_token: Optional[CancellationToken] = None,
+        accumulated_data: Optional[Dict[str, Any]] = None
     ) -> ActionResult:
         """Execute a single action with retry logic"""
+        if accumulated_data is None:
+            accumulated_data = state.accumulated_data
         start_time = time.time()
         retries = 0
         
@@ -673,7 +799,7 @@ class InterpreterLoop:
                         timestamp=time.time()
                     )
                 
-                result = await self.executor.execute(action, state.accumulated_data)
+                result = await self.executor.execute(action, accumulated_data)
                 
                 # Track usage
                 self._record_action_usage(action, state, result)
@@ -705,21 +831,21 @@ class InterpreterLoop:
                 # Exponential backoff
                 await asyncio.sleep(2 ** retries * 0.5)
     
-    def _can_execute_action(self, action: InterpreterAction, state: InterpreterState) -> bool:
-        """Check if we can execute an action within budget"""
-        if action.action_type == ActionType.FETCH:
-            return state.usage.can_fetch(self.budget)
-        elif action.action_type == ActionType.ANALYZE:
-            return state.usage.can_analyze(self.budget)
-        elif action.action_type == ActionType.SEARCH:
-            return state.usage.can_search(self.budget)
-        elif action.action_type == ActionType.COMPUTE:
-            return state.usage.can_compute(self.budget)
-        elif action.action_type in [ActionType.TEST_MOVE, ActionType.EXAMINE_PV, 
-                                     ActionType.CHECK_CONSEQUENCE, ActionType.SIMULATE_SEQUENCE]:
-            # Chess actions count as analysis for budget purposes
-            return state.usage.can_analyze(self.budget)
-        return True
+    def _can_execute_action(
+        self,
+        action: InterpreterAction,
+        state: InterpreterState,
+        in_flight: Optional[Dict[str, int]] = None
+    ) -> bool:
+        """
+        Check if we can execute an action within budget.
+        `in_flight` counts started-but-unfinished actions per usage counter.
+        """
+        counter = BUDGET_COUNTERS.get(action.action_type)
+        if counter is None:
+            return True
+        used = getattr(state.usage, counter) + (in_flight or {}).get(counter, 0)
+        return used < getattr(self.budget, f"max_{counter}")
     
     def _record_action_usage(
         self, 
@@ -9,6 +9,7 @@ from typing import Dict, Any, Optional
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from investigator import InvestigationResult
+from position_key import position_key_hex
 
 
 @dataclass
@@ -70,20 +71,18 @@ class InvestigationCache:
             investigation_type: Type of investigation ("move" or "position")
             
         Returns:
-            Cache key string
+            Cache key string: "<position key>-<digest of type/variant/move>"
         """
-        # Normalize FEN (remove move counters if present)
-        fen_normalized = " ".join(fen.split()[:4])  # Keep only position, active color, castling, en passant
-        
-        key_parts = [fen_normalized, investigation_type]
+        # Position part is the shared Zobrist key (move counters ignored, legal-only en passant)
+        key_parts = [investigation_type]
         if variant:
             key_parts.append(str(variant))
         if move_san:
             key_parts.append(move_san)
         
-        key_str = "|".join(key_parts)
-        # Use hash for filename safety
-        return hashlib.md5(key_str.encode()).hexdigest()
+        # Short digest keeps the filename safe whatever the variant/move strings contain
+        suffix = hashlib.blake2b("|".join(key_parts).encode("utf-8"), digest_size=8).hexdigest()
+        return f"{position_key_hex(fen)}-{suffix}"
     
     def _get_cache_file_path(self, cache_key: str) -> Path:
         """Get file path for cache entry"""
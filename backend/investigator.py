@@ -14,8 +14,39 @@ import re
 from typing import Dict, Any, List, Optional, Callable, Tuple
 from dataclasses import dataclass, field
 from light_raw_analyzer import LightRawAnalysis, compute_light_raw_analysis
+from position_key import position_key
+from exploration_index import build_exploration_index, record_node_deltas
+from structured_log import DEBUG, get_logger
 from evidence_semantic_story import build_semantic_story
 
+_log = get_logger("investigator")
+_ROUTINE_PREFIXES = ("   🔍", "   📊", "      🔍", "      📊", "   ✅", "      ✅")
+
+
+def _trace_print(debug: bool) -> Callable[..., None]:
+    """
+    print() replacement for the verbose analysis paths.
+
+    Routine trace lines (🔍/📊/✅) become DEBUG records — INFO when the
+    Investigator runs with debug=True — and are dropped before joining their
+    arguments when that level is off; ⚠️/❌ lines are warnings.
+    """
+    routine_level = "info" if debug else "debug"
+
+    def _print(*args: Any, **_kwargs: Any) -> None:
+        routine = bool(args) and str(args[0]).startswith(_ROUTINE_PREFIXES)
+        if routine and not debug and not _log.enabled_for(DEBUG):
+            return
+        msg = " ".join(str(a) for a in args)
+        if routine:
+            getattr(_log, routine_level)(msg)
+        elif "⚠️" in msg or "❌" in msg:
+            _log.warning(msg)
+        else:
+            _log.info(msg)
+
+    return _print
+
 
 @dataclass
 class EvidenceLine:
@@ -97,6 +128,7 @@ class InvestigationResult:
     # NEW: Multi-branched exploration
     exploration_tree: Dict[str, Any] = field(default_factory=dict)  # Tree structure of all branches
     pgn_exploration: str = ""  # Massive PGN with all branches, themes, tactics, commentary
+    exploration_index: Dict[str, Any] = field(default_factory=dict)  # Per-move nodes of pgn_exploration (exploration_index.py)
     themes_identified: List[str] = field(default_factory=list)  # Themes found in exploration
     commentary: Dict[str, str] = field(default_factory=dict)  # Move-by-move commentary
     
@@ -176,6 +208,7 @@ class InvestigationResult:
             "overestimated_moves": self.overestimated_moves,
             "exploration_tree": self.exploration_tree,
             "pgn_exploration": self.pgn_exploration,
+            "exploration_index": self.exploration_index,
             "themes_identified": self.themes_identified,
             "commentary": self.commentary,
             # NEW: Deterministic evidence lines (2-4 plies each) for claim binding / frontend UI
@@ -269,11 +302,13 @@ class Investigator:
         except Exception:
             self.debug = False
         # Simple per-instance caches (bounded by manual pruning)
-        self._analysis_cache: Dict[Tuple[str, int], Dict[str, Any]] = {}
-        self._light_raw_cache: Dict[str, LightRawAnalysis] = {}
+        # Keyed by the shared position key so transpositions / move-counter variants hit.
+        self._analysis_cache: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._light_raw_cache: Dict[int, LightRawAnalysis] = {}
 
     def _cached_light_raw(self, fen: str) -> LightRawAnalysis:
-        lr = self._light_raw_cache.get(fen)
+        key = position_key(fen)
+        lr = self._light_raw_cache.get(key)
         if lr is not None:
             return lr
         lr = compute_light_raw_analysis(fen)
@@ -283,14 +318,14 @@ class Investigator:
                 self._light_raw_cache.pop(next(iter(self._light_raw_cache)))
             except Exception:
                 self._light_raw_cache = {}
-        self._light_raw_cache[fen] = lr
+        self._light_raw_cache[key] = lr
         return lr
 
     async def _cached_analyze_depth(self, fen: str, depth: int, get_top_2: bool = False) -> Dict[str, Any]:
         # Cache only the common get_top_2=False case
         if get_top_2:
             return await self._analyze_depth(fen, depth=depth, get_top_2=get_top_2)
-        key = (fen, int(depth))
+        key = (position_key(fen), int(depth))
         cached = self._analysis_cache.get(key)
         if cached is not None:
             return cached
@@ -1073,6 +1108,7 @@ class Investigator:
             overestimated_moves=dual_depth_result.overestimated_moves,
             # PGN exploration from dual-depth
             pgn_exploration=dual_depth_result.pgn_exploration,
+            exploration_index=dual_depth_result.exploration_index,
             exploration_tree=dual_depth_result.exploration_tree,
             themes_identified=dual_depth_result.themes_identified,
             commentary=dual_depth_result.commentary,
@@ -2528,20 +2564,9 @@ class Investigator:
                 "top_moves": List[Dict[str, Any]]  # [{move: str, eval: float, rank: int}, ...]
             }
         """
-        # This method can generate enormous logs; in non-debug mode, suppress noisy prints
-        # but still allow warnings/errors through.
-        import builtins as _builtins
-        _real_print = _builtins.print
-        if not getattr(self, "debug", False):
-            def print(*args, **kwargs):  # type: ignore
-                try:
-                    msg = " ".join(str(a) for a in args)
-                    # Suppress routine trace lines; keep warnings/errors and timing visible.
-                    if msg.startswith(("   🔍", "   📊", "      🔍", "      📊", "   ✅", "      ✅")):
-                        return None
-                except Exception:
-                    pass
-                return _real_print(*args, **kwargs)
+        # This method can generate enormous logs; routine trace lines are DEBUG records
+        # (visible with debug=True or LOG_LEVELS=investigator=DEBUG), warnings/errors stay visible.
+        print = _trace_print(getattr(self, "debug", False))
 
         print(f"   🔍 [ANALYZE_DEPTH] INPUT: depth={depth}, get_top_2={get_top_2}, fen={fen[:50]}...")
         print(f"   🔍 [ANALYZE_DEPTH] use_pool={self.use_pool}, engine_pool={self.engine_pool is not None}, engine_queue={self.engine_queue is not None}")
@@ -3014,19 +3039,8 @@ class Investigator:
         Returns:
             InvestigationResult with exploration tree and PGN
         """
-        # Suppress routine trace logs in non-debug mode (this function is extremely verbose).
-        # IMPORTANT: do not read local `print` before assignment (Python treats it as local if we define it below).
-        import builtins as _builtins
-        _real_print = _builtins.print
-        if not getattr(self, "debug", False):
-            def print(*args, **kwargs):  # type: ignore
-                try:
-                    msg = " ".join(str(a) for a in args)
-                    if msg.startswith(("   🔍", "   📊", "      🔍", "      📊", "   ✅", "      ✅")):
-                        return None
-                except Exception:
-                    pass
-                return _real_print(*args, **kwargs)
+        # Routine trace logs are DEBUG records unless debug=True (this function is extremely verbose).
+        print = _trace_print(getattr(self, "debug", False))
 
         print(f"   🔍 [INVESTIGATOR] Starting investigate_with_dual_depth for scope={scope}")
         
@@ -3450,8 +3464,9 @@ class Investigator:
         # Step 9: Generate PGN with themes, tactics, commentary
         print(f"   🔍 [INVESTIGATOR] Step 9: Building exploration PGN...")
         pgn_exploration = ""
+        exploration_index: Dict[str, Any] = {}
         if include_pgn:
-            pgn_exploration = await self._build_exploration_pgn(exploration_tree, light_raw)
+            pgn_exploration, exploration_index = await self._build_exploration_pgn(exploration_tree, light_raw)
             try:
                 if int(pgn_max_chars or 0) > 0 and isinstance(pgn_exploration, str) and len(pgn_exploration) > int(pgn_max_chars):
                     pgn_exploration = pgn_exploration[: int(pgn_max_chars)]
@@ -3536,6 +3551,7 @@ class Investigator:
             light_raw_analysis=light_raw,
             exploration_tree=exploration_tree,
             pgn_exploration=pgn_exploration,
+            exploration_index=exploration_index,
             themes_identified=themes_identified,
             commentary=commentary,
             evidence_index=evidence_index,  # NEW: Structured evidence lines
@@ -4616,7 +4632,7 @@ class Investigator:
         self,
         exploration_tree: Dict[str, Any],
         light_raw: Optional[LightRawAnalysis]
-    ) -> str:
+    ) -> Tuple[str, Dict[str, Any]]:
         """
         Build massive PGN from exploration tree with themes, threats, and commentary.
         
@@ -4625,7 +4641,7 @@ class Investigator:
             light_raw: Light raw analysis results
             
         Returns:
-            PGN string with annotations
+            (PGN string with annotations, exploration move index of the same tree)
         """
         try:
             # Use original_position if available (position before player's move)
@@ -4692,28 +4708,36 @@ class Investigator:
             if comment_blocks:
                 game.comment = "".join(comment_blocks)
             
-            # Build PGN recursively from tree
+            # Build PGN recursively from tree, recording each annotated node's deltas
             node = game
-            await self._build_pgn_from_tree(node, exploration_tree, light_raw, 0)
+            node_deltas: Dict[int, Dict[str, Any]] = {}
+            await self._build_pgn_from_tree(node, exploration_tree, light_raw, 0, node_deltas=node_deltas)
             
             exporter = chess.pgn.StringExporter(
                 headers=True,
                 variations=True,
                 comments=True
             )
-            return str(game.accept(exporter))
+            pgn_text = str(game.accept(exporter))
+            try:
+                index = build_exploration_index(game, node_deltas, starting_tags=starting_tags, starting_roles=starting_roles)
+            except Exception as e:
+                print(f"   ⚠️ [INVESTIGATOR] Could not index exploration PGN: {e}")
+                index = {}
+            return pgn_text, index
         except Exception as e:
             print(f"   ❌ [INVESTIGATOR] ERROR in _build_exploration_pgn: {type(e).__name__}: {e}")
             import traceback
             traceback.print_exc()
-            return ""
+            return "", {}
     
     async def _build_pgn_from_tree(
         self,
         node: chess.pgn.GameNode,
         tree_node: Dict[str, Any],
         light_raw: Optional[LightRawAnalysis],
-        move_number: int
+        move_number: int,
+        node_deltas: Optional[Dict[int, Dict[str, Any]]] = None
     ):
         """Recursively build PGN from exploration tree - FOLLOWS FULL PV SEQUENCE"""
         try:
@@ -5041,6 +5065,12 @@ class Investigator:
                         if annotation_parts or commentary:
                             full_comment = " ".join(annotation_parts) + " " + commentary
                             current_node.comment = full_comment.strip()
+                        record_node_deltas(
+                            node_deltas, current_node,
+                            tags_gained=tags_gained, tags_lost=tags_lost,
+                            roles_gained=roles_gained, roles_lost=roles_lost,
+                            threats=threat_labels,
+                        )
                         
                         # Update tags_before and roles_before for next iteration
                         tags_before = tags_after_move
@@ -5304,6 +5334,11 @@ class Investigator:
                                     branch_commentary += f" {{[gained: {branch_tags_gained_str}], [lost: {branch_tags_lost_str}], [roles_gained: {branch_roles_gained_str}], [roles_lost: {branch_roles_lost_str}], [threats: none]}}"
                                 
                                 branch_node.comment = " ".join(branch_annotation) + " " + branch_commentary
+                                record_node_deltas(
+                                    node_deltas, branch_node,
+                                    tags_gained=branch_tags_gained, tags_lost=branch_tags_lost,
+                                    roles_gained=branch_roles_gained, roles_lost=branch_roles_lost,
+                                )
                                 
                                 # Restore board state
                                 self.board.pop()
@@ -5328,7 +5363,8 @@ class Investigator:
                                         branch_node,
                                         branch,
                                         branch_light_raw_obj,
-                                        move_number + 1
+                                        move_number + 1,
+                                        node_deltas=node_deltas
                                     )
                                 else:
                                     # Branch stopped, but extend it with PV if available
@@ -5545,6 +5581,11 @@ class Investigator:
                                                         pv_comment += f" {{[gained: {gained_str}], [lost: {lost_str}], [roles_gained: {roles_gained_str}], [roles_lost: {roles_lost_str}], [threats: none]}}"
                                                     
                                                     pv_node.comment = pv_comment
+                                                    record_node_deltas(
+                                                        node_deltas, pv_node,
+                                                        tags_gained=gained_tags, tags_lost=lost_tags,
+                                                        roles_gained=gained_roles, roles_lost=lost_roles,
+                                                    )
                                                     
                                                     # Update tags_before and roles_before for next iteration
                                                     tags_before_pv = tags_after_pv
@@ -14,6 +14,8 @@ import asyncio
 import json
 import concurrent.futures
 
+from pipeline_timer import bind_trace_context
+
 
 def determine_moment_count(query_type: str, total_moments: int) -> int:
     """Determine target number of key moments based on query type."""
@@ -700,14 +702,14 @@ Examples:
                 result = await asyncio.wait_for(
                     loop.run_in_executor(
                         pool,
-                        lambda: llm_router.complete_json(
+                        bind_trace_context(lambda: llm_router.complete_json(
                             session_id="default",
                             stage="key_moment_selector",
                             system_prompt="You are a chess game analyzer. Select the most relevant moves to show based on the user's query. Return only valid JSON.",
                             user_text=prompt,
                             # Don't pass temperature for gpt-5 models - they only support default (1)
                             model="gpt-5-mini",
-                        )
+                        ))
                     ),
                     timeout=8.0
                 )
@@ -726,7 +728,7 @@ Examples:
             
             with concurrent.futures.ThreadPoolExecutor() as pool:
                 response = await asyncio.wait_for(
-                    loop.run_in_executor(pool, call_openai),
+                    loop.run_in_executor(pool, bind_trace_context(call_openai)),
                     timeout=8.0
                 )
             
@@ -1121,3 +1123,34 @@ def detect_all_key_moments(
     
     return key_moments
 
+
+
+def apply_review_perspective(review: Dict, side_focus: str = "both") -> Dict:
+    """
+    Fill the player-perspective fields of a game review in place.
+
+    The engine part of a review (ply records, stats, phases, metadata) is the
+    same for both players; this derives the rest for `side_focus`:
+    all_key_moments, each record's legacy key_point_labels (the other side's
+    labels are dropped unless it blundered), key_points and side_focus.
+    Cheap enough to run on every read of a cached review.
+    """
+    ply_records = review.get("ply_records", [])
+    all_key_moments = detect_all_key_moments(ply_records, player_color=side_focus if side_focus != "both" else None)
+    key_moments_by_ply = {km["ply"]: km for km in all_key_moments}
+    opponent = {"white": "black", "black": "white"}.get(side_focus)
+
+    key_points = []
+    for record in ply_records:
+        km = key_moments_by_ply.get(record["ply"])
+        labels = list(km.get("labels", [])) if km else []
+        if opponent and record["side_moved"] == opponent and "blunder" not in labels:
+            labels = []
+        record["key_point_labels"] = labels
+        if labels:
+            key_points.append(record)
+
+    review["side_focus"] = side_focus
+    review["key_points"] = key_points
+    review["all_key_moments"] = all_key_moments
+    return review
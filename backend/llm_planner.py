@@ -145,7 +145,7 @@ Create the analysis plan:"""
             except Exception:
                 prompt_tokens = None
                 completion_tokens = None
-            if _timer:
+            if _timer and response is not None:  # router calls are recorded by the LLMRouter
                 _timer.record_llm(
                     "personal_review_planner",
                     _dt,
@@ -0,0 +1,186 @@
+"""
+LLM Response Cache
+
+Opt-in cache for deterministic (temperature-0) pipeline stages (claim JSON,
+fact summaries, memory compression). Many users reviewing the same popular
+game, or a client retrying, send byte-identical prompts; those are served
+from here instead of re-running the model.
+
+- Keyed on stage, provider/model, sampling params and hashes of the system
+  prompt and the rendered user message (session transcript, including the
+  task seed, plus the new chunk), so an answer is only replayed into the
+  context it was computed in.
+- Bounded: an in-memory LRU in front of one JSON file per entry under
+  backend/cache/llm_responses, capped by entry count and TTL.
+- Single-flight: identical calls already in flight wait for the leader's
+  result instead of issuing their own request.
+
+Configure with LLM_CACHE_DIR, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_S and
+LLM_CACHE_VERSION (bump to invalidate); LLM_CACHE=false turns it off.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def make_cache_key(
+    *,
+    stage: str,
+    provider: str,
+    model: str,
+    system_prompt: str,
+    prompt_text: str,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> str:
+    ver = (os.getenv("LLM_CACHE_VERSION", "v1") or "v1").strip()
+    parts = [
+        ver,
+        stage,
+        provider,
+        model,
+        hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest(),
+        hashlib.sha256((prompt_text or "").encode("utf-8")).hexdigest(),
+        repr(temperature),
+        repr(max_tokens),
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Bounded, disk-backed response cache with single-flight coalescing."""
+
+    def __init__(
+        self,
+        *,
+        cache_dir: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+        memory_entries: int = 512,
+    ) -> None:
+        self.cache_dir = cache_dir or os.getenv("LLM_CACHE_DIR") or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "cache", "llm_responses"
+        )
+        self.max_entries = int(max_entries if max_entries is not None else os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+        self.ttl_s = float(ttl_s if ttl_s is not None else os.getenv("LLM_CACHE_TTL_S", str(7 * 86400)))
+        self.memory_entries = int(memory_entries)
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        # key -> mtime for every entry on disk, oldest first (drives eviction)
+        self._disk_index: "OrderedDict[str, float]" = OrderedDict()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    try:
+                        entries.append((os.path.getmtime(os.path.join(self.cache_dir, name)), name[:-5]))
+                    except OSError:
+                        continue
+            for mtime, key in sorted(entries):
+                self._disk_index[key] = mtime
+        except Exception as e:
+            print(f"   ⚠️ [LLM_CACHE] Could not prepare cache dir {self.cache_dir}: {e}")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _expired(self, entry: Dict[str, Any]) -> bool:
+        return self.ttl_s > 0 and (time.time() - float(entry.get("created_at", 0))) > self.ttl_s
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._expired(entry):
+                    self._memory.pop(key, None)
+                    return None
+                self._memory.move_to_end(key)
+                return entry
+            if key not in self._disk_index:
+                return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception:
+            return None
+        if not isinstance(entry, dict) or self._expired(entry):
+            return None
+        with self._lock:
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        entry = {**entry, "created_at": time.time()}
+        evict = []
+        with self._lock:
+            self._remember(key, entry)
+            self._disk_index.pop(key, None)
+            self._disk_index[key] = entry["created_at"]
+            while len(self._disk_index) > self.max_entries:
+                evict.append(self._disk_index.popitem(last=False)[0])
+        try:
+            path = self._path(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"   ⚠️ [LLM_CACHE] Write failed: {e}")
+        for old in evict:
+            try:
+                os.remove(self._path(old))
+            except OSError:
+                pass
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+        """Return (entry, source) where source is "hit", "coalesced" or "miss".
+
+        On a miss, compute() runs once per key across threads; concurrent
+        callers with the same key block on the leader's result (and see its
+        exception if it fails). Failures and entries marked cacheable=False
+        are never stored.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry, "hit"
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            return future.result(), "coalesced"
+
+        try:
+            entry = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            if entry.get("cacheable", True):
+                self.put(key, entry)
+            future.set_result(entry)
+            return entry, "miss"
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
@@ -17,16 +17,23 @@ Important KV-cache rules:
 from __future__ import annotations
 
 import hashlib
+import json
 import os
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Literal, Tuple, List
+from typing import Any, Callable, Dict, Optional, Literal, Tuple, List
 
 from openai import OpenAI
 
+from llm_response_cache import LLMResponseCache, make_cache_key
+from prompt_compiler import count_tokens, tokenizer_is_exact
+from pipeline_timer import get_pipeline_timer
 from session_store import InMemorySessionStore
+from structured_log import INFO, WARNING, get_logger
 from redis_session_store import build_session_store
 
+_log = get_logger("llm_router")
+
 Provider = Literal["vllm", "openai"]
 
 
@@ -37,6 +44,29 @@ def _stage_provider(stage: str) -> Provider:
     return "openai" if val == "openai" else "vllm"
 
 
+def _json_object(text: str) -> Optional[Dict[str, Any]]:
+    """The JSON object in text (or its outermost {...}), or None."""
+    s = (text or "").strip()
+    i, j = s.find("{"), s.rfind("}")
+    for candidate in (s, s[i : j + 1] if i != -1 and j > i else None):
+        if candidate:
+            try:
+                obj = json.loads(candidate)
+            except Exception:
+                continue
+            if isinstance(obj, dict):
+                return obj
+    return None
+
+
+def _render_prompt(working_context: str, user_text: str) -> str:
+    """User message sent for a call: the session transcript plus the new chunk."""
+    prompt_text = working_context or ""
+    if prompt_text:
+        prompt_text += "\n\n"
+    return prompt_text + f"USER: {(user_text or '').strip()}\nASSISTANT:"
+
+
 @dataclass
 class LLMRouterConfig:
     # RunPod proxies usually expose the OpenAI-compatible API under /v1
@@ -59,6 +89,12 @@ class LLMRouterConfig:
     cb_max_fails: int = int(os.getenv("VLLM_CB_MAX_FAILS", "3"))
     cb_window_seconds: float = float(os.getenv("VLLM_CB_WINDOW_S", "30"))
     cb_cooldown_seconds: float = float(os.getenv("VLLM_CB_COOLDOWN_S", "30"))
+    # Response cache for deterministic (temperature-0) stages (opt-in per call via
+    # complete_json(cache=True), or per stage via LLM_CACHE_STAGES=stage_a,stage_b)
+    response_cache: bool = (os.getenv("LLM_CACHE", "true").lower().strip() == "true")
+    cache_stages: Tuple[str, ...] = tuple(
+        s.strip() for s in os.getenv("LLM_CACHE_STAGES", "").split(",") if s.strip()
+    )
 
 
 class LLMRouter:
@@ -89,6 +125,8 @@ class LLMRouter:
         # Circuit breaker state
         self._cb_fail_ts: List[float] = []
         self._cb_open_until: float = 0.0
+        # Stage-keyed response cache (created lazily on first cached call)
+        self._response_cache: Optional[LLMResponseCache] = None
 
     def _client_for(self, provider: Provider) -> Tuple[OpenAI, str]:
         if provider == "openai":
@@ -212,29 +250,38 @@ class LLMRouter:
         total_ms: float,
         tokens_in: Optional[int],
         tokens_out: Optional[int],
+        tokens_in_est: Optional[int] = None,
         error: Optional[str] = None,
     ) -> None:
         if not self.config.log_calls:
             return
-        sys_hash = self._hash_text(system_prompt or "")
-        err_str = f" error={error!r}" if error else ""
-        print(
-            "   🔎 [LLM_ROUTER]"
-            f" stage={stage}"
-            f" provider={provider}"
-            f" model={model}"
-            f" session={session_id}"
-            f" sys={sys_hash}"
-            f" prefix_chars={prefix_chars}"
-            f" user_chars={user_chunk_chars}"
-            f" out_chars={response_chars}"
-            f" ttft_ms={(round(ttft_ms, 1) if isinstance(ttft_ms, (int, float)) else None)}"
-            f" total_ms={round(total_ms, 1)}"
-            f" tokens_in={tokens_in}"
-            f" tokens_out={tokens_out}"
-            f"{err_str}"
+        _log.log(
+            WARNING if error else INFO,
+            "   🔎 [LLM_ROUTER]",
+            stage=stage,
+            provider=provider,
+            model=model,
+            session=session_id,
+            sys=lambda: self._hash_text(system_prompt or ""),
+            prefix_chars=prefix_chars,
+            user_chars=user_chunk_chars,
+            out_chars=response_chars,
+            ttft_ms=(round(ttft_ms, 1) if isinstance(ttft_ms, (int, float)) else None),
+            total_ms=round(total_ms, 1),
+            tokens_in=tokens_in,
+            tokens_in_est=tokens_in_est,
+            tokens_out=tokens_out,
+            **({"error": repr(error)} if error else {}),
         )
 
+    def _measure_prompt(self, stage: str, system_prompt: str, prompt_text: str) -> int:
+        """Count input tokens locally before sending; recorded per stage for the router stats."""
+        tokens = count_tokens(system_prompt) + count_tokens(prompt_text)
+        timer = get_pipeline_timer()
+        if timer:
+            timer.record_prompt_tokens(f"router:{stage}", tokens, estimated=not tokenizer_is_exact())
+        return tokens
+
     def check_vllm_health(self, *, force: bool = False) -> None:
         """
         Fail-fast vLLM health probe.
@@ -357,8 +404,39 @@ class LLMRouter:
         provider: Optional[Provider] = None,
         max_tokens: Optional[int] = None,
     ) -> str:
+        """Session-aware completion (see _complete_with_usage)."""
+        content, _usage = self._complete_with_usage(
+            session_id=session_id,
+            stage=stage,
+            system_prompt=system_prompt,
+            user_text=user_text,
+            task_seed=task_seed,
+            subsession=subsession,
+            response_format=response_format,
+            temperature=temperature,
+            model=model,
+            provider=provider,
+            max_tokens=max_tokens,
+        )
+        return content
+
+    def _complete_with_usage(
+        self,
+        *,
+        session_id: str,
+        stage: str,
+        system_prompt: str,
+        user_text: str,
+        task_seed: Optional[str] = None,
+        subsession: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        temperature: Optional[float] = None,
+        model: Optional[str] = None,
+        provider: Optional[Provider] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
         """
-        Session-aware completion.
+        Session-aware completion. Returns (content, usage).
 
         Prompt structure is intentionally a single user message containing the append-only transcript:
           <working_context>\n\nUSER: <new>\nASSISTANT:
@@ -394,20 +472,19 @@ class LLMRouter:
         prefix = state.working_context or ""
         user_chunk = (user_text or "").strip()
         prefix_chars = len(prefix or "")
-        prompt_text = prefix
-        if prompt_text:
-            prompt_text += "\n\n"
-        prompt_text += f"USER: {user_chunk}\nASSISTANT:"
-
-        # Log full raw input for complete method
-        print(f"🔍 [INTERPRETER_RAW_INPUT] complete method called")
-        print(f"   stage={stage} session_id={session_id} subsession={subsession or 'main'}")
-        print(f"   provider={provider} model={chosen_model}")
-        print(f"   system_prompt (full, {len(state.system_prompt)} chars):\n{state.system_prompt}")
-        print(f"   prefix/working_context (full, {len(prefix)} chars):\n{prefix}")
-        print(f"   user_chunk (full, {len(user_chunk)} chars):\n{user_chunk}")
-        print(f"   full_prompt_text (full, {len(prompt_text)} chars):\n{prompt_text}")
-        print(f"   response_format={response_format} temperature={temperature} max_tokens={max_tokens}")
+        prompt_text = _render_prompt(prefix, user_chunk)
+
+        # Full raw input (DEBUG only: prompts are large)
+        _log.debug(lambda: (
+            f"🔍 [INTERPRETER_RAW_INPUT] complete method called\n"
+            f"   stage={stage} session_id={session_id} subsession={subsession or 'main'}\n"
+            f"   provider={provider} model={chosen_model}\n"
+            f"   system_prompt (full, {len(state.system_prompt)} chars):\n{state.system_prompt}\n"
+            f"   prefix/working_context (full, {len(prefix)} chars):\n{prefix}\n"
+            f"   user_chunk (full, {len(user_chunk)} chars):\n{user_chunk}\n"
+            f"   full_prompt_text (full, {len(prompt_text)} chars):\n{prompt_text}\n"
+            f"   response_format={response_format} temperature={temperature} max_tokens={max_tokens}"
+        ))
 
         kwargs: Dict[str, Any] = {
             "model": chosen_model,
@@ -429,6 +506,8 @@ class LLMRouter:
                 # vLLM and other models support max_tokens
                 kwargs["max_tokens"] = int(max_tokens)
 
+        tokens_in_est = self._measure_prompt(stage, state.system_prompt, prompt_text)
+
         # vLLM-only by default. Any fallback must be explicitly disabled by config.
         # (Your deployment choice: fail fast, no silent provider switching.)
         try:
@@ -447,6 +526,7 @@ class LLMRouter:
                 total_ms=0.0,
                 tokens_in=None,
                 tokens_out=None,
+                tokens_in_est=tokens_in_est,
                 error=str(e)[:200],
             )
             raise
@@ -463,11 +543,13 @@ class LLMRouter:
             tokens_in = None
             tokens_out = None
 
-        # Log full raw output for complete method
-        print(f"🔍 [INTERPRETER_RAW_OUTPUT] complete method response")
-        print(f"   stage={stage} session_id={session_id} subsession={subsession or 'main'}")
-        print(f"   raw_output (full, {len(content)} chars):\n{content}")
-        print(f"   ttft_ms={ttft_ms} total_ms={total_ms} tokens_in={tokens_in} tokens_out={tokens_out}")
+        # Full raw output (DEBUG only)
+        _log.debug(lambda: (
+            f"🔍 [INTERPRETER_RAW_OUTPUT] complete method response\n"
+            f"   stage={stage} session_id={session_id} subsession={subsession or 'main'}\n"
+            f"   raw_output (full, {len(content)} chars):\n{content}\n"
+            f"   ttft_ms={ttft_ms} total_ms={total_ms} tokens_in={tokens_in} tokens_out={tokens_out}"
+        ))
 
         # Persist append-only transcript (KV-cache friendly).
         self.sessions.append_user(skey, user_chunk)
@@ -486,8 +568,120 @@ class LLMRouter:
             total_ms=total_ms,
             tokens_in=tokens_in if isinstance(tokens_in, int) else None,
             tokens_out=tokens_out if isinstance(tokens_out, int) else None,
+            tokens_in_est=tokens_in_est,
+        )
+        timer = get_pipeline_timer()
+        if timer:
+            timer.record_llm(
+                f"router:{stage}",
+                total_ms / 1000.0,
+                tokens_in=tokens_in if isinstance(tokens_in, int) else None,
+                tokens_out=tokens_out if isinstance(tokens_out, int) else None,
+                model=str(chosen_model),
+            )
+        return content, {
+            "model": str(chosen_model),
+            "tokens_in": tokens_in if isinstance(tokens_in, int) else None,
+            "tokens_out": tokens_out if isinstance(tokens_out, int) else None,
+        }
+
+    def _resolve_model(self, stage: str, model: Optional[str], provider: Optional[Provider]) -> Tuple[str, str]:
+        """(provider, model) the call will actually use, mirroring _complete_with_usage."""
+        provider = provider or _stage_provider(stage)
+        if provider == "vllm":
+            if not model or model.lower().startswith("gpt-"):
+                return provider, self.config.vllm_model
+        return provider, model or ""
+
+    def _cacheable_sampling(self, stage: str, temperature: Optional[float], model: Optional[str], provider: Optional[Provider]) -> bool:
+        """Only temperature-0 calls are pure functions of their prompt (gpt-5 ignores temperature)."""
+        if temperature is None or float(temperature) != 0.0:
+            return False
+        _provider, resolved_model = self._resolve_model(stage, model, provider)
+        return "gpt-5" not in (resolved_model or "").lower()
+
+    def _cached_complete(
+        self,
+        *,
+        session_id: str,
+        stage: str,
+        system_prompt: str,
+        user_text: str,
+        task_seed: Optional[str],
+        subsession: Optional[str],
+        response_format: Optional[Dict[str, Any]],
+        temperature: Optional[float],
+        model: Optional[str],
+        provider: Optional[Provider],
+        max_tokens: Optional[int],
+        validate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> str:
+        """complete() through the response cache, with single-flight coalescing.
+
+        The key hashes the prompt exactly as it will be sent (session system
+        prompt, transcript and new chunk), so an answer is only replayed into
+        an identical context. Hits still append to the session so the
+        transcript reads the same as if the model had been called. Answers
+        that are not JSON, or that `validate` rejects, are returned but never
+        stored.
+        """
+        if self._response_cache is None:
+            self._response_cache = LLMResponseCache()
+        resolved_provider, resolved_model = self._resolve_model(stage, model, provider)
+        skey = self.ensure_session(
+            task_id=session_id, subsession=subsession or stage, system_prompt=system_prompt, task_seed=task_seed
+        )
+        state = self.sessions.get_or_create(skey, system_prompt or "")
+        key = make_cache_key(
+            stage=stage,
+            provider=resolved_provider,
+            model=resolved_model,
+            system_prompt=state.system_prompt,
+            prompt_text=_render_prompt(state.working_context, user_text),
+            temperature=temperature,
+            max_tokens=max_tokens,
         )
-        return content
+
+        def _compute() -> Dict[str, Any]:
+            content, usage = self._complete_with_usage(
+                session_id=session_id,
+                stage=stage,
+                system_prompt=system_prompt,
+                user_text=user_text,
+                task_seed=task_seed,
+                subsession=subsession,
+                response_format=response_format,
+                temperature=temperature,
+                model=model,
+                provider=provider,
+                max_tokens=max_tokens,
+            )
+            entry = {"content": content, **usage}
+            parsed = _json_object(content) if response_format is not None else None
+            if response_format is not None and parsed is None:
+                # Let the caller's repair/raise path handle it, but never cache it
+                entry["cacheable"] = False
+            elif validate is not None and not validate(parsed):
+                entry["cacheable"] = False
+            return entry
+
+        entry, source = self._response_cache.get_or_compute(key, _compute)
+        hit = source != "miss"
+        if hit:
+            self.sessions.append_user(skey, (user_text or "").strip())
+            self.sessions.append_assistant(skey, entry.get("content") or "")
+            if self.config.log_calls:
+                _log.info("   🔎 [LLM_ROUTER]", stage=stage, cache=source, key=key[:12])
+        timer = get_pipeline_timer()
+        if timer:
+            timer.record_llm_cache(
+                f"router:{stage}",
+                hit,
+                tokens_in=entry.get("tokens_in"),
+                tokens_out=entry.get("tokens_out"),
+                model=entry.get("model"),
+            )
+        return entry.get("content") or ""
 
     def complete_json(
         self,
@@ -502,15 +696,29 @@ class LLMRouter:
         temperature: Optional[float] = None,
         model: Optional[str] = None,
         provider: Optional[Provider] = None,
+        cache: bool = False,
+        cache_validate: Optional[Callable[[Dict[str, Any]], bool]] = None,
     ) -> Dict[str, Any]:
-        # Log full raw input
-        print(f"🔍 [INTERPRETER_RAW_INPUT] complete_json called")
-        print(f"   stage={stage} session_id={session_id} subsession={subsession or 'main'}")
-        print(f"   system_prompt (full, {len(system_prompt)} chars):\n{system_prompt}")
-        print(f"   user_text (full, {len(user_text)} chars):\n{user_text}")
-        print(f"   task_seed={task_seed} max_tokens={max_tokens} temperature={temperature} model={model} provider={provider}")
+        """
+        JSON completion. With cache=True (or the stage listed in LLM_CACHE_STAGES)
+        byte-identical prompts are served from the response cache. Caching only
+        applies at temperature 0; cache_validate(parsed) returning False keeps
+        an answer out of the cache (the caller still gets it).
+        """
+        _log.debug(lambda: (
+            f"🔍 [INTERPRETER_RAW_INPUT] complete_json called\n"
+            f"   stage={stage} session_id={session_id} subsession={subsession or 'main'}\n"
+            f"   system_prompt (full, {len(system_prompt)} chars):\n{system_prompt}\n"
+            f"   user_text (full, {len(user_text)} chars):\n{user_text}\n"
+            f"   task_seed={task_seed} max_tokens={max_tokens} temperature={temperature} model={model} provider={provider}"
+        ))
         
-        txt = self.complete(
+        use_cache = (
+            self.config.response_cache
+            and (cache or stage in self.config.cache_stages)
+            and self._cacheable_sampling(stage, temperature, model, provider)
+        )
+        call_kwargs: Dict[str, Any] = dict(
             session_id=session_id,
             stage=stage,
             system_prompt=system_prompt,
@@ -523,11 +731,16 @@ class LLMRouter:
             provider=provider,
             max_tokens=max_tokens,
         )
+        if use_cache:
+            txt = self._cached_complete(**call_kwargs, validate=cache_validate)
+        else:
+            txt = self.complete(**call_kwargs)
         
-        # Log full raw output
-        print(f"🔍 [INTERPRETER_RAW_OUTPUT] complete_json response")
-        print(f"   stage={stage} session_id={session_id} subsession={subsession or 'main'}")
-        print(f"   raw_output (full, {len(txt)} chars):\n{txt}")
+        _log.debug(lambda: (
+            f"🔍 [INTERPRETER_RAW_OUTPUT] complete_json response\n"
+            f"   stage={stage} session_id={session_id} subsession={subsession or 'main'}\n"
+            f"   raw_output (full, {len(txt)} chars):\n{txt}"
+        ))
         
         import json
         try:
@@ -551,26 +764,26 @@ class LLMRouter:
                     try:
                         head = (s[:800] + ("…<truncated>" if len(s) > 800 else ""))
                         tail = (s[-400:] if len(s) > 400 else s)
-                        print(
+                        _log.error(
                             "❌ [LLM_JSON_PARSE] complete_json failed after repair"
                             f" stage={stage} session_id={session_id} subsession={subsession or 'main'}"
                             f" err1=nonjson err2={type(e2).__name__}: {str(e2)[:140]}"
                         )
-                        print(f"❌ [LLM_JSON_PARSE] raw_head:\n{head}")
+                        _log.error(f"❌ [LLM_JSON_PARSE] raw_head:\n{head}")
                         if tail and tail != head:
-                            print(f"❌ [LLM_JSON_PARSE] raw_tail:\n{tail}")
+                            _log.error(f"❌ [LLM_JSON_PARSE] raw_tail:\n{tail}")
                     except Exception:
                         pass
                     raise
             # No braces at all → log and raise.
             try:
                 head = ((s[:800] + ("…<truncated>" if len(s) > 800 else "")) if isinstance(s, str) else "")
-                print(
+                _log.error(
                     "❌ [LLM_JSON_PARSE] complete_json failed: no JSON object found"
                     f" stage={stage} session_id={session_id} subsession={subsession or 'main'}"
                 )
                 if head:
-                    print(f"❌ [LLM_JSON_PARSE] raw_head:\n{head}")
+                    _log.error(f"❌ [LLM_JSON_PARSE] raw_head:\n{head}")
             except Exception:
                 pass
             raise
@@ -638,6 +851,7 @@ class LLMRouter:
                 kwargs["max_completion_tokens"] = int(max_tokens)
             else:
                 kwargs["max_tokens"] = int(max_tokens)
+        self._measure_prompt(stage, state.system_prompt, prompt_text)
 
         # Stream the response
         t0 = time.monotonic()
@@ -683,11 +897,12 @@ class LLMRouter:
                                         self.sessions.append_user(skey, user_chunk)
                                         self.sessions.append_assistant(candidate)
                                         
-                                        # Log
-                                        print(f"🔍 [INTERPRETER_STREAMING] JSON complete early")
-                                        print(f"   stage={stage} session_id={session_id} subsession={subsession or 'main'}")
-                                        print(f"   ttft_ms={ttft_ms:.1f}ms total_ms={total_ms:.1f}ms")
-                                        print(f"   accumulated_chars={len(accumulated)} json_chars={len(candidate)}")
+                                        _log.debug(
+                                            "🔍 [INTERPRETER_STREAMING] JSON complete early",
+                                            stage=stage, session_id=session_id, subsession=subsession or "main",
+                                            ttft_ms=ttft_ms, total_ms=round(total_ms, 1),
+                                            accumulated_chars=len(accumulated), json_chars=len(candidate),
+                                        )
                                         
                                         return result, ttft_ms, total_ms
                                     except json.JSONDecodeError:
@@ -3,7 +3,7 @@ import asyncio
 import math
 import uuid
 from typing import Optional, List, Dict, Any, Literal
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, nullcontext
 from io import StringIO
 import urllib.parse
 import urllib.request
@@ -50,17 +50,23 @@ from pv_profile_tracker import track_pv_profiles, detect_captures_in_pv, compute
 from piece_interactions import compute_coordination_score
 from square_control import compute_square_control, get_control_summary
 from nnue_bridge import get_nnue_dump
+from pipeline_timer import start_request_trace, end_request_trace, recent_traces, get_trace
 from drill_generator import DrillGenerator
 from training_planner import TrainingPlanner
 from srs_scheduler import SRSScheduler
 from drill_card import CardDatabase
 from chat_tools import ALL_TOOLS, get_tools_for_context
 from tool_executor import ToolExecutor
+from analysis_service import AnalysisService
 from enhanced_system_prompt import TOOL_AWARE_SYSTEM_PROMPT, LIGHTNING_MODE_WARNING
 from request_interpreter import RequestInterpreter, execute_analysis_requests
 from prompt_builder import validate_interpreter_selections, build_interpreter_driven_prompt
 from orchestration_plan import OrchestrationPlan, Mode, ResponseStyle
-from engine_pool import EnginePool, get_engine_pool
+from engine_pool import AdaptiveDepthConfig, EnginePool, get_engine_pool
+from position_key import position_key
+from anytime_analysis import AnytimeAnalysisHub
+from cache.analysis_cache import AnalysisCache, pgn_clock_timestamps, review_cache_key
+from key_moment_selector import apply_review_perspective
 from response_annotator import parse_response_for_annotations, generate_candidate_move_annotations
 from engine_queue import StockfishQueue
 from board_vision import analyze_board_image, BoardVisionError
@@ -68,6 +74,8 @@ from concurrent.futures import ProcessPoolExecutor
 from parallel_analyzer import compute_themes_and_tags, compute_theme_scores
 from llm_router import LLMRouter, LLMRouterConfig
 from board_tree_store import BoardTreeStore, BoardTree, BoardTreeNode, new_node_id
+from learning_logger import extract_learning_headers
+from tactics_index import TacticsStore
 
 load_dotenv()
 
@@ -108,9 +116,26 @@ queue_processor_task: Optional[asyncio.Task] = None
 # Engine pool for parallel analysis (4 instances)
 engine_pool_instance: Optional[EnginePool] = None
 
+
+def _anytime_lease():
+    """Engine for a progressive search: a pool engine when available, else the shared queue."""
+    if engine_pool_instance is not None and engine_pool_instance._initialized:
+        return engine_pool_instance.lease()
+    return nullcontext(engine_queue)
+
+
+# Progressive (per-depth) searches, shared between subscribers to the same position
+anytime_hub = AnytimeAnalysisHub(_anytime_lease)
+
 # Global position cache for dynamic generation
 position_cache = PositionCache(ttl_seconds=3600)
 
+# Game reviews keyed by game content (moves + clocks), shared by both players
+review_cache = AnalysisCache(max_entries=int(os.getenv("REVIEW_CACHE_MAX_ENTRIES", "64")))
+
+# Tactics puzzles, indexed once and reloaded when the file changes (tactics.json or a binary .idx)
+tactics_store = TacticsStore(os.getenv("TACTICS_PATH", "tactics.json"))
+
 # Global Lichess explorer client
 explorer_client: Optional[LichessExplorerClient] = None
 
@@ -352,6 +377,7 @@ async def lifespan(app: FastAPI):
     else:
         print("⚠️  SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY not set - database features will be unavailable")
         supabase_client = None
+    review_cache.supabase_client = supabase_client
 
     # Initialize Personal Review components
     game_fetcher = GameFetcher()
@@ -560,7 +586,7 @@ async def lifespan(app: FastAPI):
                 try:
                     def compute_and_save_cache():
                         # Fetch 60 most recent games for detailed analytics
-                        games = supabase_client.get_active_reviewed_games(user_id, limit=60, include_full_review=True)
+                        games = supabase_client.get_active_reviewed_games(user_id, limit=60, columnar=True)
                         if not games:
                             print(f"   ℹ️ [INDEXING_CALLBACK] No games found for detailed analytics cache")
                             return
@@ -634,7 +660,7 @@ async def lifespan(app: FastAPI):
         try:
             from services.game_window_manager import GameWindowManager
             from services.account_initialization_manager import AccountInitializationManager
-            game_window_manager = GameWindowManager(supabase_client)
+            game_window_manager = GameWindowManager(supabase_client, stats_manager=stats_manager)
             account_init_manager = AccountInitializationManager(
                 supabase_client,
                 profile_indexer,
@@ -694,7 +720,14 @@ async def lifespan(app: FastAPI):
         srs_scheduler=srs_scheduler,
         supabase_client=supabase_client,
         openai_client=openai_client,
-        llm_router=llm_router
+        llm_router=llm_router,
+        # Tools call the analysis routes' coroutines directly instead of looping back over HTTP
+        analysis_service=AnalysisService(
+            analyze_position_fn=analyze_position,
+            analyze_move_fn=analyze_move,
+        ),
+        engine_pool=engine_pool_instance,
+        review_cache=review_cache,
     )
     print("✅ Tool executor initialized for chat")
     
@@ -907,14 +940,15 @@ def piece_quality(board: chess.Board, square: chess.Square) -> float:
     return round(quality, 2)
 
 
-async def probe_candidates(board: chess.Board, multipv: int = 3, depth: int = 16) -> List[Dict[str, Any]]:
-    """Probe engine for top candidate moves."""
-    if not engine:
+async def probe_candidates(board: chess.Board, multipv: int = 3, depth: int = 16, queue=None) -> List[Dict[str, Any]]:
+    """Probe engine for top candidate moves (on `queue`, default the shared engine_queue)."""
+    if not engine and queue is None:
         return []
+    queue = queue or engine_queue
     
     try:
-        info = await engine_queue.enqueue(
-            engine_queue.engine.analyse,
+        info = await queue.enqueue(
+            queue.engine.analyse,
             board,
             chess.engine.Limit(depth=depth),
             multipv=multipv
@@ -1104,6 +1138,14 @@ class RaisePositionConfidenceRequest(BaseModel):
     target: int = 80
 
 
+class AnalyzePositionsBatchRequest(BaseModel):
+    fens: List[str] = Field(..., min_length=1, max_length=500)
+    lines: int = Field(3, ge=1, le=5)
+    depth: int = Field(18, ge=10, le=22)
+    light_mode: bool = False
+    concurrency: Optional[int] = Field(None, ge=1, le=16)  # Default: engine pool size
+
+
 class OpeningLessonRequest(BaseModel):
     user_id: str
     chat_id: Optional[str] = None
@@ -1165,6 +1207,24 @@ async def engine_pool_health():
     return await engine_pool_instance.health_check()
 
 
+@app.get("/debug/traces")
+async def debug_traces(req: Request, limit: int = 20, name: Optional[str] = None, user_id: Optional[str] = None):
+    """Recent request traces from the in-process ring buffer (newest first)."""
+    _require_shared_secret(req)
+    traces = recent_traces(limit=max(1, min(limit, 200)), name=name, user_id=user_id)
+    return {"count": len(traces), "traces": traces}
+
+
+@app.get("/debug/traces/{trace_id}")
+async def debug_trace(req: Request, trace_id: str):
+    """A single request trace with its full span tree."""
+    _require_shared_secret(req)
+    trace = get_trace(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
+
+
 # Sample PGN for testing
 TEST_PGN = """[Event "Test Game"]
 [Site "Test"]
@@ -1378,6 +1438,341 @@ async def engine_metrics():
     return engine_queue.get_metrics()
 
 
+async def _analyze_position_core(
+    fen: str,
+    *,
+    lines: int,
+    depth: int,
+    light_mode: bool,
+    queue=None,
+    cpu_pool: Optional[ProcessPoolExecutor] = None,
+) -> Dict[str, Any]:
+    """
+    Body of /analyze_position for one position (FEN already validated by the caller).
+
+    queue: StockfishQueue-compatible engine handle (defaults to the shared engine_queue;
+        the batch endpoint passes an engine leased from the EnginePool).
+    cpu_pool: ProcessPoolExecutor for theme/tag work (defaults to a per-call pool).
+    """
+    queue = queue or engine_queue
+    board = chess.Board(fen)
+
+    # STEP 1: Extract candidate moves (single Stockfish call for eval + candidates)
+    print("🎯 Step 1/6: Extracting candidate moves with Stockfish...")
+    candidates = await probe_candidates(board, multipv=lines, depth=depth, queue=queue)
+    print(f"   Found {len(candidates)} candidate lines")
+    
+    # Extract eval and PV from first candidate
+    if candidates:
+        eval_cp = candidates[0]["eval_cp"]
+        pv = candidates[0].get("pv", [])
+        print(f"   Eval: {eval_cp}cp, PV: {len(pv)} moves")
+    else:
+        eval_cp = 0
+        pv = []
+        print("   ⚠️ No candidates found, using default eval")
+    
+    # STEP 2: Calculate material balance and positional CP
+    print("🧮 Step 2/6: Calculating material balance...")
+    material_balance_start = calculate_material_balance(board)
+    positional_cp_start = eval_cp - material_balance_start
+    
+    print(f"   Material: {material_balance_start}cp, Positional: {positional_cp_start}cp")
+    
+    # STEP 3: Build final FEN from PV (do this early so we can parallelize theme calculations)
+    print("♟️  Step 3/6: Playing out principal variation...")
+    final_board = board.copy()
+    for move in pv:
+        final_board.push(move)
+    final_fen = final_board.fen()
+    
+    print(f"   PV final position: {final_fen[:50]}...")
+    
+    # STEP 4: Analyze both positions in parallel (themes + tags)
+    print("🏷️  Step 4/6: Analyzing positions (parallel theme/tag calculations)...")
+    loop = asyncio.get_event_loop()
+    
+    with (nullcontext(cpu_pool) if cpu_pool is not None else ProcessPoolExecutor(max_workers=4)) as pool:
+        # Start both theme/tag calculations in parallel
+        themes_start_future = loop.run_in_executor(pool, compute_themes_and_tags, fen)
+        themes_final_future = loop.run_in_executor(pool, compute_themes_and_tags, final_fen)
+        
+        # While themes calculate, do Stockfish analysis of final position
+        print("🔍 Step 5/6: Analyzing PV final position with Stockfish...")
+        final_info = await queue.enqueue(
+            queue.engine.analyse,
+            final_board,
+            chess.engine.Limit(depth=depth)
+        )
+        final_score = final_info.get("score")
+        
+        if final_score and final_score.is_mate():
+            final_mate = final_score.relative.mate()
+            eval_cp_final = 10000 if final_mate > 0 else -10000
+        elif final_score:
+            eval_cp_final = final_score.relative.score(mate_score=10000)
+        else:
+            eval_cp_final = 0
+        
+        material_balance_final = calculate_material_balance(final_board)
+        positional_cp_final = eval_cp_final - material_balance_final
+        
+        print(f"   Final eval: {eval_cp_final}cp, Material: {material_balance_final}cp")
+        
+        # Wait for theme/tag results
+        raw_start = await themes_start_future
+        raw_final = await themes_final_future
+
+        # Calculate theme scores
+        raw_start["theme_scores"] = compute_theme_scores(raw_start["themes"])
+        raw_final["theme_scores"] = compute_theme_scores(raw_final["themes"])
+
+        # Add engine-based threats (for both start and final positions)
+        print("🔍 Detecting threats...")
+        from threat_analyzer import detect_engine_threats
+        threats_start = await detect_engine_threats(fen, queue, depth)
+        threats_final = await detect_engine_threats(final_fen, queue, depth)
+
+        # Build analysis_start and analysis_final in the same format as analyze_fen
+        analysis_start = {
+            "fen": fen,
+            "themes": raw_start["themes"],
+            "tags": raw_start["tags"],
+            "material_balance_cp": raw_start["material_balance_cp"],
+            "theme_scores": raw_start["theme_scores"],
+            "engine_threats": threats_start
+        }
+        analysis_final = {
+            "fen": final_fen,
+            "themes": raw_final["themes"],
+            "tags": raw_final["tags"],
+            "material_balance_cp": raw_final["material_balance_cp"],
+            "theme_scores": raw_final["theme_scores"],
+            "engine_threats": threats_final
+        }
+    
+    print(f"   Detected {len(analysis_start['tags'])} tags in start, {len(analysis_final['tags'])} tags in final")
+    
+    # Calculate delta and classify plans
+    print("📊 Computing delta and classifying plans...")
+    delta = calculate_delta(
+        analysis_start["themes"],
+        analysis_final["themes"],
+        material_balance_start,
+        material_balance_final,
+        positional_cp_start,
+        positional_cp_final,
+        analysis_start["tags"],
+        analysis_final["tags"]
+    )
+    
+    print(f"   Plan types - White: {delta['white']['plan_type']}, Black: {delta['black']['plan_type']}")
+    
+    # Get game phase
+    phase = game_phase(board)
+    
+    # STEP 7: Build piece profiles (NNUE + tags + interactions) - SKIP IN LIGHT MODE
+    piece_profiles_start = {}
+    piece_profiles_final = {}
+    piece_trajectories = {}
+    captures_in_pv = []
+    profile_summary = {}
+    square_control_start = {}
+    square_control_final = {}
+    piece_interactions_start = []
+    piece_interactions_final = []
+    pv_fen_profiles = []
+    
+    if not light_mode:
+        print("🧩 Step 7: Building piece profiles...")
+    try:
+        # Get NNUE dumps for start and final positions
+        nnue_dump_start = get_nnue_dump(fen)
+        nnue_dump_final = get_nnue_dump(final_fen) if final_fen != fen else nnue_dump_start
+        
+        # Build piece profiles
+        piece_profiles_start = build_piece_profiles(
+            fen=fen,
+            nnue_dump=nnue_dump_start,
+            tags=analysis_start.get("tags", []),
+            themes=analysis_start.get("themes", {}),
+            phase=phase
+        )
+        
+        piece_profiles_final = build_piece_profiles(
+            fen=final_fen,
+            nnue_dump=nnue_dump_final,
+            tags=analysis_final.get("tags", []),
+            themes=analysis_final.get("themes", {}),
+            phase=phase
+        )
+        
+        # Compute square control
+        square_control_start = compute_square_control(board)
+        square_control_final = compute_square_control(final_board)
+        
+        # Get profile summary
+        profile_summary = get_profile_summary(piece_profiles_start)
+        
+        # Add coordination scores
+        profile_summary["white"]["coordination_score"] = round(
+            compute_coordination_score(board, chess.WHITE), 2
+        )
+        profile_summary["black"]["coordination_score"] = round(
+            compute_coordination_score(board, chess.BLACK), 2
+        )
+        
+        # Track piece trajectories across PV
+        if pv:
+            pv_fens = compute_pv_fens(fen, pv)
+            
+            # Build profiles for each PV position (sample up to 5 positions)
+            sample_indices = [0, len(pv_fens) - 1]  # Start and end
+            if len(pv_fens) > 2:
+                mid = len(pv_fens) // 2
+                sample_indices.insert(1, mid)
+            
+            profiles_by_fen = {fen: piece_profiles_start, final_fen: piece_profiles_final}
+            
+            for idx in sample_indices:
+                if idx < len(pv_fens):
+                    sample_fen = pv_fens[idx]
+                    if sample_fen not in profiles_by_fen:
+                        sample_board = chess.Board(sample_fen)
+                        sample_dump = get_nnue_dump(sample_fen)
+                        from tag_detector import aggregate_all_tags
+                        sample_tags = await aggregate_all_tags(sample_board, queue)
+                        profiles_by_fen[sample_fen] = build_piece_profiles(
+                            fen=sample_fen,
+                            nnue_dump=sample_dump,
+                            tags=sample_tags,
+                            phase=phase
+                        )
+            
+            # Track trajectories
+            piece_trajectories = track_pv_profiles(pv_fens, profiles_by_fen)
+            
+            # Detect captures
+            captures_in_pv = detect_captures_in_pv(fen, pv)
+            
+            # Build PV FEN profiles for response
+            for idx, pv_fen in enumerate(pv_fens):
+                if pv_fen in profiles_by_fen:
+                    pv_fen_profiles.append({
+                        "fen_idx": idx,
+                        "fen": pv_fen,
+                        "profiles": profiles_by_fen[pv_fen]
+                    })
+        
+        print(f"   Built profiles for {len(piece_profiles_start)} pieces")
+        
+    except Exception as pe:
+        print(f"⚠️ Piece profiling error (non-fatal): {pe}")
+        import traceback
+        traceback.print_exc()
+    else:
+        print("⏭️  Step 7: Skipped (light mode enabled)")
+    
+    # Convert PV to SAN
+    pv_san = []
+    temp_board = board.copy()
+    for move in pv:
+        try:
+            pv_san.append(temp_board.san(move))
+            temp_board.push(move)
+        except:
+            break
+    
+    # Filter out null/zero themes and tags
+    def filter_themes(theme_scores: Dict) -> Dict:
+        """Remove themes with zero or near-zero scores."""
+        return {k: v for k, v in theme_scores.items() if k == "total" or abs(v) > 0.01}
+    
+    def filter_tags(tags: List[Dict]) -> List[Dict]:
+        """Return only non-empty tags."""
+        return [t for t in tags if t.get("tag_name")]
+    
+    # Build response with two clear chunks per side
+    white_mat_start = material_balance_start if board.turn == chess.WHITE else -material_balance_start
+    white_pos_start = positional_cp_start if board.turn == chess.WHITE else -positional_cp_start
+    black_mat_start = -material_balance_start if board.turn == chess.WHITE else material_balance_start
+    black_pos_start = -positional_cp_start if board.turn == chess.WHITE else positional_cp_start
+    
+    response = {
+        "fen": fen,
+        "eval_cp": eval_cp,
+        "pv": pv_san,
+        "best_move": candidates[0]["move"] if candidates else (pv_san[0] if pv_san else ""),
+        "candidate_moves": candidates,
+        "phase": phase,
+        "light_mode": light_mode,  # Flag to indicate if light mode was used
+        "threats": {
+            "white": threats_start["threats_by_side"]["white"] + threats_final["threats_by_side"]["white"],
+            "black": threats_start["threats_by_side"]["black"] + threats_final["threats_by_side"]["black"]
+        },
+        
+        "white_analysis": {
+            "chunk_1_immediate": {
+                "description": "What the position IS right now for White",
+                "material_balance_cp": white_mat_start,
+                "positional_cp_significance": white_pos_start,
+                "theme_scores": filter_themes(analysis_start["theme_scores"]["white"]),
+                "tags": filter_tags([t for t in analysis_start["tags"] if t.get("side") == "white" or t.get("side") == "both"])
+            },
+            "chunk_2_plan_delta": {
+                "description": "How it SHOULD unfold for White (after PV)",
+                "plan_type": delta["white"]["plan_type"],
+                "plan_explanation": delta["white"]["plan_explanation"],
+                "material_delta_cp": delta["white"]["material_delta_cp"],
+                "positional_delta_cp": delta["white"]["positional_delta_cp"],
+                "theme_changes": {k: v for k, v in delta["white"]["theme_deltas"].items() if abs(v) > 0.5}
+            }
+        },
+        
+        "black_analysis": {
+            "chunk_1_immediate": {
+                "description": "What the position IS right now for Black",
+                "material_balance_cp": black_mat_start,
+                "positional_cp_significance": black_pos_start,
+                "theme_scores": filter_themes(analysis_start["theme_scores"]["black"]),
+                "tags": filter_tags([t for t in analysis_start["tags"] if t.get("side") == "black" or t.get("side") == "both"])
+            },
+            "chunk_2_plan_delta": {
+                "description": "How it SHOULD unfold for Black (after PV)",
+                "plan_type": delta["black"]["plan_type"],
+                "plan_explanation": delta["black"]["plan_explanation"],
+                "material_delta_cp": delta["black"]["material_delta_cp"],
+                "positional_delta_cp": delta["black"]["positional_delta_cp"],
+                "theme_changes": {k: v for k, v in delta["black"]["theme_deltas"].items() if abs(v) > 0.5}
+            }
+        },
+        
+        # Piece profiling data
+        "piece_profiles_start": piece_profiles_start,
+        "piece_profiles_final": piece_profiles_final,
+        "piece_trajectories": piece_trajectories,
+        "captures_in_pv": captures_in_pv,
+        "square_control_start": get_control_summary(square_control_start) if square_control_start else {},
+        "square_control_final": get_control_summary(square_control_final) if square_control_final else {},
+        "profile_summary": profile_summary,
+        "pv_fen_profiles": pv_fen_profiles[:5],  # Limit to 5 positions
+    }
+    # Attach position-level confidence (best move from side-to-move)
+    print("📊 [ANALYZE_POSITION] Computing position confidence...")
+    try:
+        position_conf = await compute_position_confidence(queue, fen, target_conf=80)
+        response["position_confidence"] = position_conf
+        print("✅ [ANALYZE_POSITION] Position confidence computed successfully")
+    except Exception as ce:
+        print(f"⚠️ [ANALYZE_POSITION] Confidence computation failed (position): {ce}")
+        import traceback
+        traceback.print_exc()
+        response["position_confidence"] = neutral_confidence()
+    
+    print("✅ [ANALYZE_POSITION] Analysis complete, returning response")
+    return response
+
+
 @app.get("/analyze_position")
 async def analyze_position(
     fen: str = Query(..., description="FEN string of the position"),
@@ -1408,321 +1803,7 @@ async def analyze_position(
         raise HTTPException(status_code=400, detail=f"Invalid FEN: {str(e)}")
     
     try:
-        # STEP 1: Extract candidate moves (single Stockfish call for eval + candidates)
-        print("🎯 Step 1/6: Extracting candidate moves with Stockfish...")
-        candidates = await probe_candidates(board, multipv=lines, depth=depth)
-        print(f"   Found {len(candidates)} candidate lines")
-        
-        # Extract eval and PV from first candidate
-        if candidates:
-            eval_cp = candidates[0]["eval_cp"]
-            pv = candidates[0].get("pv", [])
-            print(f"   Eval: {eval_cp}cp, PV: {len(pv)} moves")
-        else:
-            eval_cp = 0
-            pv = []
-            print("   ⚠️ No candidates found, using default eval")
-        
-        # STEP 2: Calculate material balance and positional CP
-        print("🧮 Step 2/6: Calculating material balance...")
-        material_balance_start = calculate_material_balance(board)
-        positional_cp_start = eval_cp - material_balance_start
-        
-        print(f"   Material: {material_balance_start}cp, Positional: {positional_cp_start}cp")
-        
-        # STEP 3: Build final FEN from PV (do this early so we can parallelize theme calculations)
-        print("♟️  Step 3/6: Playing out principal variation...")
-        final_board = board.copy()
-        for move in pv:
-            final_board.push(move)
-        final_fen = final_board.fen()
-        
-        print(f"   PV final position: {final_fen[:50]}...")
-        
-        # STEP 4: Analyze both positions in parallel (themes + tags)
-        print("🏷️  Step 4/6: Analyzing positions (parallel theme/tag calculations)...")
-        loop = asyncio.get_event_loop()
-        
-        with ProcessPoolExecutor(max_workers=4) as pool:
-            # Start both theme/tag calculations in parallel
-            themes_start_future = loop.run_in_executor(pool, compute_themes_and_tags, fen)
-            themes_final_future = loop.run_in_executor(pool, compute_themes_and_tags, final_fen)
-            
-            # While themes calculate, do Stockfish analysis of final position
-            print("🔍 Step 5/6: Analyzing PV final position with Stockfish...")
-            final_info = await engine_queue.enqueue(
-                engine_queue.engine.analyse,
-                final_board,
-                chess.engine.Limit(depth=depth)
-            )
-            final_score = final_info.get("score")
-            
-            if final_score and final_score.is_mate():
-                final_mate = final_score.relative.mate()
-                eval_cp_final = 10000 if final_mate > 0 else -10000
-            elif final_score:
-                eval_cp_final = final_score.relative.score(mate_score=10000)
-            else:
-                eval_cp_final = 0
-            
-            material_balance_final = calculate_material_balance(final_board)
-            positional_cp_final = eval_cp_final - material_balance_final
-            
-            print(f"   Final eval: {eval_cp_final}cp, Material: {material_balance_final}cp")
-            
-            # Wait for theme/tag results
-            raw_start = await themes_start_future
-            raw_final = await themes_final_future
-
-            # Calculate theme scores
-            raw_start["theme_scores"] = compute_theme_scores(raw_start["themes"])
-            raw_final["theme_scores"] = compute_theme_scores(raw_final["themes"])
-
-            # Add engine-based threats (for both start and final positions)
-            print("🔍 Detecting threats...")
-            from threat_analyzer import detect_engine_threats
-            threats_start = await detect_engine_threats(fen, engine_queue, depth)
-            threats_final = await detect_engine_threats(final_fen, engine_queue, depth)
-
-            # Build analysis_start and analysis_final in the same format as analyze_fen
-            analysis_start = {
-                "fen": fen,
-                "themes": raw_start["themes"],
-                "tags": raw_start["tags"],
-                "material_balance_cp": raw_start["material_balance_cp"],
-                "theme_scores": raw_start["theme_scores"],
-                "engine_threats": threats_start
-            }
-            analysis_final = {
-                "fen": final_fen,
-                "themes": raw_final["themes"],
-                "tags": raw_final["tags"],
-                "material_balance_cp": raw_final["material_balance_cp"],
-                "theme_scores": raw_final["theme_scores"],
-                "engine_threats": threats_final
-            }
-        
-        print(f"   Detected {len(analysis_start['tags'])} tags in start, {len(analysis_final['tags'])} tags in final")
-        
-        # Calculate delta and classify plans
-        print("📊 Computing delta and classifying plans...")
-        delta = calculate_delta(
-            analysis_start["themes"],
-            analysis_final["themes"],
-            material_balance_start,
-            material_balance_final,
-            positional_cp_start,
-            positional_cp_final,
-            analysis_start["tags"],
-            analysis_final["tags"]
-        )
-        
-        print(f"   Plan types - White: {delta['white']['plan_type']}, Black: {delta['black']['plan_type']}")
-        
-        # Get game phase
-        phase = game_phase(board)
-        
-        # STEP 7: Build piece profiles (NNUE + tags + interactions) - SKIP IN LIGHT MODE
-        piece_profiles_start = {}
-        piece_profiles_final = {}
-        piece_trajectories = {}
-        captures_in_pv = []
-        profile_summary = {}
-        square_control_start = {}
-        square_control_final = {}
-        piece_interactions_start = []
-        piece_interactions_final = []
-        pv_fen_profiles = []
-        
-        if not light_mode:
-            print("🧩 Step 7: Building piece profiles...")
-        try:
-            # Get NNUE dumps for start and final positions
-            nnue_dump_start = get_nnue_dump(fen)
-            nnue_dump_final = get_nnue_dump(final_fen) if final_fen != fen else nnue_dump_start
-            
-            # Build piece profiles
-            piece_profiles_start = build_piece_profiles(
-                fen=fen,
-                nnue_dump=nnue_dump_start,
-                tags=analysis_start.get("tags", []),
-                themes=analysis_start.get("themes", {}),
-                phase=phase
-            )
-            
-            piece_profiles_final = build_piece_profiles(
-                fen=final_fen,
-                nnue_dump=nnue_dump_final,
-                tags=analysis_final.get("tags", []),
-                themes=analysis_final.get("themes", {}),
-                phase=phase
-            )
-            
-            # Compute square control
-            square_control_start = compute_square_control(board)
-            square_control_final = compute_square_control(final_board)
-            
-            # Get profile summary
-            profile_summary = get_profile_summary(piece_profiles_start)
-            
-            # Add coordination scores
-            profile_summary["white"]["coordination_score"] = round(
-                compute_coordination_score(board, chess.WHITE), 2
-            )
-            profile_summary["black"]["coordination_score"] = round(
-                compute_coordination_score(board, chess.BLACK), 2
-            )
-            
-            # Track piece trajectories across PV
-            if pv:
-                pv_fens = compute_pv_fens(fen, pv)
-                
-                # Build profiles for each PV position (sample up to 5 positions)
-                sample_indices = [0, len(pv_fens) - 1]  # Start and end
-                if len(pv_fens) > 2:
-                    mid = len(pv_fens) // 2
-                    sample_indices.insert(1, mid)
-                
-                profiles_by_fen = {fen: piece_profiles_start, final_fen: piece_profiles_final}
-                
-                for idx in sample_indices:
-                    if idx < len(pv_fens):
-                        sample_fen = pv_fens[idx]
-                        if sample_fen not in profiles_by_fen:
-                            sample_board = chess.Board(sample_fen)
-                            sample_dump = get_nnue_dump(sample_fen)
-                            from tag_detector import aggregate_all_tags
-                            sample_tags = await aggregate_all_tags(sample_board, engine_queue)
-                            profiles_by_fen[sample_fen] = build_piece_profiles(
-                                fen=sample_fen,
-                                nnue_dump=sample_dump,
-                                tags=sample_tags,
-                                phase=phase
-                            )
-                
-                # Track trajectories
-                piece_trajectories = track_pv_profiles(pv_fens, profiles_by_fen)
-                
-                # Detect captures
-                captures_in_pv = detect_captures_in_pv(fen, pv)
-                
-                # Build PV FEN profiles for response
-                for idx, pv_fen in enumerate(pv_fens):
-                    if pv_fen in profiles_by_fen:
-                        pv_fen_profiles.append({
-                            "fen_idx": idx,
-                            "fen": pv_fen,
-                            "profiles": profiles_by_fen[pv_fen]
-                        })
-            
-            print(f"   Built profiles for {len(piece_profiles_start)} pieces")
-            
-        except Exception as pe:
-            print(f"⚠️ Piece profiling error (non-fatal): {pe}")
-            import traceback
-            traceback.print_exc()
-        else:
-            print("⏭️  Step 7: Skipped (light mode enabled)")
-        
-        # Convert PV to SAN
-        pv_san = []
-        temp_board = board.copy()
-        for move in pv:
-            try:
-                pv_san.append(temp_board.san(move))
-                temp_board.push(move)
-            except:
-                break
-        
-        # Filter out null/zero themes and tags
-        def filter_themes(theme_scores: Dict) -> Dict:
-            """Remove themes with zero or near-zero scores."""
-            return {k: v for k, v in theme_scores.items() if k == "total" or abs(v) > 0.01}
-        
-        def filter_tags(tags: List[Dict]) -> List[Dict]:
-            """Return only non-empty tags."""
-            return [t for t in tags if t.get("tag_name")]
-        
-        # Build response with two clear chunks per side
-        white_mat_start = material_balance_start if board.turn == chess.WHITE else -material_balance_start
-        white_pos_start = positional_cp_start if board.turn == chess.WHITE else -positional_cp_start
-        black_mat_start = -material_balance_start if board.turn == chess.WHITE else material_balance_start
-        black_pos_start = -positional_cp_start if board.turn == chess.WHITE else positional_cp_start
-        
-        response = {
-            "fen": fen,
-            "eval_cp": eval_cp,
-            "pv": pv_san,
-            "best_move": candidates[0]["move"] if candidates else (pv_san[0] if pv_san else ""),
-            "candidate_moves": candidates,
-            "phase": phase,
-            "light_mode": light_mode,  # Flag to indicate if light mode was used
-            "threats": {
-                "white": threats_start["threats_by_side"]["white"] + threats_final["threats_by_side"]["white"],
-                "black": threats_start["threats_by_side"]["black"] + threats_final["threats_by_side"]["black"]
-            },
-            
-            "white_analysis": {
-                "chunk_1_immediate": {
-                    "description": "What the position IS right now for White",
-                    "material_balance_cp": white_mat_start,
-                    "positional_cp_significance": white_pos_start,
-                    "theme_scores": filter_themes(analysis_start["theme_scores"]["white"]),
-                    "tags": filter_tags([t for t in analysis_start["tags"] if t.get("side") == "white" or t.get("side") == "both"])
-                },
-                "chunk_2_plan_delta": {
-                    "description": "How it SHOULD unfold for White (after PV)",
-                    "plan_type": delta["white"]["plan_type"],
-                    "plan_explanation": delta["white"]["plan_explanation"],
-                    "material_delta_cp": delta["white"]["material_delta_cp"],
-                    "positional_delta_cp": delta["white"]["positional_delta_cp"],
-                    "theme_changes": {k: v for k, v in delta["white"]["theme_deltas"].items() if abs(v) > 0.5}
-                }
-            },
-            
-            "black_analysis": {
-                "chunk_1_immediate": {
-                    "description": "What the position IS right now for Black",
-                    "material_balance_cp": black_mat_start,
-                    "positional_cp_significance": black_pos_start,
-                    "theme_scores": filter_themes(analysis_start["theme_scores"]["black"]),
-                    "tags": filter_tags([t for t in analysis_start["tags"] if t.get("side") == "black" or t.get("side") == "both"])
-                },
-                "chunk_2_plan_delta": {
-                    "description": "How it SHOULD unfold for Black (after PV)",
-                    "plan_type": delta["black"]["plan_type"],
-                    "plan_explanation": delta["black"]["plan_explanation"],
-                    "material_delta_cp": delta["black"]["material_delta_cp"],
-                    "positional_delta_cp": delta["black"]["positional_delta_cp"],
-                    "theme_changes": {k: v for k, v in delta["black"]["theme_deltas"].items() if abs(v) > 0.5}
-                }
-            },
-            
-            # Piece profiling data
-            "piece_profiles_start": piece_profiles_start,
-            "piece_profiles_final": piece_profiles_final,
-            "piece_trajectories": piece_trajectories,
-            "captures_in_pv": captures_in_pv,
-            "square_control_start": get_control_summary(square_control_start) if square_control_start else {},
-            "square_control_final": get_control_summary(square_control_final) if square_control_final else {},
-            "profile_summary": profile_summary,
-            "pv_fen_profiles": pv_fen_profiles[:5],  # Limit to 5 positions
-        }
-        # Attach position-level confidence (best move from side-to-move)
-        print("📊 [ANALYZE_POSITION] Computing position confidence...")
-        try:
-            position_conf = await compute_position_confidence(engine_queue, fen, target_conf=80)
-            response["position_confidence"] = position_conf
-            print("✅ [ANALYZE_POSITION] Position confidence computed successfully")
-        except Exception as ce:
-            print(f"⚠️ [ANALYZE_POSITION] Confidence computation failed (position): {ce}")
-            import traceback
-            traceback.print_exc()
-            response["position_confidence"] = neutral_confidence()
-        
-        print("✅ [ANALYZE_POSITION] Analysis complete, returning response")
-        return response
-        
+        return await _analyze_position_core(fen, lines=lines, depth=depth, light_mode=light_mode)
     except HTTPException:
         raise
     except Exception as e:
@@ -1732,6 +1813,147 @@ async def analyze_position(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/analyze_positions_batch")
+async def analyze_positions_batch(request: AnalyzePositionsBatchRequest):
+    """
+    Analyze many positions with shared options, streamed as NDJSON.
+    
+    - FENs are deduplicated by position key (move counters / dead en passant
+      ignored); each result line lists every request index it answers.
+    - Positions run concurrently, one leased engine each from the engine pool
+      plus the pool's CPU workers; without a pool they go through engine_queue
+      one at a time.
+    - Lines are emitted as soon as each position finishes (not in request
+      order), followed by one {"done": true, ...} summary line.
+    
+    Line shape: {"indices": [...], "fen": ..., "ok": true, "result": {...}}
+    or {"indices": [...], "fen": ..., "ok": false, "error": "..."}.
+    """
+    if not engine:
+        raise HTTPException(status_code=503, detail="Stockfish engine not available")
+    
+    # Dedupe by canonical position; remember every index each one answers
+    groups: Dict[int, Dict[str, Any]] = {}
+    invalid: List[Dict[str, Any]] = []
+    for index, fen in enumerate(request.fens):
+        fen = (fen or "").strip()
+        try:
+            chess.Board(fen)
+        except Exception as e:
+            invalid.append({"indices": [index], "fen": fen, "ok": False, "error": f"Invalid FEN: {e}"})
+            continue
+        group = groups.setdefault(position_key(fen), {"fen": fen, "indices": []})
+        group["indices"].append(index)
+    
+    use_pool = engine_pool_instance is not None and engine_pool_instance._initialized
+    if use_pool:
+        concurrency = min(request.concurrency or engine_pool_instance.pool_size, engine_pool_instance.pool_size)
+    else:
+        concurrency = 1
+    semaphore = asyncio.Semaphore(concurrency)
+    print(f"📦 [ANALYZE_BATCH] {len(request.fens)} FENs -> {len(groups)} unique, {len(invalid)} invalid "
+          f"(concurrency={concurrency}, pool={'yes' if use_pool else 'no'})")
+    
+    async def run_one(group: Dict[str, Any]) -> Dict[str, Any]:
+        line = {"indices": group["indices"], "fen": group["fen"]}
+        async with semaphore:
+            try:
+                if use_pool:
+                    async with engine_pool_instance.lease() as lease:
+                        result = await _analyze_position_core(
+                            group["fen"], lines=request.lines, depth=request.depth,
+                            light_mode=request.light_mode, queue=lease,
+                            cpu_pool=engine_pool_instance.process_pool,
+                        )
+                else:
+                    result = await _analyze_position_core(
+                        group["fen"], lines=request.lines, depth=request.depth,
+                        light_mode=request.light_mode,
+                    )
+                return {**line, "ok": True, "result": result}
+            except Exception as e:
+                print(f"   ❌ [ANALYZE_BATCH] {group['fen'][:50]}: {e}")
+                return {**line, "ok": False, "error": str(e)}
+    
+    import time as _time
+    
+    async def ndjson_lines():
+        started = _time.perf_counter()
+        failed = len(invalid)
+        for line in invalid:
+            yield json.dumps(line) + "\n"
+        tasks = [asyncio.create_task(run_one(group)) for group in groups.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                if not line["ok"]:
+                    failed += 1
+                yield json.dumps(line, default=str) + "\n"
+        finally:
+            # Client went away: don't keep engines busy for nobody
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        elapsed = _time.perf_counter() - started
+        print(f"✅ [ANALYZE_BATCH] {len(groups)} positions in {elapsed:.1f}s ({failed} failed)")
+        yield json.dumps({
+            "done": True,
+            "requested": len(request.fens),
+            "unique": len(groups),
+            "failed": failed,
+            "elapsed_s": round(elapsed, 3),
+        }) + "\n"
+    
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/analyze_position_stream")
+async def analyze_position_stream(
+    fen: str = Query(..., description="FEN string of the position"),
+    lines: int = Query(3, ge=1, le=5, description="Number of candidate lines"),
+    depth: int = Query(22, ge=1, le=30, description="Maximum search depth"),
+    stop_when_stable: bool = Query(False, description="Finish early once best move and score settle")
+):
+    """
+    Anytime engine analysis over SSE.
+    
+    Emits one `depth` event per completed search depth (score, PV and all
+    multipv lines), then `complete` (or `error`). Clients may also just
+    disconnect once they are satisfied; requests for the same position share
+    one search, which stops when its last subscriber leaves.
+    """
+    if not engine:
+        raise HTTPException(status_code=503, detail="Stockfish engine not available")
+    try:
+        chess.Board(fen)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid FEN: {str(e)}")
+    
+    async def event_stream():
+        events = anytime_hub.stream(fen, depth=depth, multipv=lines, stop_when_stable=stop_when_stable)
+        try:
+            async for event_type, payload in events:
+                yield f"event: {event_type}\ndata: {payload.model_dump_json()}\n\n"
+        except (BrokenPipeError, ConnectionResetError) as e:
+            print(f"   ⚠️ [ANALYZE_STREAM] Client disconnected: {e}")
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @app.post("/play_move")
 async def play_move(request: PlayMoveRequest):
     """Process a user move and return engine response."""
@@ -1887,30 +2109,29 @@ async def confidence_raise_position(req: RaisePositionConfidenceRequest):
 
 @app.get("/tactics_next")
 async def tactics_next(
+    req: Request,
     rating_min: Optional[int] = Query(None, description="Minimum rating"),
-    rating_max: Optional[int] = Query(None, description="Maximum rating")
+    rating_max: Optional[int] = Query(None, description="Maximum rating"),
+    theme: Optional[str] = Query(None, description="Puzzle theme, e.g. fork"),
 ):
-    """Get next tactics puzzle from tactics.json."""
+    """Get the next tactics puzzle the caller hasn't seen, from the tactics index."""
+    headers = extract_learning_headers(dict(req.headers))
+    viewer = headers.user_id
+    if viewer == "00000000-0000-0000-0000-000000000000":
+        viewer = headers.app_session_id  # anonymous: progress per app session
     try:
-        with open("tactics.json", "r") as f:
-            tactics = json.load(f)
+        if tactics_store.stale():
+            # File check / reload off the event loop; other requests keep the loaded index meanwhile
+            await asyncio.to_thread(tactics_store.refresh)
+        puzzle = tactics_store.next_puzzle(rating_min, rating_max, theme=theme, viewer=viewer)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="tactics.json not found")
-    except json.JSONDecodeError as e:
-        raise HTTPException(status_code=500, detail=f"Invalid tactics.json: {str(e)}")
-    
-    # Filter by rating if specified
-    filtered = tactics
-    if rating_min is not None:
-        filtered = [t for t in filtered if t.get("rating", 0) >= rating_min]
-    if rating_max is not None:
-        filtered = [t for t in filtered if t.get("rating", 9999) <= rating_max]
-    
-    if not filtered:
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=f"Invalid tactics file: {str(e)}")
+
+    if puzzle is None:
         raise HTTPException(status_code=404, detail="No tactics found matching criteria")
-    
-    # Return first matching tactic (in production, would track progress)
-    return filtered[0]
+    return puzzle
 
 
 @app.post("/annotate")
@@ -2341,7 +2562,8 @@ async def _review_game_internal(
     include_timestamps: bool = True,
     depth: int = 14,  # Lowered for speed - deep analysis done on-demand via raw data
     engine_instance = None,
-    status_callback = None  # Optional callback for progress updates
+    status_callback = None,  # Optional callback for progress updates
+    adaptive_depth: bool = False  # Shallow sweep + deep re-search of critical moves (engine pool only)
 ) -> Dict:
     """
     Internal function for game review logic (called by endpoint and aggregator).
@@ -2355,10 +2577,7 @@ async def _review_game_internal(
         return {"error": "Stockfish engine not available", "ply_records": []}
     
     try:
-        # Clean PGN
-        import re
-        
-        print(f"🎮 Starting game review (side_focus={side_focus}, depth={depth})")
+        print(f"🎮 Starting game review (side_focus={side_focus}, depth={depth}, adaptive={adaptive_depth})")
         print(f"   PGN length: {len(pgn_string)} chars")
         
         # PGN needs newlines preserved - don't join everything into one line!
@@ -2372,21 +2591,8 @@ async def _review_game_internal(
             return {"error": "Invalid PGN", "ply_records": []}
         
         # Extract timestamps if present
-        timestamps = {}
-        if include_timestamps:
-            node = pgn_io
-            ply = 0
-            while node.variations:
-                node = node.variation(0)
-                ply += 1
-                if node.comment:
-                    # Extract [%clk 0:05:23] or [%clk 0:05:23.5] format (handles decimals)
-                    clk_match = re.search(r'\[%clk (\d+):(\d+):(\d+(?:\.\d+)?)\]', node.comment)
-                    if clk_match:
-                        h, m, s_str = clk_match.groups()
-                        h, m = int(h), int(m)
-                        s = float(s_str)  # Handle decimal seconds
-                        timestamps[ply] = h * 3600 + m * 60 + s
+        # [%clk 0:05:23] or [%clk 0:05:23.5] comments (decimals handled)
+        timestamps = pgn_clock_timestamps(pgn_io) if include_timestamps else {}
         
         print(f"   Extracted {len(timestamps)} timestamps from PGN")
         if len(timestamps) > 0:
@@ -2395,6 +2601,14 @@ async def _review_game_internal(
         else:
             print(f"   ⚠️ WARNING: No timestamps extracted (time management will be 0)")
         
+        # Same game (moves + clocks) already reviewed at this depth or deeper, by either player?
+        review_key = review_cache_key(pgn_io, timestamps)
+        cached_review = review_cache.get_review(review_key, depth, adaptive=adaptive_depth)
+        if cached_review is not None:
+            if status_callback:
+                await status_callback("executing", f"Loaded cached review ({len(cached_review['ply_records'])} moves)", 0.98, replace=True)
+            return apply_review_perspective(cached_review, side_focus)
+        
         # Initialize game state
         board = chess.Board()
         ply_records = []
@@ -2456,7 +2670,8 @@ async def _review_game_internal(
                     depth=depth,
                     multipv=2,
                     timestamps=timestamps,
-                    progress_callback=parallel_progress
+                    progress_callback=parallel_progress,
+                    adaptive=AdaptiveDepthConfig() if adaptive_depth else None
                 )
                 
                 # Use complete ply records directly - just add phase detection
@@ -2674,47 +2889,6 @@ async def _review_game_internal(
         
         print(f"✅ Analyzed {len(ply_records)} plies")
         
-        # Detect key points and assign labels using enhanced detection
-        if status_callback:
-            await status_callback("executing", "Detecting key moments...", 0.96, replace=True)
-            await asyncio.sleep(0)  # Yield to event loop
-        print("🔍 Detecting key points (enhanced)...")
-        
-        # Use enhanced key moment detection for BOTH sides
-        from key_moment_selector import detect_all_key_moments
-        all_key_moments = detect_all_key_moments(ply_records, player_color=side_focus if side_focus != "both" else None)
-        
-        # Also update the legacy key_point_labels on each record for backwards compatibility
-        key_moments_by_ply = {km["ply"]: km for km in all_key_moments}
-        key_points = []
-        
-        for i, record in enumerate(ply_records):
-            ply = record["ply"]
-            
-            # Check if this ply has a key moment
-            km = key_moments_by_ply.get(ply)
-            if km:
-                record["key_point_labels"] = km.get("labels", [])
-            else:
-                record["key_point_labels"] = []
-            
-            # Apply side filtering for backwards compatibility
-            if side_focus == "white":
-                if record["side_moved"] == "black" and "blunder" not in record["key_point_labels"]:
-                    record["key_point_labels"] = []
-            elif side_focus == "black":
-                if record["side_moved"] == "white" and "blunder" not in record["key_point_labels"]:
-                    record["key_point_labels"] = []
-            
-            if record["key_point_labels"]:
-                key_points.append(record)
-            
-            # Progress update every 10 moves or at the end
-            if status_callback and (i % 10 == 0 or i == len(ply_records) - 1):
-                progress = 0.96 + (i / len(ply_records) * 0.02)  # 96% to 98%
-                await status_callback("executing", f"Scanning for key moments ({i+1}/{len(ply_records)})...", progress, replace=True)
-                await asyncio.sleep(0)  # Yield to event loop
-        
         # Calculate aggregated statistics
         if status_callback:
             await status_callback("executing", "Calculating statistics...", 0.98, replace=True)
@@ -2801,7 +2975,7 @@ async def _review_game_internal(
                     "to_phase": ply_records[i]["phase"]
                 })
         
-        print(f"✅ Review complete: {len(key_points)} key points, {len(phase_transitions)} phase transitions")
+        print(f"✅ Review complete: {len(phase_transitions)} phase transitions")
         
         # Add general game info for training system
         endgame_plies = [r for r in ply_records if r["phase"] == "endgame"]
@@ -2863,7 +3037,7 @@ async def _review_game_internal(
                 record["is_critical"] = True
                 record["critical_note"] = f"Critical decision: {record['san']} was the only good move"
         
-        return {
+        review = {
             "ply_records": ply_records,
             "opening": {
                 "name_final": opening_name_final,
@@ -2871,15 +3045,23 @@ async def _review_game_internal(
                 "left_theory_ply": left_theory_ply
             },
             "phases": phase_transitions,
-            "side_focus": side_focus,
             "stats": {
                 "white": white_stats,
                 "black": black_stats
             },
-            "key_points": key_points,
-            "all_key_moments": all_key_moments,  # NEW: Enhanced key moments for both sides
-            "game_metadata": game_metadata
+            "game_metadata": game_metadata,
+            # Lets the Supabase copy of this review serve later cache lookups
+            "review_meta": {"content_key": review_key, "depth": depth, "adaptive": adaptive_depth and use_parallel},
         }
+        if ply_records:
+            review_cache.store_review(review_key, depth, review, adaptive=adaptive_depth and use_parallel)
+        
+        # Player-perspective fields: key moments (both sides), key_point_labels, key_points, side_focus
+        if status_callback:
+            await status_callback("executing", "Detecting key moments...", 0.999, replace=True)
+        apply_review_perspective(review, side_focus)
+        print(f"   🔍 {len(review['key_points'])} key points for side_focus={side_focus}")
+        return review
         
     except Exception as e:
         import traceback
@@ -3037,14 +3219,15 @@ async def review_game(
     pgn_string: str = Query(..., description="PGN string of the game"),
     side_focus: str = Query("both", pattern="^(white|black|both)$", description="Which side to focus analysis on"),
     include_timestamps: bool = Query(True, description="Extract timestamps from PGN if available"),
-    depth: int = Query(18, ge=10, le=25, description="Stockfish analysis depth")
+    depth: int = Query(18, ge=10, le=25, description="Stockfish analysis depth"),
+    adaptive: bool = Query(False, description="Shallow sweep first, full depth only for critical moves")
 ):
     """
     Comprehensive game review with theme-based analysis per move.
     Returns move-by-move analysis with full position themes, key points, and statistics.
     """
     global engine
-    result = await _review_game_internal(pgn_string, side_focus, include_timestamps, depth, engine)
+    result = await _review_game_internal(pgn_string, side_focus, include_timestamps, depth, engine, adaptive_depth=adaptive)
     
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
@@ -5421,6 +5604,12 @@ async def llm_chat_stream(request: LLMRequest, http_request: Request):
         def send_error_event(msg: str, tb: str = ""):
             return f"event: error\ndata: {json.dumps({'message': msg, 'traceback': tb})}\n\n"
         
+        # Request-scoped trace: spans, cache/engine/LLM stats from every layer land here
+        trace_context = request.context or {}
+        trace_timer, trace_token = start_request_trace(
+            "llm_chat_stream",
+            user_id=trace_context.get("user_id") or (trace_context.get("profile") or {}).get("user_id"),
+        )
         try:
             async for event in event_generator():
                 try:
@@ -5449,6 +5638,8 @@ async def llm_chat_stream(request: LLMRequest, http_request: Request):
                     await asyncio.sleep(0.1)
                 except:
                     pass
+        finally:
+            end_request_trace(trace_timer, trace_token)
     
     return StreamingResponse(
         safe_event_generator(),
@@ -6099,6 +6290,7 @@ async def _generate_opening_lesson_internal(request_data: Dict[str, Any]) -> Dic
         profile_indexer=profile_indexer,
         supabase_client=supabase_client,
         engine_queue=engine_queue,
+        engine_pool=engine_pool_instance if engine_pool_instance and engine_pool_instance._initialized else None,
     )
     
     # Persist canonical lesson snapshot so `/check_opening_move` can reference it
@@ -7429,21 +7621,31 @@ async def profile_overview_snapshot(user_id: str, limit: int = 60):
     """
     Lightweight Overview snapshot (last N games).
     Designed for fast UI rendering: record, accuracy, rating trend, time-style, openings snapshot, momentum.
+    
+    Served from the materialized snapshot (profile_overview_snapshots), which
+    game ingest/compression keep current; (re)built from the games' stored
+    overview_features only when missing or when it can't cover `limit`.
     """
     if not supabase_client:
         raise HTTPException(status_code=503, detail="Supabase client not initialized")
 
     try:
-        from profile_overview_snapshot import build_overview_snapshot
-
-        def fetch_games():
-            if hasattr(supabase_client, "get_recent_games_for_overview_snapshot"):
-                return supabase_client.get_recent_games_for_overview_snapshot(user_id, limit=int(limit))
-            # Fallback (should not happen): use active reviewed games without PGN clocks
-            return supabase_client.get_active_reviewed_games(user_id, limit=int(limit), include_full_review=False)
-
-        games = await asyncio.to_thread(fetch_games)
-        return build_overview_snapshot(games or [], window=int(limit))
+        from profile_overview_snapshot import OverviewSnapshotView
+
+        def load_snapshot():
+            row = supabase_client.get_overview_snapshot_view(user_id)
+            if row:
+                snapshot = OverviewSnapshotView.from_row(row).snapshot_for(int(limit))
+                if snapshot is not None:
+                    return snapshot
+            games = supabase_client.get_recent_games_for_overview_snapshot(user_id, limit=int(limit))
+            view = OverviewSnapshotView.build(games or [], window=int(limit))
+            # Compare-and-set over an existing row, so a concurrent ingest's update isn't overwritten
+            supabase_client.save_overview_snapshot_view(user_id, view.to_row(), expected_version=(row or {}).get("version"))
+            print(f"   🔄 [OVERVIEW_SNAPSHOT] Materialized snapshot for {user_id[:8]}... ({len(view.games)} games)")
+            return view.snapshot
+
+        return await asyncio.to_thread(load_snapshot)
     except Exception as e:
         import traceback
         print(f"❌ [OVERVIEW_SNAPSHOT] Error: {e}")
@@ -7599,7 +7801,7 @@ async def get_detailed_analytics(user_id: str):
         print(f"   ℹ️ [DETAILED_ANALYTICS_ENDPOINT] No cached data found, computing on-demand for user_id: {user_id}")
         
         def fetch_and_aggregate():
-            games = supabase_client.get_active_reviewed_games(user_id, limit=60, include_full_review=True)
+            games = supabase_client.get_active_reviewed_games(user_id, limit=60, columnar=True)
             if not games:
                 print(f"⚠️ [DETAILED_ANALYTICS_ENDPOINT] No games found for user_id: {user_id}")
                 from profile_analytics.detailed_analytics import DetailedAnalyticsAggregator
@@ -7697,7 +7899,7 @@ async def get_graph_data(
 
         def fetch_games():
             return supabase_client.get_active_reviewed_games(
-                user_id, limit=int(limit), include_full_review=True
+                user_id, limit=int(limit), columnar=True
             )
 
         games = await asyncio.to_thread(fetch_games)
@@ -8150,7 +8352,8 @@ async def compare_cohorts(cohorts: List[Dict], games: List[Dict]):
 # ============================================================================
 
 class MinePositionsRequest(BaseModel):
-    analyzed_games: List[Dict]
+    analyzed_games: List[Dict] = []
+    user_id: Optional[str] = None  # Mine the user's saved positions when no games are sent
     focus_tags: Optional[List[str]] = None
     max_positions: int = 20
     phase_filter: Optional[str] = None
@@ -8165,16 +8368,30 @@ async def mine_positions_endpoint(request: MinePositionsRequest):
         raise HTTPException(status_code=503, detail="Position miner not initialized")
     
     try:
-        print(f"⛏️ Mining positions from {len(request.analyzed_games)} games")
-        
-        positions = position_miner.mine_positions(
-            analyzed_games=request.analyzed_games,
-            focus_tags=request.focus_tags,
-            max_positions=request.max_positions,
-            phase_filter=request.phase_filter,
-            side_filter=request.side_filter,
-            include_critical_choices=request.include_critical_choices
-        )
+        index = None
+        if not request.analyzed_games and request.user_id and supabase_client:
+            index = await asyncio.to_thread(supabase_client.position_index.get, request.user_id)
+        
+        if index is not None:
+            print(f"⛏️ Mining positions from {len(index)} saved positions")
+            positions = position_miner.mine_saved_positions(
+                index,
+                focus_tags=request.focus_tags,
+                max_positions=request.max_positions,
+                phase_filter=request.phase_filter,
+                side_filter=request.side_filter,
+                include_critical_choices=request.include_critical_choices
+            )
+        else:
+            print(f"⛏️ Mining positions from {len(request.analyzed_games)} games")
+            positions = position_miner.mine_positions(
+                analyzed_games=request.analyzed_games,
+                focus_tags=request.focus_tags,
+                max_positions=request.max_positions,
+                phase_filter=request.phase_filter,
+                side_filter=request.side_filter,
+                include_critical_choices=request.include_critical_choices
+            )
         
         print(f"✅ Mined {len(positions)} positions")
         
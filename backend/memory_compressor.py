@@ -57,6 +57,7 @@ async def compress_memory(
         user_text=cmd,
         model=model,
         temperature=0.0 if not str(model).startswith("gpt-5") else None,
+        cache=True,
     )
 
 
@@ -15,6 +15,10 @@ PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 STOCKFISH_PATH = os.path.join(PROJECT_ROOT, "Stockfish-sf_16", "src", "stockfish")
 DUMP_DIR = os.path.join(PROJECT_ROOT, "nnue_dumps")
 
+# Engine square order (a1..h8), used to index the per-square mask delta vectors
+SQUARES = [f + r for r in "12345678" for f in "abcdefgh"]
+PIECE_NAMES = {"k": "king", "q": "queen", "r": "rook", "b": "bishop", "n": "knight", "p": "pawn"}
+
 
 def ensure_dump_dir():
     """Ensure the dump directory exists."""
@@ -112,9 +116,108 @@ def get_nnue_dumps_batch(fens: List[str], timeout_per_fen: float = 30.0) -> List
     return results
 
 
+def parse_mask_all_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the engine's ``info string maskall ...`` line.
+
+    Returns:
+        Same shape as the dump's "mask_deltas": {
+            "base_total_cp": int, "base_classical_cp": int,
+            "total": [64 x int|None], "classical": [64 x int|None]
+        } where each entry is base - masked for that square (None = not masked).
+        None if the line is not a maskall result.
+    """
+    if "info string maskall" not in line or "total=" not in line:
+        return None
+    fields = dict(tok.split("=", 1) for tok in line.split() if "=" in tok)
+
+    def _deltas(raw: str) -> List[Optional[int]]:
+        return [None if v == "-" else int(v) for v in raw.split(",")]
+
+    try:
+        total = _deltas(fields["total"])
+        classical = _deltas(fields["classical"])
+        if len(total) != 64 or len(classical) != 64:
+            return None
+        return {
+            "base_total_cp": int(fields["base_cp"]),
+            "base_classical_cp": int(fields["base_classical_cp"]),
+            "total": total,
+            "classical": classical,
+        }
+    except (KeyError, ValueError):
+        return None
+
+
+def pieces_from_fen(fen: str) -> Dict[str, Dict[str, str]]:
+    """Build the dump's "pieces" map (piece_id → {"square"}) from a FEN."""
+    pieces = {}
+    rank = 7
+    file = 0
+    for ch in fen.split(" ")[0]:
+        if ch == "/":
+            rank -= 1
+            file = 0
+        elif ch.isdigit():
+            file += int(ch)
+        else:
+            square = "abcdefgh"[file] + str(rank + 1)
+            color = "white" if ch.isupper() else "black"
+            pieces[f"{color}_{PIECE_NAMES.get(ch.lower(), 'unknown')}_{square}"] = {"square": square}
+            file += 1
+    return pieces
+
+
+def get_mask_attribution(fen: str, timeout: float = 30.0) -> Optional[Dict[str, Any]]:
+    """
+    Per-piece attribution in a single engine call via the batched ``maskall``
+    command (no dump files, no per-square processes).
+
+    Returns:
+        Dump-shaped dict {"fen", "pieces", "mask_deltas"} that
+        compute_piece_contributions() accepts, or None if failed.
+    """
+    commands = [
+        "uci",
+        f"position fen {fen}",
+        "maskall",
+        "quit",
+    ]
+
+    try:
+        proc = subprocess.Popen(
+            [STOCKFISH_PATH],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        out, _ = proc.communicate("\n".join(commands) + "\n", timeout=timeout)
+
+        for line in out.splitlines():
+            mask_deltas = parse_mask_all_line(line)
+            if mask_deltas is not None:
+                return {"fen": fen, "pieces": pieces_from_fen(fen), "mask_deltas": mask_deltas}
+
+        print(f"[NNUE Bridge] No maskall output for FEN: {fen[:50]}...")
+        return None
+
+    except subprocess.TimeoutExpired:
+        print(f"[NNUE Bridge] Stockfish timeout for FEN: {fen[:50]}...")
+        proc.kill()
+        return None
+    except FileNotFoundError:
+        print(f"[NNUE Bridge] Stockfish not found at: {STOCKFISH_PATH}")
+        return None
+    except Exception as e:
+        print(f"[NNUE Bridge] Error: {e}")
+        return None
+
+
 def compute_piece_contributions(dump: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
     """
-    From dump's masked_total/masked_classical, compute per-piece contributions.
+    From dump's mask_deltas (or legacy masked_total/masked_classical), compute
+    per-piece contributions.
     
     contribution = base_eval - masked_eval
     (Positive contribution means the piece helps the side to move)
@@ -129,6 +232,10 @@ def compute_piece_contributions(dump: Dict[str, Any]) -> Dict[str, Dict[str, flo
             "total_contribution_cp": float
         }
     """
+    mask_deltas = dump.get("mask_deltas")
+    if mask_deltas:
+        return _contributions_from_deltas(dump, mask_deltas)
+
     base_total = float(dump.get("final_eval_cp", 0))
     base_nnue = float(dump.get("nnue_eval_cp", 0))
     base_classical = float(dump.get("classical_eval_cp", 0))
@@ -157,6 +264,29 @@ def compute_piece_contributions(dump: Dict[str, Any]) -> Dict[str, Dict[str, flo
     return contributions
 
 
+def _contributions_from_deltas(dump: Dict[str, Any], mask_deltas: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Per-piece contributions read straight off the per-square delta vectors."""
+    total = mask_deltas.get("total") or []
+    classical = mask_deltas.get("classical") or []
+    pieces = dump.get("pieces") or pieces_from_fen(dump.get("fen", ""))
+
+    contributions = {}
+    for piece_id, meta in pieces.items():
+        square = meta.get("square") or parse_piece_id(piece_id)["square"]
+        idx = SQUARES.index(square) if square in SQUARES else -1
+        # Kings and masks that leave the side to move in check carry no delta
+        total_contribution = float(total[idx] or 0) if 0 <= idx < len(total) else 0.0
+        classical_contribution = float(classical[idx] or 0) if 0 <= idx < len(classical) else 0.0
+
+        contributions[piece_id] = {
+            "nnue_contribution_cp": total_contribution - classical_contribution,
+            "classical_contribution_cp": classical_contribution,
+            "total_contribution_cp": total_contribution,
+        }
+
+    return contributions
+
+
 def get_classical_terms(dump: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
     """
     Extract classical evaluation terms from dump.
@@ -9,11 +9,12 @@ import json
 import os
 import glob
 import time
-import hashlib
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from position_key import position_key
+
 # Paths
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 STOCKFISH_PATH = os.path.join(PROJECT_ROOT, "Stockfish-sf_16", "src", "stockfish")
@@ -53,18 +54,9 @@ class NNUEProcessPool:
         """Ensure the dump directory exists."""
         os.makedirs(DUMP_DIR, exist_ok=True)
     
-    def _normalize_fen(self, fen: str) -> str:
-        """Normalize FEN for cache key."""
-        try:
-            import chess
-            return chess.Board(fen).fen()
-        except Exception:
-            return (fen or "").strip()
-    
-    def _cache_key(self, fen: str) -> str:
-        """Generate cache key from FEN."""
-        nfen = self._normalize_fen(fen)
-        return hashlib.sha256(nfen.encode("utf-8")).hexdigest()
+    def _cache_key(self, fen: str) -> int:
+        """Generate cache key from FEN (shared Zobrist position key)."""
+        return position_key(fen)
     
     async def _get_from_cache(self, fen: str) -> Optional[Dict[str, Any]]:
         """Get dump from cache if valid."""
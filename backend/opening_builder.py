@@ -2,10 +2,11 @@
 Opening lesson builder - selects variations and creates lesson plans.
 """
 
+import asyncio
 import chess
 import hashlib
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from opening_explorer import LichessExplorerClient
 from opening_resolver import resolve_opening
 
@@ -21,6 +22,11 @@ MAIN_LINE_DEPTH = 20
 ALT_LINE_DEPTH = 8
 OVERVIEW_DEPTH = 6
 
+# Explorer scheduling
+EXPLORER_CONCURRENCY = 4  # Max in-flight explorer queries per lesson build
+PREFETCH_WIDTH = 3        # Speculatively fetch children of the top-N popular replies
+ALT_CHECK_PLIES = 3       # Alternates are branched off the first N main-line positions
+
 WHITE_MINOR_START = [chess.B1, chess.G1, chess.C1, chess.F1]
 BLACK_MINOR_START = [chess.B8, chess.G8, chess.C8, chess.F8]
 
@@ -60,9 +66,62 @@ def _opening_phase_complete(board: chess.Board, orientation: str) -> bool:
 class VariationBuilder:
     """Builds opening variations from explorer data."""
     
-    def __init__(self, explorer: LichessExplorerClient):
+    def __init__(
+        self,
+        explorer: LichessExplorerClient,
+        max_concurrency: int = EXPLORER_CONCURRENCY,
+        prefetch_width: int = PREFETCH_WIDTH
+    ):
         self.explorer = explorer
         self.visited_fens = set()
+        self.prefetch_width = prefetch_width
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._queries: Dict[str, asyncio.Task] = {}  # {fen: query task}, shared by walks and prefetch
+    
+    async def _query_limited(self, fen: str) -> Dict:
+        async with self._semaphore:
+            return await self.explorer.query_position(fen)
+    
+    def _schedule_query(self, fen: str) -> asyncio.Task:
+        """
+        Start (or join) the explorer query for a position.
+        
+        Identical positions reached by several branches or by prefetch share a
+        single in-flight request.
+        """
+        task = self._queries.get(fen)
+        if task is None:
+            task = asyncio.ensure_future(self._query_limited(fen))
+            # Prefetches may never be awaited - consume their errors here
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._queries[fen] = task
+        return task
+    
+    async def _query(self, fen: str) -> Dict:
+        """Query the explorer through the shared, concurrency-limited scheduler."""
+        return await asyncio.shield(self._schedule_query(fen))
+    
+    def _prefetch_children(self, board: chess.Board, ranked: List[Tuple]) -> None:
+        """Speculatively start queries for the positions after the most popular replies."""
+        for move_data, _score, pop, _wr in ranked[:self.prefetch_width]:
+            if pop < THETA_POP_MIN:
+                break
+            try:
+                move = board.parse_san(move_data["san"])
+            except Exception:
+                continue
+            board.push(move)
+            child_fen = board.fen()
+            board.pop()
+            self._schedule_query(child_fen)
+    
+    async def cancel_pending(self) -> None:
+        """Cancel speculative queries that are still running once the lesson is built."""
+        pending = [task for task in self._queries.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
     
     def _rank_moves(self, moves: List[Dict], total_games: int, for_white: bool) -> List[Tuple[Dict, float]]:
         """
@@ -99,11 +158,20 @@ class VariationBuilder:
         start_moves: List[str],
         max_depth: int,
         min_popularity: float,
-        orientation: str
+        orientation: str,
+        on_step: Optional[Callable[[int, str, str], None]] = None
     ) -> Dict:
         """
         Walk a variation branch until popularity drops or depth limit.
         
+        Children of the popular replies at each position are prefetched, so
+        the next ply (and any branch forking here) usually hits a warm query.
+        
+        Args:
+            on_step: Optional callback(ply, fen, move_san) fired when the walk
+                chooses its move at a position, so callers can fan out
+                alternate branches without waiting for the walk to finish.
+        
         Returns:
             {
                 "moves_san": List[str],
@@ -123,7 +191,7 @@ class VariationBuilder:
         for ply in range(max_depth):
             # Query current position
             try:
-                explorer_data = await self.explorer.query_position(current_fen)
+                explorer_data = await self._query(current_fen)
             except Exception as e:
                 print(f"Explorer query failed: {e}")
                 break
@@ -141,6 +209,8 @@ class VariationBuilder:
             if not ranked:
                 break
             
+            self._prefetch_children(board, ranked)
+            
             # Check if this is a fork point (multiple popular moves)
             popular_moves = [r for r in ranked if r[2] >= THETA_POP_FORK]  # r[2] is popularity
             if len(popular_moves) >= 2:
@@ -169,6 +239,8 @@ class VariationBuilder:
                 move_san = best_move_data["san"]
                 move = board.parse_san(move_san)
                 board.push(move)
+                if on_step:
+                    on_step(ply, current_fen, move_san)
                 moves_san.append(move_san)
                 current_fen = board.fen()
                 fens.append(current_fen)
@@ -194,7 +266,7 @@ class VariationBuilder:
     ) -> List[Dict]:
         """Select 2-3 alternate moves at a position."""
         try:
-            explorer_data = await self.explorer.query_position(fen)
+            explorer_data = await self._query(fen)
         except:
             return []
         
@@ -250,53 +322,70 @@ async def build_opening_lesson(
     
     # Step 2: Build variation tree
     builder = VariationBuilder(explorer)
+    orientation = resolved["orientation"]
+    
+    async def expand_alternates(i: int, fen: str, main_move: str, prefix: List[str]) -> List[Dict]:
+        """Select alternates at a main-line position and walk them concurrently."""
+        alternates = await builder._select_alternates(fen, orientation, main_move)
+        
+        async def walk_alternate(alt: Dict) -> Optional[Dict]:
+            board_at_fork = chess.Board(fen)
+            try:
+                alt_move = board_at_fork.parse_san(alt["san"])
+                board_at_fork.push(alt_move)
+                alt_fen = board_at_fork.fen()
+                
+                alt_branch = await builder._walk_branch(
+                    start_fen=alt_fen,
+                    start_moves=prefix + [alt["san"]],
+                    max_depth=ALT_LINE_DEPTH,
+                    min_popularity=THETA_POP_MIN,
+                    orientation=orientation
+                )
+                
+                return {
+                    "id": f"alt_{i}_{alt['san']}",
+                    "name": alt.get("name", f"Alternate: {alt['san']}"),
+                    "fork_move": alt["san"],
+                    "popularity": alt["popularity"],
+                    "branch": alt_branch
+                }
+            except Exception:
+                return None
+        
+        walked = await asyncio.gather(*(walk_alternate(alt) for alt in alternates[:2]))  # Max 2 alternates per position
+        return [branch for branch in walked if branch]
     
-    # Walk main line
-    main_branch = await builder._walk_branch(
-        start_fen=resolved["seed_fen"],
-        start_moves=resolved["seed_moves_san"],
-        max_depth=MAIN_LINE_DEPTH,
-        min_popularity=THETA_POP_MIN,
-        orientation=resolved["orientation"]
-    )
+    # Alternates fork off the first few main-line positions. Start each fork as
+    # soon as the main walk passes it instead of after the main line completes.
+    alternate_tasks: List[asyncio.Task] = []
+    main_moves_so_far: List[str] = []
     
-    # Select alternates at key decision points
-    alternate_branches = []
+    def on_main_step(ply: int, fen: str, move_san: str) -> None:
+        if ply < ALT_CHECK_PLIES:
+            prefix = resolved["seed_moves_san"] + main_moves_so_far
+            alternate_tasks.append(asyncio.ensure_future(expand_alternates(ply, fen, move_san, prefix)))
+        main_moves_so_far.append(move_san)
     
-    # Look for alternates at the first few moves
-    if len(main_branch["fens"]) > 0:
-        check_fens = main_branch["fens"][:min(3, len(main_branch["fens"]))]
+    try:
+        # Walk main line
+        main_branch = await builder._walk_branch(
+            start_fen=resolved["seed_fen"],
+            start_moves=resolved["seed_moves_san"],
+            max_depth=MAIN_LINE_DEPTH,
+            min_popularity=THETA_POP_MIN,
+            orientation=orientation,
+            on_step=on_main_step
+        )
         
-        for i, fen in enumerate(check_fens):
-            main_move = main_branch["moves_san"][i] if i < len(main_branch["moves_san"]) else None
-            if main_move:
-                alternates = await builder._select_alternates(fen, resolved["orientation"], main_move)
-                
-                for alt in alternates[:2]:  # Max 2 alternates per position
-                    # Walk this alternate
-                    board_at_fork = chess.Board(fen)
-                    try:
-                        alt_move = board_at_fork.parse_san(alt["san"])
-                        board_at_fork.push(alt_move)
-                        alt_fen = board_at_fork.fen()
-                        
-                        alt_branch = await builder._walk_branch(
-                            start_fen=alt_fen,
-                            start_moves=main_branch["moves_san"][:i] + [alt["san"]],
-                            max_depth=ALT_LINE_DEPTH,
-                            min_popularity=THETA_POP_MIN,
-                            orientation=resolved["orientation"]
-                        )
-                        
-                        alternate_branches.append({
-                            "id": f"alt_{i}_{alt['san']}",
-                            "name": alt.get("name", f"Alternate: {alt['san']}"),
-                            "fork_move": alt["san"],
-                            "popularity": alt["popularity"],
-                            "branch": alt_branch
-                        })
-                    except:
-                        pass
+        # Select alternates at key decision points (kept in main-line order)
+        alternate_branches = []
+        for branches in await asyncio.gather(*alternate_tasks):
+            alternate_branches.extend(branches)
+    finally:
+        for task in alternate_tasks:
+            task.cancel()
+        await builder.cancel_pending()
     
     # Step 3: Compose lesson plan
     lesson_id = hashlib.md5(f"{opening_query}_{time.time()}".encode()).hexdigest()[:12]
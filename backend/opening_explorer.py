@@ -9,6 +9,8 @@ import urllib.parse
 from typing import Dict, List, Optional
 import chess
 
+from position_key import position_key_hex
+
 
 class LichessExplorerClient:
     """Client for querying the Lichess Opening Explorer API."""
@@ -35,7 +37,7 @@ class LichessExplorerClient:
         """Create a cache key from query parameters."""
         speeds_str = ",".join(sorted(speeds))
         ratings_str = f"{ratings[0]}-{ratings[1]}"
-        return f"{fen}|{db}|{speeds_str}|{ratings_str}"
+        return f"{position_key_hex(fen)}|{db}|{speeds_str}|{ratings_str}"
     
     def _get_cached(self, cache_key: str) -> Optional[Dict]:
         """Get data from cache if valid."""
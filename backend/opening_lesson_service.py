@@ -3,6 +3,7 @@ Opening lesson orchestration service.
 Combines Lichess explorer data with user history to build personalized lessons.
 """
 
+import asyncio
 import hashlib
 import time
 from typing import Any, Dict, List, Optional, Tuple
@@ -12,6 +13,10 @@ import chess.pgn
 
 from fen_analyzer import analyze_fen
 from opening_builder import build_opening_lesson
+from tag_detector import aggregate_all_tags
+
+# Max lesson nodes tagged at once
+TAG_EXTRACTION_CONCURRENCY = 6
 
 
 def _color_from_turn(fen: str) -> str:
@@ -100,31 +105,70 @@ def _derive_user_alternates(history: List[str], opening_summary: Dict[str, Any])
     return formatted
 
 
-async def _extract_tags_for_nodes(nodes: List[Dict[str, Any]], engine_queue, max_nodes: int = 6) -> None:
-    if not engine_queue:
+def _detect_lesson_node_tags(fen: str) -> List[Dict[str, Any]]:
+    """
+    Detect positional tags for a lesson node.
+
+    Lesson nodes only surface tag names and squares, which never need an engine
+    search. Module-level so it can run in the engine pool's process workers.
+    """
+    return asyncio.run(aggregate_all_tags(chess.Board(fen), None))
+
+
+def _apply_node_tags(node: Dict[str, Any], tags: List[Dict[str, Any]]) -> None:
+    white_tags = sorted({t.get("tag_name") for t in tags if t.get("side") == "white" and t.get("tag_name")})[:6]
+    black_tags = sorted({t.get("tag_name") for t in tags if t.get("side") == "black" and t.get("tag_name")})[:6]
+    highlight_squares = []
+    for tag in tags:
+        highlight_squares.extend(tag.get("squares", []))
+    node["tags"] = {
+        "white": white_tags,
+        "black": black_tags,
+    }
+    if highlight_squares:
+        node["tag_highlights"] = sorted(set(highlight_squares))
+
+
+async def _extract_tags_for_nodes(
+    nodes: List[Dict[str, Any]],
+    engine_queue,
+    max_nodes: int = 6,
+    engine_pool=None,
+) -> None:
+    """
+    Attach tags to the first `max_nodes` lesson nodes, tagging them concurrently.
+
+    With an initialized engine pool the tag detection fans out over its process
+    workers; otherwise each node goes through `analyze_fen` on the engine queue.
+    """
+    if not engine_queue and not engine_pool:
         return
-    sampled = nodes[:max_nodes]
-    for node in sampled:
-        fen = node.get("fen")
-        if not fen:
-            continue
+    process_pool = getattr(engine_pool, "process_pool", None)
+    if process_pool is None and not engine_queue:
+        return
+
+    sampled = [node for node in nodes[:max_nodes] if node.get("fen")]
+    if not sampled:
+        return
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(TAG_EXTRACTION_CONCURRENCY)
+
+    async def _tag_node(node: Dict[str, Any]) -> None:
+        fen = node["fen"]
         try:
-            analysis = await analyze_fen(fen, engine_queue, depth=12)
-            tags = analysis.get("tags", [])
-            white_tags = sorted({t.get("tag_name") for t in tags if t.get("side") == "white" and t.get("tag_name")})[:6]
-            black_tags = sorted({t.get("tag_name") for t in tags if t.get("side") == "black" and t.get("tag_name")})[:6]
-            highlight_squares = []
-            for tag in tags:
-                highlight_squares.extend(tag.get("squares", []))
-            node["tags"] = {
-                "white": white_tags,
-                "black": black_tags,
-            }
-            if highlight_squares:
-                node["tag_highlights"] = sorted(set(highlight_squares))
+            async with semaphore:
+                if process_pool is not None:
+                    tags = await loop.run_in_executor(process_pool, _detect_lesson_node_tags, fen)
+                else:
+                    analysis = await analyze_fen(fen, engine_queue, depth=12)
+                    tags = analysis.get("tags", [])
+            _apply_node_tags(node, tags)
         except Exception as exc:
             print(f"⚠️ Tag extraction failed for lesson node: {exc}")
 
+    await asyncio.gather(*(_tag_node(node) for node in sampled))
+
 
 def _append_ai_responses(lesson_nodes: List[Dict[str, Any]]) -> None:
     for idx, node in enumerate(lesson_nodes):
@@ -552,6 +596,7 @@ async def create_opening_lesson_payload(
     profile_indexer,
     supabase_client,
     engine_queue=None,
+    engine_pool=None,
 ) -> Dict[str, Any]:
     """
     Generate a personalized opening lesson payload.
@@ -561,6 +606,8 @@ async def create_opening_lesson_payload(
         explorer_client: Lichess explorer client
         profile_indexer: ProfileIndexingManager instance
         supabase_client: Supabase client (optional)
+        engine_queue: Stockfish queue used for lesson-node tagging (optional)
+        engine_pool: EnginePool whose workers tag lesson nodes in parallel (optional)
 
     Returns:
         Dict with lesson plan, personalization, metadata, and quiz prompts
@@ -746,7 +793,7 @@ async def create_opening_lesson_payload(
         opening_summary,
         orientation_color,
     )
-    await _extract_tags_for_nodes(lesson_tree, engine_queue)
+    await _extract_tags_for_nodes(lesson_tree, engine_queue, engine_pool=engine_pool)
 
     response = {
         "lesson": lesson_blueprint,
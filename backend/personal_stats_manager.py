@@ -11,6 +11,14 @@ import json
 import math
 from datetime import datetime
 
+from stats_accumulator import (
+    STATS_KEY as ACCUMULATOR_KEY,
+    TIME_SPENT_RANGES,
+    StatsAccumulator,
+    classify_time_control,
+    piece_type_from_san,
+)
+
 
 def format_tag_display_name(tag_name: str) -> str:
     """
@@ -168,6 +176,10 @@ MIN_SAMPLE_SIZE = 3  # Minimum games for a habit to appear (lowered for faster f
 MIN_DEVIATION_PERCENT = 5  # Minimum % deviation from baseline to be significant
 MAX_HABITS_DISPLAY = 12  # Maximum habits to show in dashboard
 
+# Game windows for incremental stats (personal stats) and habits
+STATS_WINDOW_GAMES = 30
+HABIT_WINDOW_GAMES = 20
+
 
 class PersonalStatsManager:
     """Manages persistent personal statistics with incremental updates."""
@@ -182,16 +194,24 @@ class PersonalStatsManager:
         Get current stats, trigger lazy migration if needed.
         If account_filter provided, filter to that account only.
         """
+        return self._public_stats(self._get_full_stats(user_id))
+    
+    def _public_stats(self, stats: Dict) -> Dict:
+        """Stats without the internal accumulator state."""
+        return {k: v for k, v in stats.items() if k != ACCUMULATOR_KEY}
+    
+    def _get_full_stats(self, user_id: str) -> Dict:
+        """Stats JSONB including the accumulator state (lazy backfill / recalculation)."""
         # Try to load existing stats
         stats_row = self.supabase.get_personal_stats(user_id)
         
         if stats_row is None:
             # First access - backfill from existing games
             print(f"   📊 No stats found for user {user_id}, backfilling from games...")
-            games = self.supabase.get_analyzed_games(user_id, limit=30)
+            games = self.supabase.get_analyzed_games(user_id, limit=STATS_WINDOW_GAMES)
             if games:
                 stats = self._backfill_stats_from_games(user_id, games)
-                game_ids = [g.get('id') for g in games if g.get('id')]
+                game_ids = list(StatsAccumulator(stats.get(ACCUMULATOR_KEY)).game_ids())
                 self.supabase.update_personal_stats(user_id, stats, game_ids)
                 return stats
             else:
@@ -206,60 +226,43 @@ class PersonalStatsManager:
         # Check if needs recalculation
         if stats_row.get('needs_recalc', False):
             print(f"   ⚠️ Stats marked for recalculation, recalculating...")
-            return self.full_recalculate(user_id)
+            return self._recalculate(user_id)
         
         return stats_data
     
-    def update_stats_from_game(self, user_id: str, game_id: str, game_review: Dict) -> bool:
+    def update_stats_from_game(self, user_id: str, game_id: str, game_review: Dict, game_date: Optional[str] = None) -> bool:
         """
         Incrementally update stats from a single game review.
-        Merges new data into existing stats.
+        
+        When the stored accumulator covers exactly the games in the stats window,
+        only the entries this game touches are rewritten from its sufficient
+        statistics (O(plies of the game)). Otherwise the legacy running-average
+        updates are applied and the game is still added to the accumulator.
         """
         try:
             # Get current stats
-            current_stats = self.get_stats(user_id)
-            
-            # Extract metrics from game_review
-            ply_records = game_review.get("ply_records", [])
-            player_color = game_review.get("metadata", {}).get("player_color", "white")
-            result = game_review.get("metadata", {}).get("result", "unknown")
-            time_control = game_review.get("metadata", {}).get("time_control", "")
-            opening_name = game_review.get("opening", {}).get("name_final", "")
-            
-            # Update tag accuracy
-            self._update_tag_accuracy(current_stats, ply_records, player_color, game_id)
-            
-            # Update tag preferences
-            self._update_tag_preferences(current_stats, ply_records, player_color, game_id)
+            current_stats = self._get_full_stats(user_id)
             
-            # Update tag transitions (gained/lost)
-            self._update_tag_transitions(current_stats, ply_records, player_color, game_id)
-            
-            # Update accuracy by piece
-            self._update_piece_accuracy(current_stats, ply_records, player_color, game_id, game_review)
-            
-            # Update accuracy by time control
-            self._update_time_control_accuracy(current_stats, ply_records, player_color, time_control, game_id)
-            
-            # Update accuracy by time spent
-            self._update_time_spent_accuracy(current_stats, ply_records, player_color, game_id)
+            # Get current game_ids
+            stats_row = self.supabase.get_personal_stats(user_id)
+            current_game_ids = stats_row.get('game_ids', []) if stats_row else []
             
-            # Update opening stats
-            if opening_name:
-                self._update_opening_stats(current_stats, opening_name, result, ply_records, player_color, game_id, game_review)
+            accumulator = StatsAccumulator(current_stats.get(ACCUMULATOR_KEY))
+            if game_date is None:
+                game_date = game_review.get("metadata", {}).get("date") or datetime.now().date().isoformat()
             
-            # Update phase stats
-            self._update_phase_stats(current_stats, ply_records, player_color, game_id, result, game_review)
+            if self._accumulator_covers(accumulator, current_game_ids):
+                self._accumulate_game(current_stats, accumulator, game_id, game_review, game_date)
+            else:
+                self._apply_legacy_updates(current_stats, game_id, game_review)
+                accumulator.add_game(game_id, game_review, game_date)
+            current_stats[ACCUMULATOR_KEY] = accumulator.to_dict()
             
             # Update metadata
-            current_stats["total_games_analyzed"] = current_stats.get("total_games_analyzed", 0) + 1
-            current_stats["last_game_analyzed_at"] = datetime.now().isoformat()
-            
-            # Get current game_ids and add new one
-            stats_row = self.supabase.get_personal_stats(user_id)
-            current_game_ids = stats_row.get('game_ids', []) if stats_row else []
             if game_id not in current_game_ids:
                 current_game_ids.append(game_id)
+                current_stats["total_games_analyzed"] = current_stats.get("total_games_analyzed", 0) + 1
+            current_stats["last_game_analyzed_at"] = datetime.now().isoformat()
             
             # Save updated stats
             return self.supabase.update_personal_stats(user_id, current_stats, current_game_ids)
@@ -268,25 +271,105 @@ class PersonalStatsManager:
             print(f"   ❌ Error updating stats from game: {e}")
             return False
     
+    def _apply_legacy_updates(self, current_stats: Dict, game_id: str, game_review: Dict):
+        """Running-average updates used when the accumulator does not cover the stats window."""
+        ply_records = game_review.get("ply_records", [])
+        player_color = game_review.get("metadata", {}).get("player_color", "white")
+        result = game_review.get("metadata", {}).get("result", "unknown")
+        time_control = game_review.get("metadata", {}).get("time_control", "")
+        opening_name = game_review.get("opening", {}).get("name_final", "")
+        
+        # Update tag accuracy
+        self._update_tag_accuracy(current_stats, ply_records, player_color, game_id)
+        
+        # Update tag preferences
+        self._update_tag_preferences(current_stats, ply_records, player_color, game_id)
+        
+        # Update tag transitions (gained/lost)
+        self._update_tag_transitions(current_stats, ply_records, player_color, game_id)
+        
+        # Update accuracy by piece
+        self._update_piece_accuracy(current_stats, ply_records, player_color, game_id, game_review)
+        
+        # Update accuracy by time control
+        self._update_time_control_accuracy(current_stats, ply_records, player_color, time_control, game_id)
+        
+        # Update accuracy by time spent
+        self._update_time_spent_accuracy(current_stats, ply_records, player_color, game_id)
+        
+        # Update opening stats
+        if opening_name:
+            self._update_opening_stats(current_stats, opening_name, result, ply_records, player_color, game_id, game_review)
+        
+        # Update phase stats
+        self._update_phase_stats(current_stats, ply_records, player_color, game_id, result, game_review)
+    
+    def _accumulator_covers(self, accumulator: StatsAccumulator, game_ids: List[str]) -> bool:
+        """True when the accumulator holds exactly the games the stats were built from."""
+        return set(accumulator.game_ids()) == set(game_ids)
+    
+    def _accumulate_game(self, stats: Dict, accumulator: StatsAccumulator, game_id: str, game_review: Dict, game_date: Optional[str]):
+        """Add (or replace) one game in the accumulator and rewrite the stats entries it touches."""
+        previous = accumulator.remove_game(game_id)
+        if previous is not None:
+            accumulator.apply_game(stats, previous, removed=True)
+        contribution = accumulator.add_game(game_id, game_review, game_date)
+        accumulator.apply_game(stats, contribution)
+        
+        # Per-game piece breakdown (aggregate entries are kept by apply_game)
+        pieces = contribution["sums"].get("pieces", {})
+        if pieces:
+            per_game = stats.setdefault("piece_accuracy_detailed", {"per_game": [], "aggregate": {}}).setdefault("per_game", [])
+            per_game.append({
+                "game_id": game_id,
+                "pieces": {
+                    name: {"accuracy": round(values[1] / values[0], 1), "count": values[0]}
+                    for name, values in pieces.items()
+                }
+            })
+            if len(per_game) > 100:
+                del per_game[:-100]
+    
     def remove_game_from_stats(self, user_id: str, game_id: str) -> bool:
         """
-        Remove a game's contributions and recalculate.
-        This is called when a game is archived.
+        Remove a game's contributions.
+        This is called when a game is archived or compressed out of the window.
+        
+        Subtracts the game's stored sufficient statistics when the accumulator
+        covers the stats window; otherwise marks stats for recalculation.
         """
+        return self.remove_games_from_stats(user_id, [game_id])
+    
+    def remove_games_from_stats(self, user_id: str, game_ids: List[str]) -> bool:
+        """Remove several games' contributions with one stats read and one write."""
         try:
             # Get current stats
             stats_row = self.supabase.get_personal_stats(user_id)
             if not stats_row:
                 return True  # No stats to update
             
-            current_stats = stats_row.get('stats', {})
+            current_stats = stats_row.get('stats', {}) or {}
             current_game_ids = stats_row.get('game_ids', [])
+            accumulator = StatsAccumulator(current_stats.get(ACCUMULATOR_KEY))
+            covered = (
+                not stats_row.get('needs_recalc', False)
+                and all(game_id in accumulator for game_id in game_ids)
+                and self._accumulator_covers(accumulator, current_game_ids)
+            )
             
-            # Remove game_id from list
-            if game_id in current_game_ids:
-                current_game_ids.remove(game_id)
+            # Remove game_ids from list
+            removed = set(game_ids)
+            current_game_ids = [gid for gid in current_game_ids if gid not in removed]
             
-            # Mark for recalculation (safer than trying to subtract)
+            if covered:
+                for game_id in game_ids:
+                    contribution = accumulator.remove_game(game_id)
+                    accumulator.apply_game(current_stats, contribution, removed=True)
+                current_stats[ACCUMULATOR_KEY] = accumulator.to_dict()
+                current_stats["total_games_analyzed"] = len(current_game_ids)
+                return self.supabase.update_personal_stats(user_id, current_stats, current_game_ids)
+            
+            # Mark for recalculation (accumulator doesn't cover this window)
             # We'll recalc on next access
             return self.supabase.mark_stats_for_recalc(user_id, current_game_ids)
         
@@ -299,41 +382,22 @@ class PersonalStatsManager:
         Full recalculation from all active games.
         Uses PersonalReviewAggregator logic.
         """
+        return self._public_stats(self._recalculate(user_id))
+    
+    def _recalculate(self, user_id: str) -> Dict:
+        """Full recalculation; returns stats including the rebuilt accumulator."""
         print(f"   🔄 Full recalculation for user {user_id}...")
         
         # Get all active reviewed games
-        games = self.supabase.get_active_reviewed_games(user_id, limit=30)
+        games = self.supabase.get_active_reviewed_games(user_id, limit=STATS_WINDOW_GAMES)
         
         if not games:
             return self._create_empty_stats()
         
-        # Convert games to format expected by aggregator
-        # Include pgn from game row as it's stored separately from game_review
-        analyzed_games = []
-        for game in games:
-            game_review = game.get('game_review', {})
-            if game_review:
-                # Merge pgn from game row into game_review for aggregator
-                game_review_with_pgn = {**game_review}
-                if game.get('pgn'):
-                    game_review_with_pgn['pgn'] = game.get('pgn')
-                analyzed_games.append(game_review_with_pgn)
-        
-        if not analyzed_games:
-            return self._create_empty_stats()
-        
-        # Use aggregator to calculate stats
-        from personal_review_aggregator import PersonalReviewAggregator
-        aggregator = PersonalReviewAggregator()
-        aggregated = aggregator.aggregate(analyzed_games)
-        
-        # Convert to stats format
-        stats = self._convert_aggregated_to_stats(aggregated)
-        stats["total_games_analyzed"] = len(games)
-        stats["last_game_analyzed_at"] = datetime.now().isoformat()
+        stats = self._backfill_stats_from_games(user_id, games)
         
         # Save with game IDs
-        game_ids = [g.get('id') for g in games if g.get('id')]
+        game_ids = list(StatsAccumulator(stats.get(ACCUMULATOR_KEY)).game_ids())
         self.supabase.update_personal_stats(user_id, stats, game_ids)
         
         return stats
@@ -371,8 +435,9 @@ class PersonalStatsManager:
         return {"valid": True, "message": "Stats validated successfully"}
     
     def _backfill_stats_from_games(self, user_id: str, games: List[Dict]) -> Dict:
-        """Backfill stats from existing games."""
+        """Backfill stats from existing games and seed the accumulator from the same reviews."""
         analyzed_games = []
+        accumulator = StatsAccumulator()
         for game in games:
             game_review = game.get('game_review', {})
             if game_review:
@@ -381,6 +446,8 @@ class PersonalStatsManager:
                 if game.get('pgn'):
                     game_review_with_pgn['pgn'] = game.get('pgn')
                 analyzed_games.append(game_review_with_pgn)
+                if game.get('id'):
+                    accumulator.add_game(game['id'], game_review, game.get('game_date') or game.get('created_at'))
         
         if not analyzed_games:
             return self._create_empty_stats()
@@ -390,7 +457,10 @@ class PersonalStatsManager:
         aggregated = aggregator.aggregate(analyzed_games)
         
         stats = self._convert_aggregated_to_stats(aggregated)
-        stats["total_games_analyzed"] = len(games)
+        # Ply-level sections come from the accumulator so later add/remove deltas stay exact
+        accumulator.render_stats(stats)
+        stats[ACCUMULATOR_KEY] = accumulator.to_dict()
+        stats["total_games_analyzed"] = len(accumulator)
         stats["last_game_analyzed_at"] = datetime.now().isoformat()
         
         return stats
@@ -827,12 +897,12 @@ class PersonalStatsManager:
         Compute habits with per-game history, significance, and trends.
         Returns a dictionary of habits ready for visualization.
         """
-        # Get all games with full review data (reduced limit for speed)
-        games = self.supabase.get_active_reviewed_games(user_id, limit=20)
+        # Accumulator for the active game window (kept in sync on ingest; read-only here)
+        accumulator, window_ids, games = self._habit_window(user_id)
         
         # Debug logging
-        print(f"   🔍 [HABITS] Found {len(games)} games from get_active_reviewed_games")
-        if not games:
+        print(f"   🔍 [HABITS] Found {len(window_ids)} games in the active window")
+        if not window_ids:
             print(f"   ⚠️ [HABITS] No games found - checking database...")
             # Try to get any games to see what's in the database
             try:
@@ -856,44 +926,19 @@ class PersonalStatsManager:
             
             return {"habits": [], "baseline_accuracy": 0, "total_games": 0}
         
-        # Check if games have required structure (game_review with ply_records that have tags)
-        games_with_review = 0
-        games_with_ply_records = 0
-        games_with_tags = 0
-        
-        # Store original games list for reference
-        original_games = games
-        
-        # Filter games to only include those with tags
-        games_with_tags_list = []
+        # Per-habit history, per-game phase accuracies and baseline straight from the
+        # per-game sufficient statistics (only games with tags contribute)
+        habit_histories, game_phase_accuracies, baseline_accuracy, tagged_ids = accumulator.habit_inputs(window_ids)
+        games_with_review = sum(1 for game_id in window_ids if game_id in accumulator)
+        games_with_ply_records = sum(
+            1 for game_id in window_ids
+            if game_id in accumulator and "moves" in accumulator.games[game_id]["sums"]
+        )
+        games_with_tags = len(tagged_ids)
         
-        for game in original_games:
-            game_review = game.get("game_review")
-            if game_review:
-                games_with_review += 1
-                ply_records = game_review.get("ply_records", [])
-                if ply_records:
-                    games_with_ply_records += 1
-                    # Check if this game has any tags in its ply_records
-                    has_tags = False
-                    tag_count = 0
-                    for record in ply_records:
-                        tags = record.get("analyse", {}).get("tags", [])
-                        if tags:
-                            has_tags = True
-                            tag_count += len(tags)
-                    
-                    if has_tags:
-                        games_with_tags += 1
-                        games_with_tags_list.append(game)
-                        print(f"   🔍 [HABITS] Game {game.get('id', 'unknown')[:8]}... has {tag_count} tags across {len(ply_records)} moves")
-        
-        print(f"   🔍 [HABITS] {games_with_review}/{len(original_games)} games have game_review")
-        print(f"   🔍 [HABITS] {games_with_ply_records}/{len(original_games)} games have ply_records")
-        print(f"   🔍 [HABITS] {games_with_tags}/{len(original_games)} games have TAGS in ply_records (will use these for habits)")
-        
-        # Only use games with tags for habit computation
-        games = games_with_tags_list
+        print(f"   🔍 [HABITS] {games_with_review}/{len(window_ids)} games have game_review")
+        print(f"   🔍 [HABITS] {games_with_ply_records}/{len(window_ids)} games have ply_records")
+        print(f"   🔍 [HABITS] {games_with_tags}/{len(window_ids)} games have TAGS in ply_records (will use these for habits)")
         
         if games_with_tags == 0:
             print(f"   ⚠️ [HABITS] No games have tags in ply_records - habits cannot be computed")
@@ -901,115 +946,6 @@ class PersonalStatsManager:
             # Return total games with ply_records checked (even though none have tags)
             return {"habits": [], "baseline_accuracy": 0, "total_games": games_with_ply_records}
         
-        # Calculate overall baseline accuracy
-        all_accuracies = []
-        for game in games:
-            game_review = game.get("game_review", {})
-            stats = game_review.get("stats", {})
-            if stats.get("overall_accuracy"):
-                all_accuracies.append(stats.get("overall_accuracy", 0))
-        
-        baseline_accuracy = statistics.mean(all_accuracies) if all_accuracies else 75.0
-        
-        # Calculate phase baseline accuracies from game stats
-        phase_baselines = {"opening": 75.0, "middlegame": 75.0, "endgame": 75.0}
-        phase_accuracies_all = {"opening": [], "middlegame": [], "endgame": []}
-        for game in games:
-            game_review = game.get("game_review", {})
-            stats = game_review.get("stats", {})
-            by_phase = stats.get("by_phase", {})
-            for phase in ["opening", "middlegame", "endgame"]:
-                phase_stat = by_phase.get(phase, {})
-                if phase_stat.get("accuracy") is not None:
-                    phase_accuracies_all[phase].append(phase_stat["accuracy"])
-        
-        for phase in ["opening", "middlegame", "endgame"]:
-            if phase_accuracies_all[phase]:
-                phase_baselines[phase] = statistics.mean(phase_accuracies_all[phase])
-        
-        # Build per-habit history from each game
-        # OPTIMIZATION: Process each game only once (combine tag and phase processing)
-        habit_histories = defaultdict(list)  # habit_name -> [{game_date, accuracy, count, game_id}]
-        game_phase_accuracies = {}  # game_id -> {opening: acc, middlegame: acc, endgame: acc}
-        
-        for game in games:
-            game_id = game.get("id", "")
-            game_date = game.get("game_date") or game.get("created_at", "")
-            if isinstance(game_date, str) and len(game_date) > 10:
-                game_date = game_date[:10]  # Just YYYY-MM-DD
-            
-            game_review = game.get("game_review", {})
-            ply_records = game_review.get("ply_records", [])
-            player_color = game_review.get("metadata", {}).get("player_color", "white")
-            
-            # Extract phase accuracies from game stats for this game
-            stats = game_review.get("stats", {})
-            by_phase = stats.get("by_phase", {})
-            game_phase_accuracies[game_id] = {
-                "opening": by_phase.get("opening", {}).get("accuracy"),
-                "middlegame": by_phase.get("middlegame", {}).get("accuracy"),
-                "endgame": by_phase.get("endgame", {}).get("accuracy")
-            }
-            
-            # OPTIMIZATION: Sample ply_records if too many (limit to 100 moves per game for speed)
-            if len(ply_records) > 100:
-                # Sample evenly across the game
-                step = len(ply_records) // 100
-                ply_records = ply_records[::step][:100]
-            
-            # Collect accuracy per tag AND phase in single pass
-            tag_game_data = defaultdict(lambda: {"accuracies": [], "count": 0})
-            phase_data = defaultdict(lambda: {"accuracies": [], "count": 0})
-            
-            for record in ply_records:
-                if record.get("side_moved") != player_color:
-                    continue
-                
-                accuracy = record.get("accuracy_pct", 0)
-                
-                # Process tags
-                tags = record.get("analyse", {}).get("tags", [])
-                for tag in tags:
-                    # Handle different tag formats: string, dict with tag_name, name, or tag key
-                    if isinstance(tag, str):
-                        tag_name = tag
-                    elif isinstance(tag, dict):
-                        tag_name = tag.get("tag_name", tag.get("name", tag.get("tag", "")))
-                    else:
-                        continue
-                    if tag_name:
-                        # Normalize tag name
-                        tag_name = tag_name.lower().replace(" ", "_").replace("-", "_")
-                        tag_game_data[tag_name]["accuracies"].append(accuracy)
-                        tag_game_data[tag_name]["count"] += 1
-                
-                # Process phase
-                phase = record.get("phase", "middlegame")
-                phase_data[f"phase_{phase}"]["accuracies"].append(accuracy)
-                phase_data[f"phase_{phase}"]["count"] += 1
-            
-            # Add tag game data to habit histories
-            for tag_name, data in tag_game_data.items():
-                if data["count"] >= 1:  # At least 1 occurrence in this game
-                    avg_acc = statistics.mean(data["accuracies"])
-                    habit_histories[tag_name].append({
-                        "game_id": game_id,
-                        "game_date": game_date,
-                        "accuracy": round(avg_acc, 1),
-                        "count": data["count"]
-                    })
-            
-            # Add phase data to habit histories
-            for phase_name, data in phase_data.items():
-                if data["count"] >= 3:  # Need at least 3 moves in phase
-                    avg_acc = statistics.mean(data["accuracies"])
-                    habit_histories[phase_name].append({
-                        "game_id": game_id,
-                        "game_date": game_date,
-                        "accuracy": round(avg_acc, 1),
-                        "count": data["count"]
-                    })
-        
         # Calculate significance and trend for each habit (existing tag/phase habits)
         habits = []
         phase_habits = []  # Always include phase habits
@@ -1106,6 +1042,11 @@ class PersonalStatsManager:
         # Only compute other habit types if we don't have enough from tag/phase habits
         if len(top_tag_habits) < MAX_HABITS_DISPLAY:
             print(f"   🔍 [HABITS] Only {len(top_tag_habits)} tag/phase habits, computing other types...")
+            # Other habit types still walk ply records, so load the window games now
+            if games is None:
+                games = self.supabase.get_active_reviewed_games(user_id, limit=HABIT_WINDOW_GAMES, columnar=True)
+            tagged = set(tagged_ids)
+            games = [g for g in games if g.get("id") in tagged]
             # Compute new habit types
             endgame_habits = self._compute_endgame_habits(user_id, games, baseline_accuracy)
             tag_accuracy_habits = self._compute_tag_accuracy_habits(user_id, games, baseline_accuracy)
@@ -1137,7 +1078,7 @@ class PersonalStatsManager:
             import threading
             thread = threading.Thread(
                 target=self._save_habit_snapshots,
-                args=(user_id, all_habits, games, baseline_accuracy),
+                args=(user_id, all_habits, games or [], baseline_accuracy),
                 daemon=True
             )
             thread.start()
@@ -1153,10 +1094,97 @@ class PersonalStatsManager:
         return {
             "habits": top_habits,
             "baseline_accuracy": round(baseline_accuracy, 1),
-            "total_games": len(games),
+            "total_games": games_with_tags,
             "all_habits": all_habits  # Include all for filtering
         }
     
+    def sync_stats_window(self, user_id: str) -> bool:
+        """
+        Sync the stored accumulator with the active game window and save it.
+        
+        Runs on the ingest/compress side (after a game is added, archived or
+        compressed) so reads never write. Games that left the window are
+        subtracted and new games are added from their ply columns: O(plies of
+        the changed games). Returns False when the window could not be listed.
+        """
+        refs = self.supabase.get_active_reviewed_game_refs(user_id, limit=STATS_WINDOW_GAMES)
+        if refs is None:
+            return False
+        
+        active_ids = [r["id"] for r in refs if r.get("id")]
+        stats = self._get_full_stats(user_id)
+        stats_row = self.supabase.get_personal_stats(user_id)
+        stored_ids = stats_row.get("game_ids", []) if stats_row else []
+        accumulator = StatsAccumulator(stats.get(ACCUMULATOR_KEY))
+        covered = self._accumulator_covers(accumulator, stored_ids)
+        
+        added, removed = self._apply_window(accumulator, active_ids, stats if covered else None)
+        if not added and not removed:
+            return True
+        
+        print(f"   🔄 [STATS] Accumulator synced: +{added} / -{removed} games")
+        stats[ACCUMULATOR_KEY] = accumulator.to_dict()
+        if covered:
+            stored_ids = accumulator.game_ids()
+            stats["total_games_analyzed"] = len(stored_ids)
+        return self.supabase.update_personal_stats(user_id, stats, stored_ids)
+    
+    def _apply_window(self, accumulator: StatsAccumulator, active_ids: List[str], stats: Optional[Dict] = None) -> Tuple[int, int]:
+        """
+        Subtract games that left the window and add the ones that entered it.
+        With `stats`, the entries those games touch are rewritten too. Returns
+        (games added, games removed).
+        """
+        active = set(active_ids)
+        stale_ids = [game_id for game_id in accumulator.game_ids() if game_id not in active]
+        missing_ids = [game_id for game_id in active_ids if game_id not in accumulator]
+        
+        for game_id in stale_ids:
+            contribution = accumulator.remove_game(game_id)
+            if stats is not None:
+                accumulator.apply_game(stats, contribution, removed=True)
+        
+        added = 0
+        for game in self.supabase.get_games_ply_data(missing_ids) if missing_ids else []:
+            game_review = game.get("game_review")
+            if not game_review:
+                continue
+            game_date = game.get("game_date") or game.get("created_at")
+            if stats is not None:
+                self._accumulate_game(stats, accumulator, game["id"], game_review, game_date)
+            else:
+                accumulator.add_game(game["id"], game_review, game_date)
+            added += 1
+        return added, len(stale_ids)
+    
+    def _habit_window(self, user_id: str) -> Tuple[StatsAccumulator, List[str], Optional[List[Dict]]]:
+        """
+        Accumulator for the active game window, for the habits read path.
+        
+        Read-only: sync_stats_window keeps the stored accumulator in line on
+        ingest/compression; if it lags, the difference is applied in memory
+        only. Returns the accumulator, the most recent HABIT_WINDOW_GAMES game
+        ids (newest first) and, when the window could not be listed, the games
+        fetched instead.
+        """
+        refs = self.supabase.get_active_reviewed_game_refs(user_id, limit=STATS_WINDOW_GAMES)
+        if refs is None:
+            # Fall back to a throwaway accumulator built from the window games
+            games = self.supabase.get_active_reviewed_games(user_id, limit=HABIT_WINDOW_GAMES, columnar=True)
+            accumulator = StatsAccumulator()
+            for game in games:
+                if game.get("id") and game.get("game_review"):
+                    accumulator.add_game(game["id"], game["game_review"], game.get("game_date") or game.get("created_at"))
+            return accumulator, [g["id"] for g in games if g.get("id")], games
+        
+        active_ids = [r["id"] for r in refs if r.get("id")]
+        stats_row = self.supabase.get_personal_stats(user_id)
+        accumulator = StatsAccumulator(((stats_row or {}).get("stats") or {}).get(ACCUMULATOR_KEY))
+        added, removed = self._apply_window(accumulator, active_ids)
+        if added or removed:
+            print(f"   ⚠️ [HABITS] Stored accumulator behind the window (+{added} / -{removed} games); not saved on read")
+        return accumulator, active_ids[:HABIT_WINDOW_GAMES], None
+    
     def _calculate_habit_metrics(self, habit_name: str, history: List[Dict], baseline: float, game_phase_accuracies: Dict = None) -> Optional[Dict]:
         """
         Calculate metrics for a single habit.
@@ -1390,18 +1418,11 @@ class PersonalStatsManager:
             # Check if we need to recompute
             if not needs_computation:
                 # Check if games with tags changed
-                current_games = self.supabase.get_active_reviewed_games(user_id, limit=20)
-                current_games_with_tags = 0
-                for game in current_games:
-                    game_review = game.get("game_review", {})
-                    ply_records = game_review.get("ply_records", [])
-                    if ply_records:
-                        has_tags = any(
-                            len(record.get("analyse", {}).get("tags", [])) > 0
-                            for record in ply_records
-                        )
-                        if has_tags:
-                            current_games_with_tags += 1
+                accumulator, window_ids, _ = self._habit_window(user_id)
+                current_games_with_tags = sum(
+                    1 for game_id in window_ids
+                    if game_id in accumulator and accumulator.games[game_id].get("has_tags")
+                )
                 
                 if current_games_with_tags == saved_total_games and habits_data.get("habits"):
                     # Games haven't changed and we have valid habits - return saved
@@ -1893,15 +1914,7 @@ class PersonalStatsManager:
             stats["accuracy_by_time_spent"] = {}
         
         # 7-bucket system as specified
-        time_ranges = [
-            (0, 5, '<5s'),
-            (5, 15, '5-15s'),
-            (15, 30, '15-30s'),
-            (30, 60, '30s-1min'),
-            (60, 150, '1min-2min30'),
-            (150, 300, '2min30-5min'),
-            (300, float('inf'), '5min+')
-        ]
+        time_ranges = TIME_SPENT_RANGES
         
         range_counts = defaultdict(lambda: {"accuracies": [], "count": 0, "blunders": 0, "mistakes": 0, "inaccuracies": 0})
         
@@ -2093,43 +2106,8 @@ class PersonalStatsManager:
     
     def _get_piece_type_from_san(self, san: str) -> Optional[str]:
         """Extract piece type from SAN notation."""
-        if not san:
-            return None
-        
-        first_char = san[0]
-        if first_char == 'K':
-            return 'King'
-        elif first_char == 'Q':
-            return 'Queen'
-        elif first_char == 'R':
-            return 'Rook'
-        elif first_char == 'B':
-            return 'Bishop'
-        elif first_char == 'N':
-            return 'Knight'
-        elif first_char in 'abcdefgh' or first_char.islower():
-            return 'Pawn'
-        elif first_char == 'O':
-            return 'Castling'
-        
-        return None
+        return piece_type_from_san(san)
     
     def _classify_time_control(self, time_control: str) -> Optional[str]:
         """Classify time control into category."""
-        if isinstance(time_control, int):
-            base_time = time_control
-        elif isinstance(time_control, str):
-            try:
-                base_time = int(time_control.split('+')[0])
-            except:
-                return None
-        else:
-            return None
-        
-        if base_time < 180:
-            return 'blitz'
-        elif base_time < 900:
-            return 'rapid'
-        else:
-            return 'classical'
-
+        return classify_time_control(time_control)
@@ -1,25 +1,63 @@
 """
 Pipeline Timer - Track performance metrics for the 4-layer pipeline
+
+Timers are request-scoped: the current timer and the innermost open span live
+in contextvars, so concurrent requests never share stats and nested spans
+follow asyncio tasks. Executor hops need bind_trace_context() (asyncio.to_thread
+already copies the context). When no timer is set, get_pipeline_timer() is a
+single ContextVar lookup returning None and every call site skips its work.
+
+Finished request traces go to an in-process ring buffer (recent_traces) and,
+when configured, to a JSONL file (PIPELINE_TRACE_FILE) and a Chrome trace file
+(PIPELINE_TRACE_CHROME, open in chrome://tracing or Perfetto).
 """
+import contextvars
+import functools
+import json
+import os
+import threading
 import time
-from typing import Dict, Any, Optional, List
-from collections import defaultdict
+import uuid
+from typing import Dict, Any, Optional, List, Callable
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from contextlib import contextmanager
 
 from llm_pricing import estimate_cost_usd  # Pricing table + cost estimator
 
-# Global timer instance (set by main.py)
-_current_timer: Optional['PipelineTimer'] = None
+TRACING_ENABLED = os.getenv("PIPELINE_TRACE", "true").lower().strip() == "true"
+TRACE_RING_SIZE = int(os.getenv("PIPELINE_TRACE_RING", "200"))
+TRACE_FILE = os.getenv("PIPELINE_TRACE_FILE", "")
+TRACE_CHROME_FILE = os.getenv("PIPELINE_TRACE_CHROME", "")
+
+# Request-scoped timer and innermost open span (entry_id)
+_current_timer: contextvars.ContextVar[Optional['PipelineTimer']] = contextvars.ContextVar("pipeline_timer", default=None)
+_current_span: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("pipeline_span", default=None)
+
+# Upper bounds of the per-stage prompt-size histogram buckets (tokens)
+PROMPT_TOKEN_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384)
 
-def set_pipeline_timer(timer: 'PipelineTimer'):
-    """Set the global pipeline timer instance"""
-    global _current_timer
-    _current_timer = timer
+_recent_traces: deque = deque(maxlen=TRACE_RING_SIZE)
+_export_lock = threading.Lock()
+
+def set_pipeline_timer(timer: Optional['PipelineTimer']) -> contextvars.Token:
+    """Set the pipeline timer for the current context. Returns a token for reset."""
+    return _current_timer.set(timer)
 
 def get_pipeline_timer() -> Optional['PipelineTimer']:
-    """Get the global pipeline timer instance"""
-    return _current_timer
+    """Get the pipeline timer for the current request (None when not tracing)"""
+    return _current_timer.get()
+
+
+def bind_trace_context(fn: Callable) -> Callable:
+    """Bind fn to a copy of the current context so it keeps the request's
+    timer and parent span when run via loop.run_in_executor / pool.submit.
+
+    Bind once per submission: a copied context can't be entered by two
+    threads at once.
+    """
+    ctx = contextvars.copy_context()
+    return functools.partial(ctx.run, fn)
 
 
 @dataclass
@@ -30,6 +68,9 @@ class TimingEntry:
     end_time: Optional[float] = None
     duration: Optional[float] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    entry_id: str = ""
+    parent_id: Optional[str] = None
+    thread_id: int = 0
     
     def finish(self, metadata: Optional[Dict[str, Any]] = None):
         """Mark timing entry as complete"""
@@ -45,7 +86,12 @@ class PipelineTimer:
     Provides detailed breakdown of where time is spent.
     """
     
-    def __init__(self):
+    def __init__(self, name: str = "request", labels: Optional[Dict[str, Any]] = None):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.labels: Dict[str, Any] = dict(labels or {})
+        self.created_at = time.time()
+        self._lock = threading.Lock()
         self.entries: List[TimingEntry] = []
         self.active_entries: Dict[str, TimingEntry] = {}
         self.layer_times: Dict[str, float] = defaultdict(float)
@@ -63,6 +109,17 @@ class PipelineTimer:
                 "tokens_in": 0,
                 "tokens_out": 0,
                 "tokens_total": 0,
+                # Response cache (LLMRouter): hits are calls that never reached the model
+                "cache_hits": 0,
+                "cache_misses": 0,
+                "saved_tokens_in": 0,
+                "saved_tokens_out": 0,
+                "saved_by_model": defaultdict(lambda: [0, 0]),
+                # Prompt sizes measured locally before sending (see record_prompt_tokens)
+                "prompts_measured": 0,
+                "prompts_estimated": 0,
+                "prompt_tokens": 0,
+                "prompt_hist": defaultdict(int),
                 "by_model": defaultdict(
                     lambda: {
                         "count": 0,
@@ -76,21 +133,30 @@ class PipelineTimer:
         )
         
     def start(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Start timing an operation. Returns entry_id for later reference."""
-        entry_id = f"{name}_{len(self.entries)}"
-        entry = TimingEntry(
-            name=name,
-            start_time=time.time(),
-            metadata=metadata or {}
-        )
-        self.entries.append(entry)
-        self.active_entries[entry_id] = entry
+        """Start timing an operation. Returns entry_id for later reference.
+
+        The parent is the innermost span open in the calling context.
+        """
+        with self._lock:
+            entry_id = f"{name}_{len(self.entries)}"
+            entry = TimingEntry(
+                name=name,
+                start_time=time.time(),
+                metadata=metadata or {},
+                entry_id=entry_id,
+                parent_id=_current_span.get(),
+                thread_id=threading.get_ident(),
+            )
+            self.entries.append(entry)
+            self.active_entries[entry_id] = entry
         return entry_id
     
     def finish(self, entry_id: str, metadata: Optional[Dict[str, Any]] = None):
         """Finish timing an operation"""
-        if entry_id in self.active_entries:
-            entry = self.active_entries[entry_id]
+        with self._lock:
+            entry = self.active_entries.pop(entry_id, None)
+            if entry is None:
+                return
             entry.finish(metadata)
             
             # Update layer times
@@ -99,32 +165,34 @@ class PipelineTimer:
             
             # Update step counts
             self.step_counts[entry.name] = self.step_counts.get(entry.name, 0) + 1
-            
-            del self.active_entries[entry_id]
     
     def record_cache(self, cache_type: str, hit: bool):
         """Record cache hit/miss"""
-        if hit:
-            self.cache_stats[f"{cache_type}_hits"] += 1
-        else:
-            self.cache_stats[f"{cache_type}_misses"] += 1
+        with self._lock:
+            if hit:
+                self.cache_stats[f"{cache_type}_hits"] += 1
+            else:
+                self.cache_stats[f"{cache_type}_misses"] += 1
     
     def record_engine(self, operation: str, duration: float, depth: Optional[int] = None):
         """Record engine operation timing"""
-        key = f"{operation}" + (f"_d{depth}" if depth else "")
-        self.engine_stats[key]["count"] += 1
-        self.engine_stats[key]["total_time"] += duration
-        if depth:
-            self.engine_stats[key]["avg_depth"] = depth
+        with self._lock:
+            key = f"{operation}" + (f"_d{depth}" if depth else "")
+            self.engine_stats[key]["count"] += 1
+            self.engine_stats[key]["total_time"] += duration
+            if depth:
+                self.engine_stats[key]["avg_depth"] = depth
 
     def record_skill(self, name: str, duration: float):
-        key = str(name or "unknown")
-        self.skill_stats[key]["count"] += 1
-        self.skill_stats[key]["total_time"] += float(duration or 0.0)
+        with self._lock:
+            key = str(name or "unknown")
+            self.skill_stats[key]["count"] += 1
+            self.skill_stats[key]["total_time"] += float(duration or 0.0)
 
     def record_stop_reason(self, reason: str):
-        r = str(reason or "unknown")
-        self.stop_reasons[r] += 1
+        with self._lock:
+            r = str(reason or "unknown")
+            self.stop_reasons[r] += 1
     
     def record_llm(
         self,
@@ -136,32 +204,72 @@ class PipelineTimer:
         model: Optional[str] = None
     ):
         """Record LLM call timing + token usage (input/output)."""
-        key = layer
-        self.llm_stats[key]["count"] += 1
-        self.llm_stats[key]["total_time"] += duration
-
-        tin = int(tokens_in) if tokens_in is not None else 0
-        tout = int(tokens_out) if tokens_out is not None else 0
-        self.llm_stats[key]["tokens_in"] += tin
-        self.llm_stats[key]["tokens_out"] += tout
-        self.llm_stats[key]["tokens_total"] += tin + tout
-
-        if model:
-            m = str(model)
-            by_model = self.llm_stats[key]["by_model"][m]
-            by_model["count"] += 1
-            by_model["total_time"] += duration
-            by_model["tokens_in"] += tin
-            by_model["tokens_out"] += tout
-            by_model["tokens_total"] += tin + tout
+        with self._lock:
+            key = layer
+            self.llm_stats[key]["count"] += 1
+            self.llm_stats[key]["total_time"] += duration
+
+            tin = int(tokens_in) if tokens_in is not None else 0
+            tout = int(tokens_out) if tokens_out is not None else 0
+            self.llm_stats[key]["tokens_in"] += tin
+            self.llm_stats[key]["tokens_out"] += tout
+            self.llm_stats[key]["tokens_total"] += tin + tout
+
+            if model:
+                m = str(model)
+                by_model = self.llm_stats[key]["by_model"][m]
+                by_model["count"] += 1
+                by_model["total_time"] += duration
+                by_model["tokens_in"] += tin
+                by_model["tokens_out"] += tout
+                by_model["tokens_total"] += tin + tout
+
+    def record_llm_cache(
+        self,
+        layer: str,
+        hit: bool,
+        *,
+        tokens_in: Optional[int] = None,
+        tokens_out: Optional[int] = None,
+        model: Optional[str] = None
+    ):
+        """Record a response-cache lookup; hits count the tokens they saved."""
+        with self._lock:
+            stats = self.llm_stats[layer]
+            if not hit:
+                stats["cache_misses"] += 1
+                return
+            stats["cache_hits"] += 1
+            tin = int(tokens_in or 0)
+            tout = int(tokens_out or 0)
+            stats["saved_tokens_in"] += tin
+            stats["saved_tokens_out"] += tout
+            saved = stats["saved_by_model"][str(model or "")]
+            saved[0] += tin
+            saved[1] += tout
+
+    def record_prompt_tokens(self, layer: str, tokens: int, estimated: bool = False):
+        """Record the locally measured input size of a prompt about to be sent.
+
+        estimated=True marks a count from the fallback estimate (no tiktoken).
+        """
+        bucket = next((f"<={b}" for b in PROMPT_TOKEN_BUCKETS if tokens <= b), f">{PROMPT_TOKEN_BUCKETS[-1]}")
+        with self._lock:
+            stats = self.llm_stats[layer]
+            stats["prompts_measured"] += 1
+            stats["prompts_estimated"] += bool(estimated)
+            stats["prompt_tokens"] += int(tokens)
+            stats["prompt_hist"][bucket] += 1
 
     @contextmanager
     def span(self, name: str, metadata: Optional[Dict[str, Any]] = None):
         """
         Convenience context manager for timing a scoped operation.
-        Records an 'error' field on exception.
+        Records an 'error' field on exception. Spans opened inside (including
+        in child tasks) are nested under this one.
         """
         entry_id = self.start(name, metadata)
+        token = _current_span.set(entry_id)
         try:
             yield entry_id
         except Exception as e:
@@ -171,6 +279,8 @@ class PipelineTimer:
                 raise
         else:
             self.finish(entry_id)
+        finally:
+            _reset_var(_current_span, token)
     
     def get_summary(self) -> Dict[str, Any]:
         """Get summary of all timings"""
@@ -211,6 +321,22 @@ class PipelineTimer:
         # Calculate LLM averages
         llm_avg = {}
         for key, stats in self.llm_stats.items():
+            lookups = stats["cache_hits"] + stats["cache_misses"]
+            cache_summary = None
+            if lookups:
+                saved_cost_usd = 0.0
+                for model, (tin, tout) in stats["saved_by_model"].items():
+                    saved_cost_usd += estimate_cost_usd(model, tin, tout) or 0.0
+                cache_summary = {
+                    "hits": stats["cache_hits"],
+                    "misses": stats["cache_misses"],
+                    "hit_rate": stats["cache_hits"] / lookups * 100,
+                    "saved_tokens_in": stats["saved_tokens_in"],
+                    "saved_tokens_out": stats["saved_tokens_out"],
+                    "saved_cost_usd": saved_cost_usd if saved_cost_usd > 0 else None,
+                }
+            if stats["count"] == 0 and cache_summary:
+                llm_avg[key] = {"count": 0, "total_time": 0.0, "avg_time": 0.0, "cache": cache_summary}
             if stats["count"] > 0:
                 # Compute cost estimates per model and total.
                 model_breakdown: Dict[str, Any] = {}
@@ -239,6 +365,22 @@ class PipelineTimer:
                     "cost_usd": total_cost_usd if total_cost_usd > 0 else None,
                     "by_model": model_breakdown,
                 }
+                if cache_summary:
+                    llm_avg[key]["cache"] = cache_summary
+            if stats["prompts_measured"]:
+                entry = llm_avg.setdefault(key, {"count": 0, "total_time": 0.0, "avg_time": 0.0})
+                entry["prompt_tokens"] = {
+                    "measured": stats["prompts_measured"],
+                    # Prompts counted with the fallback estimate rather than tiktoken
+                    "estimated": stats["prompts_estimated"],
+                    "total": stats["prompt_tokens"],
+                    "avg": stats["prompt_tokens"] / stats["prompts_measured"],
+                    "histogram": {
+                        bucket: stats["prompt_hist"][bucket]
+                        for bucket in [f"<={b}" for b in PROMPT_TOKEN_BUCKETS] + [f">{PROMPT_TOKEN_BUCKETS[-1]}"]
+                        if stats["prompt_hist"].get(bucket)
+                    },
+                }
         
         return {
             "total_time": total_time,
@@ -252,6 +394,32 @@ class PipelineTimer:
             "step_counts": dict(self.step_counts)
         }
     
+    def to_trace(self) -> Dict[str, Any]:
+        """Serializable trace: labels, summary and the flat span list (with parents)."""
+        with self._lock:
+            spans = [
+                {
+                    "id": e.entry_id,
+                    "parent_id": e.parent_id,
+                    "name": e.name,
+                    "start": e.start_time,
+                    "duration": e.duration,
+                    "thread_id": e.thread_id,
+                    "metadata": e.metadata,
+                }
+                for e in self.entries
+            ]
+        summary = self.get_summary()
+        summary.pop("layer_breakdown", None)
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "labels": self.labels,
+            "created_at": self.created_at,
+            "spans": spans,
+            "summary": summary,
+        }
+
     def print_summary(self):
         """Print formatted summary to console"""
         summary = self.get_summary()
@@ -314,6 +482,19 @@ class PipelineTimer:
                     f"   {key:20s} {stats['count']:3d} calls, {stats['total_time']:6.2f}s total, {stats['avg_time']:.2f}s avg"
                     f", in={tin} tok, out={tout} tok, total={ttot} tok{cost_str}{per_100_str}"
                 )
+                prompt_tokens = stats.get("prompt_tokens")
+                if prompt_tokens:
+                    hist = " ".join(f"{bucket}:{n}" for bucket, n in prompt_tokens["histogram"].items())
+                    source = "estimated" if prompt_tokens.get("estimated") else "measured"
+                    print(f"      └─ prompt tokens ({source}) avg={prompt_tokens['avg']:.0f} [{hist}]")
+                cache = stats.get("cache")
+                if cache:
+                    saved_cost = cache.get("saved_cost_usd")
+                    saved_cost_str = f", ${saved_cost:.4f} saved" if isinstance(saved_cost, (int, float)) else ""
+                    print(
+                        f"      └─ cache {cache['hits']}/{cache['hits'] + cache['misses']} hits ({cache['hit_rate']:.1f}%)"
+                        f", saved in={cache['saved_tokens_in']} out={cache['saved_tokens_out']} tok{saved_cost_str}"
+                    )
 
                 # Per-model breakdown (useful when a layer uses multiple models)
                 by_model = stats.get("by_model") or {}
@@ -331,3 +512,102 @@ class PipelineTimer:
         
         print(f"{'='*80}\n")
 
+
+def _reset_var(var: contextvars.ContextVar, token: contextvars.Token) -> None:
+    try:
+        var.reset(token)
+    except ValueError:
+        # Generator closed from another context (e.g. client disconnect); just clear it
+        var.set(None)
+
+
+def _chrome_events(trace: Dict[str, Any]) -> List[Dict[str, Any]]:
+    events = []
+    for span in trace["spans"]:
+        if span["duration"] is None:
+            continue
+        events.append({
+            "name": span["name"],
+            "cat": span["name"].split(":")[0],
+            "ph": "X",
+            "ts": int(span["start"] * 1e6),
+            "dur": int(span["duration"] * 1e6),
+            "pid": trace["trace_id"],
+            "tid": span["thread_id"],
+            "args": {**span["metadata"], "trace": trace["name"], **trace["labels"]},
+        })
+    return events
+
+
+def export_trace(timer: PipelineTimer) -> Dict[str, Any]:
+    """Push a finished trace to the ring buffer and the configured files."""
+    trace = timer.to_trace()
+    _recent_traces.append(trace)
+    if not (TRACE_FILE or TRACE_CHROME_FILE):
+        return trace
+    try:
+        with _export_lock:
+            if TRACE_FILE:
+                with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace, default=str) + "\n")
+            if TRACE_CHROME_FILE:
+                # Trace Event Format tolerates a missing closing bracket, so the file stays appendable
+                is_new = not os.path.exists(TRACE_CHROME_FILE) or os.path.getsize(TRACE_CHROME_FILE) == 0
+                with open(TRACE_CHROME_FILE, "a", encoding="utf-8") as f:
+                    if is_new:
+                        f.write("[\n")
+                    for event in _chrome_events(trace):
+                        f.write(json.dumps(event, default=str) + ",\n")
+    except Exception as e:
+        print(f"   ⚠️ [TRACE] Export failed: {e}")
+    return trace
+
+
+def start_request_trace(name: str, **labels: Any):
+    """Create a timer for this request and make it current.
+
+    Returns (timer, token), or (None, None) when tracing is disabled.
+    """
+    if not TRACING_ENABLED:
+        return None, None
+    timer = PipelineTimer(name, {k: v for k, v in labels.items() if v is not None})
+    return timer, set_pipeline_timer(timer)
+
+
+def end_request_trace(timer: Optional[PipelineTimer], token: Optional[contextvars.Token]) -> None:
+    """Restore the previous timer and export the finished trace."""
+    if timer is None:
+        return
+    _reset_var(_current_timer, token)
+    export_trace(timer)
+
+
+@contextmanager
+def request_trace(name: str, **labels: Any):
+    """Scope a request trace: `with request_trace("llm_chat", user_id=uid) as timer:`"""
+    timer, token = start_request_trace(name, **labels)
+    try:
+        yield timer
+    finally:
+        end_request_trace(timer, token)
+
+
+def recent_traces(limit: int = 20, name: Optional[str] = None, **labels: Any) -> List[Dict[str, Any]]:
+    """Most recent finished traces first, optionally filtered by name and labels."""
+    out = []
+    for trace in reversed(_recent_traces):
+        if name and trace["name"] != name:
+            continue
+        if any(v is not None and trace["labels"].get(k) != v for k, v in labels.items()):
+            continue
+        out.append(trace)
+        if len(out) >= limit:
+            break
+    return out
+
+
+def get_trace(trace_id: str) -> Optional[Dict[str, Any]]:
+    for trace in reversed(_recent_traces):
+        if trace["trace_id"] == trace_id:
+            return trace
+    return None
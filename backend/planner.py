@@ -12,6 +12,7 @@ from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 import chess
 from planner_helpers import prepare_planner_context
+from position_key import position_key
 from orchestration_plan import IntentPlan
 from planner_prompt import PLANNER_SYSTEM_PROMPT
 from minimal_prompts import MIN_SYSTEM_PROMPT_V1, PLANNER_CONTRACT_V1
@@ -276,7 +277,8 @@ class Planner:
                 prompt_tokens = None
                 completion_tokens = None
             if _timer:
-                _timer.record_llm("planner", _dt, tokens_in=prompt_tokens, tokens_out=completion_tokens, model=self.model)
+                if response is not None:  # router calls are recorded by the LLMRouter
+                    _timer.record_llm("planner", _dt, tokens_in=prompt_tokens, tokens_out=completion_tokens, model=self.model)
                 if _llm_entry:
                     _timer.finish(_llm_entry, {"duration_s": round(_dt, 4), "tokens_in": prompt_tokens, "tokens_out": completion_tokens})
             try:
@@ -1273,17 +1275,11 @@ Output JSON:
         """Normalize SAN for deduplication."""
         return move.strip().replace(" ", "").lower()
 
-    def _normalize_fen_key(self, fen: Optional[str]) -> Optional[str]:
-        """Use only the stable parts of a FEN when comparing cached analysis."""
-        if not fen:
+    def _normalize_fen_key(self, fen: Optional[str]) -> Optional[int]:
+        """Shared position key (ignores move counters) when comparing cached analysis."""
+        if not fen or not isinstance(fen, str):
             return None
-        try:
-            parts = fen.split()
-            if len(parts) >= 4:
-                return " ".join(parts[:4])
-        except Exception:
-            pass
-        return fen
+        return position_key(fen)
 
     def _normalize_candidate_list(self, candidate_list: Any, source: str) -> List[Dict[str, Any]]:
         normalized: List[Dict[str, Any]] = []
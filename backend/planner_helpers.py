@@ -5,19 +5,12 @@ Provides organized legal moves and position tags to help Planner make decisions.
 
 import chess
 from typing import Dict, List, Any, Optional
+from position_key import position_key
 from parallel_analyzer import compute_themes_and_tags
 from threat_detector import detect_all_threats
 
-_LEGAL_MOVES_CACHE: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
-_TAGS_CACHE: Dict[str, Dict[str, Any]] = {}
-
-
-def _norm_fen_key(fen: str) -> str:
-    """Normalize FEN for caching: keep position + turn + castling + ep, drop move counters."""
-    try:
-        return " ".join((fen or "").split()[:4])
-    except Exception:
-        return fen or ""
+_LEGAL_MOVES_CACHE: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+_TAGS_CACHE: Dict[Any, Dict[str, Any]] = {}
 
 
 def get_legal_moves_by_piece(fen: str) -> Dict[str, List[Dict[str, Any]]]:
@@ -41,7 +34,7 @@ def get_legal_moves_by_piece(fen: str) -> Dict[str, List[Dict[str, Any]]]:
             "castling": [...]
         }
     """
-    cache_key = _norm_fen_key(fen)
+    cache_key = position_key(fen)
     cached = _LEGAL_MOVES_CACHE.get(cache_key)
     if cached is not None:
         return cached
@@ -172,7 +165,7 @@ def get_relevant_tags(fen: str, focus: Optional[str] = None) -> Dict[str, Any]:
             "tactical_tags": [...]  # Tactical tags (threats, pins, etc.)
         }
     """
-    cache_key = f"{_norm_fen_key(fen)}|focus:{(focus or '').strip().lower()}"
+    cache_key = (position_key(fen), (focus or '').strip().lower())
     cached = _TAGS_CACHE.get(cache_key)
     if cached is not None:
         return cached
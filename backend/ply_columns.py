@@ -0,0 +1,316 @@
+"""
+Ply Columns - compact, versioned columnar encoding of a game review's ply_records.
+
+Stored alongside the JSON `game_review` (games.ply_columns) so analytics
+(habits, detailed analytics, graph points, pattern summaries) can read the few
+per-ply fields they need without downloading and parsing the full review.
+
+Layout (little-endian):
+    magic  b"PLYC" | version u8 | flags u8 | reserved u16 | n_plies u32 | header_len u32
+    header JSON (dictionaries, game-level meta, column directory)
+    column data, each column aligned to 8 bytes
+
+Numeric columns decode as zero-copy memoryviews (or NumPy views via
+`PlyColumns.numpy()` when NumPy is installed). String fields (SAN, phase,
+move category, threat category) and tag names are dictionary-encoded.
+"""
+
+import base64
+import json
+import math
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Union
+
+PLY_COLUMNS_VERSION = 1
+MAGIC = b"PLYC"
+
+_PREAMBLE = struct.Struct("<4sBBHII")
+_ALIGN = 8
+
+# Sentinels for missing values
+MISSING_CODE = 0xFFFF        # dictionary-coded string columns (u16)
+MISSING_EVAL = -(2 ** 31)    # eval column (i32); float columns use NaN
+
+SIDE_CODES = {"white": 0, "black": 1}
+SIDE_NAMES = ("white", "black")
+SIDE_UNKNOWN = 2
+
+# name -> array typecode ('H' u16, 'B' u8, 'i' i32, 'f' f32, 'I' u32)
+NUMERIC_COLUMNS = (
+    ("ply", "H"),
+    ("side", "B"),
+    ("eval_cp", "i"),
+    ("cp_loss", "f"),
+    ("accuracy", "f"),
+    ("time_spent", "f"),
+)
+STRING_COLUMNS = ("san", "phase", "category", "threat_category")
+TAG_COLUMNS = ("tags", "tags_before")  # analyse.tags / raw_before.tags, CSR-encoded
+
+_NUMPY_DTYPES = {"H": "<u2", "B": "u1", "i": "<i4", "f": "<f4", "I": "<u4"}
+
+
+def _tag_name(tag: Any) -> Optional[str]:
+    if isinstance(tag, str):
+        return tag or None
+    if isinstance(tag, dict):
+        name = tag.get("tag_name") or tag.get("name") or tag.get("tag")
+        return str(name) if name else None
+    return None
+
+
+def _as_float(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return math.nan
+    return float(value)
+
+
+def _review_meta(game_review: Dict) -> Dict[str, Any]:
+    """Game-level fields analytics read next to the plies."""
+    metadata = game_review.get("metadata") or {}
+    stats = game_review.get("stats") or {}
+    opening = game_review.get("opening") or {}
+    by_phase = stats.get("by_phase") or {}
+    return {
+        "metadata": {
+            key: metadata.get(key)
+            for key in ("player_color", "result", "time_control")
+            if metadata.get(key) is not None
+        },
+        "stats": {
+            "overall_accuracy": stats.get("overall_accuracy"),
+            "by_phase": {
+                phase: {"accuracy": (by_phase.get(phase) or {}).get("accuracy")}
+                for phase in ("opening", "middlegame", "endgame")
+                if isinstance(by_phase.get(phase), dict)
+            },
+        },
+        "opening": {"name_final": opening.get("name_final")} if opening.get("name_final") else {},
+    }
+
+
+def encode_ply_columns(game_review: Dict) -> bytes:
+    """Encode a game review's ply_records into the columnar binary format."""
+    ply_records = [r for r in (game_review.get("ply_records") or []) if isinstance(r, dict)]
+    n = len(ply_records)
+
+    numeric = {name: array(code) for name, code in NUMERIC_COLUMNS}
+    dictionaries: Dict[str, List[str]] = {name: [] for name in STRING_COLUMNS}
+    dictionaries["tags"] = []
+    lookups: Dict[str, Dict[str, int]] = {name: {} for name in dictionaries}
+    codes = {name: array("H") for name in STRING_COLUMNS}
+    tag_offsets = {name: array("I", [0]) for name in TAG_COLUMNS}
+    tag_ids = {name: array("H") for name in TAG_COLUMNS}
+
+    def _code(dictionary: str, value: Any) -> int:
+        if value is None or value == "":
+            return MISSING_CODE
+        value = str(value)
+        lookup = lookups[dictionary]
+        code = lookup.get(value)
+        if code is None:
+            code = len(dictionaries[dictionary])
+            if code >= MISSING_CODE:
+                raise ValueError(f"Too many distinct values for {dictionary}")
+            lookup[value] = code
+            dictionaries[dictionary].append(value)
+        return code
+
+    for idx, record in enumerate(ply_records):
+        engine = record.get("engine") or {}
+        eval_cp = engine.get("eval_before_cp")
+        numeric["ply"].append(int(record.get("ply") or idx + 1) & 0xFFFF)
+        numeric["side"].append(SIDE_CODES.get(record.get("side_moved"), SIDE_UNKNOWN))
+        numeric["eval_cp"].append(
+            max(MISSING_EVAL + 1, min(2 ** 31 - 1, int(eval_cp)))
+            if isinstance(eval_cp, (int, float)) and not isinstance(eval_cp, bool) else MISSING_EVAL
+        )
+        numeric["cp_loss"].append(_as_float(record.get("cp_loss")))
+        numeric["accuracy"].append(_as_float(record.get("accuracy_pct")))
+        numeric["time_spent"].append(_as_float(record.get("time_spent_s")))
+
+        for name in STRING_COLUMNS:
+            codes[name].append(_code(name, record.get(name)))
+
+        sources = {
+            "tags": (record.get("analyse") or {}).get("tags") or [],
+            "tags_before": (record.get("raw_before") or {}).get("tags") or [],
+        }
+        for name, tags in sources.items():
+            for tag in tags:
+                tag_name = _tag_name(tag)
+                if tag_name:
+                    tag_ids[name].append(_code("tags", tag_name))
+            tag_offsets[name].append(len(tag_ids[name]))
+
+    columns: List[array] = []
+    directory = []
+    for name, _code_type in NUMERIC_COLUMNS:
+        columns.append(numeric[name])
+        directory.append(name)
+    for name in STRING_COLUMNS:
+        columns.append(codes[name])
+        directory.append(name)
+    for name in TAG_COLUMNS:
+        columns.append(tag_offsets[name])
+        directory.append(f"{name}.offsets")
+        columns.append(tag_ids[name])
+        directory.append(f"{name}.ids")
+
+    if sys.byteorder != "little":
+        for col in columns:
+            col.byteswap()
+
+    # Lay out column offsets relative to the start of the data section
+    layout = []
+    cursor = 0
+    for name, col in zip(directory, columns):
+        cursor += -cursor % _ALIGN
+        layout.append([name, col.typecode, cursor, len(col)])
+        cursor += len(col) * col.itemsize
+
+    header = json.dumps(
+        {"meta": _review_meta(game_review), "dictionaries": dictionaries, "columns": layout},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    header += b" " * (-(_PREAMBLE.size + len(header)) % _ALIGN)
+
+    out = bytearray(_PREAMBLE.pack(MAGIC, PLY_COLUMNS_VERSION, 0, 0, n, len(header)))
+    out += header
+    data_start = len(out)
+    for (_name, _typecode, offset, _count), col in zip(layout, columns):
+        out += b"\0" * (data_start + offset - len(out))
+        out += col.tobytes()
+    return bytes(out)
+
+
+def encode_ply_columns_b64(game_review: Dict) -> Optional[str]:
+    """Encode for storage in a text column; None when there are no plies."""
+    if not isinstance(game_review, dict) or not game_review.get("ply_records"):
+        return None
+    return base64.b64encode(encode_ply_columns(game_review)).decode("ascii")
+
+
+class PlyColumns:
+    """Decoded view over an encoded ply-columns buffer."""
+
+    def __init__(self, buffer: bytes):
+        if len(buffer) < _PREAMBLE.size:
+            raise ValueError("Ply columns buffer is truncated")
+        magic, version, _flags, _reserved, n, header_len = _PREAMBLE.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a ply columns buffer")
+        if version > PLY_COLUMNS_VERSION:
+            raise ValueError(f"Unsupported ply columns version {version}")
+        header_end = _PREAMBLE.size + header_len
+        header = json.loads(bytes(buffer[_PREAMBLE.size:header_end]).decode("utf-8"))
+
+        self.version = version
+        self.n = n
+        self.meta: Dict[str, Any] = header.get("meta") or {}
+        self.dictionaries: Dict[str, List[str]] = header.get("dictionaries") or {}
+        self._buffer = buffer
+        self._data_start = header_end
+        self._layout = {name: (typecode, offset, count) for name, typecode, offset, count in header["columns"]}
+        self._views: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return self.n
+
+    def column(self, name: str):
+        """Return a column as a zero-copy memoryview (copied only on big-endian hosts)."""
+        view = self._views.get(name)
+        if view is None:
+            typecode, offset, count = self._layout[name]
+            start = self._data_start + offset
+            nbytes = count * array(typecode).itemsize
+            raw = memoryview(self._buffer)[start:start + nbytes]
+            if sys.byteorder == "little":
+                view = raw.cast(typecode)
+            else:
+                swapped = array(typecode, raw.tobytes())
+                swapped.byteswap()
+                view = memoryview(swapped)
+            self._views[name] = view
+        return view
+
+    def numpy(self) -> Dict[str, Any]:
+        """Return every column as a read-only NumPy view over the buffer. Requires NumPy."""
+        import numpy as np
+
+        arrays = {}
+        for name, (typecode, offset, count) in self._layout.items():
+            arrays[name] = np.frombuffer(
+                self._buffer,
+                dtype=np.dtype(_NUMPY_DTYPES[typecode]),
+                count=count,
+                offset=self._data_start + offset,
+            )
+        return arrays
+
+    def strings(self, name: str) -> List[Optional[str]]:
+        """Decode a dictionary-coded string column."""
+        dictionary = self.dictionaries.get(name) or []
+        return [None if code == MISSING_CODE else dictionary[code] for code in self.column(name)]
+
+    def tags(self, name: str = "tags") -> List[List[str]]:
+        """Decode a tag column into per-ply lists of tag names (original order and multiplicity)."""
+        dictionary = self.dictionaries.get("tags") or []
+        offsets = self.column(f"{name}.offsets")
+        ids = self.column(f"{name}.ids")
+        return [[dictionary[ids[j]] for j in range(offsets[i], offsets[i + 1])] for i in range(self.n)]
+
+    def to_ply_records(self) -> List[Dict[str, Any]]:
+        """
+        Rebuild lightweight ply records carrying only the encoded fields.
+
+        Missing values are omitted rather than set to None so `.get(key, default)`
+        behaves as it does on the original records.
+        """
+        ply = self.column("ply")
+        side = self.column("side")
+        eval_cp = self.column("eval_cp")
+        numeric_fields = (
+            ("cp_loss", self.column("cp_loss")),
+            ("accuracy_pct", self.column("accuracy")),
+            ("time_spent_s", self.column("time_spent")),
+        )
+        strings = {name: self.strings(name) for name in STRING_COLUMNS}
+        tags = self.tags("tags")
+        tags_before = self.tags("tags_before")
+
+        records = []
+        for i in range(self.n):
+            record: Dict[str, Any] = {"ply": ply[i]}
+            if side[i] < len(SIDE_NAMES):
+                record["side_moved"] = SIDE_NAMES[side[i]]
+            if eval_cp[i] != MISSING_EVAL:
+                record["engine"] = {"eval_before_cp": eval_cp[i]}
+            for key, col in numeric_fields:
+                value = col[i]
+                if not math.isnan(value):
+                    record[key] = int(value) if key == "cp_loss" and value.is_integer() else value
+            for name in STRING_COLUMNS:
+                if strings[name][i] is not None:
+                    record[name] = strings[name][i]
+            record["analyse"] = {"tags": [{"tag_name": t} for t in tags[i]]}
+            if tags_before[i]:
+                record["raw_before"] = {"tags": [{"tag_name": t} for t in tags_before[i]]}
+            records.append(record)
+        return records
+
+    def to_game_review(self) -> Dict[str, Any]:
+        """Lightweight game_review dict (meta + light ply records) for existing analytics code."""
+        review = {key: dict(value) for key, value in self.meta.items()}
+        review["ply_records"] = self.to_ply_records()
+        review["_columnar"] = True
+        return review
+
+
+def decode_ply_columns(data: Union[bytes, bytearray, memoryview, str]) -> PlyColumns:
+    """Decode raw bytes or the base64 text stored in games.ply_columns."""
+    if isinstance(data, str):
+        data = base64.b64decode(data)
+    return PlyColumns(data)
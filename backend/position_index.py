@@ -0,0 +1,443 @@
+"""
+Position Index - per-user in-memory inverted index over saved positions.
+
+Every saved position gets a dense ordinal, and every facet value (a tag in
+tags_start / gained / lost / missed, phase, error category, piece, time
+bucket, theme, side, mover, opening) keeps a posting bitset: a Python int
+with bit i set for ordinal i. A multi-facet query is a few big-int AND/ORs,
+and ranking is a top-k heap over the surviving ordinals, so drill queries
+don't scan the positions table. SupabaseClient loads an index once per user
+and keeps it current as positions are saved or marked used.
+"""
+
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from position_miner import score_priority
+
+
+# Columns the index needs; the wide jsonb columns (analysis, threats) are left out
+POSITION_INDEX_FIELDS = (
+    "id,fen,side_to_move,from_game_id,source_ply,move_san,move_uci,eval_cp,mate_in,"
+    "best_move_san,best_move_uci,tags,themes,user_note,error_note,critical_note,is_critical,"
+    "phase,opening_name,mover_name,is_error,error_category,error_side,cp_loss,source_game_ids,"
+    "tags_start,tags_after_played,tags_after_best,tags_gained,tags_lost,piece_blundered,"
+    "piece_best_move,time_spent_s,last_used_in_drill,created_at"
+)
+
+# Seconds spent on the move → drill time bucket ([min, max))
+TIME_BUCKET_RANGES = {
+    "<5s": (0, 5),
+    "5-15s": (5, 15),
+    "15-30s": (15, 30),
+    "30s-1min": (30, 60),
+    "1min-2min30": (60, 150),
+    "2min30-5min": (150, 300),
+    "5min+": (300, float('inf'))
+}
+
+PIECE_NAMES = {"p": "pawn", "n": "knight", "b": "bishop", "r": "rook", "q": "queen", "k": "king"}
+
+POSITION_INDEX_TTL_S = 15 * 60
+POSITION_INDEX_MAX_USERS = 256
+
+Facet = Tuple[str, str]
+
+
+def time_bucket_of(seconds: Any) -> Optional[str]:
+    """Drill time bucket for a time_spent_s value (None if unknown)."""
+    try:
+        seconds = float(seconds)
+    except (TypeError, ValueError):
+        return None
+    for bucket, (low, high) in TIME_BUCKET_RANGES.items():
+        if low <= seconds < high:
+            return bucket
+    return None
+
+
+def normalize_piece(value: Any) -> Optional[str]:
+    """'N', 'n', 'Knight' and 'knight' all index as 'knight'."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip().lower()
+    return PIECE_NAMES.get(value, value)
+
+
+def _tag_names(values: Any) -> List[str]:
+    names = []
+    for tag in values or []:
+        if isinstance(tag, str):
+            name = tag
+        elif isinstance(tag, dict):
+            name = tag.get("name", tag.get("tag", tag.get("tag_name", "")))
+        else:
+            continue
+        if name:
+            names.append(name)
+    return names
+
+
+def _theme_names(themes: Any) -> List[str]:
+    if isinstance(themes, dict):
+        return [name for name, score in themes.items() if score]
+    if isinstance(themes, list):
+        return [name for name in themes if isinstance(name, str)]
+    return []
+
+
+def _num(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _ordinals(bits: int) -> List[int]:
+    """Set bit positions of a posting bitset, lowest first."""
+    return [i for i, bit in enumerate(bin(bits)[:1:-1]) if bit == "1"]
+
+
+class PositionIndex:
+    """Inverted index over one user's saved positions."""
+
+    def __init__(self, rows: Iterable[Dict] = ()):
+        self._rows: List[Optional[Dict]] = []
+        self._facets: List[Tuple[Facet, ...]] = []
+        self._postings: Dict[Facet, int] = {}
+        self._by_id: Dict[str, int] = {}
+        self._by_key: Dict[Tuple[Any, Any], int] = {}
+        self._free: List[int] = []
+        self._live = 0
+        self._lock = threading.RLock()
+        self.loaded_at = time.time()
+        for row in rows:
+            self.upsert(row)
+
+    def __len__(self) -> int:
+        return bin(self._live).count("1")
+
+    def __contains__(self, position_id: str) -> bool:
+        return position_id in self._by_id
+
+    @staticmethod
+    def facets_of(row: Dict) -> Tuple[Facet, ...]:
+        """All (facet, value) pairs a position is posted under."""
+        facets = set()
+        for facet, column in (("tag_start", "tags_start"), ("tag_gained", "tags_gained"), ("tag_lost", "tags_lost")):
+            facets.update((facet, name) for name in _tag_names(row.get(column)))
+
+        # Missed: present after the best move but not after the played move
+        played = set(_tag_names(row.get("tags_after_played")))
+        facets.update(("tag_missed", name) for name in _tag_names(row.get("tags_after_best")) if name not in played)
+
+        for facet, column in (
+            ("phase", "phase"),
+            ("error_category", "error_category"),
+            ("error_side", "error_side"),
+            ("side", "side_to_move"),
+            ("mover", "mover_name"),
+        ):
+            if row.get(column):
+                facets.add((facet, str(row[column])))
+
+        piece = normalize_piece(row.get("piece_blundered"))
+        if piece:
+            facets.add(("piece", piece))
+        bucket = time_bucket_of(row.get("time_spent_s"))
+        if bucket:
+            facets.add(("time_bucket", bucket))
+        opening = (row.get("opening_name") or "").strip().lower()
+        if opening:
+            facets.add(("opening", opening))
+        facets.update(("theme", name) for name in _theme_names(row.get("themes")))
+        return tuple(facets)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def upsert(self, row: Dict) -> int:
+        """Add or refresh a position (matched by id, then fen + side_to_move)."""
+        with self._lock:
+            key = (row.get("fen"), row.get("side_to_move"))
+            ordinal = self._by_id.get(row.get("id")) if row.get("id") else None
+            if ordinal is None:
+                ordinal = self._by_key.get(key)
+
+            if ordinal is not None:
+                merged = {**self._rows[ordinal], **row}
+                self._unlink(ordinal)
+            else:
+                merged = dict(row)
+                if self._free:
+                    ordinal = self._free.pop()
+                else:
+                    ordinal = len(self._rows)
+                    self._rows.append(None)
+                    self._facets.append(())
+
+            self._link(ordinal, merged)
+            return ordinal
+
+    def remove(self, position_id: str) -> bool:
+        with self._lock:
+            ordinal = self._by_id.get(position_id)
+            if ordinal is None:
+                return False
+            self._unlink(ordinal)
+            self._rows[ordinal] = None
+            self._free.append(ordinal)
+            return True
+
+    def mark_used(self, position_ids: Iterable[str], used_at: str) -> int:
+        """Record last_used_in_drill for the positions this index holds."""
+        marked = 0
+        with self._lock:
+            for position_id in position_ids:
+                ordinal = self._by_id.get(position_id)
+                if ordinal is not None:
+                    self._rows[ordinal]["last_used_in_drill"] = used_at
+                    marked += 1
+        return marked
+
+    def _link(self, ordinal: int, row: Dict) -> None:
+        bit = 1 << ordinal
+        facets = self.facets_of(row)
+        for facet in facets:
+            self._postings[facet] = self._postings.get(facet, 0) | bit
+        self._rows[ordinal] = row
+        self._facets[ordinal] = facets
+        self._live |= bit
+        if row.get("id"):
+            self._by_id[row["id"]] = ordinal
+        self._by_key[(row.get("fen"), row.get("side_to_move"))] = ordinal
+
+    def _unlink(self, ordinal: int) -> None:
+        bit = 1 << ordinal
+        for facet in self._facets[ordinal]:
+            remaining = self._postings.get(facet, 0) & ~bit
+            if remaining:
+                self._postings[facet] = remaining
+            else:
+                self._postings.pop(facet, None)
+        self._facets[ordinal] = ()
+        self._live &= ~bit
+        row = self._rows[ordinal] or {}
+        if self._by_id.get(row.get("id")) == ordinal:
+            del self._by_id[row["id"]]
+        key = (row.get("fen"), row.get("side_to_move"))
+        if self._by_key.get(key) == ordinal:
+            del self._by_key[key]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _any(self, facet: str, values: Iterable[str]) -> int:
+        bits = 0
+        for value in values:
+            bits |= self._postings.get((facet, value), 0)
+        return bits
+
+    def _any_matching(self, facet: str, predicate: Callable[[str], bool]) -> int:
+        bits = 0
+        for (name, value), posting in self._postings.items():
+            if name == facet and predicate(value):
+                bits |= posting
+        return bits
+
+    def match(
+        self,
+        tags: Optional[List[str]] = None,
+        tags_gained: Optional[str] = None,
+        tags_lost: Optional[str] = None,
+        tags_missed: Optional[str] = None,
+        phases: Optional[List[str]] = None,
+        error_categories: Optional[List[str]] = None,
+        error_side: Optional[str] = None,
+        themes: Optional[List[str]] = None,
+        side: Optional[str] = None,
+        mover_name: Optional[str] = None,
+        piece: Optional[str] = None,
+        time_bucket: Optional[str] = None,
+        opening: Optional[str] = None,
+    ) -> int:
+        """Bitset of positions matching every given facet (OR within list facets)."""
+        with self._lock:
+            bits = self._live
+            if tags:
+                bits &= self._any("tag_start", tags)
+            if tags_gained:
+                bits &= self._postings.get(("tag_gained", tags_gained), 0)
+            if tags_lost:
+                bits &= self._postings.get(("tag_lost", tags_lost), 0)
+            if tags_missed:
+                bits &= self._postings.get(("tag_missed", tags_missed), 0)
+            if phases:
+                bits &= self._any("phase", phases)
+            if error_categories:
+                bits &= self._any("error_category", error_categories)
+            if error_side:
+                bits &= self._postings.get(("error_side", error_side), 0)
+            if themes:
+                bits &= self._any("theme", themes)
+            if side:
+                bits &= self._postings.get(("side", side), 0)
+            if mover_name:
+                bits &= self._postings.get(("mover", mover_name), 0)
+            if piece:
+                bits &= self._postings.get(("piece", normalize_piece(piece)), 0)
+            if time_bucket in TIME_BUCKET_RANGES:
+                bits &= self._postings.get(("time_bucket", time_bucket), 0)
+            if opening:
+                needle = opening.strip().lower()
+                bits &= self._any_matching("opening", lambda value: needle in value)
+            return bits
+
+    def _candidates(self, min_cp_loss: Optional[float], filters: Dict[str, Any]) -> List[Tuple[int, Dict]]:
+        with self._lock:
+            bits = self.match(**filters)
+            candidates = [(i, self._rows[i]) for i in _ordinals(bits)]
+        if min_cp_loss is not None:
+            candidates = [(i, row) for i, row in candidates if _num(row.get("cp_loss")) >= min_cp_loss]
+        return candidates
+
+    def count(self, min_cp_loss: Optional[float] = None, **filters) -> int:
+        return len(self._candidates(min_cp_loss, filters))
+
+    def search(
+        self,
+        limit: int = 10,
+        order: str = "cp_loss",
+        min_cp_loss: Optional[float] = None,
+        focus_tags: Optional[List[str]] = None,
+        include_critical_choices: bool = True,
+        **filters
+    ) -> List[Dict]:
+        """
+        Top-k positions matching the filters.
+
+        order:
+            "cp_loss"  - highest cp_loss first
+            "fresh"    - never drilled first, then least recently drilled, then cp_loss
+            "priority" - PositionMiner priority (focus_tags add the match bonus);
+                         returned rows carry a "priority" key
+        """
+        candidates = self._candidates(min_cp_loss, filters)
+        if limit <= 0 or not candidates:
+            return []
+
+        if order == "fresh":
+            top = heapq.nsmallest(limit, candidates, key=lambda c: (
+                c[1].get("last_used_in_drill") is not None,
+                c[1].get("last_used_in_drill") or "",
+                -_num(c[1].get("cp_loss")),
+                c[0],
+            ))
+            return [dict(row) for _, row in top]
+
+        if order == "priority":
+            focus_bits = 0
+            if focus_tags:
+                lowered = [focus.lower() for focus in focus_tags]
+                with self._lock:
+                    focus_bits = self._any_matching(
+                        "tag_start",
+                        lambda name: any(f in name.lower() or name.lower() in f for f in lowered),
+                    )
+            scored = []
+            for i, row in candidates:
+                priority = score_priority(
+                    category=row.get("error_category") or ("critical_best" if row.get("is_critical") else ""),
+                    cp_loss=_num(row.get("cp_loss")),
+                    time_spent_s=row.get("time_spent_s"),
+                    focus_match=bool(focus_bits >> i & 1),
+                    include_critical_choices=include_critical_choices,
+                )
+                if priority > 0:
+                    scored.append((priority, _num(row.get("cp_loss")), -i, row))
+            top = heapq.nlargest(limit, scored, key=lambda s: s[:3])
+            return [{**row, "priority": priority} for priority, _, _, row in top]
+
+        top = heapq.nlargest(limit, candidates, key=lambda c: (_num(c[1].get("cp_loss")), -c[0]))
+        return [dict(row) for _, row in top]
+
+
+class PositionIndexRegistry:
+    """
+    Lazily-built PositionIndex per user, LRU-bounded and refreshed after a TTL
+    as a backstop for writes that bypass the incremental hooks.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Optional[List[Dict]]],
+        ttl_s: float = POSITION_INDEX_TTL_S,
+        max_users: int = POSITION_INDEX_MAX_USERS
+    ):
+        self._loader = loader
+        self.ttl_s = ttl_s
+        self.max_users = max_users
+        self._indexes: "OrderedDict[str, PositionIndex]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, user_id: str) -> Optional[PositionIndex]:
+        index = self._indexes.get(user_id)
+        if index is not None and time.time() - index.loaded_at < self.ttl_s:
+            self._indexes.move_to_end(user_id)
+            return index
+        return None
+
+    def get(self, user_id: str) -> Optional[PositionIndex]:
+        """The user's index, loading it on first use. None if loading fails."""
+        with self._lock:
+            index = self._fresh(user_id)
+            if index is not None:
+                return index
+            user_lock = self._loading.setdefault(user_id, threading.Lock())
+
+        with user_lock:
+            with self._lock:
+                index = self._fresh(user_id)
+                if index is not None:
+                    return index
+
+            rows = self._loader(user_id)
+            if rows is None:
+                return None
+            index = PositionIndex(rows)
+
+            with self._lock:
+                self._indexes[user_id] = index
+                self._indexes.move_to_end(user_id)
+                while len(self._indexes) > self.max_users:
+                    evicted, _ = self._indexes.popitem(last=False)
+                    self._loading.pop(evicted, None)
+            return index
+
+    def peek(self, user_id: str) -> Optional[PositionIndex]:
+        """The user's index only if already loaded (for incremental updates)."""
+        with self._lock:
+            return self._indexes.get(user_id)
+
+    def mark_used(self, position_ids: List[str], used_at: str) -> None:
+        with self._lock:
+            indexes = list(self._indexes.values())
+        remaining = set(position_ids)
+        for index in indexes:
+            if not remaining:
+                break
+            if index.mark_used(remaining, used_at):
+                remaining = {pid for pid in remaining if pid not in index}
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(user_id, None)
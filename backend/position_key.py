@@ -0,0 +1,76 @@
+"""
+Position Key
+
+One canonical identity for a chess position, shared by every cache layer
+(investigation cache, baseline jobs, NNUE dumps, engine/investigator memo
+dicts, planner/interpreter caches, opening DB rows) so a position hits the
+same entry whichever subsystem looked it up first.
+
+- position_key(fen_or_board) -> int: 64-bit Polyglot Zobrist hash of piece
+  placement, side to move, castling rights and en passant (only when a pawn
+  can actually capture). Move counters are ignored, so transpositions share
+  a key.
+- position_key_hex(...) -> the same key as 16 hex chars (filenames, string
+  cache keys).
+- canonical_fen(fen) -> "placement turn castling ep" with en passant only
+  when legal; the human-readable form for logs and persisted rows.
+
+Strings that python-chess can't parse fall back to a stable 64-bit BLAKE2b
+digest of their first four whitespace-separated fields, so the same input
+always maps to the same key.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from functools import lru_cache
+from typing import Union
+
+import chess  # type: ignore
+import chess.polyglot  # type: ignore
+
+PositionLike = Union[str, chess.Board]
+
+
+def _fallback_fields(fen: str) -> str:
+    return " ".join((fen or "").split()[:4])
+
+
+def _fallback_key(fen: str) -> int:
+    digest = hashlib.blake2b(_fallback_fields(fen).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def board_key(board: chess.Board) -> int:
+    """Zobrist key of a board (cheap enough to call per push)."""
+    return chess.polyglot.zobrist_hash(board)
+
+
+@lru_cache(maxsize=16384)
+def _fen_key(fen: str) -> int:
+    try:
+        return board_key(chess.Board(fen))
+    except Exception:
+        return _fallback_key(fen)
+
+
+def position_key(position: PositionLike) -> int:
+    """Canonical 64-bit key for a FEN string or board."""
+    if isinstance(position, chess.Board):
+        return board_key(position)
+    return _fen_key((position or "").strip())
+
+
+def position_key_hex(position: PositionLike) -> str:
+    return f"{position_key(position):016x}"
+
+
+@lru_cache(maxsize=16384)
+def canonical_fen(fen: str) -> str:
+    """First four FEN fields with en passant only when a capture is legal."""
+    if not fen or not fen.strip():
+        return ""
+    try:
+        return " ".join(chess.Board(fen).fen(en_passant="legal").split()[:4])
+    except Exception:
+        return _fallback_fields(fen)
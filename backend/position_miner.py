@@ -8,6 +8,63 @@ from collections import defaultdict
 import random
 import json
 
+from structured_log import get_logger
+
+_log = get_logger("position_miner")
+
+
+def score_priority(
+    category: str,
+    cp_loss: float,
+    key_labels: Optional[List[str]] = None,
+    time_spent_s: Optional[float] = None,
+    focus_match: bool = False,
+    include_critical_choices: bool = True
+) -> float:
+    """
+    Priority score for a candidate drill position.
+    Shared by the ply-record miner and the saved-position index.
+    """
+    priority = 0.0
+    cp_loss = cp_loss or 0
+    key_labels = key_labels or []
+    
+    # Priority Tier 1: Blunders matching focus tags (10 points)
+    if category == "blunder":
+        priority += 10.0
+        if focus_match:
+            priority += 5.0  # Bonus for matching focus
+    
+    # Priority Tier 2: Mistakes matching focus tags (7 points)
+    elif category == "mistake":
+        priority += 7.0
+        if focus_match:
+            priority += 3.0
+    
+    # Priority Tier 3: Critical choices (5 points)
+    elif category == "critical_best" and include_critical_choices:
+        priority += 5.0
+    
+    # Priority Tier 4: Threshold crossings (3 points)
+    if any("threshold" in label for label in key_labels):
+        priority += 3.0
+    
+    # Priority Tier 5: Theory exits (2 points)
+    if "theory_exit" in key_labels:
+        priority += 2.0
+    
+    # Bonus for high CP loss (learning opportunity)
+    if cp_loss >= 100:
+        priority += 2.0
+    elif cp_loss >= 200:
+        priority += 4.0
+    
+    # Bonus for time trouble (if available)
+    if time_spent_s is not None and time_spent_s < 5 and cp_loss > 50:
+        priority += 2.0  # Fast mistakes
+    
+    return priority
+
 
 class PositionMiner:
     """Mines training positions from analyzed games"""
@@ -41,9 +98,9 @@ class PositionMiner:
         Returns:
             List of drill-ready positions
         """
-        print(f"\n🔍 POSITION MINER: Mining {max_positions} positions from {len(analyzed_games)} games")
-        print(f"   Focus tags: {focus_tags or 'all'}")
-        print(f"   Filters: phase={phase_filter or 'all'}, side={side_filter or 'both'}")
+        _log.info(lambda: f"\n🔍 POSITION MINER: Mining {max_positions} positions from {len(analyzed_games)} games")
+        _log.info(lambda: f"   Focus tags: {focus_tags or 'all'}")
+        _log.info(lambda: f"   Filters: phase={phase_filter or 'all'}, side={side_filter or 'both'}")
         
         # Build game context for better selection
         game_summaries = []
@@ -58,27 +115,27 @@ class PositionMiner:
                 "total_moves": game_meta.get("total_moves", 0)
             })
         
-        print(f"   Game types: {[g['character'] for g in game_summaries]}")
-        print(f"   Openings: {[g['opening'][:30] for g in game_summaries[:3]]}")
+        _log.info(lambda: f"   Game types: {[g['character'] for g in game_summaries]}")
+        _log.info(lambda: f"   Openings: {[g['opening'][:30] for g in game_summaries[:3]]}")
         
         # Log search criteria
-        print(f"\n   🔍 SEARCHING FOR:")
+        _log.info("\n   🔍 SEARCHING FOR:")
         if focus_tags:
-            print(f"      Tags matching: {', '.join(focus_tags)}")
+            _log.info(lambda: f"      Tags matching: {', '.join(focus_tags)}")
         if phase_filter:
-            print(f"      Phase: {phase_filter}")
+            _log.info(lambda: f"      Phase: {phase_filter}")
         if side_filter:
-            print(f"      Side: {side_filter}")
-        print(f"      Include critical choices: {include_critical_choices}")
-        print(f"      Priority: Blunders > Mistakes > Critical > Threshold events")
-        print()
+            _log.info(lambda: f"      Side: {side_filter}")
+        _log.info(lambda: f"      Include critical choices: {include_critical_choices}")
+        _log.info("      Priority: Blunders > Mistakes > Critical > Threshold events")
+        _log.info("")
         
         candidates = []
         moves_checked = 0
         
         # Extract candidates with priority scoring
         for game_idx, game in enumerate(analyzed_games):
-            print(f"   Searching game {game_idx + 1}/{len(analyzed_games)}...")
+            _log.debug(lambda: f"   Searching game {game_idx + 1}/{len(analyzed_games)}...")
             ply_records = game.get("ply_records", [])
             player_color = game.get("metadata", {}).get("player_color", "white")
             opening_name = game.get("opening", {}).get("name_final", "") or game.get("metadata", {}).get("opening", "")
@@ -125,13 +182,13 @@ class PositionMiner:
                     }
                     candidates.append(position)
         
-        print(f"\n   📊 SEARCH RESULTS:")
-        print(f"      Moves checked: {moves_checked}")
-        print(f"      Candidates found: {len(candidates)}")
+        _log.info("\n   📊 SEARCH RESULTS:")
+        _log.info(lambda: f"      Moves checked: {moves_checked}")
+        _log.info(lambda: f"      Candidates found: {len(candidates)}")
         
         if len(candidates) == 0:
-            print(f"      ⚠️ NO RELEVANT POSITIONS FOUND")
-            print(f"      Criteria may be too specific or games don't contain matching positions")
+            _log.warning(f"      ⚠️ NO RELEVANT POSITIONS FOUND")
+            _log.info("      Criteria may be too specific or games don't contain matching positions")
             return []  # Return empty list - frontend will handle
         
         # Show candidate breakdown
@@ -139,28 +196,88 @@ class PositionMiner:
         for c in candidates:
             cat = c.get("category", "unknown")
             by_category[cat] = by_category.get(cat, 0) + 1
-        print(f"      By category: {dict(by_category)}")
+        _log.info(lambda: f"      By category: {dict(by_category)}")
         
         # Sort by priority
         candidates.sort(key=lambda x: x["priority"], reverse=True)
         
         # Show top priorities
         top_3 = candidates[:3]
-        print(f"      Top 3 priorities:")
+        _log.info("      Top 3 priorities:")
         for i, c in enumerate(top_3):
             tags_str = ", ".join(self._extract_motifs(c["tags"]))[:40]
-            print(f"        {i+1}. {c['category']} (priority={c['priority']:.1f}): {c['best_move_san']} - tags: {tags_str}")
+            _log.info(lambda: f"        {i+1}. {c['category']} (priority={c['priority']:.1f}): {c['best_move_san']} - tags: {tags_str}")
         
         # Apply diversity rules
         selected = self._apply_diversity(candidates, max_positions)
         
-        print(f"\n   ✅ FINAL SELECTION: {len(selected)} positions")
+        _log.info(lambda: f"\n   ✅ FINAL SELECTION: {len(selected)} positions")
         if len(selected) == 0:
-            print(f"      ⚠️ Diversity filtering removed all candidates")
-            print(f"      Try broadening search criteria or increasing max_positions")
+            _log.warning(f"      ⚠️ Diversity filtering removed all candidates")
+            _log.info("      Try broadening search criteria or increasing max_positions")
         
         return selected
     
+    def mine_saved_positions(
+        self,
+        index,
+        focus_tags: Optional[List[str]] = None,
+        max_positions: int = 20,
+        phase_filter: Optional[str] = None,
+        side_filter: Optional[str] = None,
+        include_critical_choices: bool = True
+    ) -> List[Dict]:
+        """
+        Mine training positions from a user's saved-position index
+        (position_index.PositionIndex) instead of re-scanning game reviews.
+        
+        Ranking happens inside the index (top-k by priority); diversity rules
+        are applied to an over-fetched candidate list as in mine_positions.
+        """
+        _log.info(lambda: f"\n🔍 POSITION MINER: Mining {max_positions} positions from {len(index)} saved positions")
+        
+        rows = index.search(
+            limit=max_positions * 4,
+            order="priority",
+            focus_tags=focus_tags,
+            include_critical_choices=include_critical_choices,
+            phases=[phase_filter] if phase_filter else None,
+            side=side_filter,
+        )
+        candidates = [self._position_from_row(row) for row in rows]
+        selected = self._apply_diversity(candidates, max_positions)
+        
+        _log.info(lambda: f"   ✅ FINAL SELECTION: {len(selected)}/{len(candidates)} candidates")
+        return selected
+    
+    @staticmethod
+    def _position_from_row(row: Dict) -> Dict:
+        """Map a saved `positions` row to the mined-position shape"""
+        return {
+            "fen": row.get("fen"),
+            "side_to_move": row.get("side_to_move"),
+            "best_move_san": row.get("best_move_san"),
+            "best_move_uci": row.get("best_move_uci"),
+            "player_move_san": row.get("move_san"),
+            "player_move_uci": row.get("move_uci"),
+            "eval_before_cp": row.get("eval_cp") or 0,
+            "cp_loss": row.get("cp_loss") or 0,
+            "category": row.get("error_category"),
+            "phase": row.get("phase"),
+            "tags": row.get("tags_start") or [],
+            "themes": row.get("themes") or {},
+            "opening": row.get("opening_name") or "",
+            "source_game_id": row.get("from_game_id"),
+            "position_id": row.get("id"),
+            "ply": row.get("source_ply"),
+            "time_spent_s": row.get("time_spent_s"),
+            "priority": row.get("priority", 0.0),
+            "key_point_labels": [],
+            "error_note": row.get("error_note") or "",
+            "critical_note": row.get("critical_note") or "",
+            "is_critical": row.get("is_critical", False),
+        }
+    
     def _calculate_priority(
         self,
         record: Dict,
@@ -168,48 +285,14 @@ class PositionMiner:
         include_critical_choices: bool
     ) -> float:
         """Calculate priority score for a position"""
-        priority = 0.0
-        
-        category = record.get("category", "")
-        cp_loss = record.get("cp_loss", 0)
-        key_labels = record.get("key_point_labels", [])
-        
-        # Priority Tier 1: Blunders matching focus tags (10 points)
-        if category == "blunder":
-            priority += 10.0
-            if focus_tags and self._has_matching_tag(record, focus_tags):
-                priority += 5.0  # Bonus for matching focus
-        
-        # Priority Tier 2: Mistakes matching focus tags (7 points)
-        elif category == "mistake":
-            priority += 7.0
-            if focus_tags and self._has_matching_tag(record, focus_tags):
-                priority += 3.0
-        
-        # Priority Tier 3: Critical choices (5 points)
-        elif category == "critical_best" and include_critical_choices:
-            priority += 5.0
-        
-        # Priority Tier 4: Threshold crossings (3 points)
-        if any("threshold" in label for label in key_labels):
-            priority += 3.0
-        
-        # Priority Tier 5: Theory exits (2 points)
-        if "theory_exit" in key_labels:
-            priority += 2.0
-        
-        # Bonus for high CP loss (learning opportunity)
-        if cp_loss >= 100:
-            priority += 2.0
-        elif cp_loss >= 200:
-            priority += 4.0
-        
-        # Bonus for time trouble (if available)
-        time_spent = record.get("time_spent_s")
-        if time_spent is not None and time_spent < 5 and cp_loss > 50:
-            priority += 2.0  # Fast mistakes
-        
-        return priority
+        return score_priority(
+            category=record.get("category", ""),
+            cp_loss=record.get("cp_loss", 0),
+            key_labels=record.get("key_point_labels", []),
+            time_spent_s=record.get("time_spent_s"),
+            focus_match=bool(focus_tags) and self._has_matching_tag(record, focus_tags),
+            include_critical_choices=include_critical_choices,
+        )
     
     def _has_matching_tag(self, record: Dict, focus_tags: List[str]) -> bool:
         """Check if record has any of the focus tags"""
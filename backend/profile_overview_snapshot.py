@@ -5,10 +5,17 @@ Design goals:
 - Fast to compute (last ~60 games only)
 - No deep/engine-heavy metrics
 - Friendly, non-technical labels (time style + identity)
+
+PGN-derived inputs (user clock series, time-style features, ply count) are
+extracted once at ingest (extract_overview_features -> games.overview_features)
+and the snapshot is kept materialized per user (OverviewSnapshotView), updated
+when a game is added or compressed, so a request reads one stored row instead
+of re-parsing every PGN in the window.
 """
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from datetime import datetime
 from io import StringIO
@@ -71,30 +78,31 @@ def _std(values: List[float]) -> Optional[float]:
     return var ** 0.5
 
 
-def _parse_user_clocks_from_pgn(pgn: str, user_color: str) -> List[float]:
-    """
-    Returns list of clock remaining (seconds) AFTER each of the user's moves.
-    Uses [%clk H:MM:SS(.d)] comments if present.
-    """
-    if not isinstance(pgn, str) or "[%clk" not in pgn:
-        return []
+_CLK_RE = re.compile(r"\[%clk (\d+):(\d+):(\d+(?:\.\d+)?)\]")
+
+# Bump when extract_overview_features changes shape (older rows are re-extracted from PGN)
+OVERVIEW_FEATURES_VERSION = 1
+
 
+def _parse_pgn_plies_and_clocks(pgn: str) -> Tuple[int, Dict[int, float]]:
+    """One pass over the mainline: ply count and [%clk H:MM:SS(.d)] remaining per ply."""
+    if not isinstance(pgn, str):
+        return 0, {}
     game = chess.pgn.read_game(StringIO(pgn))
     if not game:
-        return []
+        return 0, {}
 
     clocks_by_ply: Dict[int, float] = {}
+    has_clocks = "[%clk" in pgn
     ply = 0
     node = game
-
-    import re
-
     while node.variations:
         node = node.variation(0)
         ply += 1
-        comment = node.comment or ""
+        if not has_clocks:
+            continue
         # Matches [%clk 0:05:23] or [%clk 0:05:23.5]
-        m = re.search(r"\[%clk (\d+):(\d+):(\d+(?:\.\d+)?)\]", comment)
+        m = _CLK_RE.search(node.comment or "")
         if not m:
             continue
         h, mm, ss = m.groups()
@@ -102,10 +110,10 @@ def _parse_user_clocks_from_pgn(pgn: str, user_color: str) -> List[float]:
             clocks_by_ply[ply] = int(h) * 3600 + int(mm) * 60 + float(ss)
         except Exception:
             continue
+    return ply, clocks_by_ply
 
-    if not clocks_by_ply:
-        return []
 
+def _user_clocks(clocks_by_ply: Dict[int, float], user_color: str) -> List[float]:
     want_white = user_color == "white"
     user_clocks: List[float] = []
     for p in sorted(clocks_by_ply.keys()):
@@ -115,6 +123,69 @@ def _parse_user_clocks_from_pgn(pgn: str, user_color: str) -> List[float]:
     return user_clocks
 
 
+def _parse_user_clocks_from_pgn(pgn: str, user_color: str) -> List[float]:
+    """
+    Returns list of clock remaining (seconds) AFTER each of the user's moves.
+    Uses [%clk H:MM:SS(.d)] comments if present.
+    """
+    if not isinstance(pgn, str) or "[%clk" not in pgn:
+        return []
+    _plies, clocks_by_ply = _parse_pgn_plies_and_clocks(pgn)
+    return _user_clocks(clocks_by_ply, user_color)
+
+
+def _clock_features(clocks: List[float]) -> Dict[str, Any]:
+    """Per-game time-style inputs from the user's clock series (None when not measurable)."""
+    features: Dict[str, Any] = {"clk_n": len(clocks), "early_burn": None, "late_pressure": None, "pressure": False}
+    if len(clocks) < 6:
+        return features
+    # Estimate initial clock from early maximum (robust vs increments)
+    initial = max(clocks[: min(8, len(clocks))])
+    if initial <= 0:
+        return features
+
+    last = clocks[-1]
+    denom = max(1e-9, initial - last)
+
+    idx30 = max(0, int((len(clocks) * 0.30) - 1))
+    c30 = clocks[idx30]
+    early_burn = (initial - c30) / denom
+    features["early_burn"] = round(max(0.0, min(1.0, float(early_burn))), 6)
+
+    late_moves = [c for c in clocks if (c / initial) < 0.10]
+    features["late_pressure"] = round(len(late_moves) / len(clocks), 6)
+    features["pressure"] = bool(late_moves)
+    return features
+
+
+def extract_overview_features(pgn: Optional[str], user_color: Optional[str]) -> Dict[str, Any]:
+    """
+    Everything the Overview needs from a game's PGN, extracted once at ingest.
+
+    Returns {"v", "plies", "clk" (user clock remaining in deciseconds),
+    "clk_n", "early_burn", "late_pressure", "pressure"}; small enough to
+    store on the games row.
+    """
+    plies, clocks_by_ply = _parse_pgn_plies_and_clocks(pgn) if isinstance(pgn, str) else (0, {})
+    clocks = _user_clocks(clocks_by_ply, user_color) if user_color in ("white", "black") else []
+    return {
+        "v": OVERVIEW_FEATURES_VERSION,
+        "plies": plies if isinstance(pgn, str) else None,
+        "clk": [int(round(c * 10)) for c in clocks],
+        **_clock_features(clocks),
+    }
+
+
+def _game_features(g: Dict[str, Any]) -> Dict[str, Any]:
+    """Stored overview_features for a game row, extracting from the PGN for rows saved before them."""
+    features = g.get("overview_features")
+    if isinstance(features, dict) and features.get("v") == OVERVIEW_FEATURES_VERSION:
+        return features
+    features = extract_overview_features(g.get("pgn"), g.get("user_color"))
+    g["overview_features"] = features
+    return features
+
+
 def _time_style_from_games(games_desc: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Compute a single label using true clock remaining from PGN comments.
@@ -134,34 +205,20 @@ def _time_style_from_games(games_desc: List[Dict[str, Any]]) -> Dict[str, Any]:
             if r != "loss":
                 overall_non_loss += 1
 
-        pgn = g.get("pgn")
-        user_color = g.get("user_color")
-        if not isinstance(pgn, str) or user_color not in ("white", "black"):
+        if g.get("user_color") not in ("white", "black"):
             continue
 
-        clocks = _parse_user_clocks_from_pgn(pgn, user_color)
-        if len(clocks) < 6:
+        features = _game_features(g)
+        if (features.get("clk_n") or 0) < 6:
             continue
 
         games_with_clock += 1
-        # Estimate initial clock from early maximum (robust vs increments)
-        initial = max(clocks[: min(8, len(clocks))])
-        if initial <= 0:
+        if features.get("early_burn") is None:
             continue
+        early_burn_vals.append(float(features["early_burn"]))
+        late_pressure_vals.append(float(features["late_pressure"]))
 
-        last = clocks[-1]
-        denom = max(1e-9, initial - last)
-
-        idx30 = max(0, int((len(clocks) * 0.30) - 1))
-        c30 = clocks[idx30]
-        early_burn = (initial - c30) / denom
-        early_burn_vals.append(max(0.0, min(1.0, float(early_burn))))
-
-        late_moves = [c for c in clocks if (c / initial) < 0.10]
-        late_pressure = len(late_moves) / len(clocks)
-        late_pressure_vals.append(float(late_pressure))
-
-        if late_moves:
+        if features.get("pressure"):
             pressure_games += 1
             if r in ("win", "draw"):
                 pressure_non_loss += 1
@@ -290,14 +347,12 @@ def _identity_labels(
     long_total = 0
     long_non_loss_cnt = 0
     for g in games_desc:
-        pgn = g.get("pgn")
         r = g.get("result")
-        if not isinstance(pgn, str) or r not in ("win", "draw", "loss"):
+        if r not in ("win", "draw", "loss"):
             continue
-        game = chess.pgn.read_game(StringIO(pgn))
-        if not game:
+        plies = _game_features(g).get("plies")
+        if plies is None:
             continue
-        plies = sum(1 for _ in game.mainline_moves())
         if plies >= 100:  # 50 moves
             long_total += 1
             if r != "loss":
@@ -398,3 +453,94 @@ def build_overview_snapshot(games: List[Dict[str, Any]], window: int = 60) -> Di
     }
 
 
+
+
+# Game row fields the snapshot reads (plus overview_features)
+SNAPSHOT_GAME_FIELDS = (
+    "id", "game_date", "created_at", "updated_at", "user_color", "user_rating",
+    "result", "opening_name", "accuracy_overall", "time_control",
+)
+
+
+def compact_snapshot_game(g: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of a game row the snapshot needs (no PGN, no clock series)."""
+    row = {k: g[k] for k in SNAPSHOT_GAME_FIELDS if g.get(k) is not None}
+    features = dict(_game_features(g))
+    features.pop("clk", None)
+    row["overview_features"] = features
+    return row
+
+
+class OverviewSnapshotView:
+    """
+    Materialized Overview for one user: compact rows for the window's games
+    (most recent first) and the snapshot rendered from them.
+
+    add_game / remove_game keep it current as games are ingested or
+    compressed; a request just returns `snapshot`.
+    """
+
+    def __init__(
+        self,
+        window: int = 60,
+        games: Optional[List[Dict[str, Any]]] = None,
+        snapshot: Optional[Dict[str, Any]] = None,
+        truncated: bool = False,
+    ):
+        self.window = int(window)
+        self.games: List[Dict[str, Any]] = list(games or [])
+        self.snapshot = snapshot
+        # True once older games fell off the end: a shrunken window can't be refilled locally
+        self.truncated = truncated
+
+    @classmethod
+    def build(cls, games: List[Dict[str, Any]], window: int = 60) -> "OverviewSnapshotView":
+        games_desc = sorted(games, key=_safe_date_key, reverse=True)
+        view = cls(window, [compact_snapshot_game(g) for g in games_desc[: int(window)]], truncated=len(games_desc) >= int(window))
+        view.render()
+        return view
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "OverviewSnapshotView":
+        return cls(row.get("window_size") or 60, row.get("games"), row.get("snapshot"), bool(row.get("truncated")))
+
+    def to_row(self) -> Dict[str, Any]:
+        return {"window_size": self.window, "games": self.games, "snapshot": self.snapshot, "truncated": self.truncated}
+
+    @property
+    def needs_rebuild(self) -> bool:
+        return self.truncated and len(self.games) < self.window
+
+    def render(self) -> Dict[str, Any]:
+        self.snapshot = build_overview_snapshot(self.games, window=self.window)
+        return self.snapshot
+
+    def add_game(self, game: Dict[str, Any]) -> None:
+        """Insert (or replace) a newly ingested game and re-render."""
+        row = compact_snapshot_game(game)
+        games = [g for g in self.games if g.get("id") != row.get("id")] + [row]
+        games.sort(key=_safe_date_key, reverse=True)
+        if len(games) > self.window:
+            self.truncated = True
+        self.games = games[: self.window]
+        self.render()
+
+    def remove_game(self, game_id: str) -> bool:
+        """Drop a compressed/archived game; returns False if it wasn't in the window."""
+        games = [g for g in self.games if g.get("id") != game_id]
+        if len(games) == len(self.games):
+            return False
+        self.games = games
+        self.render()
+        return True
+
+    def snapshot_for(self, window: int) -> Optional[Dict[str, Any]]:
+        """Snapshot for a requested window, or None when the view can't answer it without a rebuild."""
+        window = int(window)
+        if self.needs_rebuild or self.snapshot is None:
+            return None
+        if window == self.window:
+            return self.snapshot
+        if window < self.window or not self.truncated:
+            return build_overview_snapshot(self.games, window=window)
+        return None
@@ -0,0 +1,407 @@
+"""
+Prompt Compiler
+Token-budgeted assembly of evidence sections for LLM prompts.
+
+Each section has a priority and an optional token cap. Values are rendered
+as compact JSON (no indentation, empty fields dropped, floats rounded).
+FENs that appear more than once become short aliases, defined once in a
+POSITIONS legend. A subtree repeated in a later section becomes a reference
+to its first occurrence. Sections are fitted highest priority first. Lists
+are trimmed from the tail (with a "+N more" marker) until the section fits
+its share of the budget. A section that can't fit at all is omitted.
+
+Token counts come from a local tokenizer, so prompt size is known before
+sending: tiktoken (a backend requirement), or a deterministic BPE-like
+estimate when it can't be loaded. Router stats label estimated counts.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import re
+
+# Tokenizer (lazy; falls back to an estimate if tiktoken can't be loaded)
+_ENCODING = None
+_ENCODING_LOADED = False
+
+# Pieces a BPE tokenizer rarely merges across: words, short digit runs,
+# single punctuation marks, whitespace runs
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d{1,3}|\s+|[^\sA-Za-z\d]")
+
+_FEN_RE = re.compile(r"^[pnbrqkPNBRQK1-8]+(?:/[pnbrqkPNBRQK1-8]+){7} [wb] (?:-|[KQkq]+) (?:-|[a-h][36])(?: \d+ \d+)?$")
+
+# Subtrees shorter than this (compact JSON chars) are cheaper to repeat than to reference
+MIN_SHARED_CHARS = 60
+# Long strings are cut to this many chars when a section still doesn't fit after list trimming
+MIN_STRING_CHARS = 80
+# Sections whose allowance drops below this are omitted rather than shown as a stub
+MIN_SECTION_TOKENS = 24
+
+TRIM_MARKER = "… +{n} more"
+_TRIM_MARKER_RE = re.compile(r"^… \+(\d+) more$")
+
+
+def _get_encoding():
+    global _ENCODING, _ENCODING_LOADED
+    if not _ENCODING_LOADED:
+        _ENCODING_LOADED = True
+        try:
+            import tiktoken
+            _ENCODING = tiktoken.get_encoding(os.getenv("PROMPT_TOKENIZER_ENCODING", "cl100k_base"))
+        except Exception:
+            _ENCODING = None
+    return _ENCODING
+
+
+def tokenizer_is_exact() -> bool:
+    """True when count_tokens() uses tiktoken rather than the estimate."""
+    return _get_encoding() is not None
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """
+    Input token count for `text`, measured locally.
+    Exact with tiktoken; otherwise an estimate that tracks BPE tokenizers on
+    English text and compact JSON far better than chars/4.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece.isspace():
+            # A single space merges into the next word
+            tokens += 0 if piece == " " else 1
+        elif piece[0].isalpha():
+            tokens += 1 + (len(piece) - 1) // 6
+        else:
+            tokens += 1
+    return tokens
+
+
+def _prune(value: Any) -> Any:
+    """Drop None/empty fields and round floats (they cost tokens and carry nothing)"""
+    if isinstance(value, dict):
+        pruned = {}
+        for key, item in value.items():
+            item = _prune(item)
+            if item is None or item == "" or item == [] or item == {}:
+                continue
+            pruned[str(key)] = item
+        return pruned
+    if isinstance(value, (list, tuple, set)):
+        return [_prune(item) for item in value if item is not None]
+    if isinstance(value, float):
+        return round(value, 2)
+    if isinstance(value, (str, int, bool)) or value is None:
+        return value
+    if hasattr(value, "to_dict"):
+        try:
+            return _prune(value.to_dict())
+        except Exception:
+            pass
+    return str(value)
+
+
+def compact_json(value: Any) -> str:
+    """Compact, deterministic JSON (no indentation or spaces after separators)"""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _render(value: Any) -> str:
+    return value if isinstance(value, str) else compact_json(value)
+
+
+@dataclass
+class PromptSection:
+    """One block of evidence in a prompt"""
+    name: str
+    value: Any
+    priority: int = 50                 # Lower = more important (fitted first, never trimmed for others)
+    max_tokens: Optional[int] = None   # Cap for this section (None = only the overall budget)
+    label: Optional[str] = None        # Used in cross-section references
+    empty_text: str = "None"
+
+
+@dataclass
+class CompiledPrompt:
+    """Rendered sections plus token accounting"""
+    sections: Dict[str, str]
+    legend: str = ""
+    section_tokens: Dict[str, int] = field(default_factory=dict)
+    trimmed: List[str] = field(default_factory=list)
+    omitted: List[str] = field(default_factory=list)
+    aliases: int = 0
+    references: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.section_tokens.values()) + count_tokens(self.legend)
+
+    def __getitem__(self, name: str) -> str:
+        return self.sections[name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "total_tokens": self.total_tokens,
+            "section_tokens": dict(self.section_tokens),
+            "trimmed": list(self.trimmed),
+            "omitted": list(self.omitted),
+            "fen_aliases": self.aliases,
+            "references": self.references,
+        }
+
+
+class PromptCompiler:
+    """
+    Collects prompt sections and compiles them to fit a token budget.
+
+    Usage:
+        compiler = PromptCompiler(budget_tokens=5000)
+        compiler.add("facts", facts, priority=10, max_tokens=1200, label="INVESTIGATION FACTS")
+        compiled = compiler.compile()
+        prompt = f"...{compiled.legend}...{compiled['facts']}..."
+    """
+
+    def __init__(self, budget_tokens: Optional[int] = None):
+        self.budget_tokens = budget_tokens
+        self._sections: List[PromptSection] = []
+
+    def add(
+        self,
+        name: str,
+        value: Any,
+        *,
+        priority: int = 50,
+        max_tokens: Optional[int] = None,
+        label: Optional[str] = None,
+        empty_text: str = "None",
+    ) -> "PromptCompiler":
+        """Add a section (later sections with the same name replace earlier ones)"""
+        self._sections = [s for s in self._sections if s.name != name]
+        self._sections.append(PromptSection(name, value, priority, max_tokens, label, empty_text))
+        return self
+
+    def compile(self) -> CompiledPrompt:
+        """Fit sections to the budget, highest priority first, and render them"""
+        ordered = sorted(self._sections, key=lambda s: s.priority)
+        values = {s.name: _prune(s.value) for s in ordered}
+
+        fens = self._alias_fens(values)
+        legend = ""
+        if fens:
+            legend = "POSITIONS (FEN aliases used below):\n" + "\n".join(f"{alias} = {fen}" for fen, alias in fens.items())
+
+        remaining = None
+        if self.budget_tokens is not None:
+            remaining = self.budget_tokens - count_tokens(legend)
+
+        compiled = CompiledPrompt(sections={}, legend=legend, aliases=len(fens))
+        fitted: Dict[str, Any] = {}
+        for section in ordered:
+            value = values[section.name]
+            if value is None or value == "" or value == [] or value == {}:
+                fitted[section.name] = None
+                continue
+            allowance = section.max_tokens
+            if remaining is not None:
+                allowance = remaining if allowance is None else min(allowance, remaining)
+            if allowance is not None and allowance < MIN_SECTION_TOKENS:
+                compiled.omitted.append(section.name)
+                fitted[section.name] = None
+                continue
+            value, was_trimmed = _fit(value, allowance)
+            if value is None:
+                compiled.omitted.append(section.name)
+            elif was_trimmed:
+                compiled.trimmed.append(section.name)
+            fitted[section.name] = value
+            if remaining is not None and value is not None:
+                remaining -= count_tokens(_render(value))
+
+        compiled.references = self._reference_repeats(ordered, fitted)
+
+        for section in self._sections:
+            value = fitted.get(section.name)
+            if section.name in compiled.omitted:
+                text = "(omitted: token budget)"
+            elif value is None:
+                text = section.empty_text
+            else:
+                text = _render(value)
+            compiled.sections[section.name] = text
+            compiled.section_tokens[section.name] = count_tokens(text)
+
+        if legend:
+            # Drop aliases no surviving section uses
+            used = "\n".join(compiled.sections.values())
+            kept = [(fen, alias) for fen, alias in fens.items() if alias in used]
+            compiled.aliases = len(kept)
+            compiled.legend = (
+                "POSITIONS (FEN aliases used below):\n" + "\n".join(f"{alias} = {fen}" for fen, alias in kept)
+                if kept else ""
+            )
+        return compiled
+
+    @staticmethod
+    def _alias_fens(values: Dict[str, Any]) -> Dict[str, str]:
+        """Replace FENs seen more than once with @fenN (in place); returns fen -> alias"""
+        counts: Dict[str, int] = {}
+
+        def count(value: Any):
+            if isinstance(value, dict):
+                for item in value.values():
+                    count(item)
+            elif isinstance(value, list):
+                for item in value:
+                    count(item)
+            elif isinstance(value, str) and _FEN_RE.match(value):
+                counts[value] = counts.get(value, 0) + 1
+
+        for value in values.values():
+            count(value)
+        aliases = {}
+        for fen, n in counts.items():
+            if n > 1:
+                aliases[fen] = f"@fen{len(aliases) + 1}"
+        if not aliases:
+            return aliases
+
+        def replace(value: Any) -> Any:
+            if isinstance(value, dict):
+                return {key: replace(item) for key, item in value.items()}
+            if isinstance(value, list):
+                return [replace(item) for item in value]
+            if isinstance(value, str):
+                return aliases.get(value, value)
+            return value
+
+        for name in values:
+            values[name] = replace(values[name])
+        return aliases
+
+    @staticmethod
+    def _reference_repeats(ordered: List[PromptSection], fitted: Dict[str, Any]) -> int:
+        """
+        Replace subtrees already shown in a higher-priority section with a
+        reference to where they first appeared (in place). Runs after fitting,
+        so every reference target is actually in the prompt.
+        """
+        seen: Dict[str, str] = {}
+        references = 0
+
+        def walk(value: Any, where: str) -> Any:
+            nonlocal references
+            if isinstance(value, (dict, list)) and value:
+                encoded = compact_json(value)
+                if len(encoded) >= MIN_SHARED_CHARS:
+                    if encoded in seen:
+                        references += 1
+                        return f"<same as {seen[encoded]}>"
+                    seen[encoded] = where
+                if isinstance(value, dict):
+                    return {key: walk(item, f"{where}.{key}") for key, item in value.items()}
+                return [walk(item, f"{where}[{i}]") for i, item in enumerate(value)]
+            return value
+
+        for section in ordered:
+            if fitted.get(section.name) is not None:
+                fitted[section.name] = walk(fitted[section.name], section.label or section.name)
+        return references
+
+
+def _fit(value: Any, max_tokens: Optional[int]) -> Tuple[Any, bool]:
+    """
+    Shrink `value` until it renders within `max_tokens`.
+    Returns (value, trimmed); value is None if it can't fit.
+    """
+    if max_tokens is None or count_tokens(_render(value)) <= max_tokens:
+        return value, False
+
+    if isinstance(value, str):
+        return _truncate_text(value, max_tokens), True
+
+    while count_tokens(_render(value)) > max_tokens:
+        if not _trim_largest_list(value) and not _cut_longest_string(value):
+            return None, True
+    return value, True
+
+
+def _truncate_text(text: str, max_tokens: int) -> Optional[str]:
+    """Longest prefix of `text` (plus a marker) within max_tokens"""
+    marker = "\n… <truncated>"
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(text[:mid] + marker) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + marker if lo else None
+
+
+def _containers(value: Any):
+    """All dicts/lists inside `value` (including itself)"""
+    stack = [value]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            yield current
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            yield current
+            stack.extend(current)
+
+
+def _trim_largest_list(value: Any) -> bool:
+    """Halve the list with the largest rendering (keeping its head). False if none can shrink."""
+    best: Optional[List[Any]] = None
+    best_size = 0
+    for container in _containers(value):
+        if not isinstance(container, list):
+            continue
+        items = len(container) - (1 if _trimmed_count(container) else 0)
+        if items <= 1:
+            continue
+        size = len(compact_json(container))
+        if size > best_size:
+            best, best_size = container, size
+    if best is None:
+        return False
+
+    already = _trimmed_count(best)
+    if already:
+        best.pop()
+    keep = len(best) // 2
+    dropped = len(best) - keep
+    del best[keep:]
+    best.append(TRIM_MARKER.format(n=dropped + already))
+    return True
+
+
+def _trimmed_count(items: List[Any]) -> int:
+    if items and isinstance(items[-1], str):
+        match = _TRIM_MARKER_RE.match(items[-1])
+        if match:
+            return int(match.group(1))
+    return 0
+
+
+def _cut_longest_string(value: Any) -> bool:
+    """Halve the longest string value above MIN_STRING_CHARS. False if there is none."""
+    best: Optional[Tuple[Any, Any]] = None
+    best_len = MIN_STRING_CHARS + 1
+    for container in _containers(value):
+        keys = container.keys() if isinstance(container, dict) else range(len(container))
+        for key in keys:
+            item = container[key]
+            if isinstance(item, str) and len(item) > best_len:
+                best, best_len = (container, key), len(item)
+    if best is None:
+        return False
+    container, key = best
+    container[key] = container[key][: max(MIN_STRING_CHARS, best_len // 2)] + "…"
+    return True
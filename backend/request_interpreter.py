@@ -11,6 +11,8 @@ import os
 
 import chess
 
+from position_key import position_key_hex
+
 from orchestration_plan import (
     OrchestrationPlan,
     IntentPlan,
@@ -214,19 +216,10 @@ class RequestInterpreter:
         
         return moves, cleaned_message
 
-    def _normalize_fen_for_cache(self, fen: Optional[str]) -> str:
-        """Normalize FEN for cache keys (strip move counters)."""
-        if not fen or not isinstance(fen, str):
-            return ""
-        try:
-            return " ".join(fen.split()[:4])
-        except Exception:
-            return str(fen)
-
     def _connected_ideas_cache_key(self, fen: Optional[str], message: str) -> str:
-        fen_norm = self._normalize_fen_for_cache(fen)
+        pos = position_key_hex(fen) if isinstance(fen, str) and fen else ""
         msg = (message or "").strip().lower()
-        return f"{fen_norm}|{msg}"
+        return f"{pos}|{msg}"
 
     def _should_run_connected_ideas(
         self,
@@ -650,7 +643,7 @@ The user is asking about this resulting position.
                 prompt_tokens = None
                 completion_tokens = None
             try:
-                if _timer:
+                if _timer and response is not None:  # router calls are recorded by the LLMRouter
                     _timer.record_llm("interpreter_intent", float(locals().get("_dt_intent", 0.0)), tokens_in=prompt_tokens, tokens_out=completion_tokens, model=self.model)
             except Exception:
                 pass
@@ -876,20 +869,7 @@ INVESTIGATION REQUESTS (from prior pass):
                                     rel_resp = None
 
                             if rel_resp is not None:
-                                # Record token usage for cost audits
-                                try:
-                                    usage = getattr(rel_resp, "usage", None)
-                                    prompt_tokens = getattr(usage, "prompt_tokens", None)
-                                    completion_tokens = getattr(usage, "completion_tokens", None)
-                                except Exception:
-                                    prompt_tokens = None
-                                    completion_tokens = None
-                                try:
-                                    if _timer:
-                                        _timer.record_llm("interpreter_connected_ideas", float(locals().get("_dt_connected", 0.0)), tokens_in=prompt_tokens, tokens_out=completion_tokens, model=connected_model)
-                                except Exception:
-                                    pass
-
+                                # Token usage is recorded by the LLMRouter (router:interpreter_connected_ideas)
                                 intent_plan.connected_ideas = rel_resp if isinstance(rel_resp, dict) else None
                             else:
                                 intent_plan.connected_ideas = None
@@ -21,6 +21,8 @@ from typing import Any, Dict, List, Optional
 
 import chess
 
+from static_exchange import position_see
+
 
 def detect_all_piece_roles(
     fen: str,
@@ -42,6 +44,7 @@ def detect_all_piece_roles(
         return {}
 
     roles: Dict[str, List[str]] = {}
+    see = position_see(board)
 
     # Cache king squares for "defending king" heuristics
     wk = board.king(chess.WHITE)
@@ -62,15 +65,15 @@ def detect_all_piece_roles(
 
         # --- Status roles (tactical-ish, deterministic) ---
         # Hanging: attacked by opponent and not defended by own side.
-        attacked_by_opp = board.is_attacked_by(not color, sq)
-        defended_by_self = board.is_attacked_by(color, sq)
+        attacked_by_opp = see.is_attacked_by(not color, sq)
+        defended_by_self = see.is_attacked_by(color, sq)
         if attacked_by_opp and not defended_by_self:
             rlist.append("role.status.hanging")
 
         # Trapped-ish: very low mobility and most destinations are unsafe.
         legal_dests = list(board.attacks(sq))
         if piece.piece_type in (chess.KNIGHT, chess.BISHOP, chess.ROOK) and legal_dests:
-            safe_dests = [d for d in legal_dests if not board.is_attacked_by(not color, d)]
+            safe_dests = [d for d in legal_dests if not see.is_attacked_by(not color, d)]
             if len(safe_dests) <= 1 and len(legal_dests) >= 2:
                 rlist.append("role.status.trapped")
 
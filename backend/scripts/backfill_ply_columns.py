@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Backfill script to encode ply_columns for existing reviewed games.
+This should be run once after deploying the games.ply_columns migration (036).
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supabase_client import SupabaseClient
+from ply_columns import encode_ply_columns_b64
+
+
+def backfill_user(user_id: str, supabase: SupabaseClient, limit: int = 60):
+    """Encode ply_columns for a single user's most recent games that lack them."""
+    print(f"\n🔄 Processing user: {user_id}")
+
+    try:
+        result = supabase.client.table("games")\
+            .select("id,game_review")\
+            .eq("user_id", user_id)\
+            .not_.is_("analyzed_at", "null")\
+            .is_("ply_columns", "null")\
+            .order("updated_at", desc=True)\
+            .limit(limit)\
+            .execute()
+        games = result.data or []
+
+        if not games:
+            print(f"   ℹ️ No games without ply_columns for user {user_id}")
+            return 0
+
+        print(f"   📚 Found {len(games)} games")
+
+        saved_count = 0
+        for game in games:
+            game_id = game.get("id")
+            game_review = game.get("game_review")
+            if not game_id or not isinstance(game_review, dict):
+                continue
+
+            try:
+                encoded = encode_ply_columns_b64(game_review)
+                if not encoded:
+                    continue
+                supabase.client.table("games")\
+                    .update({"ply_columns": encoded})\
+                    .eq("id", game_id)\
+                    .execute()
+                saved_count += 1
+            except Exception as e:
+                print(f"   ⚠️ Error processing game {game_id}: {e}")
+                continue
+
+        print(f"   ✅ Encoded ply_columns for {saved_count}/{len(games)} games")
+        return saved_count
+
+    except Exception as e:
+        print(f"   ❌ Error processing user {user_id}: {e}")
+        import traceback
+        traceback.print_exc()
+        return 0
+
+
+def main():
+    """Backfill ply_columns for all users or a specific user."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backfill ply_columns for existing games")
+    parser.add_argument("--user-id", type=str, help="Specific user ID to backfill (optional)")
+    parser.add_argument("--limit", type=int, default=60, help="Number of games per user to process (default: 60)")
+    args = parser.parse_args()
+
+    # Initialize Supabase client
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+
+        supabase_url = os.getenv("SUPABASE_URL")
+        supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+        if not supabase_url or not supabase_key:
+            print("❌ Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in environment")
+            return
+
+        supabase = SupabaseClient(supabase_url, supabase_key)
+        print("✅ Connected to Supabase")
+    except Exception as e:
+        print(f"❌ Failed to initialize Supabase client: {e}")
+        return
+
+    if args.user_id:
+        backfill_user(args.user_id, supabase, args.limit)
+    else:
+        print("🔍 Finding all users with analyzed games...")
+        try:
+            result = supabase.client.table("games")\
+                .select("user_id")\
+                .not_.is_("analyzed_at", "null")\
+                .is_("ply_columns", "null")\
+                .execute()
+
+            user_ids = list(set([g.get("user_id") for g in (result.data or []) if g.get("user_id")]))
+            print(f"📊 Found {len(user_ids)} users with games to encode")
+
+            total_saved = 0
+            for user_id in user_ids:
+                total_saved += backfill_user(user_id, supabase, args.limit)
+
+            print(f"\n✅ Backfill complete: {total_saved} games encoded across {len(user_ids)} users")
+        except Exception as e:
+            print(f"❌ Error finding users: {e}")
+            import traceback
+            traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
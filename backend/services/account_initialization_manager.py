@@ -7,20 +7,44 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import asyncio
 
+# Users per grouped count query, and per-user work (analysis trigger / compression) in flight at once
+MAINTENANCE_BATCH_SIZE = 200
+MAINTENANCE_CONCURRENCY = 8
+TARGET_ACTIVE_GAMES = 60
+
+
+def _profile_accounts(profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Linked accounts from a profiles row (linked_accounts, else the username columns)."""
+    linked_accounts = profile.get("linked_accounts") or []
+    if linked_accounts:
+        return linked_accounts if isinstance(linked_accounts, list) else []
+    accounts: List[Dict[str, Any]] = []
+    if profile.get("chesscom_username"):
+        accounts.append({"platform": "chess.com", "username": profile["chesscom_username"]})
+    if profile.get("lichess_username"):
+        accounts.append({"platform": "lichess", "username": profile["lichess_username"]})
+    return accounts
+
+
 class AccountInitializationManager:
-    def __init__(self, supabase_client, profile_indexer, game_window_manager):
+    def __init__(self, supabase_client, profile_indexer, game_window_manager, concurrency: int = MAINTENANCE_CONCURRENCY):
         self.supabase = supabase_client
         self.profile_indexer = profile_indexer
         self.game_window_manager = game_window_manager
+        self.concurrency = max(1, int(concurrency))
     
     async def check_all_accounts(self) -> Dict[str, Any]:
         """
         Check all user accounts and ensure they have 60 games analyzed.
         Returns summary of accounts checked and actions taken.
+        
+        Game counts come from one grouped query per batch of users; only users
+        below or above the 60-game window get per-user work, fanned out with
+        bounded concurrency.
         """
         # Get all user profiles
         print(f"🔍 [ACCOUNT_CHECK] Getting all profiles...")
-        profiles = self.supabase.get_all_profiles()
+        profiles = await asyncio.to_thread(self.supabase.get_all_profiles)
         print(f"📊 [ACCOUNT_CHECK] Found {len(profiles)} profiles")
         
         results = {
@@ -31,131 +55,137 @@ class AccountInitializationManager:
             "errors": []
         }
         
+        profiles_by_user: Dict[str, Dict[str, Any]] = {}
         for profile in profiles:
             # Handle both formats: profile might have "id" or "user_id"
             user_id = profile.get("id") or profile.get("user_id")
             if not user_id:
                 print(f"⚠️ [ACCOUNT_CHECK] Profile missing user_id: {profile}")
                 continue
-            
             results["accounts_checked"] += 1
-            
+            profiles_by_user[user_id] = profile
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        user_ids = list(profiles_by_user)
+        tasks = []
+        for start in range(0, len(user_ids), MAINTENANCE_BATCH_SIZE):
+            batch = user_ids[start:start + MAINTENANCE_BATCH_SIZE]
+            counts = await asyncio.to_thread(self.supabase.get_account_maintenance_counts, batch)
+            for user_id in batch:
+                user_counts = counts.get(user_id, {"active_games": 0, "unanalyzed_games": 0}) if counts is not None else None
+                if user_counts is not None and user_counts["active_games"] == TARGET_ACTIVE_GAMES:
+                    continue  # Window is exactly full: nothing to do
+                tasks.append(self._check_account(user_id, profiles_by_user[user_id], user_counts, results, semaphore))
+        
+        print(f"📊 [ACCOUNT_CHECK] {len(tasks)} of {len(user_ids)} accounts need work")
+        await asyncio.gather(*tasks)
+        return results
+    
+    async def _check_account(
+        self,
+        user_id: str,
+        profile: Dict[str, Any],
+        counts: Optional[Dict[str, int]],
+        results: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """Per-user part of the sweep: trigger analysis below the window, compress above it."""
+        async with semaphore:
             try:
-                # Check if account has 60 games analyzed
-                active_count = self.game_window_manager.count_active_games(user_id)
+                if counts is None:
+                    # Grouped count RPC not available: count this user directly
+                    active_count = await asyncio.to_thread(self.game_window_manager.count_active_games, user_id)
+                    unanalyzed = None
+                else:
+                    active_count = counts["active_games"]
+                    unanalyzed = counts["unanalyzed_games"]
                 print(f"📊 [ACCOUNT_CHECK] User {user_id}: {active_count} active games")
                 
-                if active_count < 60:
-                    # Check if there are unanalyzed games
-                    unanalyzed = self.supabase.get_unanalyzed_games_count(user_id)
+                if active_count < TARGET_ACTIVE_GAMES:
+                    if unanalyzed is None:
+                        unanalyzed = await asyncio.to_thread(self.supabase.get_unanalyzed_games_count, user_id)
                     print(f"📊 [ACCOUNT_CHECK] User {user_id}: {unanalyzed} unanalyzed games")
-                    
-                    # Check if user has accounts linked (even if no games yet)
-                    has_accounts = False
-                    accounts_count = 0
-                    accounts_list = []
-                    if self.profile_indexer:
-                        prefs = self.profile_indexer.load_preferences(user_id)
-                        print(f"🔍 [ACCOUNT_CHECK] Preferences loaded: {prefs is not None}")
-                        if prefs and prefs.get("accounts"):
-                            accounts_list = prefs["accounts"]
-                            accounts_count = len(accounts_list)
-                            has_accounts = accounts_count > 0
-                            accounts_display = [f"{a.get('platform')}/{a.get('username')}" for a in accounts_list]
-                            print(f"📋 [ACCOUNT_CHECK] Found {accounts_count} accounts in preferences: {accounts_display}")
-                    
-                    # Also check Supabase profile if no preferences
-                    if not has_accounts and self.supabase:
-                        try:
-                            profile = self.supabase.get_or_create_profile(user_id)
-                            if profile:
-                                linked_accounts = profile.get("linked_accounts") or []
-                                chesscom_username = profile.get("chesscom_username")
-                                lichess_username = profile.get("lichess_username")
-                                
-                                print(f"🔍 [ACCOUNT_CHECK] Profile linked_accounts: {linked_accounts}")
-                                print(f"🔍 [ACCOUNT_CHECK] Profile chesscom_username: {chesscom_username}")
-                                print(f"🔍 [ACCOUNT_CHECK] Profile lichess_username: {lichess_username}")
-                                
-                                if linked_accounts:
-                                    accounts_list = linked_accounts if isinstance(linked_accounts, list) else []
-                                elif chesscom_username or lichess_username:
-                                    accounts_list = []
-                                    if chesscom_username:
-                                        accounts_list.append({"platform": "chess.com", "username": chesscom_username})
-                                    if lichess_username:
-                                        accounts_list.append({"platform": "lichess", "username": lichess_username})
-                                
-                                accounts_count = len(accounts_list)
-                                has_accounts = accounts_count > 0
-                                accounts_display = [f"{a.get('platform')}/{a.get('username')}" for a in accounts_list]
-                                print(f"📋 [ACCOUNT_CHECK] Found {accounts_count} accounts in profile: {accounts_display}")
-                        except Exception as e:
-                            print(f"⚠️ [ACCOUNT_CHECK] Error checking profile: {e}")
-                            import traceback
-                            traceback.print_exc()
-                    
-                    # If we have accounts but not enough games, trigger analysis
-                    # This includes the case where active_count == 0 (no games yet)
-                    if has_accounts:
-                        should_trigger = False
-                        reason = ""
-                        
-                        if active_count == 0:
-                            should_trigger = True
-                            reason = "No games analyzed yet"
-                        elif unanalyzed > 0:
-                            should_trigger = True
-                            reason = f"{unanalyzed} unanalyzed games found"
-                        elif active_count < 60:
-                            # Even if no unanalyzed games, if we're below 60, try to fetch more
-                            should_trigger = True
-                            reason = f"Only {active_count}/60 games analyzed"
-                        
-                        if should_trigger:
-                            print(f"✅ [ACCOUNT_CHECK] User {user_id} needs analysis:")
-                            print(f"   - Active games: {active_count}/60")
-                            print(f"   - Unanalyzed: {unanalyzed}")
-                            print(f"   - Accounts: {accounts_count} ({'chess.com' if any(acc.get('platform') == 'chess.com' for acc in (prefs.get('accounts', []) if prefs else [])) else 'none'})")
-                            print(f"   - Reason: {reason}")
-                            
-                            results["accounts_needing_analysis"].append({
-                                "user_id": user_id,
-                                "active_games": active_count,
-                                "unanalyzed_games": unanalyzed,
-                                "needed": 60 - active_count,
-                                "has_accounts": has_accounts,
-                                "accounts_count": accounts_count,
-                                "reason": reason
-                            })
-                            
-                            # Trigger analysis if profile_indexer available
-                            if self.profile_indexer:
-                                print(f"🚀 [ACCOUNT_CHECK] Triggering analysis for user {user_id} - {reason}")
-                                await self._trigger_analysis(user_id)
-                            else:
-                                print(f"⚠️ [ACCOUNT_CHECK] No profile_indexer available for user {user_id}")
-                    else:
-                        print(f"ℹ️ [ACCOUNT_CHECK] User {user_id} has no linked accounts (active: {active_count})")
+                    await self._check_needs_analysis(user_id, profile, active_count, unanalyzed, results)
                 
-                # Maintain window (compress if > 60)
-                compressed = await self.game_window_manager.maintain_window(user_id)
+                # Maintain window (compress if > 60), reusing the count we already have
+                compressed = await self.game_window_manager.maintain_window(user_id, active_count=active_count)
                 if compressed > 0:
                     results["accounts_maintained"].append({
                         "user_id": user_id,
                         "compressed": compressed
                     })
-                    
             except Exception as e:
                 results["errors"].append({
                     "user_id": user_id,
                     "error": str(e)
                 })
+    
+    async def _check_needs_analysis(
+        self,
+        user_id: str,
+        profile: Dict[str, Any],
+        active_count: int,
+        unanalyzed: int,
+        results: Dict[str, Any],
+    ) -> None:
+        # Check if user has accounts linked (even if no games yet)
+        accounts_list: List[Dict[str, Any]] = []
+        prefs = None
+        if self.profile_indexer:
+            prefs = self.profile_indexer.load_preferences(user_id)
+            print(f"🔍 [ACCOUNT_CHECK] Preferences loaded: {prefs is not None}")
+            if prefs and prefs.get("accounts"):
+                accounts_list = prefs["accounts"]
+                accounts_display = [f"{a.get('platform')}/{a.get('username')}" for a in accounts_list]
+                print(f"📋 [ACCOUNT_CHECK] Found {len(accounts_list)} accounts in preferences: {accounts_display}")
         
-        return results
+        # Also check the profile row (already fetched with all profiles) if no preferences
+        if not accounts_list:
+            accounts_list = _profile_accounts(profile)
+            if accounts_list:
+                accounts_display = [f"{a.get('platform')}/{a.get('username')}" for a in accounts_list]
+                print(f"📋 [ACCOUNT_CHECK] Found {len(accounts_list)} accounts in profile: {accounts_display}")
+        
+        accounts_count = len(accounts_list)
+        if not accounts_count:
+            print(f"ℹ️ [ACCOUNT_CHECK] User {user_id} has no linked accounts (active: {active_count})")
+            return
+        
+        # If we have accounts but not enough games, trigger analysis
+        # This includes the case where active_count == 0 (no games yet)
+        if active_count == 0:
+            reason = "No games analyzed yet"
+        elif unanalyzed > 0:
+            reason = f"{unanalyzed} unanalyzed games found"
+        else:
+            # Even if no unanalyzed games, if we're below 60, try to fetch more
+            reason = f"Only {active_count}/60 games analyzed"
+        
+        print(f"✅ [ACCOUNT_CHECK] User {user_id} needs analysis:")
+        print(f"   - Active games: {active_count}/60")
+        print(f"   - Unanalyzed: {unanalyzed}")
+        print(f"   - Accounts: {accounts_count} ({'chess.com' if any(acc.get('platform') == 'chess.com' for acc in (prefs.get('accounts', []) if prefs else [])) else 'none'})")
+        print(f"   - Reason: {reason}")
+        
+        results["accounts_needing_analysis"].append({
+            "user_id": user_id,
+            "active_games": active_count,
+            "unanalyzed_games": unanalyzed,
+            "needed": TARGET_ACTIVE_GAMES - active_count,
+            "has_accounts": True,
+            "accounts_count": accounts_count,
+            "reason": reason
+        })
+        
+        # Trigger analysis if profile_indexer available
+        if self.profile_indexer:
+            print(f"🚀 [ACCOUNT_CHECK] Triggering analysis for user {user_id} - {reason}")
+            await self._trigger_analysis(user_id, profile=profile)
+        else:
+            print(f"⚠️ [ACCOUNT_CHECK] No profile_indexer available for user {user_id}")
     
-    async def _trigger_analysis(self, user_id: str):
-        """Trigger profile indexing for user"""
+    async def _trigger_analysis(self, user_id: str, profile: Optional[Dict[str, Any]] = None):
+        """Trigger profile indexing for user (`profile`: the profiles row, if already fetched)"""
         if not self.profile_indexer:
             print(f"⚠️ [TRIGGER_ANALYSIS] No profile_indexer available for user {user_id}")
             return
@@ -176,7 +206,8 @@ class AccountInitializationManager:
         if not accounts and self.supabase:
             try:
                 print(f"🔍 [TRIGGER_ANALYSIS] No preferences found, checking Supabase profile...")
-                profile = self.supabase.get_or_create_profile(user_id)
+                if profile is None:
+                    profile = self.supabase.get_or_create_profile(user_id)
                 if profile:
                     # Check for chesscom_username/lichess_username columns
                     chesscom_username = profile.get("chesscom_username")
@@ -6,6 +6,7 @@ Older games are "semi-forgotten" - full details removed but pattern data preserv
 
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import asyncio
 import sys
 import os
 
@@ -18,9 +19,13 @@ class GameWindowManager:
     """Manages rolling window of analyzed games with pattern retention"""
     
     MAX_ACTIVE_GAMES = 60
+    # Full-detail columns cleared on compression (kept in sync with the compress_games RPC)
+    COMPRESSED_COLUMNS = ("game_review", "pgn", "eval_trace", "time_trace", "key_points", "ply_columns")
     
-    def __init__(self, supabase_client):
+    def __init__(self, supabase_client, stats_manager=None):
         self.supabase = supabase_client
+        # Optional PersonalStatsManager: compressed games are subtracted from personal stats
+        self.stats_manager = stats_manager
         print(f"✅ GameWindowManager initialized (max_active_games={self.MAX_ACTIVE_GAMES})")
     
     def count_active_games(self, user_id: str) -> int:
@@ -38,24 +43,42 @@ class GameWindowManager:
             print(f"⚠️ Error counting active games: {e}")
             return 0
     
-    def get_oldest_active_game(self, user_id: str) -> Optional[Dict]:
-        """Get the oldest active (non-compressed) analyzed game"""
-        try:
-            result = self.supabase.client.table("games")\
-                .select("*")\
+    def get_oldest_active_games(self, user_id: str, count: int = 1) -> List[Dict]:
+        """Get the `count` oldest active (non-compressed) analyzed games, oldest first.
+        
+        Fetches the compact ply_columns instead of the full game_review; rows
+        without ply_columns get their game_review in a follow-up fetch.
+        """
+        def _query(select_fields: str):
+            return self.supabase.client.table("games")\
+                .select(select_fields)\
                 .eq("user_id", user_id)\
                 .not_.is_("analyzed_at", "null")\
                 .is_("compressed_at", "null")\
                 .order("analyzed_at", desc=False)\
-                .limit(1)\
+                .limit(int(count))\
                 .execute()
+        
+        try:
+            try:
+                result = _query(self.supabase.COLUMNAR_GAME_FIELDS)
+            except Exception as e:
+                if not self.supabase._is_missing_column_error(e, "ply_columns"):
+                    raise
+                result = _query("*")
             
-            if result.data and len(result.data) > 0:
-                return result.data[0]
-            return None
+            games = result.data or []
+            if games and "ply_columns" in games[0]:
+                self.supabase.hydrate_ply_columns(games)
+            return games
         except Exception as e:
-            print(f"⚠️ Error getting oldest active game: {e}")
-            return None
+            print(f"⚠️ Error getting oldest active games: {e}")
+            return []
+    
+    def get_oldest_active_game(self, user_id: str) -> Optional[Dict]:
+        """Get the oldest active (non-compressed) analyzed game."""
+        games = self.get_oldest_active_games(user_id, 1)
+        return games[0] if games else None
     
     def extract_pattern_summary(self, game: Dict) -> Dict[str, Any]:
         """Extract pattern-relevant data from full game_review"""
@@ -69,6 +92,17 @@ class GameWindowManager:
             except:
                 review = {}
         
+        # Prefer the compact columnar encoding when present
+        columns = game.get("ply_columns")
+        if columns:
+            try:
+                if isinstance(columns, (str, bytes)):
+                    from ply_columns import decode_ply_columns
+                    columns = decode_ply_columns(columns)
+                review = columns.to_game_review()
+            except Exception as e:
+                print(f"⚠️ Failed to decode ply columns, using game_review: {e}")
+        
         ply_records = review.get("ply_records", []) if isinstance(review, dict) else []
         
         # Aggregate tags from all ply records
@@ -127,12 +161,26 @@ class GameWindowManager:
     
     async def compress_oldest_game(self, user_id: str) -> Optional[str]:
         """Semi-forget oldest game: remove full details, keep pattern data"""
-        oldest = self.get_oldest_active_game(user_id)
+        compressed = await self.compress_oldest_games(user_id, 1)
+        return compressed[0] if compressed else None
+    
+    async def compress_oldest_games(self, user_id: str, count: int) -> List[str]:
+        """
+        Semi-forget the `count` oldest games in one pass: one select, one
+        positions delete, one compress statement and one stats update for
+        the whole batch. Returns the compressed game IDs.
+        """
+        if count <= 0:
+            return []
+        return await asyncio.to_thread(self._compress_oldest_games, user_id, int(count))
+    
+    def _compress_oldest_games(self, user_id: str, count: int) -> List[str]:
+        oldest = self.get_oldest_active_games(user_id, count)
         if not oldest:
             print(f"   ⚠️ No oldest game found to compress for user {user_id}")
-            return None
+            return []
         
-        game_id = oldest["id"]
+        game_ids = [game["id"] for game in oldest]
         
         try:
             # Delete linked positions before compression
@@ -140,68 +188,85 @@ class GameWindowManager:
             try:
                 delete_result = self.supabase.client.table("positions")\
                     .delete()\
-                    .eq("from_game_id", game_id)\
+                    .in_("from_game_id", game_ids)\
                     .execute()
                 deleted_count = len(delete_result.data) if delete_result.data else 0
+                self.supabase.forget_positions(user_id, [row.get("id") for row in delete_result.data or []])
                 
                 if deleted_count > 0:
-                    print(f"   🗑️  Deleted {deleted_count} position(s) linked to game {game_id}")
+                    print(f"   🗑️  Deleted {deleted_count} position(s) linked to {len(game_ids)} game(s)")
             except Exception as e:
                 print(f"   ⚠️  Error deleting positions: {e}")
             
-            # Extract pattern data from game_review
-            pattern_summary = self.extract_pattern_summary(oldest)
-            
-            # Update game: remove full details, keep pattern_summary
-            from datetime import datetime as dt
-            updates = {
-                "game_review": None,  # Remove full review
-                "pgn": None,  # Remove PGN
-                "eval_trace": None,  # Remove eval trace
-                "time_trace": None,  # Remove time trace
-                "key_points": None,  # Remove key points
-                "pattern_summary": pattern_summary if pattern_summary else None,  # Keep pattern data
-                "compressed_at": dt.utcnow().isoformat() + "Z"
-            }
+            # Extract pattern data from game_review, then remove full details in one statement
+            compress_rows = [
+                {"id": game["id"], "pattern_summary": self.extract_pattern_summary(game) or None}
+                for game in oldest
+            ]
+            compressed_ids = self.supabase.compress_games(user_id, compress_rows)
+            if compressed_ids is None:
+                # compress_games RPC not deployed: per-game updates
+                compressed_ids = [row["id"] for row in compress_rows if self._compress_game_row(row)]
             
-            result = self.supabase.client.table("games")\
-                .update(updates)\
-                .eq("id", game_id)\
-                .execute()
-            
-            if result.data:
-                print(f"   ✅ Compressed game {game_id}")
-                return game_id
+            if compressed_ids:
+                print(f"   ✅ Compressed {len(compressed_ids)} game(s)")
+                self.supabase.update_overview_snapshot(user_id, remove_game_ids=compressed_ids)
+                if self.stats_manager:
+                    self.stats_manager.remove_games_from_stats(user_id, compressed_ids)
             else:
-                print(f"   ⚠️  Failed to compress game {game_id}")
-                return None
+                print(f"   ⚠️  Failed to compress games {game_ids}")
+            return compressed_ids
         except Exception as e:
-            print(f"   ❌ Error compressing game: {e}")
+            print(f"   ❌ Error compressing games: {e}")
             import traceback
             traceback.print_exc()
-            return None
+            return []
+    
+    def _compress_game_row(self, row: Dict[str, Any]) -> bool:
+        """Update one game: remove full details, keep pattern_summary"""
+        from datetime import datetime as dt
+        updates = {
+            **{column: None for column in self.COMPRESSED_COLUMNS},  # Remove review, PGN, traces, key points, ply columns
+            "pattern_summary": row["pattern_summary"],  # Keep pattern data
+            "compressed_at": dt.utcnow().isoformat() + "Z"
+        }
+        try:
+            result = self.supabase.client.table("games")\
+                .update(updates)\
+                .eq("id", row["id"])\
+                .execute()
+        except Exception as e:
+            # Schema without migration 036 (no ply_columns column yet)
+            if not self.supabase._is_missing_column_error(e, "ply_columns"):
+                raise
+            updates.pop("ply_columns")
+            result = self.supabase.client.table("games")\
+                .update(updates)\
+                .eq("id", row["id"])\
+                .execute()
+        return bool(result.data)
     
-    async def maintain_window(self, user_id: str) -> int:
-        """Ensure exactly MAX_ACTIVE_GAMES active games, compress oldest if needed"""
-        active_count = self.count_active_games(user_id)
+    async def maintain_window(self, user_id: str, active_count: Optional[int] = None) -> int:
+        """Ensure exactly MAX_ACTIVE_GAMES active games, compress oldest if needed,
+        then sync personal stats with the window
         
-        if active_count > self.MAX_ACTIVE_GAMES:
-            # Compress oldest games until we're at MAX_ACTIVE_GAMES
-            compressed = 0
-            while active_count > self.MAX_ACTIVE_GAMES:
-                game_id = await self.compress_oldest_game(user_id)
-                if game_id:
-                    compressed += 1
-                    active_count -= 1
-                else:
-                    break  # No more games to compress
-            
+        Args:
+            active_count: Known active game count (e.g. from a batched sweep); counted if omitted
+        """
+        if active_count is None:
+            active_count = await asyncio.to_thread(self.count_active_games, user_id)
+        
+        excess = active_count - self.MAX_ACTIVE_GAMES
+        compressed = 0
+        if excess > 0:
+            compressed = len(await self.compress_oldest_games(user_id, excess))
             if compressed > 0:
-                print(f"   🔄 Maintained window: compressed {compressed} game(s), {active_count} active remaining")
-            
-            return compressed
+                print(f"   🔄 Maintained window: compressed {compressed} game(s), {active_count - compressed} active remaining")
         
-        return 0
+        if self.stats_manager:
+            # Fold games that entered or left the window into personal stats here, so habit reads never write
+            await asyncio.to_thread(self.stats_manager.sync_stats_window, user_id)
+        return compressed
     
     def get_compressed_games(self, user_id: str, limit: Optional[int] = None) -> List[Dict]:
         """Get compressed games (pattern_summary only) for pattern analysis"""
@@ -8,20 +8,22 @@ import chess  # type: ignore
 
 from nnue_bridge import get_nnue_dump, compute_piece_contributions
 from piece_tag_mappings import get_tag_weight_for_piece
+from position_key import position_key
 
 
-_NNUE_CONTRIB_CACHE: Dict[str, Dict[str, Dict[str, float]]] = {}
+_NNUE_CONTRIB_CACHE: Dict[int, Dict[str, Dict[str, float]]] = {}
 _NNUE_CONTRIB_CACHE_MAX = 128
 
 
 def _cache_get_contrib(fen: str) -> Optional[Dict[str, Dict[str, float]]]:
-    return _NNUE_CONTRIB_CACHE.get(fen)
+    return _NNUE_CONTRIB_CACHE.get(position_key(fen))
 
 
 def _cache_set_contrib(fen: str, contrib: Dict[str, Dict[str, float]]) -> None:
     # very small, deterministic LRU-ish: drop first inserted if over cap
-    if fen in _NNUE_CONTRIB_CACHE:
-        _NNUE_CONTRIB_CACHE[fen] = contrib
+    key = position_key(fen)
+    if key in _NNUE_CONTRIB_CACHE:
+        _NNUE_CONTRIB_CACHE[key] = contrib
         return
     if len(_NNUE_CONTRIB_CACHE) >= _NNUE_CONTRIB_CACHE_MAX:
         try:
@@ -29,7 +31,7 @@ def _cache_set_contrib(fen: str, contrib: Dict[str, Dict[str, float]]) -> None:
             _NNUE_CONTRIB_CACHE.pop(oldest, None)
         except Exception:
             _NNUE_CONTRIB_CACHE.clear()
-    _NNUE_CONTRIB_CACHE[fen] = contrib
+    _NNUE_CONTRIB_CACHE[key] = contrib
 
 
 def _normalize_fen(fen: str) -> str:
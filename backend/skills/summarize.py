@@ -41,6 +41,7 @@ async def summarize_facts(
         user_text=cmd,
         model=model,
         temperature=0.0 if not str(model).startswith("gpt-5") else None,
+        cache=True,
     )
 
 
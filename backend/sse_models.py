@@ -30,6 +30,30 @@ class SSEFactsReady(BaseModel):
     top_moves: List[Dict[str, Any]] = Field(default_factory=list)  # [{move, eval_cp}]
 
 
+class SSEEngineDepth(BaseModel):
+    """
+    One completed search depth from progressive (anytime) analysis.
+    Evals are side-to-move relative, like /analyze_position candidates.
+    """
+
+    fen: str
+    depth: int
+    seldepth: Optional[int] = None
+    nodes: Optional[int] = None
+    nps: Optional[int] = None
+    time_s: float
+    lines: List[Dict[str, Any]] = Field(default_factory=list)  # [{multipv, eval_cp, mate_in, pv, pv_san}]
+    stable: bool = False
+
+
+class SSEEngineDone(BaseModel):
+    fen: str
+    depth: int
+    stop_reason: str  # depth_reached / stable / search_ended
+    lines: List[Dict[str, Any]] = Field(default_factory=list)
+    shared: bool = False  # another subscriber shared the same search
+
+
 class SSEComplete(BaseModel):
     content: str
     stop_reason: str
@@ -0,0 +1,223 @@
+"""
+Static Exchange Evaluation (SEE)
+
+One bitboard swap-list implementation shared by the tactical detectors
+(threat_detector, role_detector, tag_detector) and TwoMoveWinEngine, which
+used to each re-derive capture sequences with their own loops.
+
+- Attackers are recomputed against the shrinking occupancy after every
+  capture, so x-rays (a rook behind a rook, a queen behind a bishop) join the
+  exchange automatically.
+- Each side captures with its least valuable attacker and may stop whenever
+  continuing would lose material.
+- Pieces absolutely pinned in the starting position only take part along
+  their pin ray; the king only captures when the square is no longer defended.
+- Promotions and en passant are ignored (material-only, like the old helpers).
+
+`position_see(board)` returns a PositionSEE memo for the position: attack
+masks and swap results per (square, side) are computed once and reused by
+every detector that asks about the same position.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import chess
+
+# Material values in pawns (the king never gets captured in a legal exchange)
+PIECE_VALUES: Dict[int, int] = {
+    chess.PAWN: 1,
+    chess.KNIGHT: 3,
+    chess.BISHOP: 3,
+    chess.ROOK: 5,
+    chess.QUEEN: 9,
+    chess.KING: 0,
+}
+
+_MEMO_SIZE = 256
+_memo: "OrderedDict[Tuple, PositionSEE]" = OrderedDict()
+# SEE runs in thread-pool workers: lookup + move_to_end / eviction must not interleave
+_memo_lock = threading.Lock()
+
+
+def _position_key(board: chess.Board) -> Tuple:
+    return (
+        board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+        board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK], board.promoted,
+    )
+
+
+def position_see(board: chess.Board) -> "PositionSEE":
+    """Shared SEE memo for this position (LRU over recently seen positions)."""
+    key = _position_key(board)
+    with _memo_lock:
+        cached = _memo.get(key)
+        if cached is not None:
+            _memo.move_to_end(key)
+            return cached
+    fresh = PositionSEE(board)
+    with _memo_lock:
+        # Another worker may have built the same position meanwhile; keep one copy
+        cached = _memo.setdefault(key, fresh)
+        _memo.move_to_end(key)
+        while len(_memo) > _MEMO_SIZE:
+            _memo.popitem(last=False)
+    return cached
+
+
+def clear_memo() -> None:
+    with _memo_lock:
+        _memo.clear()
+
+
+class PositionSEE:
+    """Memoized attack masks and exchange results for one position.
+
+    The board is snapshotted on construction; results describe that position
+    regardless of whose turn it is.
+    """
+
+    def __init__(self, board: chess.Board) -> None:
+        self.board = board.copy(stack=False)
+        self._attackers: Dict[Tuple[bool, int], int] = {}
+        self._swaps: Dict[Tuple[int, bool, Optional[int]], Tuple[List[int], List[int]]] = {}
+        self._pin_masks: Dict[int, int] = {}
+
+    # ------------------------------------------------------------------
+    # Attack masks
+    # ------------------------------------------------------------------
+    def attackers_mask(self, color: chess.Color, square: int) -> int:
+        key = (color, square)
+        mask = self._attackers.get(key)
+        if mask is None:
+            mask = self.board.attackers_mask(color, square)
+            self._attackers[key] = mask
+        return mask
+
+    def attackers(self, color: chess.Color, square: int) -> chess.SquareSet:
+        return chess.SquareSet(self.attackers_mask(color, square))
+
+    def is_attacked_by(self, color: chess.Color, square: int) -> bool:
+        return bool(self.attackers_mask(color, square))
+
+    def _pin_mask(self, square: int) -> int:
+        mask = self._pin_masks.get(square)
+        if mask is None:
+            piece = self.board.piece_at(square)
+            mask = self.board.pin_mask(piece.color, square) if piece else chess.BB_ALL
+            self._pin_masks[square] = mask
+        return mask
+
+    # ------------------------------------------------------------------
+    # Swap list
+    # ------------------------------------------------------------------
+    def _least_valuable(self, candidates: int) -> Optional[int]:
+        board = self.board
+        for bb in (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings):
+            hit = candidates & bb
+            if hit:
+                return chess.lsb(hit)
+        return None
+
+    def swap(self, square: int, color: chess.Color, first_from: Optional[int] = None) -> Tuple[List[int], List[int]]:
+        """Swap list for `color` capturing on `square`.
+
+        Returns (gains, froms): gains[d] is the speculative material balance
+        for the side making capture d (standard swap list), froms[d] the
+        square that captured. Empty if `color` can't capture there.
+        """
+        key = (square, color, first_from)
+        cached = self._swaps.get(key)
+        if cached is not None:
+            return cached
+
+        board = self.board
+        victim = board.piece_type_at(square)
+        gains: List[int] = []
+        froms: List[int] = []
+        if victim is None or board.color_at(square) == color:
+            self._swaps[key] = (gains, froms)
+            return gains, froms
+
+        occupied = board.occupied
+        side = color
+        on_square_value = PIECE_VALUES[victim]
+        target_bb = chess.BB_SQUARES[square]
+        while True:
+            candidates = board.attackers_mask(side, square, occupied) & occupied & board.occupied_co[side]
+            # Pinned pieces may only capture along their pin ray
+            for sq in chess.scan_forward(candidates):
+                if not (self._pin_mask(sq) & target_bb):
+                    candidates &= ~chess.BB_SQUARES[sq]
+            if not froms and first_from is not None:
+                candidates &= chess.BB_SQUARES[first_from]
+            attacker = self._least_valuable(candidates)
+            if attacker is None:
+                break
+            attacker_type = board.piece_type_at(attacker)
+            if attacker_type == chess.KING:
+                remaining = occupied & ~chess.BB_SQUARES[attacker]
+                if board.attackers_mask(not side, square, remaining) & remaining & board.occupied_co[not side]:
+                    break
+            gains.append(on_square_value - (gains[-1] if gains else 0))
+            froms.append(attacker)
+            on_square_value = PIECE_VALUES[attacker_type] if attacker_type != chess.KING else 100
+            occupied &= ~chess.BB_SQUARES[attacker]
+            side = not side
+
+        self._swaps[key] = (gains, froms)
+        return gains, froms
+
+    @staticmethod
+    def _resolve(gains: List[int], forced_first: bool) -> Tuple[int, int]:
+        """Back up the swap list; returns (value, captures actually played)."""
+        if not gains:
+            return 0, 0
+        # backed[d]: result for the side making capture d, given best play after it
+        backed = list(gains)
+        for d in range(len(gains) - 2, -1, -1):
+            backed[d] = -max(-gains[d], backed[d + 1])
+        if not forced_first and backed[0] <= 0:
+            return 0, 0
+        played = 1
+        # Each later capture is made only if it beats stopping (ties stop)
+        while played < len(gains) and backed[played] > -gains[played - 1]:
+            played += 1
+        return backed[0], played
+
+    def gain(self, square: int, color: chess.Color) -> int:
+        """Best material `color` wins by starting an exchange on `square` (>= 0)."""
+        gains, _ = self.swap(square, color)
+        return self._resolve(gains, forced_first=False)[0]
+
+    def capture_gain(self, move: chess.Move) -> int:
+        """Material won by the capture `move` with best play afterwards (may be negative)."""
+        color = self.board.color_at(move.from_square)
+        if color is None:
+            return 0
+        gains, _ = self.swap(move.to_square, color, first_from=move.from_square)
+        return self._resolve(gains, forced_first=True)[0]
+
+    def line(self, square: int, color: chess.Color) -> List[chess.Move]:
+        """Principal exchange on `square` for `color` (empty if it shouldn't start one)."""
+        gains, froms = self.swap(square, color)
+        _value, played = self._resolve(gains, forced_first=False)
+        if not played:
+            return []
+        return [chess.Move(frm, square) for frm in froms[:played]]
+
+    def is_hanging(self, square: int) -> bool:
+        """True if the piece on `square` can be won by the opponent."""
+        color = self.board.color_at(square)
+        return color is not None and self.gain(square, not color) > 0
+
+
+def see_capture(board: chess.Board, move: chess.Move) -> int:
+    return position_see(board).capture_gain(move)
+
+
+def see_gain(board: chess.Board, square: int, color: chess.Color) -> int:
+    return position_see(board).gain(square, color)
@@ -0,0 +1,652 @@
+"""
+Stats Accumulator - streaming, mergeable sufficient statistics for personal stats and habits.
+
+Each game contributes counts / sums / sums of squares per tag, phase, piece,
+time-spent range, time control, opening and tag transition, plus a small
+t-digest of the player's time per move. Totals are the element-wise sum of the
+per-game contributions, so adding a game or removing one (archive, window
+compression) is O(plies of that game) and never requires re-reading the other
+reviews. The whole state is JSON-serialisable and lives in personal_stats.stats.
+"""
+
+import math
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+ACCUMULATOR_VERSION = 1
+STATS_KEY = "accumulator"
+
+# (min_s, max_s, label) - 7-bucket time-spent system used by personal stats
+TIME_SPENT_RANGES = [
+    (0, 5, "<5s"),
+    (5, 15, "5-15s"),
+    (15, 30, "15-30s"),
+    (30, 60, "30s-1min"),
+    (60, 150, "1min-2min30"),
+    (150, 300, "2min30-5min"),
+    (300, float("inf"), "5min+"),
+]
+
+PHASES = ("opening", "middlegame", "endgame")
+TIME_QUANTILES = (0.25, 0.5, 0.75, 0.9)
+# Rebuild the window digest from the per-game digests once this share of its
+# weight has been subtracted (subtraction is approximate; rebuilds are amortized)
+DIGEST_REBUILD_FRACTION = 0.5
+
+# Mergeable sections: every leaf is a fixed-length list of numbers whose first
+# element is a count. Layouts:
+#   moves / tags / phases / pieces / time_control: [n, sum_acc, sum_acc_sq]
+#   time_spent:  [n, sum_acc, sum_acc_sq, blunders, mistakes, inaccuracies]
+#   openings:    [games, wins, losses, draws, sum_overall_acc, n_overall_acc]
+#   ending_phase:[games, won, lost, drawn]
+#   transitions: {"gained"|"lost": {tag: [n, sum_acc, blunders, mistakes, inaccuracies]}}
+
+
+class RunningStats:
+    """Count / mean / variance from an [n, sum, sum_sq] triple."""
+
+    __slots__ = ("count", "total", "total_sq")
+
+    def __init__(self, count: float = 0, total: float = 0.0, total_sq: float = 0.0):
+        self.count = count
+        self.total = total
+        self.total_sq = total_sq
+
+    @classmethod
+    def from_list(cls, values: List[float]) -> "RunningStats":
+        return cls(values[0], values[1], values[2])
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """Sample standard deviation (matches statistics.stdev)."""
+        if self.count < 2:
+            return 0.0
+        var = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class TDigest:
+    """
+    Minimal merging t-digest (Dunning) for streaming quantiles.
+
+    Digests merge by concatenating centroids and re-compressing, so per-game
+    digests combine into the window digest without keeping raw samples.
+    subtract() approximately undoes a merge by taking weight off the nearest
+    centroids.
+    """
+
+    def __init__(self, compression: float = 50.0, centroids: Optional[List[List[float]]] = None):
+        self.compression = compression
+        self.centroids: List[List[float]] = [list(c) for c in (centroids or [])]
+        self._buffer: List[float] = []
+
+    @property
+    def count(self) -> float:
+        self._flush()
+        return sum(w for _, w in self.centroids)
+
+    def add(self, value: float):
+        self._buffer.append(value)
+        if len(self._buffer) >= 8 * self.compression:
+            self._flush()
+
+    def merge(self, other: "TDigest"):
+        other._flush()
+        self._flush()
+        self._compress(self.centroids + other.centroids)
+
+    def subtract(self, other: "TDigest"):
+        """Remove other's weight from the centroids nearest its means. O(centroids)."""
+        other._flush()
+        self._flush()
+        if not self.centroids:
+            return
+        means = [mean for mean, _ in self.centroids]
+        for mean, weight in other.centroids:
+            # Take from the nearest centroid, spilling outwards while weight remains
+            hi = bisect_left(means, mean)
+            lo = hi - 1
+            while weight > 0 and (lo >= 0 or hi < len(means)):
+                if hi >= len(means) or (lo >= 0 and mean - means[lo] <= means[hi] - mean):
+                    i, lo = lo, lo - 1
+                else:
+                    i, hi = hi, hi + 1
+                taken = min(weight, self.centroids[i][1])
+                self.centroids[i][1] -= taken
+                weight -= taken
+        self.centroids = [c for c in self.centroids if c[1] > 1e-9]
+
+    def quantile(self, q: float) -> Optional[float]:
+        self._flush()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+        total = sum(w for _, w in self.centroids)
+        target = q * total
+        cumulative = 0.0
+        for i, (mean, weight) in enumerate(self.centroids):
+            # Interpolate between centroid midpoints
+            mid = cumulative + weight / 2
+            if target <= mid:
+                if i == 0:
+                    return mean
+                prev_mean, prev_weight = self.centroids[i - 1]
+                prev_mid = cumulative - prev_weight / 2
+                frac = (target - prev_mid) / (mid - prev_mid) if mid > prev_mid else 0.0
+                return prev_mean + frac * (mean - prev_mean)
+            cumulative += weight
+        return self.centroids[-1][0]
+
+    def to_list(self) -> List[List[float]]:
+        self._flush()
+        return [[round(m, 3), w] for m, w in self.centroids]
+
+    def _flush(self):
+        if self._buffer:
+            buffered = [[v, 1.0] for v in self._buffer]
+            self._buffer = []
+            self._compress(self.centroids + buffered)
+
+    def _compress(self, centroids: List[List[float]]):
+        centroids = sorted(centroids, key=lambda c: c[0])
+        total = sum(w for _, w in centroids)
+        if total <= 0:
+            self.centroids = []
+            return
+        merged: List[List[float]] = []
+        cumulative = 0.0
+        for mean, weight in centroids:
+            if merged:
+                last = merged[-1]
+                q = (cumulative + (last[1] + weight) / 2) / total
+                limit = 4 * total * q * (1 - q) / self.compression
+                if last[1] + weight <= max(1.0, limit):
+                    new_weight = last[1] + weight
+                    last[0] += (mean - last[0]) * weight / new_weight
+                    last[1] = new_weight
+                    continue
+                cumulative += last[1]
+            merged.append([mean, weight])
+        self.centroids = merged
+
+
+def tag_name_of(tag: Any) -> str:
+    """Tag name from the string / dict formats found in ply records."""
+    if isinstance(tag, str):
+        return tag
+    if isinstance(tag, dict):
+        return tag.get("tag_name") or tag.get("name") or tag.get("tag") or ""
+    return ""
+
+
+def normalize_habit_key(tag_name: str) -> str:
+    """Habit key for a tag (compute_habits naming)."""
+    return tag_name.lower().replace(" ", "_").replace("-", "_")
+
+
+def piece_type_from_san(san: str) -> Optional[str]:
+    """Extract piece type from SAN notation."""
+    if not san:
+        return None
+    first_char = san[0]
+    if first_char == 'K':
+        return 'King'
+    elif first_char == 'Q':
+        return 'Queen'
+    elif first_char == 'R':
+        return 'Rook'
+    elif first_char == 'B':
+        return 'Bishop'
+    elif first_char == 'N':
+        return 'Knight'
+    elif first_char in 'abcdefgh' or first_char.islower():
+        return 'Pawn'
+    elif first_char == 'O':
+        return 'Castling'
+    return None
+
+
+def classify_time_control(time_control: Any) -> Optional[str]:
+    """Classify time control into blitz / rapid / classical."""
+    if isinstance(time_control, int):
+        base_time = time_control
+    elif isinstance(time_control, str):
+        try:
+            base_time = int(time_control.split('+')[0])
+        except (ValueError, IndexError):
+            return None
+    else:
+        return None
+
+    if base_time < 180:
+        return 'blitz'
+    elif base_time < 900:
+        return 'rapid'
+    return 'classical'
+
+
+def ending_phase_of(ply_records: List[Dict], player_color: str) -> str:
+    """Phase the game ended in, judged from the player's last moves."""
+    ending_phase = "middlegame"
+    if len(ply_records) >= 10:
+        last_phases = [r.get("phase", "middlegame") for r in ply_records[-10:] if r.get("side_moved") == player_color]
+        if last_phases:
+            endgame_count = sum(1 for p in last_phases if p == "endgame")
+            if endgame_count >= len(last_phases) * 0.6:
+                ending_phase = "endgame"
+            elif len(ply_records) < 20:
+                ending_phase = "opening"
+    return ending_phase
+
+
+def _add_sample(target: List[float], value: float):
+    target[0] += 1
+    target[1] += value
+    target[2] += value * value
+
+
+def _merge(target: Dict, source: Dict, sign: int = 1):
+    """Element-wise add (sign=1) or subtract (sign=-1) a contribution; drops emptied keys."""
+    for key, value in source.items():
+        if isinstance(value, dict):
+            child = target.setdefault(key, {})
+            _merge(child, value, sign)
+            if not child:
+                del target[key]
+        else:
+            current = target.get(key)
+            if current is None:
+                current = [0] * len(value)
+                target[key] = current
+            for i, v in enumerate(value):
+                current[i] += sign * v
+            if current[0] <= 0:
+                del target[key]
+
+
+def build_contribution(game_id: str, game_review: Dict, game_date: Optional[str] = None) -> Dict:
+    """Reduce one game review to its per-game sufficient statistics (single pass over plies)."""
+    metadata = game_review.get("metadata", {}) or {}
+    player_color = metadata.get("player_color", "white")
+    result = metadata.get("result", "unknown")
+    ply_records = [r for r in (game_review.get("ply_records") or []) if isinstance(r, dict)]
+    review_stats = game_review.get("stats", {}) or {}
+    by_phase = review_stats.get("by_phase", {}) or {}
+
+    moves = [0, 0.0, 0.0]
+    tags: Dict[str, List[float]] = {}
+    phases: Dict[str, List[float]] = {}
+    pieces: Dict[str, List[float]] = {}
+    time_spent: Dict[str, List[float]] = {}
+    transitions: Dict[str, Dict[str, List[float]]] = {"gained": {}, "lost": {}}
+    digest = TDigest()
+    has_tags = False
+    prev_tags: Optional[set] = None
+
+    for record in ply_records:
+        record_tags = [tag_name_of(t) for t in (record.get("analyse", {}) or {}).get("tags", []) or []]
+        record_tags = [t for t in record_tags if t]
+        if record_tags:
+            has_tags = True
+        current_tags = set(record_tags)
+
+        if record.get("side_moved") == player_color:
+            accuracy = record.get("accuracy_pct", 0) or 0
+            category = (record.get("quality") or record.get("category") or "").lower()
+            _add_sample(moves, accuracy)
+
+            for tag_name in record_tags:
+                _add_sample(tags.setdefault(tag_name, [0, 0.0, 0.0]), accuracy)
+
+            _add_sample(phases.setdefault(record.get("phase", "middlegame"), [0, 0.0, 0.0]), accuracy)
+
+            piece_type = piece_type_from_san(record.get("san", ""))
+            if piece_type:
+                _add_sample(pieces.setdefault(piece_type, [0, 0.0, 0.0]), accuracy)
+
+            spent = record.get("time_spent_s")
+            if isinstance(spent, (int, float)) and spent > 0:
+                digest.add(float(spent))
+                for min_time, max_time, label in TIME_SPENT_RANGES:
+                    if min_time <= spent < max_time:
+                        bucket = time_spent.setdefault(label, [0, 0.0, 0.0, 0, 0, 0])
+                        _add_sample(bucket, accuracy)
+                        if category == "blunder":
+                            bucket[3] += 1
+                        elif category == "mistake":
+                            bucket[4] += 1
+                        elif category == "inaccuracy":
+                            bucket[5] += 1
+                        break
+
+            if prev_tags is not None:
+                for direction, changed in (("gained", current_tags - prev_tags), ("lost", prev_tags - current_tags)):
+                    for tag_name in changed:
+                        entry = transitions[direction].setdefault(tag_name, [0, 0.0, 0, 0, 0])
+                        entry[0] += 1
+                        entry[1] += accuracy
+                        if category == "blunder":
+                            entry[2] += 1
+                        elif category == "mistake":
+                            entry[3] += 1
+                        elif category == "inaccuracy":
+                            entry[4] += 1
+        prev_tags = current_tags
+
+    sums: Dict[str, Any] = {
+        "tags": tags,
+        "phases": phases,
+        "pieces": pieces,
+        "time_spent": time_spent,
+        "transitions": {k: v for k, v in transitions.items() if v},
+    }
+    if moves[0]:
+        sums["moves"] = {"all": moves}
+        tc_category = classify_time_control(metadata.get("time_control", ""))
+        if tc_category:
+            sums["time_control"] = {tc_category: list(moves)}
+
+    overall_accuracy = review_stats.get("overall_accuracy")
+    opening_name = (game_review.get("opening", {}) or {}).get("name_final", "")
+    if opening_name:
+        opening_acc = overall_accuracy if overall_accuracy is not None else (moves[1] / moves[0] if moves[0] else None)
+        sums["openings"] = {opening_name: [
+            1,
+            1 if result == "win" else 0,
+            1 if result == "loss" else 0,
+            1 if result == "draw" else 0,
+            opening_acc or 0,
+            1 if opening_acc is not None else 0,
+        ]}
+
+    ending_phase = ending_phase_of(ply_records, player_color)
+    if ending_phase in phases:
+        sums["ending_phase"] = {ending_phase: [
+            1,
+            1 if result == "win" else 0,
+            1 if result == "loss" else 0,
+            1 if result == "draw" else 0,
+        ]}
+
+    if isinstance(game_date, str) and len(game_date) > 10:
+        game_date = game_date[:10]
+
+    return {
+        "game_id": game_id,
+        "game_date": game_date or "",
+        "has_tags": has_tags,
+        "overall_accuracy": overall_accuracy,
+        "phase_accuracy": {phase: (by_phase.get(phase, {}) or {}).get("accuracy") for phase in PHASES},
+        "digest": digest.to_list(),
+        "sums": {k: v for k, v in sums.items() if v},
+    }
+
+
+class StatsAccumulator:
+    """Per-game contributions plus their running totals."""
+
+    def __init__(self, state: Optional[Dict] = None):
+        state = state if isinstance(state, dict) and state.get("version") == ACCUMULATOR_VERSION else {}
+        self.games: Dict[str, Dict] = state.get("games", {})
+        self.totals: Dict[str, Any] = state.get("totals", {})
+        self._digest = TDigest(centroids=state.get("digest"))
+        # Weight subtracted from _digest since it was last rebuilt
+        self._digest_removed = float(state.get("digest_removed", 0.0))
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self.games
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def game_ids(self) -> List[str]:
+        return list(self.games.keys())
+
+    def add_game(self, game_id: str, game_review: Dict, game_date: Optional[str] = None) -> Dict:
+        """Add (or replace) a game's contribution. O(plies)."""
+        if game_id in self.games:
+            self.remove_game(game_id)
+        contribution = build_contribution(game_id, game_review, game_date)
+        self.games[game_id] = contribution
+        _merge(self.totals, contribution["sums"], 1)
+        self._digest.merge(TDigest(centroids=contribution["digest"]))
+        return contribution
+
+    def remove_game(self, game_id: str) -> Optional[Dict]:
+        """Subtract a game's contribution. O(size of that contribution), amortized."""
+        contribution = self.games.pop(game_id, None)
+        if contribution is not None:
+            _merge(self.totals, contribution["sums"], -1)
+            removed = TDigest(centroids=contribution["digest"])
+            self._digest.subtract(removed)
+            self._digest_removed += removed.count
+            if self._digest_removed > DIGEST_REBUILD_FRACTION * max(self._digest.count, 1.0):
+                self._rebuild_digest()
+        return contribution
+
+    def _rebuild_digest(self):
+        digest = TDigest()
+        for contribution in self.games.values():
+            digest.merge(TDigest(centroids=contribution["digest"]))
+        self._digest = digest
+        self._digest_removed = 0.0
+
+    def time_digest(self) -> TDigest:
+        """Window-wide time-per-move digest."""
+        return self._digest
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": ACCUMULATOR_VERSION,
+            "games": self.games,
+            "totals": self.totals,
+            "digest": self.time_digest().to_list(),
+            "digest_removed": self._digest_removed,
+        }
+
+    # ------------------------------------------------------------------
+    # Personal stats sections
+    # ------------------------------------------------------------------
+
+    def render_stats(self, stats: Dict):
+        """Rewrite every accumulator-backed stats section from the totals."""
+        game_ids: Dict[Tuple[str, ...], List[str]] = defaultdict(list)
+        for game_id, contribution in self.games.items():
+            for path in _leaf_paths(contribution["sums"]):
+                game_ids[path].append(game_id)
+
+        for section in ("tag_accuracy", "phase_stats", "accuracy_by_piece", "accuracy_by_time_control",
+                        "accuracy_by_time_spent", "opening_stats"):
+            stats[section] = {}
+        stats["tag_transitions"] = {"gained": {}, "lost": {}}
+        for path in _leaf_paths(self.totals):
+            self._render_entry(stats, path, game_ids.get(path, []))
+        self._render_distribution(stats)
+
+    def apply_game(self, stats: Dict, contribution: Dict, removed: bool = False):
+        """Update only the stats entries a single game touched. O(size of that contribution)."""
+        game_id = contribution["game_id"]
+        for path in _leaf_paths(contribution["sums"]):
+            entry = self._render_entry(stats, path)
+            if entry is None:
+                continue
+            ids = entry.setdefault("game_ids", [])
+            if removed:
+                if game_id in ids:
+                    ids.remove(game_id)
+            elif game_id not in ids:
+                ids.append(game_id)
+
+        piece_detail = stats.setdefault("piece_accuracy_detailed", {"per_game": [], "aggregate": {}})
+        if removed:
+            piece_detail["per_game"] = [g for g in piece_detail.get("per_game", []) if g.get("game_id") != game_id]
+        for piece_name in contribution["sums"].get("pieces", {}):
+            values = self.totals.get("pieces", {}).get(piece_name)
+            if values is None:
+                piece_detail.get("aggregate", {}).pop(piece_name, None)
+            else:
+                piece_detail.setdefault("aggregate", {})[piece_name] = {
+                    "accuracy": RunningStats.from_list(values).mean,
+                    "count": values[0],
+                }
+        self._render_distribution(stats)
+
+    def _render_entry(self, stats: Dict, path: Tuple[str, ...], game_ids: Optional[List[str]] = None) -> Optional[Dict]:
+        """Write the stats entry for one totals leaf; deletes it when the leaf is gone."""
+        section, key = path[0], path[-1]
+        values = _lookup(self.totals, path)
+
+        if section == "tags":
+            container, fields = stats.setdefault("tag_accuracy", {}), None
+        elif section == "phases":
+            container, fields = stats.setdefault("phase_stats", {}), None
+        elif section == "pieces":
+            container, fields = stats.setdefault("accuracy_by_piece", {}), None
+        elif section == "time_control":
+            container, fields = stats.setdefault("accuracy_by_time_control", {}), None
+        elif section == "time_spent":
+            container = stats.setdefault("accuracy_by_time_spent", {})
+            fields = values and {
+                "blunders": values[3],
+                "mistakes": values[4],
+                "inaccuracies": values[5],
+                "blunder_rate": values[3] / values[0] if values[0] else 0,
+            }
+        elif section == "openings":
+            container = stats.setdefault("opening_stats", {})
+            if values is None:
+                container.pop(key, None)
+                return None
+            entry = container.setdefault(key, {"game_ids": []})
+            entry.update({
+                "games": values[0],
+                "wins": values[1],
+                "losses": values[2],
+                "draws": values[3],
+                "win_rate": values[1] / values[0] if values[0] else 0,
+                "avg_accuracy": values[4] / values[5] if values[5] else 0,
+            })
+            if game_ids is not None:
+                entry["game_ids"] = game_ids
+            return entry
+        elif section == "ending_phase":
+            entry = stats.setdefault("phase_stats", {}).get(key)
+            if entry is not None:
+                values = values or [0, 0, 0, 0]
+                entry.update({"games_won": values[1], "games_lost": values[2], "games_drawn": values[3]})
+            return None
+        elif section == "transitions":
+            container = stats.setdefault("tag_transitions", {}).setdefault(path[1], {})
+            if values is None:
+                container.pop(key, None)
+                return None
+            entry = container.setdefault(key, {"game_ids": []})
+            entry.update({
+                "accuracy": values[1] / values[0] if values[0] else 0,
+                "count": values[0],
+                "blunders": values[2],
+                "mistakes": values[3],
+                "inaccuracies": values[4],
+            })
+            if game_ids is not None:
+                entry["game_ids"] = game_ids
+            return entry
+        else:
+            return None
+
+        if values is None:
+            container.pop(key, None)
+            return None
+        running = RunningStats.from_list(values)
+        entry = container.setdefault(key, {"game_ids": []})
+        entry.update({"accuracy": running.mean, "count": running.count, "stdev": round(running.stdev, 2)})
+        if fields:
+            entry.update(fields)
+        if section == "phases":
+            ending = self.totals.get("ending_phase", {}).get(key) or [0, 0, 0, 0]
+            entry.update({"games_won": ending[1], "games_lost": ending[2], "games_drawn": ending[3]})
+        if game_ids is not None:
+            entry["game_ids"] = game_ids
+        return entry
+
+    def _render_distribution(self, stats: Dict):
+        digest = self.time_digest()
+        count = digest.count
+        stats["time_spent_distribution"] = {
+            "count": int(count),
+            **{f"p{int(q * 100)}": (round(digest.quantile(q), 1) if count else None) for q in TIME_QUANTILES},
+        }
+
+    # ------------------------------------------------------------------
+    # Habits
+    # ------------------------------------------------------------------
+
+    def habit_inputs(self, game_ids: Optional[Iterable[str]] = None) -> Tuple[Dict[str, List[Dict]], Dict[str, Dict], float, List[str]]:
+        """
+        Per-habit history, per-game phase accuracies, baseline accuracy and the
+        tagged game ids for the given games (default: all), in the given order.
+        Only games with tags contribute, as in compute_habits.
+        """
+        habit_histories: Dict[str, List[Dict]] = defaultdict(list)
+        game_phase_accuracies: Dict[str, Dict] = {}
+        overall = []
+        tagged_ids = []
+
+        for game_id in (game_ids if game_ids is not None else self.games.keys()):
+            contribution = self.games.get(game_id)
+            if not contribution or not contribution.get("has_tags"):
+                continue
+            tagged_ids.append(game_id)
+            if contribution.get("overall_accuracy"):
+                overall.append(contribution["overall_accuracy"])
+            game_phase_accuracies[game_id] = dict(contribution.get("phase_accuracy") or {})
+            sums = contribution["sums"]
+
+            merged_tags: Dict[str, List[float]] = {}
+            for tag_name, values in sums.get("tags", {}).items():
+                target = merged_tags.setdefault(normalize_habit_key(tag_name), [0, 0.0])
+                target[0] += values[0]
+                target[1] += values[1]
+
+            def _entry(count, total):
+                return {
+                    "game_id": game_id,
+                    "game_date": contribution.get("game_date", ""),
+                    "accuracy": round(total / count, 1),
+                    "count": count,
+                }
+
+            for habit_key, (count, total) in merged_tags.items():
+                if count >= 1:
+                    habit_histories[habit_key].append(_entry(count, total))
+            for phase, values in sums.get("phases", {}).items():
+                if values[0] >= 3:
+                    habit_histories[f"phase_{phase}"].append(_entry(values[0], values[1]))
+
+        baseline_accuracy = sum(overall) / len(overall) if overall else 75.0
+        return dict(habit_histories), game_phase_accuracies, baseline_accuracy, tagged_ids
+
+
+def _leaf_paths(tree: Dict, prefix: Tuple[str, ...] = ()) -> List[Tuple[str, ...]]:
+    paths = []
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            paths.extend(_leaf_paths(value, prefix + (key,)))
+        else:
+            paths.append(prefix + (key,))
+    return paths
+
+
+def _lookup(tree: Dict, path: Tuple[str, ...]) -> Optional[List[float]]:
+    node: Any = tree
+    for key in path:
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return node
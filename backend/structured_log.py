@@ -0,0 +1,234 @@
+"""
+Structured Logging for Hot Paths
+
+Leveled, lazily formatted, rate-limited / sampled logging that writes
+through a queue, so request handlers never format payloads nobody will
+read and never block on stdout.
+
+    from structured_log import get_logger
+    _log = get_logger("llm_router")
+
+    _log.debug("🔍 [LLM_ROUTER] prompt", stage=stage, prompt=lambda: prompt_text)
+    _log.debug(lambda: {"event": "node_dump", "nodes": [n.to_payload() for n in nodes]})
+    _log.info("   ✅ [MINER] position mined", fen=fen, every=5.0)
+
+A message may be a string, a dict (rendered as one JSON line) or a callable
+returning either; field values may be callables too. Nothing is called or
+formatted unless the record is actually emitted.
+
+Configuration (env, read on first use; configure() overrides at runtime):
+    LOG_LEVEL=INFO                          default level for every module
+    LOG_LEVELS=llm_router=DEBUG,engine_pool=WARNING
+    LOG_SAMPLE=position_miner=0.05          fraction of DEBUG/INFO records kept
+    LOG_QUEUE=true                          false writes synchronously
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+ROOT_LOGGER = "chess_backend"
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+Message = Union[str, Dict[str, Any], Callable[[], Any]]
+
+_lock = threading.Lock()
+_loggers: Dict[str, "StructuredLogger"] = {}
+_config: Dict[str, Any] = {}
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _parse_level(value: Any, default: int = INFO) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value or "").strip().upper())
+    return level if isinstance(level, int) else default
+
+
+def _parse_pairs(raw: str) -> Dict[str, str]:
+    """"a=1,b=2" -> {"a": "1", "b": "2"}"""
+    pairs = {}
+    for item in (raw or "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            pairs[name.strip()] = value.strip()
+    return pairs
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time (test capture, redirected logs)."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+def _install_handler(use_queue: bool) -> None:
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER)
+    root.propagate = False
+    root.setLevel(DEBUG)  # module loggers carry the effective levels
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    output = _StdoutHandler()
+    output.setFormatter(logging.Formatter("%(message)s"))
+    if not use_queue:
+        root.addHandler(output)
+        return
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(records))
+    _listener = logging.handlers.QueueListener(records, output)
+    _listener.start()
+
+
+def configure(
+    *,
+    level: Optional[Union[str, int]] = None,
+    levels: Optional[Dict[str, Union[str, int]]] = None,
+    sample: Optional[Dict[str, float]] = None,
+    use_queue: Optional[bool] = None,
+) -> None:
+    """
+    (Re)configure logging. Arguments left as None fall back to the env
+    variables; existing loggers pick up the new levels and sample rates.
+    """
+    with _lock:
+        _config["level"] = _parse_level(level if level is not None else os.getenv("LOG_LEVEL", "INFO"))
+        raw_levels = levels if levels is not None else _parse_pairs(os.getenv("LOG_LEVELS", ""))
+        _config["levels"] = {name: _parse_level(value, _config["level"]) for name, value in raw_levels.items()}
+        raw_sample = sample if sample is not None else _parse_pairs(os.getenv("LOG_SAMPLE", ""))
+        _config["sample"] = {name: max(0.0, min(1.0, float(rate))) for name, rate in raw_sample.items()}
+        if use_queue is None:
+            use_queue = os.getenv("LOG_QUEUE", "true").lower().strip() != "false"
+        _install_handler(use_queue)
+        for structured in _loggers.values():
+            structured._apply_config()
+
+
+def flush() -> None:
+    """Block until queued records are written (tests, shutdown, benchmarks)."""
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener.start()
+
+
+def _resolve(value: Any) -> Any:
+    return value() if callable(value) else value
+
+
+def _render(message: Any, fields: Dict[str, Any]) -> str:
+    message = _resolve(message)
+    resolved = {key: _resolve(value) for key, value in fields.items()}
+    if isinstance(message, dict):
+        return json.dumps({**message, **resolved}, ensure_ascii=False, default=str)
+    if not resolved:
+        return str(message)
+    return f"{message} " + " ".join(f"{key}={value}" for key, value in resolved.items())
+
+
+class StructuredLogger:
+    """Per-module logger; see module docstring for the message forms."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+        self._sample_rate = 1.0
+        self._rate_state: Dict[str, Tuple[float, int]] = {}  # key -> (last emit, suppressed since)
+        self._apply_config()
+
+    def _apply_config(self) -> None:
+        self._logger.setLevel(_config.get("levels", {}).get(self.name, _config.get("level", INFO)))
+        self._sample_rate = _config.get("sample", {}).get(self.name, 1.0)
+
+    def enabled_for(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def log(
+        self,
+        level: int,
+        message: Message,
+        *,
+        every: Optional[float] = None,
+        key: Optional[str] = None,
+        sample: Optional[float] = None,
+        **fields: Any,
+    ) -> None:
+        """
+        Emit a record if `level` is enabled.
+
+        Args:
+            every: Emit at most once per this many seconds per `key`
+                (defaults to the message when it is a string); the next emitted
+                record reports how many were suppressed
+            sample: Fraction of records kept (overrides the module's LOG_SAMPLE
+                rate); warnings and errors are never sampled
+        """
+        if not self._logger.isEnabledFor(level):
+            return
+        if level < WARNING:
+            rate = self._sample_rate if sample is None else sample
+            if rate < 1.0 and random.random() >= rate:
+                return
+        if every is not None:
+            rate_key = key or (message if isinstance(message, str) else "")
+            now = time.monotonic()
+            last, suppressed = self._rate_state.get(rate_key, (None, 0))
+            if last is not None and now - last < every:
+                self._rate_state[rate_key] = (last, suppressed + 1)
+                return
+            self._rate_state[rate_key] = (now, 0)
+            if suppressed:
+                fields["suppressed"] = suppressed
+        try:
+            text = _render(message, fields)
+        except Exception as e:
+            text = f"⚠️ [LOG] could not render {self.name} record: {type(e).__name__}: {e}"
+        self._logger.log(level, text)
+
+    def debug(self, message: Message, **kwargs: Any) -> None:
+        self.log(DEBUG, message, **kwargs)
+
+    def info(self, message: Message, **kwargs: Any) -> None:
+        self.log(INFO, message, **kwargs)
+
+    def warning(self, message: Message, **kwargs: Any) -> None:
+        self.log(WARNING, message, **kwargs)
+
+    def error(self, message: Message, **kwargs: Any) -> None:
+        self.log(ERROR, message, **kwargs)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    """Logger for a backend module (configured from env on first use)."""
+    with _lock:
+        needs_config = not _config
+    if needs_config:
+        configure()
+    with _lock:
+        structured = _loggers.get(name)
+        if structured is None:
+            structured = _loggers[name] = StructuredLogger(name)
+        return structured
+
+
+@atexit.register
+def _shutdown() -> None:
+    if _listener is not None:
+        _listener.stop()
@@ -16,11 +16,22 @@ from investigator import InvestigationResult
 from evidence_semantic_story import build_semantic_story
 from minimal_prompts import MIN_SYSTEM_PROMPT_V1, SUMMARISER_CONTRACT_V1
 from command_protocol import render_command
+from exploration_index import ExplorationIndex
+from prompt_compiler import PromptCompiler, count_tokens
 
 if TYPE_CHECKING:
     from planner import ExecutionPlan
 
 
+def _section_tokens(name: str, default: int) -> int:
+    """Token cap for a summariser prompt section (SUMMARISER_<NAME>_MAX_TOKENS)"""
+    return int(os.getenv(f"SUMMARISER_{name.upper()}_MAX_TOKENS", str(default)))
+
+
+def _log_compiled_prompt(stage: str, compiled) -> None:
+    print(f"   📏 [{stage.upper()}_PROMPT] compiled: {compiled.stats()}")
+
+
 @dataclass
 class ClaimEvidencePayload:
     """
@@ -2095,12 +2106,17 @@ class Summariser:
             else getattr(inv, "material_change", None)
         )
         
-        # Backward-compat fallback: if precomputed lists are missing, fall back to old PGN-based calc.
-        if (pgn_line and hasattr(inv, "pgn_exploration") and inv.pgn_exploration and
-            not (tags_gained_net or tags_lost_net or roles_gained_net or roles_lost_net)):
-            tags_gained_net, tags_lost_net, roles_gained_net, roles_lost_net, _ = self._calculate_net_changes_from_pgn_sequence(
-                pgn_line, inv.pgn_exploration
-            )
+        # Backward-compat fallback: if precomputed lists are missing, sum the exploration index's
+        # per-move deltas along the line; replay the PGN only when the line isn't in the index.
+        if (pgn_line and not (tags_gained_net or tags_lost_net or roles_gained_net or roles_lost_net)):
+            index = ExplorationIndex.from_result(inv)
+            net = index.net_changes(pgn_line) if index is not None else None
+            if net is not None:
+                tags_gained_net, tags_lost_net, roles_gained_net, roles_lost_net = net
+            elif getattr(inv, "pgn_exploration", None):
+                tags_gained_net, tags_lost_net, roles_gained_net, roles_lost_net, _ = self._calculate_net_changes_from_pgn_sequence(
+                    pgn_line, inv.pgn_exploration
+                )
         
         # Trace claim identity + origin (helps debug duplicate Claim objects / overwritten evidence)
         origin = getattr(claim, "_origin", None)
@@ -2702,6 +2718,21 @@ class Summariser:
         per_move = getattr(inv, "evidence_per_move_deltas", None)
         if isinstance(per_move, list) and per_move:
             return {"main_sequence": per_move}
+        return self._exploration_sequence(inv)
+
+    def _exploration_sequence(self, inv: "InvestigationResult") -> Optional[Dict[str, Any]]:
+        """
+        Starting tags/roles and per-move deltas of the whole exploration.
+        Read from the Investigator's move index; the PGN text is parsed only
+        for results that carry no index.
+        """
+        index = ExplorationIndex.from_result(inv)
+        if index is not None:
+            return {
+                "starting_tags": index.starting_tags,
+                "starting_roles": index.starting_role_keys(),
+                "main_sequence": index.main_sequence(),
+            }
         pgn_expl = getattr(inv, "pgn_exploration", "") or ""
         if isinstance(pgn_expl, str) and pgn_expl.strip():
             return self._extract_pgn_sequence_with_deltas(pgn_expl)
@@ -3462,9 +3493,9 @@ class Summariser:
                 starting_roles = None
                 role_deltas = None
                 
-                if hasattr(investigation_result, 'pgn_exploration') and investigation_result.pgn_exploration:
-                    # Extract starting roles from PGN
-                    pgn_seq = self._extract_pgn_sequence_with_deltas(investigation_result.pgn_exploration)
+                if getattr(investigation_result, 'exploration_index', None) or getattr(investigation_result, 'pgn_exploration', None):
+                    # Extract starting roles and per-move deltas from the exploration
+                    pgn_seq = self._exploration_sequence(investigation_result)
                     if pgn_seq:
                         # Starting roles are stored as a list of strings in format "piece_id:role"
                         starting_roles_list = pgn_seq.get("starting_roles", [])
@@ -3560,8 +3591,8 @@ class Summariser:
                     if hasattr(light_raw, 'roles') and light_raw.roles:
                         # Extract starting roles to check if fork was pre-existing
                         starting_roles = None
-                        if hasattr(investigation_result, 'pgn_exploration') and investigation_result.pgn_exploration:
-                            pgn_seq = self._extract_pgn_sequence_with_deltas(investigation_result.pgn_exploration)
+                        if getattr(investigation_result, 'exploration_index', None) or getattr(investigation_result, 'pgn_exploration', None):
+                            pgn_seq = self._exploration_sequence(investigation_result)
                             if pgn_seq:
                                 starting_roles_list = pgn_seq.get("starting_roles", [])
                                 if starting_roles_list:
@@ -3900,7 +3931,13 @@ class Summariser:
                 evidence_moves = [m for m in moves if isinstance(m, str)][:4]  # Max 4 plies
                 evidence_source = source
         
-        # Priority 2: Check pgn_exploration for move sequences (fallback)
+        # Priority 2: Main line of the exploration (move index first, PGN text as fallback)
+        if not evidence_moves:
+            index = ExplorationIndex.from_result(investigation_result)
+            mainline = index.mainline(4) if index is not None else []
+            if len(mainline) >= 2:
+                evidence_moves = mainline
+                evidence_source = "pgn"
         if not evidence_moves and investigation_result.pgn_exploration:
             pgn_text = investigation_result.pgn_exploration
             
@@ -4823,9 +4860,7 @@ class Summariser:
                     primary_narratives.append(primary_narrative)
                     
                     # Extract and rank tag deltas
-                    pgn_tag_deltas_raw = None
-                    if result.pgn_exploration:
-                        pgn_tag_deltas_raw = self._extract_pgn_sequence_with_deltas(result.pgn_exploration)
+                    pgn_tag_deltas_raw = self._exploration_sequence(result)
                     
                     tag_ranking = self._rank_and_suppress_tag_deltas(pgn_tag_deltas_raw)
                     selected_tags = tag_ranking["selected_tags"]
@@ -4946,29 +4981,48 @@ class Summariser:
                     roles_gained_net_for_prompt = list(getattr(first_result, "evidence_roles_gained_net", []) or [])
                     roles_lost_net_for_prompt = list(getattr(first_result, "evidence_roles_lost_net", []) or [])
             
+            # Evidence sections, compiled against one token budget (net tags/roles and the
+            # recommendation first; reference deltas and the PGN get what's left)
+            agenda_items = (execution_plan.discussion_agenda or [])[:6] if execution_plan and getattr(execution_plan, "discussion_agenda", None) else []
+            compiler = PromptCompiler(budget_tokens=_section_tokens("evidence", 5000))
+            compiler.add("tags_gained_net", tags_gained_net_for_prompt[:20], priority=10, label="Tags gained (net)", empty_text="No net tags gained")
+            compiler.add("tags_lost_net", tags_lost_net_for_prompt[:20], priority=10, label="Tags lost (net)", empty_text="No net tags lost")
+            compiler.add("roles_gained_net", roles_gained_net_for_prompt[:20], priority=10, label="Roles gained (net)", empty_text="No net roles gained")
+            compiler.add("roles_lost_net", roles_lost_net_for_prompt[:20], priority=10, label="Roles lost (net)", empty_text="No net roles lost")
+            compiler.add("primary_recommendation", primary_recommendation, priority=15, max_tokens=_section_tokens("primary_recommendation", 600), label="PRIMARY RECOMMENDATION")
+            compiler.add("agenda", agenda_items, priority=20, max_tokens=_section_tokens("agenda", 900), label="DISCUSSION AGENDA")
+            # In suggestion mode, we still allow a *brief* contrast if the user explicitly asked to compare.
+            # Keep the data small; the model should lead with the PRIMARY RECOMMENDATION regardless.
+            compiler.add("comparison_data", facts_list[:4] if force_suggestion else facts_list, priority=30, max_tokens=_section_tokens("comparison_data", 1500), label="COMPARISON DATA")
+            if not force_suggestion:
+                compiler.add("all_tag_deltas", all_tag_deltas_comparison[:40], priority=40, max_tokens=_section_tokens("tag_deltas", 600), label="ALL TAG DELTAS")
+                compiler.add("all_role_deltas", all_role_deltas_comparison[:40], priority=40, max_tokens=_section_tokens("role_deltas", 600), label="ALL ROLE DELTAS")
+            compiler.add("pgn_with_tag_deltas", pgn_with_tag_deltas, priority=50, max_tokens=_section_tokens("comparison_pgn", 600), empty_text="No PGN available")
+            compiled = compiler.compile()
+            _log_compiled_prompt("summariser_comparison", compiled)
+            positions_text = f"\n{compiled.legend}\n" if compiled.legend else ""
+
             # Build conditional sections based on force_suggestion
             comparison_data_section = ""
             if force_suggestion:
-                # In suggestion mode, we still allow a *brief* contrast if the user explicitly asked to compare.
-                # Keep the data small; the model should lead with the PRIMARY RECOMMENDATION regardless.
                 comparison_data_section = (
                     "OTHER CANDIDATES (for optional brief contrast if the user asked to compare; do not over-focus):\n"
-                    f"{json.dumps(facts_list[:4], indent=2)}"
+                    f"{compiled['comparison_data']}"
                 )
             else:
-                comparison_data_section = f"COMPARISON DATA (other moves analyzed for context - DO NOT mention in core_message):\n{json.dumps(facts_list, indent=2)}"
+                comparison_data_section = f"COMPARISON DATA (other moves analyzed for context - DO NOT mention in core_message):\n{compiled['comparison_data']}"
             
             all_tag_deltas_section = ""
             if not force_suggestion and all_tag_deltas_comparison:
                 all_tag_deltas_section = f"""ALL TAG DELTAS (from all results - for reference only):
 Each entry has format: {{"direction": "gained"|"lost", "tag": "tag_name", "move": "move_san"}}
-{json.dumps(all_tag_deltas_comparison[:40], indent=2)}"""
+{compiled['all_tag_deltas']}"""
             
             all_role_deltas_section = ""
             if not force_suggestion and all_role_deltas_comparison:
                 all_role_deltas_section = f"""ALL ROLE DELTAS (from all results - for reference only):
 Each entry has format: {{"direction": "gained"|"lost", "role": "piece_id:role_name", "move": "move_san"}}
-{json.dumps(all_role_deltas_comparison[:40], indent=2)}"""
+{compiled['all_role_deltas']}"""
             
             pgn_header = "PRIMARY RECOMMENDATION PGN (for reference):" if force_suggestion else "FULL PGN WITH TAG AND ROLE DELTAS (for reference):"
             
@@ -4998,7 +5052,9 @@ Do not list facts. Do not hedge. Do not speculate.
 
 USER QUERY: {user_message or "Compare these moves"}
 USER GOAL (extracted): {user_goal or "unknown"}
-DISCUSSION AGENDA (planner-provided; MUST cover): {json.dumps((execution_plan.discussion_agenda or [])[:6], indent=2) if execution_plan and getattr(execution_plan, "discussion_agenda", None) else "None"}
+{positions_text}
+Evidence below is compact JSON. "<same as X>" points to data already shown under X; "… +N more" marks trimmed list items.
+DISCUSSION AGENDA (planner-provided; MUST cover): {compiled['agenda']}
 
 SUGGESTION MODE: {bool(force_suggestion)}
 If SUGGESTION MODE is true:
@@ -5009,7 +5065,7 @@ If SUGGESTION MODE is true:
 - Remaining claims (2..N) should cover agenda topics and optionally warn about specific bad candidates.
 
 PRIMARY RECOMMENDATION (deterministic; do not contradict):
-{json.dumps(primary_recommendation, indent=2) if primary_recommendation else "None"}
+{compiled['primary_recommendation']}
 
 {comparison_data_section}
 
@@ -5017,18 +5073,18 @@ PRIMARY RECOMMENDATION (deterministic; do not contradict):
 
 NET TAG CHANGES (final net tags after the PRIMARY RECOMMENDATION sequence):
 These are the actual tags that will be shown to the user. Use these exact strings; do not invent tags.
-Tags gained (net): {json.dumps(tags_gained_net_for_prompt[:20], indent=2) if tags_gained_net_for_prompt else "No net tags gained"}
-Tags lost (net): {json.dumps(tags_lost_net_for_prompt[:20], indent=2) if tags_lost_net_for_prompt else "No net tags lost"}
+Tags gained (net): {compiled['tags_gained_net']}
+Tags lost (net): {compiled['tags_lost_net']}
 
 {all_role_deltas_section}
 
 NET ROLE CHANGES (final net roles after the PRIMARY RECOMMENDATION sequence):
 These are the actual roles that will be shown to the user. Use these exact strings; do not invent roles.
-Roles gained (net): {json.dumps(roles_gained_net_for_prompt[:20], indent=2) if roles_gained_net_for_prompt else "No net roles gained"}
-Roles lost (net): {json.dumps(roles_lost_net_for_prompt[:20], indent=2) if roles_lost_net_for_prompt else "No net roles lost"}
+Roles gained (net): {compiled['roles_gained_net']}
+Roles lost (net): {compiled['roles_lost_net']}
 
 {pgn_header}
-{pgn_with_tag_deltas[:2000] if pgn_with_tag_deltas else "No PGN available"}
+{compiled['pgn_with_tag_deltas']}
 
 NARRATIVE STRUCTURE (suggestions - you have flexibility):
 - You may want to consider: INTENT (what the player intended) → MECHANISM (what the move physically does) → OUTCOME (how it affects the goal)
@@ -5682,7 +5738,7 @@ STRICT RULES (anti-hallucination and quality - these are mandatory):
             }
             
             # Use LLM to decide narrative, core message, psychological frame, mechanism, tags, claims, and PGN sequences
-            agenda_text = ""
+            agenda_for_prompt: List[Dict[str, Any]] = []
             try:
                 if execution_plan and hasattr(execution_plan, "discussion_agenda") and execution_plan.discussion_agenda:
                     # Enrich agenda with deterministic "must-surface" evidence so coverage is enforceable.
@@ -5698,7 +5754,6 @@ STRICT RULES (anti-hallucination and quality - these are mandatory):
                     except Exception:
                         moves_tested = []
 
-                    agenda_for_prompt: List[Dict[str, Any]] = []
                     for item in (execution_plan.discussion_agenda or []):
                         if not isinstance(item, dict):
                             continue
@@ -5768,31 +5823,30 @@ STRICT RULES (anti-hallucination and quality - these are mandatory):
                             pass
 
                         agenda_for_prompt.append(enriched)
-
-                    agenda_text = "\nDISCUSSION AGENDA (planner-provided; MUST cover these topics):\n"
-                    agenda_text += json.dumps(agenda_for_prompt, indent=2) + "\n"
             except Exception:
-                agenda_text = ""
+                agenda_for_prompt = []
+
+            # Keep prompt size bounded (vLLM context is limited): each evidence section has a
+            # priority and a token cap; the net tag/role lists (copied verbatim) are fitted first.
+            compiler = PromptCompiler(budget_tokens=_section_tokens("evidence", 5000))
+            compiler.add("tags_gained_net", tags_gained_net_for_prompt[:60], priority=10, label="Tags gained (net)", empty_text="No net tags gained")
+            compiler.add("tags_lost_net", tags_lost_net_for_prompt[:60], priority=10, label="Tags lost (net)", empty_text="No net tags lost")
+            compiler.add("roles_gained_net", roles_gained_net_for_prompt[:40], priority=10, label="Roles gained (net)", empty_text="No net roles gained")
+            compiler.add("roles_lost_net", roles_lost_net_for_prompt[:40], priority=10, label="Roles lost (net)", empty_text="No net roles lost")
+            compiler.add("facts", facts, priority=20, max_tokens=_section_tokens("facts", 1200), label="INVESTIGATION FACTS")
+            compiler.add("agenda", agenda_for_prompt, priority=30, max_tokens=_section_tokens("agenda", 900), label="DISCUSSION AGENDA")
+            compiler.add("significance", significance, priority=40, max_tokens=_section_tokens("significance", 450), label="SIGNIFICANCE SCORES")
+            compiler.add("primary_context", primary_context, priority=50, max_tokens=_section_tokens("primary_context", 900), label="PRIMARY CONTEXT")
+            compiler.add("all_role_deltas", all_role_deltas[:30], priority=60, max_tokens=_section_tokens("role_deltas", 500), label="ALL ROLE DELTAS", empty_text="No role deltas available")
+            compiler.add("original_pgn_context", original_pgn_context, priority=70, max_tokens=_section_tokens("original_pgn_context", 650), label="ORIGINAL PGN CONTEXT")
+            compiler.add("worded_pgn", worded_pgn, priority=80, max_tokens=_section_tokens("worded_pgn", 650), label="WORDED PGN", empty_text="No worded PGN available")
+            compiled = compiler.compile()
+            _log_compiled_prompt("summariser", compiled)
 
-            # Keep prompt size bounded (vLLM context is limited).
-            def _dump_json_limited(obj: Any, max_chars: int) -> str:
-                try:
-                    s = json.dumps(obj, indent=2)
-                except Exception:
-                    s = str(obj)
-                if not isinstance(s, str):
-                    s = str(s)
-                if max_chars <= 0:
-                    return ""
-                if len(s) <= max_chars:
-                    return s
-                return s[:max_chars] + f"\n... <truncated {len(s) - max_chars} chars>"
-
-            facts_json = _dump_json_limited(facts, int(os.getenv("SUMMARISER_FACTS_MAX_CHARS", "4500")))
-            significance_json = _dump_json_limited(significance, int(os.getenv("SUMMARISER_SIGNIFICANCE_MAX_CHARS", "1800")))
-            primary_context_json = _dump_json_limited(primary_context, int(os.getenv("SUMMARISER_PRIMARY_CONTEXT_MAX_CHARS", "3500")))
-            original_pgn_context_json = _dump_json_limited(original_pgn_context, int(os.getenv("SUMMARISER_ORIGINAL_PGN_CONTEXT_MAX_CHARS", "2500")))
-            worded_pgn_json = _dump_json_limited(worded_pgn, int(os.getenv("SUMMARISER_WORDED_PGN_MAX_CHARS", "2500"))) if worded_pgn else "No worded PGN available"
+            agenda_text = ""
+            if agenda_for_prompt:
+                agenda_text = f"\nDISCUSSION AGENDA (planner-provided; MUST cover these topics):\n{compiled['agenda']}\n"
+            positions_text = f"\n{compiled.legend}\n" if compiled.legend else ""
             prompt = f"""You are an editorial decision-maker.
 The analysis is already correct.
 You must not introduce new chess ideas.
@@ -5801,40 +5855,42 @@ Do not list facts. Do not hedge. Do not speculate.
 
 USER QUERY: {user_message or "Analyze this position"}
 USER GOAL (extracted): {user_goal or "unknown"}
+{positions_text}
+Evidence below is compact JSON. "<same as X>" points to data already shown under X; "… +N more" marks trimmed list items.
 
 INVESTIGATION FACTS (structured data only):
-{facts_json}
+{compiled['facts']}
 
 {agenda_text}
 
 SIGNIFICANCE SCORES (deterministic; optional guidance):
 Use these only if they help; do NOT force-mention them.
 These are intended to prevent hallucinated mechanisms that are not supported by evidence.
-{significance_json}
+{compiled['significance']}
 
 PRIMARY CONTEXT (use this first; compact and piece-linked):
-{primary_context_json}
+{compiled['primary_context']}
 
 ORIGINAL PGN CONTEXT (grounding only; do NOT invent beyond this):
-{original_pgn_context_json}
+{compiled['original_pgn_context']}
 
 WORDED PGN (SAN→words; grounded by per-move FEN+deltas):
-{worded_pgn_json}
+{compiled['worded_pgn']}
 
 NET TAG CHANGES (final net tags after the sequence):
 These are the actual tags that will be shown to the user. Copy the EXACT strings from these lists; do not invent tags.
-Tags gained (net): {json.dumps(tags_gained_net_for_prompt[:60], indent=2) if tags_gained_net_for_prompt else "No net tags gained"}
-Tags lost (net): {json.dumps(tags_lost_net_for_prompt[:60], indent=2) if tags_lost_net_for_prompt else "No net tags lost"}
+Tags gained (net): {compiled['tags_gained_net']}
+Tags lost (net): {compiled['tags_lost_net']}
 
 ALL ROLE DELTAS (all role changes from the position - for reference only):
 Each entry has format: {{"direction": "gained"|"lost", "role": "piece_id:role_name", "move": "move_san"}}
-{json.dumps(all_role_deltas[:30], indent=2) if all_role_deltas else "No role deltas available"}
+{compiled['all_role_deltas']}
 
 NET ROLE CHANGES (final net roles after the sequence):
 These are the actual roles that will be shown to the user. Copy the EXACT strings from these lists; do not invent roles.
 IMPORTANT: Role format is "color_piece_type_square:role.name" (e.g., "white_bishop_e2:role.tactical.pinned" or "black_queen_e5:role.attacking.overloaded_piece")
-Roles gained (net): {json.dumps(roles_gained_net_for_prompt[:40], indent=2) if roles_gained_net_for_prompt else "No net roles gained"}
-Roles lost (net): {json.dumps(roles_lost_net_for_prompt[:40], indent=2) if roles_lost_net_for_prompt else "No net roles lost"}
+Roles gained (net): {compiled['roles_gained_net']}
+Roles lost (net): {compiled['roles_lost_net']}
 
 GROUNDING CONTRACT (keep this light; style is up to you):
 - You are free in tone/structure.
@@ -5902,6 +5958,8 @@ STRICT RULES (anti-hallucination and quality - these are mandatory):
 - Do NOT invent tags, roles, or moves not present in the provided data
 - Do NOT claim mechanisms or outcomes without evidence from tags/roles/eval deltas"""
 
+            print(f"   📏 [SUMMARISER_PROMPT] prompt_tokens={count_tokens(prompt)} evidence_tokens={compiled.total_tokens}")
+
             # Log what's being sent to LLM
             print(f"   🔍 [LLM_PROMPT] Net changes being sent to LLM:")
             print(f"      - Tags gained (net): {len(tags_gained_net_for_prompt)} items")
@@ -5954,18 +6012,30 @@ STRICT RULES (anti-hallucination and quality - these are mandatory):
 
                 return False
 
-            def _call_llm(prompt_text: str, model: str) -> Tuple[Dict[str, Any], str]:
+            def _call_llm(prompt_text: str, model: str, repair_reason: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
                 import time as _time
                 from pipeline_timer import get_pipeline_timer
                 _timer = get_pipeline_timer()
                 _t0 = _time.perf_counter()
                 resp = None
                 if self.llm_router:
-                    cmd = render_command(
-                        command="SUMMARIZE_FINDINGS",
-                        input={"prompt": prompt_text},
-                        constraints={"json_only": True},
-                    )
+                    if repair_reason:
+                        # The session transcript already holds the prompt and the rejected answer;
+                        # send only the correction instead of the whole prompt again.
+                        cmd = render_command(
+                            command="REPAIR_SUMMARY",
+                            input={
+                                "problem": repair_reason,
+                                "instruction": "Your previous SUMMARIZE_FINDINGS answer was rejected. Return the complete corrected JSON with a concrete core_message, mechanism and grounded claims.",
+                            },
+                            constraints={"json_only": True},
+                        )
+                    else:
+                        cmd = render_command(
+                            command="SUMMARIZE_FINDINGS",
+                            input={"prompt": prompt_text},
+                            constraints={"json_only": True},
+                        )
                     parsed = self.llm_router.complete_json(
                         session_id=session_id or "default",
                         stage="summariser",
@@ -5974,6 +6044,10 @@ STRICT RULES (anti-hallucination and quality - these are mandatory):
                         user_text=cmd,
                         model=model,
                         max_tokens=int(os.getenv("SUMMARISER_MAX_TOKENS", "1200")),
+                        # Cached only at temperature 0, and never a placeholder answer
+                        temperature=0.0 if "gpt-5" not in str(model).lower() else None,
+                        cache=not repair_reason,
+                        cache_validate=lambda d: not _is_low_quality_decision(d),
                     )
                     raw = json.dumps(parsed, ensure_ascii=False)
                 else:
@@ -5991,7 +6065,7 @@ STRICT RULES (anti-hallucination and quality - these are mandatory):
                 except Exception:
                     prompt_tokens = None
                     completion_tokens = None
-                if _timer:
+                if _timer and resp is not None:  # router calls are recorded by the LLMRouter
                     _timer.record_llm("summariser", _dt, tokens_in=prompt_tokens, tokens_out=completion_tokens, model=model)
                 return json.loads(raw), raw
 
@@ -6010,9 +6084,9 @@ STRICT RULES (anti-hallucination and quality - these are mandatory):
             chosen_model: str = self.model
             last_err: Optional[str] = None
 
-            def _try_once(model_to_use: str) -> Tuple[Optional[Dict[str, Any]], str, Optional[str]]:
+            def _try_once(model_to_use: str, repair_reason: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], str, Optional[str]]:
                 try:
-                    dd, rr = _call_llm(prompt_text=prompt, model=model_to_use)
+                    dd, rr = _call_llm(prompt_text=prompt, model=model_to_use, repair_reason=repair_reason)
                     if _is_low_quality_decision(dd):
                         return None, rr, "low_quality"
                     return dd, rr, None
@@ -6021,7 +6095,9 @@ STRICT RULES (anti-hallucination and quality - these are mandatory):
 
             retries = max(0, int(getattr(self, "max_retries", 0) or 0))
             for attempt_idx in range(retries + 1):
-                dd, rr, err = _try_once(self.model)
+                # A low-quality answer is in the session transcript: repair it rather than resend the prompt
+                repair_reason = "low_quality: empty or placeholder core_message/mechanism/claims" if last_err == "low_quality" else None
+                dd, rr, err = _try_once(self.model, repair_reason)
                 if rr:
                     raw_1 = rr
                 if dd is not None:
@@ -6072,27 +6148,39 @@ STRICT RULES (anti-hallucination and quality - these are mandatory):
                 requested = decision_dict.get("requested_context") or []
                 print(f"   🧠 [LLM_SECOND_PASS] Model requested more context: {requested}")
 
+                secondary_compiler = PromptCompiler(budget_tokens=_section_tokens("secondary", 3500))
+                secondary_compiler.add("tags_gained_net", tags_gained_net_full[:60], priority=10, label="FULL Tags gained (net)", empty_text="No net tags gained")
+                secondary_compiler.add("tags_lost_net", tags_lost_net_full[:60], priority=10, label="FULL Tags lost (net)", empty_text="No net tags lost")
+                secondary_compiler.add("roles_gained_net", roles_gained_net_full[:60], priority=10, label="FULL Roles gained (net)", empty_text="No net roles gained")
+                secondary_compiler.add("roles_lost_net", roles_lost_net_full[:60], priority=10, label="FULL Roles lost (net)", empty_text="No net roles lost")
+                secondary_compiler.add("all_tag_deltas", all_tag_deltas[:60], priority=20, max_tokens=_section_tokens("secondary_deltas", 900), label="ALL TAG DELTAS", empty_text="No tag deltas available")
+                secondary_compiler.add("all_role_deltas", all_role_deltas[:60], priority=20, max_tokens=_section_tokens("secondary_deltas", 900), label="ALL ROLE DELTAS", empty_text="No role deltas available")
+                secondary_compiler.add("pgn_with_tag_deltas", pgn_with_tag_deltas, priority=30, max_tokens=_section_tokens("secondary_pgn", 700), empty_text="No PGN available")
+                more = secondary_compiler.compile()
+                _log_compiled_prompt("summariser_secondary", more)
+
                 secondary = f"""
 
 SECONDARY CONTEXT (expanded):
 Use this only if needed. You still must not invent tags/roles.
+{more.legend}
 
 ALL TAG DELTAS (full; reference only):
-{json.dumps(all_tag_deltas[:60], indent=2) if all_tag_deltas else "No tag deltas available"}
+{more['all_tag_deltas']}
 
 ALL ROLE DELTAS (full; reference only):
-{json.dumps(all_role_deltas[:60], indent=2) if all_role_deltas else "No role deltas available"}
+{more['all_role_deltas']}
 
 FULL NET TAG CHANGES:
-Tags gained (net): {json.dumps(tags_gained_net_full[:60], indent=2) if tags_gained_net_full else "No net tags gained"}
-Tags lost (net): {json.dumps(tags_lost_net_full[:60], indent=2) if tags_lost_net_full else "No net tags lost"}
+Tags gained (net): {more['tags_gained_net']}
+Tags lost (net): {more['tags_lost_net']}
 
 FULL NET ROLE CHANGES:
-Roles gained (net): {json.dumps(roles_gained_net_full[:60], indent=2) if roles_gained_net_full else "No net roles gained"}
-Roles lost (net): {json.dumps(roles_lost_net_full[:60], indent=2) if roles_lost_net_full else "No net roles lost"}
+Roles gained (net): {more['roles_gained_net']}
+Roles lost (net): {more['roles_lost_net']}
 
 FULL PGN WITH TAG/ROLE DELTAS:
-{pgn_with_tag_deltas[:2500] if pgn_with_tag_deltas else "No PGN available"}
+{more['pgn_with_tag_deltas']}
 """
 
                 decision_dict_2, raw_2 = _call_llm(prompt + secondary, model=chosen_model)
@@ -6129,20 +6217,6 @@ FULL PGN WITH TAG/ROLE DELTAS:
 
             if proofread_enabled:
                 try:
-                    def _cap_obj(obj: Any, max_chars: int) -> Any:
-                        # Convert to JSON-ish string and truncate; keep as string for prompt safety.
-                        try:
-                            s = json.dumps(obj, ensure_ascii=False)
-                        except Exception:
-                            s = str(obj)
-                        if not isinstance(s, str):
-                            s = str(s)
-                        if max_chars <= 0:
-                            return ""
-                        if len(s) <= max_chars:
-                            return s
-                        return s[:max_chars] + f"... <truncated {len(s) - max_chars} chars>"
-
                     evidence_packet = {
                         "evidence_eval": facts.get("evidence_eval") if isinstance(facts, dict) else {},
                         "tags_gained_net": tags_gained_net_for_prompt[:60],
@@ -6178,12 +6252,22 @@ FULL PGN WITH TAG/ROLE DELTAS:
                         "Return JSON with the SAME SHAPE as draft: {core_message, mechanism, psychological_frame, selected_tags, claims, emphasis, verbosity}.\n"
                     )
 
+                    # Draft first: it must survive intact; the evidence packet gets what's left
+                    proofread_compiler = PromptCompiler(budget_tokens=_section_tokens("proofreader", 3200))
+                    proofread_compiler.add("draft", draft, priority=10, max_tokens=_section_tokens("proofreader_draft", 1250), label="draft")
+                    proofread_compiler.add("evidence_packet", evidence_packet, priority=20, max_tokens=_section_tokens("proofreader_evidence", 2000), label="evidence_packet")
+                    proofread_input = proofread_compiler.compile()
+                    _log_compiled_prompt("summariser_proofread", proofread_input)
+
+                    proofread_payload = {
+                        "evidence_packet": proofread_input["evidence_packet"],
+                        "draft": proofread_input["draft"],
+                    }
+                    if proofread_input.legend:
+                        proofread_payload["positions"] = proofread_input.legend
                     cmd = render_command(
                         command="PROOFREAD_SUMMARY",
-                        input={
-                            "evidence_packet": _cap_obj(evidence_packet, int(os.getenv("SUMMARISER_PROOFREADER_EVIDENCE_MAX_CHARS", "8000"))),
-                            "draft": _cap_obj(draft, int(os.getenv("SUMMARISER_PROOFREADER_DRAFT_MAX_CHARS", "5000"))),
-                        },
+                        input=proofread_payload,
                         constraints={"json_only": True},
                     )
 
@@ -0,0 +1,29 @@
+-- Migration 038: Materialized Overview snapshots
+-- games.overview_features: PGN-derived Overview inputs extracted once at ingest
+--   {"v", "plies", "clk" (user clock remaining, deciseconds), "clk_n", "early_burn", "late_pressure", "pressure"}
+-- profile_overview_snapshots: per-user window of compact game rows + the rendered snapshot,
+--   updated incrementally when games are saved, compressed or archived
+
+ALTER TABLE public.games
+  ADD COLUMN IF NOT EXISTS overview_features JSONB;
+
+CREATE TABLE IF NOT EXISTS public.profile_overview_snapshots (
+  user_id uuid PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+  window_size INTEGER NOT NULL DEFAULT 60,
+  truncated BOOLEAN NOT NULL DEFAULT false,  -- older games fell out of the window
+  games JSONB NOT NULL DEFAULT '[]'::jsonb,   -- compact rows, most recent first
+  snapshot JSONB,                             -- rendered build_overview_snapshot() output
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- RLS policies
+ALTER TABLE public.profile_overview_snapshots ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own overview snapshot"
+  ON public.profile_overview_snapshots FOR SELECT
+  USING (auth.uid() = user_id);
+
+COMMENT ON TABLE public.profile_overview_snapshots IS 'Materialized profile Overview snapshot, maintained incrementally on game ingest/compression';
+COMMENT ON COLUMN public.games.overview_features IS 'Overview inputs (clock series, time-style features, ply count) extracted from the PGN at ingest';
+
@@ -0,0 +1,24 @@
+-- Migration 040: Version counter for profile_overview_snapshots
+-- Incremental snapshot updates read, edit and write back the row; writers compare-and-set on
+-- version and retry on conflict. The trigger bumps it on every update (upserts included).
+
+ALTER TABLE public.profile_overview_snapshots
+  ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION public.bump_profile_overview_snapshot_version()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.version := OLD.version + 1;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS bump_profile_overview_snapshot_version ON public.profile_overview_snapshots;
+CREATE TRIGGER bump_profile_overview_snapshot_version
+  BEFORE UPDATE ON public.profile_overview_snapshots
+  FOR EACH ROW EXECUTE PROCEDURE public.bump_profile_overview_snapshot_version();
+
+COMMENT ON COLUMN public.profile_overview_snapshots.version IS 'Bumped on every update; incremental writers compare-and-set on it';
+
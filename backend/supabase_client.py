@@ -13,6 +13,8 @@ import traceback
 import threading
 import queue
 
+from position_index import POSITION_INDEX_FIELDS, TIME_BUCKET_RANGES, PositionIndexRegistry
+
 
 class SupabaseClient:
     @staticmethod
@@ -38,6 +40,7 @@ class SupabaseClient:
     
     def __init__(self, url: str, service_role_key: str):
         self.client: Client = create_client(url, service_role_key)
+        self.position_index = PositionIndexRegistry(self._load_position_index_rows)
         print(f"✅ Supabase client initialized: {url}")
 
     def _apply_eq(self, query, column: str, value):
@@ -701,16 +704,42 @@ class SupabaseClient:
             except Exception:
                 insert_data["game_review"] = {"_stored": False, "_reason": "size_check_failed"}
 
+            # Compact columnar ply data for analytics (stored even when the full review is too large)
+            try:
+                from ply_columns import encode_ply_columns_b64
+                ply_columns = encode_ply_columns_b64(game_data.get("game_review") or game_data)
+                if ply_columns:
+                    insert_data["ply_columns"] = ply_columns
+            except Exception as e:
+                print(f"   ⚠️ Failed to encode ply columns: {e}")
+
+            # Overview inputs (clock series, time-style features, ply count) parsed from the PGN once here
+            try:
+                from profile_overview_snapshot import extract_overview_features
+                insert_data["overview_features"] = extract_overview_features(game_data.get("pgn"), game_data.get("user_color"))
+            except Exception as e:
+                print(f"   ⚠️ Failed to extract overview features: {e}")
             
             # Debug: log platform value
             print(f"   💾 Saving game: platform={insert_data['platform']}, external_id={insert_data['external_id']}")
             
             # Upsert based on user_id + platform + external_id
             # Supabase Python client upsert updates all provided fields on conflict
-            result = self.client.table("games").upsert(
-                insert_data,
-                on_conflict="user_id,platform,external_id"
-            ).execute()
+            try:
+                result = self.client.table("games").upsert(
+                    insert_data,
+                    on_conflict="user_id,platform,external_id"
+                ).execute()
+            except Exception as e:
+                optional = [c for c in ("ply_columns", "overview_features") if c in insert_data and self._is_missing_column_error(e, c)]
+                if not optional:
+                    raise
+                for column in optional:
+                    insert_data.pop(column)
+                result = self.client.table("games").upsert(
+                    insert_data,
+                    on_conflict="user_id,platform,external_id"
+                ).execute()
             
             if result.data and len(result.data) > 0:
                 game_id = result.data[0].get("id")
@@ -730,6 +759,9 @@ class SupabaseClient:
                     print(f"   ⚠️ Failed to save graph data for game {game_id}: {e}")
                     # Non-fatal - game is still saved
                 
+                # Keep the materialized Overview snapshot current (non-fatal)
+                self.update_overview_snapshot(user_id, add_game={**insert_data, "id": game_id})
+                
                 return game_id
             
             return None
@@ -819,37 +851,49 @@ class SupabaseClient:
     def get_recent_games_for_overview_snapshot(self, user_id: str, limit: int = 60) -> List[Dict]:
         """
         Fetch a small set of fields needed for the Overview snapshot.
-        Includes PGN clocks + user_color for true time-style classification.
+        Reads the ingest-time overview_features (clock/time-style/ply data) instead
+        of PGNs; only rows saved before that column existed get their PGN fetched.
         """
-        try:
-            select_fields = (
-                "id,game_date,created_at,updated_at,"
-                "pgn,user_color,user_rating,result,opening_name,accuracy_overall,time_control"
-            )
+        base_fields = "id,game_date,created_at,updated_at,user_color,user_rating,result,opening_name,accuracy_overall,time_control"
+
+        def _query(select_fields: str, skip_compressed: bool):
             query = self.client.table("games")\
                 .select(select_fields)\
                 .eq("user_id", user_id)\
                 .is_("archived_at", "null")\
                 .or_("review_type.eq.full,review_type.is.null")
-
-            # Filter out compressed games unless explicitly requested (best-effort)
-            try:
+            if skip_compressed:
                 query = query.is_("compressed_at", "null")
-                result = query.order("updated_at", desc=True).limit(int(limit)).execute()
-            except Exception as e:
-                if self._is_missing_column_error(e, "compressed_at"):
-                    result = self.client.table("games")\
-                        .select(select_fields)\
-                        .eq("user_id", user_id)\
-                        .is_("archived_at", "null")\
-                        .or_("review_type.eq.full,review_type.is.null")\
-                        .order("updated_at", desc=True)\
-                        .limit(int(limit))\
-                        .execute()
-                else:
-                    raise
+            return query.order("updated_at", desc=True).limit(int(limit)).execute()
 
-            return result.data if result.data else []
+        try:
+            select_fields = f"{base_fields},overview_features"
+            skip_compressed = True
+            while True:
+                try:
+                    result = _query(select_fields, skip_compressed)
+                    break
+                except Exception as e:
+                    # Filter out compressed games / read stored features when the schema has them (best-effort)
+                    if skip_compressed and self._is_missing_column_error(e, "compressed_at"):
+                        skip_compressed = False
+                    elif select_fields.endswith("overview_features") and self._is_missing_column_error(e, "overview_features"):
+                        select_fields = f"{base_fields},pgn"
+                    else:
+                        raise
+
+            games = result.data if result.data else []
+            legacy_ids = [g["id"] for g in games if not g.get("overview_features") and "pgn" not in g]
+            if legacy_ids:
+                pgns = self.client.table("games")\
+                    .select("id,pgn")\
+                    .in_("id", legacy_ids)\
+                    .execute()
+                pgn_by_id = {row["id"]: row.get("pgn") for row in (pgns.data or [])}
+                for g in games:
+                    if g["id"] in pgn_by_id:
+                        g["pgn"] = pgn_by_id[g["id"]]
+            return games
         except Exception as e:
             error_msg = str(e)
             # On timeout, return empty list to avoid blocking the request
@@ -857,15 +901,126 @@ class SupabaseClient:
                 print(f"[supabase] Timeout fetching games for overview snapshot (user_id={user_id[:8]}...), returning empty list")
                 return []
             return self._handle_supabase_error(e, "fetching overview snapshot games", [])
+
+    # Compare-and-set attempts for an incremental Overview snapshot update
+    OVERVIEW_SNAPSHOT_CAS_RETRIES = 5
+
+    def get_overview_snapshot_view(self, user_id: str) -> Optional[Dict]:
+        """Materialized Overview snapshot row (profile_overview_snapshots), if any."""
+        columns = "window_size,truncated,games,snapshot,version"
+        try:
+            try:
+                result = self.client.table("profile_overview_snapshots")\
+                    .select(columns)\
+                    .eq("user_id", user_id)\
+                    .maybe_single()\
+                    .execute()
+            except Exception as e:
+                # Schema without migration 040 (no version column yet)
+                if not self._is_missing_column_error(e, "version"):
+                    raise
+                result = self.client.table("profile_overview_snapshots")\
+                    .select(columns.rsplit(",", 1)[0])\
+                    .eq("user_id", user_id)\
+                    .maybe_single()\
+                    .execute()
+            return result.data if result and result.data else None
+        except Exception as e:
+            print(f"Error fetching overview snapshot (non-fatal): {e}")
+            return None
+
+    def save_overview_snapshot_view(self, user_id: str, view_row: Dict, expected_version: Optional[int] = None) -> bool:
+        """
+        Upsert the materialized Overview snapshot for a user.
+        With expected_version, only overwrite the row if its version still
+        matches (compare-and-set); False means another writer got there first.
+        """
+        row = {**view_row, "updated_at": datetime.utcnow().isoformat() + "Z"}
+        try:
+            if expected_version is None:
+                self.client.table("profile_overview_snapshots").upsert(
+                    {"user_id": user_id, **row},
+                    on_conflict="user_id"
+                ).execute()
+                return True
+            result = self.client.table("profile_overview_snapshots")\
+                .update(row)\
+                .eq("user_id", user_id)\
+                .eq("version", expected_version)\
+                .execute()
+            return bool(result.data)
+        except Exception as e:
+            print(f"   ⚠️ [OVERVIEW_SNAPSHOT] Error saving snapshot: {e}")
+            return False
+
+    def update_overview_snapshot(
+        self,
+        user_id: str,
+        add_game: Optional[Dict] = None,
+        remove_game_id: Optional[str] = None,
+        remove_game_ids: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Incrementally apply an ingested (add_game) or compressed/archived
+        (remove_game_id / remove_game_ids) game to the user's materialized
+        Overview snapshot.
+        No-op when the user has no snapshot yet (it is built on first request).
+        Concurrent ingests for one user compare-and-set on the row version and
+        re-apply on top of the winner's row, so no add or remove is lost.
+        """
+        try:
+            from profile_overview_snapshot import OverviewSnapshotView
+
+            for _attempt in range(self.OVERVIEW_SNAPSHOT_CAS_RETRIES):
+                row = self.get_overview_snapshot_view(user_id)
+                if not row:
+                    return False
+                view = OverviewSnapshotView.from_row(row)
+                changed = False
+                for game_id in ([remove_game_id] if remove_game_id else []) + list(remove_game_ids or []):
+                    changed = view.remove_game(game_id) or changed
+                if add_game:
+                    view.add_game(add_game)
+                    changed = True
+                if not changed:
+                    return False
+                if "version" not in row:
+                    # Schema without migration 040: last write wins
+                    return self.save_overview_snapshot_view(user_id, view.to_row())
+                if self.save_overview_snapshot_view(user_id, view.to_row(), expected_version=row["version"]):
+                    return True
+            # Still contended: drop the row so the next request rebuilds it from the games
+            print(f"   ⚠️ [OVERVIEW_SNAPSHOT] {self.OVERVIEW_SNAPSHOT_CAS_RETRIES} conflicting updates, dropping snapshot for rebuild")
+            self.client.table("profile_overview_snapshots").delete().eq("user_id", user_id).execute()
+            return False
+        except Exception as e:
+            print(f"   ⚠️ [OVERVIEW_SNAPSHOT] Error updating snapshot: {e}")
+            return False
     
-    def get_active_reviewed_games(self, user_id: str, limit: int = 30, include_full_review: bool = False, include_compressed: bool = False) -> List[Dict]:
+    # Game row fields analytics read next to the reviews (everything except game_review/pgn/traces)
+    COLUMNAR_GAME_FIELDS = (
+        "id,external_id,platform,game_date,created_at,updated_at,user_color,opponent_name,"
+        "user_rating,opponent_rating,result,termination,time_control,time_category,"
+        "opening_eco,opening_name,accuracy_overall,accuracy_opening,accuracy_middlegame,"
+        "accuracy_endgame,avg_cp_loss,blunders,mistakes,inaccuracies,total_moves,"
+        "game_character,endgame_type,theory_exit_ply,review_type,ply_columns"
+    )
+    
+    def get_active_reviewed_games(self, user_id: str, limit: int = 30, include_full_review: bool = False, include_compressed: bool = False, columnar: bool = False) -> List[Dict]:
         """Get active (non-archived) full-review games
         
         Args:
             user_id: User ID
             limit: Maximum number of games to fetch
             include_full_review: If False, only fetch minimal fields (id, game_review.ply_records) to reduce egress
+            columnar: Fetch the compact ply_columns encoding instead of game_review. Each game gets a
+                decoded `ply_columns` (PlyColumns) and a lightweight `game_review` rebuilt from it
+                (metadata, stats, and per-ply side/SAN/eval/cp_loss/accuracy/time/phase/category/tags).
         """
+        if columnar:
+            games = self._get_active_reviewed_games_columnar(user_id, limit, include_compressed)
+            if games is not None:
+                return games
         try:
             # Optimize query based on what's needed
             if include_full_review:
@@ -955,6 +1110,115 @@ class SupabaseClient:
                 # Use centralized error handler which will suppress tracebacks for transient errors
                 return self._handle_supabase_error(fallback_e, "fetching active reviewed games", [])
     
+    def _get_active_reviewed_games_columnar(self, user_id: str, limit: int, include_compressed: bool) -> Optional[List[Dict]]:
+        """Columnar variant of get_active_reviewed_games. Returns None if the schema lacks ply_columns."""
+        try:
+            query = self.client.table("games")\
+                .select(self.COLUMNAR_GAME_FIELDS)\
+                .eq("user_id", user_id)\
+                .is_("archived_at", "null")\
+                .or_("review_type.eq.full,review_type.is.null")
+            if not include_compressed:
+                query = query.is_("compressed_at", "null")
+            result = query.order("updated_at", desc=True).limit(limit).execute()
+        except Exception as e:
+            if self._is_missing_column_error(e, "ply_columns") or self._is_missing_column_error(e, "compressed_at"):
+                return None
+            return self._handle_supabase_error(e, "fetching columnar reviewed games", [])
+        
+        games = result.data if result.data else []
+        return self.hydrate_ply_columns(games)
+    
+    def hydrate_ply_columns(self, games: List[Dict]) -> List[Dict]:
+        """
+        Decode `ply_columns` on game rows into PlyColumns + a lightweight game_review.
+        
+        Rows written before ply_columns existed fall back to one batched game_review fetch.
+        """
+        from ply_columns import decode_ply_columns
+        
+        legacy_ids = []
+        for game in games:
+            encoded = game.get("ply_columns")
+            if not encoded:
+                if game.get("id") and not game.get("game_review"):
+                    legacy_ids.append(game["id"])
+                continue
+            try:
+                columns = decode_ply_columns(encoded)
+            except Exception as e:
+                print(f"   ⚠️ Failed to decode ply columns for game {game.get('id')}: {e}")
+                game["ply_columns"] = None
+                if game.get("id") and not game.get("game_review"):
+                    legacy_ids.append(game["id"])
+                continue
+            game["ply_columns"] = columns
+            game["game_review"] = columns.to_game_review()
+        
+        if legacy_ids:
+            try:
+                reviews = {}
+                for i in range(0, len(legacy_ids), 50):
+                    batch = legacy_ids[i:i + 50]
+                    result = self.client.table("games")\
+                        .select("id,game_review")\
+                        .in_("id", batch)\
+                        .execute()
+                    for row in result.data or []:
+                        reviews[row.get("id")] = row.get("game_review")
+                for game in games:
+                    if game.get("id") in reviews:
+                        game["game_review"] = reviews[game["id"]]
+            except Exception as e:
+                print(f"   ⚠️ Failed to fetch legacy game reviews: {e}")
+        
+        return games
+    
+    def get_active_reviewed_game_refs(self, user_id: str, limit: int = 30) -> Optional[List[Dict]]:
+        """
+        Ids and dates of the active full-review games, newest first (same window as
+        get_active_reviewed_games). Returns None if the query fails.
+        """
+        def _query(filter_compressed: bool):
+            query = self.client.table("games")\
+                .select("id,game_date,created_at,updated_at")\
+                .eq("user_id", user_id)\
+                .is_("archived_at", "null")\
+                .or_("review_type.eq.full,review_type.is.null")
+            if filter_compressed:
+                query = query.is_("compressed_at", "null")
+            return query.order("updated_at", desc=True).limit(limit).execute()
+
+        try:
+            try:
+                result = _query(True)
+            except Exception as e:
+                if not self._is_missing_column_error(e, "compressed_at"):
+                    raise
+                result = _query(False)
+            return result.data if result.data else []
+        except Exception as e:
+            return self._handle_supabase_error(e, "listing active reviewed games", None)
+
+    def get_games_ply_data(self, game_ids: List[str]) -> List[Dict]:
+        """Fetch specific games with ply_columns hydrated (game_review for legacy rows)."""
+        games = []
+        select_fields = self.COLUMNAR_GAME_FIELDS
+        try:
+            for i in range(0, len(game_ids), 50):
+                batch = game_ids[i:i + 50]
+                try:
+                    result = self.client.table("games").select(select_fields).in_("id", batch).execute()
+                except Exception as e:
+                    if not self._is_missing_column_error(e, "ply_columns"):
+                        raise
+                    select_fields = "id,game_date,created_at,updated_at,game_review"
+                    result = self.client.table("games").select(select_fields).in_("id", batch).execute()
+                games.extend(result.data or [])
+        except Exception as e:
+            return self._handle_supabase_error(e, "fetching games by id", [])
+        return self.hydrate_ply_columns(games)
+
     def get_active_reviewed_games_count(self, user_id: str, include_compressed: bool = False) -> int:
         """Count active full-review games (non-compressed by default)"""
         try:
@@ -1014,6 +1278,7 @@ class SupabaseClient:
                 .update({"archived_at": datetime.now().isoformat()})\
                 .eq("id", game_id)\
                 .execute()
+            self.update_overview_snapshot(user_id, remove_game_id=game_id)
             
             return game_id
         
@@ -1041,6 +1306,10 @@ class SupabaseClient:
                 .execute()
             
             print(f"   🗑️  Deleted {count} games for user {user_id}")
+            try:
+                self.client.table("profile_overview_snapshots").delete().eq("user_id", user_id).execute()
+            except Exception as e:
+                print(f"   ⚠️ [OVERVIEW_SNAPSHOT] Error clearing snapshot: {e}")
             return count
         
         except Exception as e:
@@ -1332,6 +1601,7 @@ class SupabaseClient:
                 "p_user_id": user_id,
                 "p_position": json.dumps(position_data)
             }).execute()
+            self.position_index.invalidate(user_id)
             
             return result.data if result.data else None
         
@@ -1375,6 +1645,52 @@ class SupabaseClient:
             print(f"Error getting profiles: {e}")
             return []
     
+    def get_account_maintenance_counts(self, user_ids: List[str]) -> Optional[Dict[str, Dict[str, int]]]:
+        """
+        Active and unanalyzed game counts for a batch of users in one grouped
+        query (account_maintenance_counts RPC).
+        Returns {user_id: {"active_games", "unanalyzed_games"}}, or None if the
+        RPC isn't available (callers fall back to per-user counts).
+        """
+        if not user_ids:
+            return {}
+        try:
+            result = self.client.rpc("account_maintenance_counts", {
+                "p_user_ids": list(user_ids)
+            }).execute()
+            return {
+                row["user_id"]: {
+                    "active_games": int(row.get("active_games") or 0),
+                    "unanalyzed_games": int(row.get("unanalyzed_games") or 0),
+                }
+                for row in (result.data or [])
+            }
+        except Exception as e:
+            print(f"Error fetching account maintenance counts (falling back to per-user counts): {e}")
+            return None
+    
+    def compress_games(self, user_id: str, games: List[Dict]) -> Optional[List[str]]:
+        """
+        Compress many games in one statement (compress_games RPC): clears
+        game_review/pgn/traces/key_points/ply_columns, stores each game's pattern_summary
+        and sets compressed_at.
+        
+        Args:
+            games: [{"id", "pattern_summary"}]
+        Returns compressed game IDs, or None if the RPC isn't available.
+        """
+        if not games:
+            return []
+        try:
+            result = self.client.rpc("compress_games", {
+                "p_user_id": user_id,
+                "p_games": games
+            }).execute()
+            return [row["id"] for row in (result.data or [])]
+        except Exception as e:
+            print(f"Error compressing games via RPC (falling back to per-game updates): {e}")
+            return None
+    
     def get_unanalyzed_games_count(self, user_id: str) -> int:
         """Count unanalyzed games for user"""
         try:
@@ -1440,9 +1756,16 @@ class SupabaseClient:
                         })\
                         .eq("id", existing_id)\
                         .execute()
+                    saved_row = {**position_data, "id": existing_id, "source_game_ids": existing_sources}
                 else:
                     # Insert new
-                    self.client.table("positions").insert(position_data).execute()
+                    inserted = self.client.table("positions").insert(position_data).execute()
+                    saved_row = inserted.data[0] if inserted.data else position_data
+                
+                # Keep the in-memory search index current (only if already loaded)
+                index = self.position_index.peek(user_id)
+                if index is not None:
+                    index.upsert(saved_row)
                 
                 saved_count += 1
         
@@ -1479,6 +1802,34 @@ class SupabaseClient:
             tags_missed_filter: Tag name that exists in best_move but not in played move
             min_cp_loss: Minimum centipawn loss to filter by
         """
+        # Both phase filters apply (as in the fallback query): intersect them
+        if phases and phase_filter:
+            phases = [p for p in phases if p == phase_filter]
+            if not phases:
+                return []
+        elif phase_filter:
+            phases = [phase_filter]
+
+        index = self.position_index.get(user_id)
+        if index is not None:
+            return index.search(
+                limit=limit,
+                order="fresh" if prioritize_fresh else "cp_loss",
+                min_cp_loss=min_cp_loss,
+                tags=tags,
+                error_categories=error_categories,
+                phases=phases,
+                themes=themes,
+                mover_name=mover_name,
+                tags_gained=tags_gained_filter,
+                tags_lost=tags_lost_filter,
+                tags_missed=tags_missed_filter,
+                opening=opening_name_filter,
+                piece=piece_type_filter,
+                time_bucket=time_bucket_filter,
+            )
+        
+        # Fallback: PostgREST filters when the index can't be loaded
         try:
             query = self.client.table("positions").select("*").eq("user_id", user_id)
             
@@ -1520,6 +1871,21 @@ class SupabaseClient:
             if min_cp_loss is not None:
                 query = query.gte("cp_loss", min_cp_loss)
             
+            if phase_filter:
+                query = query.eq("phase", phase_filter)
+            
+            if opening_name_filter:
+                query = query.ilike("opening_name", f"%{opening_name_filter}%")
+            
+            if piece_type_filter:
+                query = query.eq("piece_blundered", piece_type_filter)
+            
+            if time_bucket_filter in TIME_BUCKET_RANGES:
+                min_time, max_time = TIME_BUCKET_RANGES[time_bucket_filter]
+                query = query.gte("time_spent_s", min_time)
+                if max_time != float('inf'):
+                    query = query.lt("time_spent_s", max_time)
+            
             # Order by freshness if requested (unseen/oldest first), otherwise by CP loss
             if prioritize_fresh:
                 # Fetch more positions to sort properly (Supabase doesn't support NULLS FIRST)
@@ -1565,6 +1931,20 @@ class SupabaseClient:
         time_bucket_filter: Optional[str] = None
     ) -> Dict[str, int]:
         """Count total available positions matching filters."""
+        index = self.position_index.get(user_id)
+        if index is not None:
+            return {"count": index.count(
+                min_cp_loss=min_cp_loss,
+                error_categories=error_categories,
+                phases=[phase_filter] if phase_filter else None,
+                tags_gained=tags_gained_filter,
+                tags_lost=tags_lost_filter,
+                tags_missed=tags_missed_filter,
+                opening=opening_name_filter,
+                piece=piece_type_filter,
+                time_bucket=time_bucket_filter,
+            )}
+        
         try:
             query = self.client.table("positions").select("id", count="exact").eq("user_id", user_id)
             
@@ -1597,15 +1977,6 @@ class SupabaseClient:
             
             # Time bucket filter
             if time_bucket_filter:
-                TIME_BUCKET_RANGES = {
-                    "<5s": (0, 5),
-                    "5-15s": (5, 15),
-                    "15-30s": (15, 30),
-                    "30s-1min": (30, 60),
-                    "1min-2min30": (60, 150),
-                    "2min30-5min": (150, 300),
-                    "5min+": (300, float('inf'))
-                }
                 if time_bucket_filter in TIME_BUCKET_RANGES:
                     min_time, max_time = TIME_BUCKET_RANGES[time_bucket_filter]
                     query = query.gte("time_spent_s", min_time)
@@ -1626,6 +1997,42 @@ class SupabaseClient:
             print(f"Error counting positions: {e}")
             return {"count": 0}
     
+    def _load_position_index_rows(self, user_id: str, page_size: int = 1000) -> Optional[List[Dict]]:
+        """Load a user's positions (narrow columns, paged) to build their search index."""
+        fields = POSITION_INDEX_FIELDS
+        rows: List[Dict] = []
+        start = 0
+        while True:
+            try:
+                result = self.client.table("positions")\
+                    .select(fields)\
+                    .eq("user_id", user_id)\
+                    .order("created_at")\
+                    .range(start, start + page_size - 1)\
+                    .execute()
+            except Exception as e:
+                if fields != "*" and isinstance(e, APIError) and "42703" in str(e):
+                    # Older schema without some indexed columns
+                    fields = "*"
+                    continue
+                print(f"⚠️ Error loading position index for {user_id}: {e}")
+                return None
+            page = result.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+            start += page_size
+        print(f"📇 Position index loaded for {user_id}: {len(rows)} positions")
+        return rows
+    
+    def forget_positions(self, user_id: str, position_ids: List[str]) -> None:
+        """Drop deleted positions from the user's search index (if loaded)."""
+        index = self.position_index.peek(user_id)
+        if index is not None:
+            for position_id in position_ids:
+                if position_id:
+                    index.remove(position_id)
+    
     def mark_positions_used(self, position_ids: List[str]) -> bool:
         """Mark positions as used by updating last_used_in_drill timestamp."""
         if not position_ids:
@@ -1643,6 +2050,7 @@ class SupabaseClient:
                     .in_("id", batch)\
                     .execute()
             
+            self.position_index.mark_used(position_ids, now)
             return True
         except Exception as e:
             print(f"Error marking positions as used: {e}")
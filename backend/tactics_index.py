@@ -0,0 +1,424 @@
+"""
+Tactics Index - puzzle set loaded once into an indexed, columnar structure.
+
+Puzzles are stored sorted by rating, so a rating band is a bisect over the
+rating column; each theme has its own posting list (row numbers plus their
+ratings, also sorted). Rows are decoded into puzzle dicts only when served.
+
+The same columns are the compact on-disk format (`tactics.idx`), so large
+puzzle sets load as zero-copy memoryviews instead of parsing JSON:
+
+    python tactics_index.py tactics.json tactics.idx
+
+Layout (little-endian):
+    magic  b"TACX" | version u8 | flags u8 | reserved u16 | n_puzzles u32 | header_len u32
+    header JSON (theme dictionary, column directory)
+    column data, each column aligned to 8 bytes
+
+TacticsStore wraps the index for the /tactics_next endpoint: it reloads when
+the file changes and remembers which puzzles each viewer has already seen.
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+TACTICS_INDEX_VERSION = 1
+MAGIC = b"TACX"
+
+_PREAMBLE = struct.Struct("<4sBBHII")
+_ALIGN = 8
+_MAX_RATING = 0xFFFF
+
+# Puzzle fields with their own string column; anything else goes to "extra" (JSON)
+STRING_FIELDS = ("id", "fen", "side_to_move", "prompt", "solution_pv_san")
+
+
+def _text_column(values: List[str]) -> Tuple[array, bytes]:
+    offsets = array("I", [0])
+    chunks = []
+    for value in values:
+        encoded = value.encode("utf-8")
+        chunks.append(encoded)
+        offsets.append(offsets[-1] + len(encoded))
+    return offsets, b"".join(chunks)
+
+
+def encode_tactics(puzzles: List[Dict[str, Any]]) -> bytes:
+    """Encode puzzles (the tactics.json list) into the indexed binary format."""
+    rows = sorted(
+        (p for p in puzzles if isinstance(p, dict)),
+        key=lambda p: max(0, min(_MAX_RATING, int(p.get("rating") or 0))),
+    )  # stable: equal ratings keep file order
+    n = len(rows)
+
+    themes: Dict[str, int] = {}
+    row_themes = array("I", [0])
+    row_theme_ids = array("H")
+    postings: Dict[int, array] = {}
+    for i, puzzle in enumerate(rows):
+        for theme in puzzle.get("themes") or []:
+            code = themes.setdefault(str(theme).strip().lower(), len(themes))
+            row_theme_ids.append(code)
+            postings.setdefault(code, array("I")).append(i)
+        row_themes.append(len(row_theme_ids))
+
+    ratings = array("H", (max(0, min(_MAX_RATING, int(p.get("rating") or 0))) for p in rows))
+    theme_offsets = array("I", [0])
+    theme_rows = array("I")
+    for code in range(len(themes)):
+        theme_rows.extend(postings[code])
+        theme_offsets.append(len(theme_rows))
+    theme_ratings = array("H", (ratings[i] for i in theme_rows))
+
+    columns: List[Tuple[str, Any]] = [
+        ("rating", ratings),
+        ("themes.offsets", row_themes),
+        ("themes.ids", row_theme_ids),
+        ("theme_rows.offsets", theme_offsets),
+        ("theme_rows.rows", theme_rows),
+        ("theme_rows.ratings", theme_ratings),
+    ]
+    for name in STRING_FIELDS:
+        offsets, data = _text_column([str(p.get(name) or "") for p in rows])
+        columns += [(f"{name}.offsets", offsets), (f"{name}.data", array("B", data))]
+    extras = [
+        {k: v for k, v in p.items() if k not in STRING_FIELDS and k not in ("rating", "themes")}
+        for p in rows
+    ]
+    offsets, data = _text_column([json.dumps(e, ensure_ascii=False) if e else "" for e in extras])
+    columns += [("extra.offsets", offsets), ("extra.data", array("B", data))]
+
+    directory = []
+    body = bytearray()
+    for name, values in columns:
+        if sys.byteorder != "little":
+            values = array(values.typecode, values)
+            values.byteswap()
+        body.extend(b"\0" * (-len(body) % _ALIGN))
+        directory.append([name, values.typecode, len(body), len(values)])
+        body.extend(values.tobytes())
+
+    header = json.dumps({"themes": list(themes), "columns": directory}, separators=(",", ":")).encode("utf-8")
+    header += b" " * (-(_PREAMBLE.size + len(header)) % _ALIGN)
+    return _PREAMBLE.pack(MAGIC, TACTICS_INDEX_VERSION, 0, 0, n, len(header)) + header + bytes(body)
+
+
+class TacticsIndex:
+    """Read-only view over an encoded puzzle set."""
+
+    def __init__(self, buffer: bytes):
+        if len(buffer) < _PREAMBLE.size:
+            raise ValueError("Tactics index is truncated")
+        magic, version, _flags, _reserved, n, header_len = _PREAMBLE.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a tactics index")
+        if version > TACTICS_INDEX_VERSION:
+            raise ValueError(f"Unsupported tactics index version {version}")
+        header_end = _PREAMBLE.size + header_len
+        header = json.loads(bytes(buffer[_PREAMBLE.size:header_end]).decode("utf-8"))
+
+        self.n = n
+        self.themes: List[str] = header["themes"]
+        self._theme_codes = {theme: code for code, theme in enumerate(self.themes)}
+        self._buffer = buffer
+        self._data_start = header_end
+        self._layout = {name: (typecode, offset, count) for name, typecode, offset, count in header["columns"]}
+        self._views: Dict[str, Any] = {}
+        self.ratings = self.column("rating")
+
+    @classmethod
+    def from_puzzles(cls, puzzles: List[Dict[str, Any]]) -> "TacticsIndex":
+        return cls(encode_tactics(puzzles))
+
+    def __len__(self) -> int:
+        return self.n
+
+    def column(self, name: str):
+        """Return a column as a zero-copy memoryview (copied only on big-endian hosts)."""
+        view = self._views.get(name)
+        if view is None:
+            typecode, offset, count = self._layout[name]
+            start = self._data_start + offset
+            raw = memoryview(self._buffer)[start:start + count * array(typecode).itemsize]
+            if sys.byteorder == "little":
+                view = raw.cast(typecode)
+            else:
+                swapped = array(typecode, raw.tobytes())
+                swapped.byteswap()
+                view = memoryview(swapped)
+            self._views[name] = view
+        return view
+
+    def _text(self, name: str, row: int) -> str:
+        offsets = self.column(f"{name}.offsets")
+        return bytes(self.column(f"{name}.data")[offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def puzzle(self, row: int) -> Dict[str, Any]:
+        """Decode one row back into its tactics.json dict."""
+        puzzle: Dict[str, Any] = {"id": self._text("id", row), "rating": self.ratings[row]}
+        for name in STRING_FIELDS[1:]:
+            puzzle[name] = self._text(name, row)
+        puzzle["themes"] = [self.themes[code] for code in self.theme_codes(row)]
+        extra = self._text("extra", row)
+        if extra:
+            puzzle.update(json.loads(extra))
+        return puzzle
+
+    def theme_code(self, theme: str) -> Optional[int]:
+        """Dictionary code of a theme (case-insensitive), or None if no puzzle has it."""
+        return self._theme_codes.get(theme.strip().lower())
+
+    def theme_codes(self, row: int) -> List[int]:
+        offsets, ids = self.column("themes.offsets"), self.column("themes.ids")
+        return list(ids[offsets[row]:offsets[row + 1]])
+
+    def theme_view(self, code: int) -> Tuple[Any, Any]:
+        """(row numbers, their ratings) of one theme's puzzles, in row (= rating) order."""
+        offsets = self.column("theme_rows.offsets")
+        start, end = offsets[code], offsets[code + 1]
+        return self.column("theme_rows.rows")[start:end], self.column("theme_rows.ratings")[start:end]
+
+    def band(self, ratings, rating_min: Optional[int], rating_max: Optional[int]) -> Tuple[int, int]:
+        """Positions [lo, hi) of a rating band within a view's ratings (O(log n))."""
+        lo = bisect_left(ratings, rating_min) if rating_min is not None else 0
+        hi = bisect_right(ratings, rating_max) if rating_max is not None else len(ratings)
+        return lo, max(lo, hi)
+
+
+def load_tactics_index(path: str) -> TacticsIndex:
+    """Load a tactics file: the binary index, or a tactics.json list (indexed on load)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] == MAGIC:
+        return TacticsIndex(data)
+    puzzles = json.loads(data.decode("utf-8"))
+    if not isinstance(puzzles, list):
+        raise ValueError("tactics file must be a JSON list of puzzles")
+    return TacticsIndex.from_puzzles(puzzles)
+
+
+_FULL = (1 << 64) - 1
+
+
+class _SeenBits:
+    """
+    Seen positions of one view of the index, as a bitset with summary levels
+    (a bit is set one level up when its 64-bit word is full). Finding the
+    next unseen position and marking one seen are O(log64 n); words are
+    stored sparsely, so a viewer costs memory only for what they have seen.
+    """
+
+    __slots__ = ("levels",)
+
+    def __init__(self, size: int):
+        self.levels: List[Dict[int, int]] = [{}]
+        words = (size + 63) >> 6
+        while words > 1:
+            self.levels.append({})
+            words = (words + 63) >> 6
+
+    def _next_unset(self, level: int, pos: int) -> int:
+        words = self.levels[level]
+        w = pos >> 6
+        free = ~words.get(w, 0) & (_FULL << (pos & 63)) & _FULL
+        if not free:
+            w = self._next_unset(level + 1, w + 1) if level + 1 < len(self.levels) else w + 1
+            free = ~words.get(w, 0) & _FULL
+        return (w << 6) | ((free & -free).bit_length() - 1)
+
+    def find(self, pos: int) -> int:
+        """Smallest unseen position >= pos (>= the view size if there is none)."""
+        return self._next_unset(0, pos)
+
+    def mark(self, pos: int) -> None:
+        for words in self.levels:
+            w = pos >> 6
+            word = words[w] = words.get(w, 0) | (1 << (pos & 63))
+            if word != _FULL:
+                return
+            pos = w
+
+    def clear(self, lo: int, hi: int) -> None:
+        """Forget seen positions in [lo, hi), word by word."""
+        for words in self.levels:
+            for w in range(lo >> 6, ((hi - 1) >> 6) + 1):
+                word = words.get(w)
+                if word is None:
+                    continue
+                first, last = max(lo - (w << 6), 0), min(hi - (w << 6), 64)
+                word &= ~(((1 << last) - 1) ^ ((1 << first) - 1))
+                if word:
+                    words[w] = word
+                else:
+                    del words[w]
+            # Words touched here are no longer full one level up
+            lo, hi = lo >> 6, ((hi - 1) >> 6) + 1
+
+
+class TacticsStore:
+    """
+    Puzzle index for the tactics endpoints, reloaded when the file changes,
+    with per-viewer seen state.
+
+    Viewers walk each filter's band in rating order from a cursor, skipping
+    puzzles they have already seen; once a band is exhausted it starts over.
+    Seen state is kept per view (all puzzles, each theme) as bitsets over
+    positions in the current index, so it starts afresh when the file is
+    reloaded.
+
+    refresh() does the file I/O and parsing; call it from a worker thread
+    (the endpoint uses asyncio.to_thread). next_puzzle() only reads the
+    loaded index.
+    """
+
+    def __init__(self, path: str, check_interval: float = 2.0, max_viewers: int = 10000):
+        self.path = path
+        self.check_interval = check_interval
+        self.max_viewers = max_viewers
+        self.reloads = 0
+        self._index: Optional[TacticsIndex] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._generation = 0
+        self._viewers: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()  # index swap and viewer state
+        self._load_lock = threading.Lock()  # one reload at a time; readers keep the old index meanwhile
+
+    def stale(self) -> bool:
+        """True if refresh() has work to do (nothing loaded, or the file is due for a check)."""
+        return self._index is None or time.monotonic() - self._checked_at >= self.check_interval
+
+    def refresh(self) -> TacticsIndex:
+        """
+        Current index, reloaded first if the file's mtime/size changed
+        (checked at most every `check_interval` seconds). Blocking.
+
+        Raises:
+            FileNotFoundError: tactics file missing
+            ValueError: tactics file can't be parsed
+        """
+        if not self.stale():
+            return self._index
+        with self._load_lock:
+            if not self.stale():
+                return self._index
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self._index is not None and signature == self._signature:
+                self._checked_at = time.monotonic()
+                return self._index
+            index = load_tactics_index(self.path)
+            with self._lock:
+                self._index, self._signature = index, signature
+                self._generation += 1
+                self.reloads += 1
+            self._checked_at = time.monotonic()
+        print(f"   🧩 Tactics index loaded: {len(index)} puzzles, {len(index.themes)} themes")
+        return index
+
+    def _viewer_state(self, viewer: str) -> Dict[str, Any]:
+        state = self._viewers.get(viewer)
+        if state is None or state["generation"] != self._generation:
+            # Positions are only meaningful within one loaded index
+            state = self._viewers[viewer] = {"generation": self._generation, "views": {}, "cursors": {}}
+            while len(self._viewers) > self.max_viewers:
+                self._viewers.popitem(last=False)
+        self._viewers.move_to_end(viewer)
+        return state
+
+    @staticmethod
+    def _mark_seen(index: TacticsIndex, state: Dict[str, Any], row: int) -> None:
+        """Mark a row seen in every view it belongs to (all puzzles and each of its themes)."""
+        views = state["views"]
+        if None not in views:
+            views[None] = _SeenBits(len(index))
+        views[None].mark(row)
+        for code in index.theme_codes(row):
+            rows, _ratings = index.theme_view(code)
+            if code not in views:
+                views[code] = _SeenBits(len(rows))
+            views[code].mark(bisect_left(rows, row))  # postings are in row order
+
+    def next_puzzle(
+        self,
+        rating_min: Optional[int] = None,
+        rating_max: Optional[int] = None,
+        theme: Optional[str] = None,
+        viewer: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Next puzzle in the rating band (and theme), or None if nothing matches.
+
+        Without a viewer this is the lowest-rated match. With one, it is the
+        next puzzle they haven't seen, in rating order. Loads the index on
+        first use; later file changes are picked up by refresh().
+        """
+        index = self._index if self._index is not None else self.refresh()
+        code = None
+        if theme:
+            code = index.theme_code(theme)
+            if code is None:
+                return None
+            rows, ratings = index.theme_view(code)
+        else:
+            rows, ratings = None, index.ratings
+        lo, hi = index.band(ratings, rating_min, rating_max)
+        if lo >= hi:
+            return None
+
+        def _row(pos: int) -> int:
+            return pos if rows is None else rows[pos]
+
+        if viewer is None:
+            return index.puzzle(_row(lo))
+
+        with self._lock:
+            if index is not self._index:
+                row = None  # swapped by refresh() since we read it
+            else:
+                state = self._viewer_state(viewer)
+                if code not in state["views"]:
+                    state["views"][code] = _SeenBits(len(ratings))
+                unseen = state["views"][code]
+                key = (code, rating_min, rating_max)
+                cursor = state["cursors"].get(key, lo)
+                pos = unseen.find(cursor if lo <= cursor < hi else lo)
+                if pos >= hi:
+                    pos = unseen.find(lo)  # wrap around to the start of the band
+                if pos >= hi:
+                    # Band exhausted: start over
+                    unseen.clear(lo, hi)
+                    pos = lo
+                row = _row(pos)
+                self._mark_seen(index, state, row)
+                state["cursors"][key] = pos + 1
+        if row is None:
+            return self.next_puzzle(rating_min, rating_max, theme=theme, viewer=viewer)
+        return index.puzzle(row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a tactics.json puzzle list into the binary tactics index")
+    parser.add_argument("source", help="tactics.json")
+    parser.add_argument("target", help="output path, e.g. tactics.idx")
+    args = parser.parse_args()
+
+    with open(args.source, "r", encoding="utf-8") as f:
+        encoded = encode_tactics(json.load(f))
+    index = TacticsIndex(encoded)
+    with open(args.target, "wb") as f:
+        f.write(encoded)
+    print(f"✅ Wrote {len(index)} puzzles ({len(index.themes)} themes) to {args.target}: {len(encoded)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ Detects 100+ specific tags across files, diagonals, outposts, center control, ki
 import chess
 from typing import List, Dict, Set, Optional
 
+from static_exchange import position_see
+
 
 def detect_file_tags(board: chess.Board) -> List[Dict]:
     """Detect open/semi-open file tags and rook placements."""
@@ -1009,11 +1011,20 @@ def detect_overworked_pieces_tags(board: chess.Board) -> List[Dict]:
     leaves the other undefended.
     """
     tags = []
+    see = position_see(board)
     
     for color in [chess.WHITE, chess.BLACK]:
         side = "white" if color == chess.WHITE else "black"
         opponent = not color
         
+        # Own pieces under attack, computed once per side (attack masks are memoized)
+        attacked_own = 0
+        for target_sq in chess.scan_forward(board.occupied_co[color]):
+            if see.is_attacked_by(opponent, target_sq):
+                attacked_own |= chess.BB_SQUARES[target_sq]
+        if not attacked_own:
+            continue
+        
         # Check all piece types
         for piece_type in [chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN]:
             for defender_sq in board.pieces(piece_type, color):
@@ -1023,21 +1034,13 @@ def detect_overworked_pieces_tags(board: chess.Board) -> List[Dict]:
                 
                 # Find all pieces this defender is protecting that are also attacked
                 defended_pieces = []
-                for target_sq in chess.SQUARES:
-                    target_piece = board.piece_at(target_sq)
-                    if target_piece and target_piece.color == color and target_sq != defender_sq:
-                        # Check if defender attacks this target (defends it)
-                        if target_sq in board.attacks(defender_sq):
-                            # Check if target is attacked by opponent
-                            if board.is_attacked_by(opponent, target_sq):
-                                # Get all defenders of this target
-                                all_defenders = list(board.attackers(color, target_sq))
-                                defended_pieces.append({
-                                    "square": target_sq,
-                                    "piece": target_piece,
-                                    "attackers": list(board.attackers(opponent, target_sq)),
-                                    "all_defenders": all_defenders
-                                })
+                for target_sq in chess.scan_forward(board.attacks_mask(defender_sq) & attacked_own):
+                    defended_pieces.append({
+                        "square": target_sq,
+                        "piece": board.piece_at(target_sq),
+                        "attackers": list(see.attackers(opponent, target_sq)),
+                        "all_defenders": list(see.attackers(color, target_sq))
+                    })
                 
                 # Check for overworked piece (defending 2+ attacked pieces)
                 if len(defended_pieces) >= 2:
@@ -0,0 +1,177 @@
+"""
+Account maintenance sweep: grouped counts per batch of users, per-user work
+only where needed (bounded concurrency), batched compression.
+"""
+
+import asyncio
+import re
+from pathlib import Path
+
+import services.account_initialization_manager as aim
+from services.account_initialization_manager import AccountInitializationManager
+from services.game_window_manager import GameWindowManager
+
+
+class _FakeSupabase:
+    def __init__(self, counts, rpc=True):
+        self.counts = counts
+        self.rpc = rpc
+        self.count_calls = []
+        self.compress_calls = []
+        self.snapshot_removals = []
+        self.client = _NoPositions()  # positions delete before compression
+
+    def get_all_profiles(self):
+        return [
+            {"user_id": uid, "chesscom_username": f"{uid}_cc" if uid != "u_noacct" else None}
+            for uid in self.counts
+        ]
+
+    def get_account_maintenance_counts(self, user_ids):
+        self.count_calls.append(list(user_ids))
+        if not self.rpc:
+            return None
+        return {uid: self.counts[uid] for uid in user_ids}
+
+    def get_unanalyzed_games_count(self, user_id):
+        return self.counts[user_id]["unanalyzed_games"]
+
+    def get_or_create_profile(self, user_id):
+        raise AssertionError("profile rows come from get_all_profiles")
+
+    def compress_games(self, user_id, games):
+        self.compress_calls.append((user_id, [g["id"] for g in games]))
+        return [g["id"] for g in games]
+
+    def forget_positions(self, user_id, ids):
+        pass
+
+    def update_overview_snapshot(self, user_id, remove_game_ids=None, **_kw):
+        self.snapshot_removals.append((user_id, remove_game_ids))
+
+
+class _FakeWindowManager(GameWindowManager):
+    def __init__(self, supabase):
+        super().__init__(supabase)
+        self.counted = []
+
+    def count_active_games(self, user_id):
+        self.counted.append(user_id)
+        return self.supabase.counts[user_id]["active_games"]
+
+    def get_oldest_active_games(self, user_id, count=1):
+        return [{"id": f"{user_id}_g{i}", "game_review": {}} for i in range(count)]
+
+
+class _NoPositions:
+    def __init__(self):
+        self.updates = []
+
+    def table(self, _name):
+        return self
+
+    def delete(self):
+        return self
+
+    def in_(self, *_a):
+        return self
+
+    def update(self, values):
+        self.updates.append(values)
+        return self
+
+    def eq(self, *_a):
+        return self
+
+    def execute(self):
+        return type("Result", (), {"data": [{}] if self.updates else []})()
+
+
+class _FakeIndexer:
+    def __init__(self):
+        self.started = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def load_preferences(self, user_id):
+        return None
+
+    async def start_indexing(self, user_id, accounts, time_controls):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.started.append((user_id, [a["username"] for a in accounts]))
+
+    def get_status(self, user_id):
+        return {"state": "running", "message": ""}
+
+
+def _counts():
+    counts = {f"u{i}": {"active_games": 60, "unanalyzed_games": 0} for i in range(20)}
+    counts.update({f"low{i}": {"active_games": 10 + i, "unanalyzed_games": 3} for i in range(6)})
+    counts["over"] = {"active_games": 64, "unanalyzed_games": 0}
+    counts["u_noacct"] = {"active_games": 0, "unanalyzed_games": 0}
+    return counts
+
+
+def _sweep(supabase, monkeypatch, concurrency=2):
+    monkeypatch.setattr(aim, "MAINTENANCE_BATCH_SIZE", 10)
+    monkeypatch.setattr(aim.asyncio, "sleep", _no_sleep)
+    indexer = _FakeIndexer()
+    window = _FakeWindowManager(supabase)
+    manager = AccountInitializationManager(supabase, indexer, window, concurrency=concurrency)
+    return asyncio.run(manager.check_all_accounts()), indexer, window
+
+
+_real_sleep = asyncio.sleep
+
+
+async def _no_sleep(delay, *args):
+    # _trigger_analysis waits 0.5s before reading status; keep the indexer's own sleep
+    await _real_sleep(min(delay, 0.01))
+
+
+def test_sweep_uses_grouped_counts_and_only_touches_accounts_needing_work(monkeypatch):
+    supabase = _FakeSupabase(_counts())
+    results, indexer, window = _sweep(supabase, monkeypatch)
+
+    assert results["accounts_checked"] == 28
+    assert [len(batch) for batch in supabase.count_calls] == [10, 10, 8]
+    assert window.counted == []  # no per-user count round trips
+
+    assert sorted(uid for uid, _ in indexer.started) == [f"low{i}" for i in range(6)]
+    assert indexer.max_in_flight <= 2
+    assert {a["user_id"] for a in results["accounts_needing_analysis"]} == {f"low{i}" for i in range(6)}
+
+    # 4 excess games compressed in one batch
+    assert supabase.compress_calls == [("over", ["over_g0", "over_g1", "over_g2", "over_g3"])]
+    assert results["accounts_maintained"] == [{"user_id": "over", "compressed": 4}]
+    assert supabase.snapshot_removals == [("over", ["over_g0", "over_g1", "over_g2", "over_g3"])]
+    assert results["errors"] == []
+
+
+def test_sweep_falls_back_to_per_user_counts_without_the_rpc(monkeypatch):
+    supabase = _FakeSupabase(_counts(), rpc=False)
+    results, indexer, window = _sweep(supabase, monkeypatch)
+
+    assert len(window.counted) == 28
+    assert len(indexer.started) == 6
+    assert results["accounts_maintained"] == [{"user_id": "over", "compressed": 4}]
+
+
+def test_compression_clears_ply_columns_in_the_rpc_and_the_fallback():
+    supabase = _FakeSupabase(_counts())
+    supabase.compress_games = lambda user_id, games: None  # RPC not deployed
+    window = _FakeWindowManager(supabase)
+    assert asyncio.run(window.compress_oldest_games("over", 2)) == ["over_g0", "over_g1"]
+    assert "ply_columns" in GameWindowManager.COMPRESSED_COLUMNS
+    assert len(supabase.client.updates) == 2
+    for update in supabase.client.updates:
+        assert all(update[column] is None for column in GameWindowManager.COMPRESSED_COLUMNS)
+
+    # The compress_games RPC clears the same columns
+    migrations = Path(__file__).resolve().parents[2] / "supabase" / "migrations"
+    [rpc_sql] = migrations.glob("*_account_maintenance_rpcs.sql")
+    cleared = set(re.findall(r"^\s+(\w+) = NULL,$", rpc_sql.read_text(), re.M))
+    assert cleared == set(GameWindowManager.COMPRESSED_COLUMNS)
@@ -0,0 +1,148 @@
+"""
+Adaptive review depth: which positions the shallow sweep hands to the deep pass.
+"""
+
+import asyncio
+
+import chess
+
+from engine_pool import AdaptiveDepthConfig, EnginePool
+from position_key import position_key
+from tools.complexity_scorer import complexity_score_from_evals, score_move_complexity
+
+
+def _game(sans):
+    board = chess.Board()
+    positions, fens_after = [], []
+    for san in sans:
+        move = board.parse_san(san)
+        positions.append((board.fen(), move))
+        board.push(move)
+        fens_after.append(board.fen())
+    return positions, fens_after
+
+
+def _entry(fen, evals):
+    return {"fen": fen, "eval_cp": evals[0], "engine_info": [{"eval_cp": e} for e in evals]}
+
+
+def test_deep_pass_flags_swings_and_close_calls_in_priority_order():
+    positions, fens_after = _game(["e4", "e5", "Qh5", "Nc6", "Qxf7+"])
+    # Shallow evals, side-to-move relative, two lines each
+    evals = {
+        positions[0][0]: [30, -200],     # before e4
+        fens_after[0]: [-30, -250],      # before e5: e5 keeps the eval -> no swing, big gap
+        fens_after[1]: [30, -200],       # before Qh5
+        fens_after[2]: [-10, -15],       # before Nc6: Qh5 dropped 20cp, black's top two lines 5cp apart
+        fens_after[3]: [400, 100],       # before Qxf7+: Nc6 is a 390cp swing
+        fens_after[4]: [-600, -900],     # after Qxf7+
+    }
+    cache = {position_key(fen): _entry(fen, e) for fen, e in evals.items()}
+    # e4 is book
+    theory = {position_key(positions[0][0]): {"theoryMoves": ["e2e4"]}}
+    config = AdaptiveDepthConfig(swing_cp=30, gap_cp=20, complexity_threshold=1.01)
+
+    deep = EnginePool._plan_deep_pass(positions, fens_after, cache, theory, config)
+
+    # Nc6 (390cp swing + close call) first, then Qxf7+ (200cp swing); e5/Qh5 are quiet
+    assert deep == [fens_after[2], fens_after[3], fens_after[4]]
+    assert positions[0][0] not in deep  # book move skipped
+
+
+def test_deep_pass_skips_errors_and_respects_complexity_threshold():
+    positions, fens_after = _game(["d4", "d5"])
+    cache = {
+        position_key(positions[0][0]): _entry(positions[0][0], [20, -300]),
+        position_key(fens_after[0]): {"error": "engine died"},
+        position_key(fens_after[1]): _entry(fens_after[1], [20, -300]),
+    }
+    quiet = AdaptiveDepthConfig(complexity_threshold=1.01)
+    assert EnginePool._plan_deep_pass(positions, fens_after, cache, {}, quiet) == []
+    busy = AdaptiveDepthConfig(complexity_threshold=0.0)
+    # Both moves touch the errored position, so nothing can be compared yet
+    assert EnginePool._plan_deep_pass(positions, fens_after, cache, {}, busy) == []
+
+    cache[position_key(fens_after[0])] = _entry(fens_after[0], [-20, -300])
+    assert set(EnginePool._plan_deep_pass(positions, fens_after, cache, {}, busy)) == {
+        positions[0][0], fens_after[0], fens_after[1]
+    }
+
+
+def test_complexity_from_evals_matches_tool_without_engine():
+    fen = "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR b KQkq - 3 3"
+    tool = asyncio.run(score_move_complexity(fen))
+    assert round(complexity_score_from_evals(chess.Board(fen), []), 2) == tool["complexity_score"]
+    assert complexity_score_from_evals(chess.Board("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1"), []) == 0
+
+
+class _BiasedEngine:
+    """
+    One-ply material search whose deep results lean `bias` cp towards white, like a deeper search might.
+    A search needs 1000 nodes; with fewer it stops at depth 12.
+    """
+
+    def __init__(self, pool, bias):
+        self.pool, self.bias = pool, bias
+
+    async def analyse(self, board, limit, multipv=1):
+        lean = self.bias if limit.depth >= 18 else 0
+        values = {chess.PAWN: 100, chess.KNIGHT: 300, chess.BISHOP: 300, chess.ROOK: 500, chess.QUEEN: 900}
+        lines = []
+        for move in board.legal_moves:
+            board.push(move)
+            material = sum(values.get(p.piece_type, 0) * (1 if p.color == board.turn else -1)
+                           for p in board.piece_map().values())
+            board.pop()
+            lines.append((-material + (lean if board.turn == chess.WHITE else -lean), move))
+        lines.sort(key=lambda item: (-item[0], item[1].uci()))
+        nodes = min(limit.nodes or 1000, 1000)
+        self.pool.nodes_used += nodes
+        reached = limit.depth if nodes == 1000 else min(limit.depth, 12)
+        return [{"score": chess.engine.PovScore(chess.engine.Cp(cp), board.turn), "pv": [move],
+                 "depth": reached, "nodes": nodes} for cp, move in lines[:multipv]]
+
+
+class _FakePool(EnginePool):
+    def __init__(self, bias=150):
+        super().__init__(pool_size=2)
+        from concurrent.futures import ThreadPoolExecutor
+        self.process_pool = ThreadPoolExecutor(max_workers=2)
+        self.nodes_used = 0
+        self._engine = _BiasedEngine(self, bias)
+
+    async def acquire(self, timeout=60.0):
+        return 0, self._engine
+
+    async def release(self, engine_id, engine):
+        pass
+
+
+def _review(pool, sans, adaptive):
+    positions, _ = _game(sans)
+    records = asyncio.run(pool.analyze_game_parallel(positions, depth=18, multipv=2, adaptive=adaptive))
+    pool.process_pool.shutdown()
+    return records
+
+
+def test_two_pass_review_keeps_single_pass_classifications(monkeypatch):
+    import engine_pool
+    monkeypatch.setattr(engine_pool, "check_lichess_masters", lambda fen: {"isTheory": False, "theoryMoves": []})
+    sans = ["e4", "d5", "exd5", "Qxd5", "Nc3", "Qa5", "d4", "Nf6", "Nf3", "Bg4", "h3", "Bxf3", "Qxf3", "c6"]
+
+    single = _review(_FakePool(), sans, None)
+    for budget in (40_000_000, 3_500):
+        pool = _FakePool()
+        config = AdaptiveDepthConfig(shallow_depth=10, swing_cp=30, gap_cp=-1, complexity_threshold=1.01,
+                                     node_budget=budget)
+        two_pass = _review(pool, sans, config)
+        depths = {r["raw_before"]["search_depth"] for r in two_pass} | {r["raw_after"]["search_depth"] for r in two_pass}
+
+        # The deep evals lean 150cp to white; moves mixing a deep and a shallow eval would be misclassified.
+        # Searches the budget cut short (depth 12) are discarded.
+        assert depths == {10, 18}
+        assert [r["category"] for r in two_pass] == [r["category"] for r in single]
+        assert [r["cp_loss"] for r in two_pass] == [r["cp_loss"] for r in single]
+        for r in two_pass:
+            assert r["raw_before"]["search_depth"] == r["raw_after"]["search_depth"]
+        deep_nodes = pool.nodes_used - 1000 * len({r["fen_before"] for r in two_pass} | {r["fen_after"] for r in two_pass})
+        assert deep_nodes <= budget
@@ -0,0 +1,160 @@
+"""
+Review cache: content-addressed keys, depth domination, perspective on
+read, LRU bound and the metadata-first Supabase fallback.
+"""
+
+from io import StringIO
+
+import chess.pgn
+
+from cache.analysis_cache import AnalysisCache, review_cache_key
+from key_moment_selector import apply_review_perspective
+
+PGN = """[Event "Live Chess"]
+[White "alice"]
+[Black "bob"]
+
+1. e4 {[%clk 0:05:00]} e5 {[%clk 0:05:00]} 2. Qh5 {[%clk 0:04:58]} Nc6 {[%clk 0:04:57]} 1-0
+"""
+
+# Same moves and clocks, different headers/comments/variations
+PGN_REIMPORT = """[Event "Rated blitz game"]
+[Site "https://lichess.org/abcd"]
+[White "bob"]
+
+1. e4 {[%clk 0:05:00] book} (1. d4 d5) 1... e5 {[%clk 0:05:00]} 2. Qh5 {[%clk 0:04:58]} 2... Nc6 {[%clk 0:04:57]} *
+"""
+
+
+def _game(pgn):
+    return chess.pgn.read_game(StringIO(pgn))
+
+
+def _record(ply, side, category):
+    return {
+        "ply": ply,
+        "side_moved": side,
+        "category": category,
+        "cp_loss": 300 if category == "blunder" else 120 if category == "mistake" else 0,
+        "engine": {"eval_before_cp": 0, "played_eval_after_cp": 0},
+        "phase": "opening",
+        "key_point_labels": [],
+    }
+
+
+def _review():
+    records = [_record(1, "white", "good"), _record(2, "black", "mistake"), _record(3, "white", "blunder"), _record(4, "black", "blunder")]
+    return {"ply_records": records, "stats": {"white": {}, "black": {}}, "game_metadata": {}}
+
+
+def test_key_ignores_headers_and_comments_but_not_moves_or_clocks():
+    ts = {1: 300.0, 2: 300.0, 3: 298.0, 4: 297.0}
+    key = review_cache_key(_game(PGN), ts)
+    assert key == review_cache_key(_game(PGN_REIMPORT), ts)
+    assert key != review_cache_key(_game(PGN), {**ts, 4: 290.0})
+    assert key != review_cache_key(_game(PGN.replace("Nc6", "Nf6")), ts)
+    assert review_cache_key(_game(PGN)) != key  # no clocks -> no time_spent_s
+
+
+def test_deeper_review_serves_shallower_requests_only():
+    cache = AnalysisCache()
+    cache.store_review("k", 18, _review())
+    assert cache.get_review("k", 14) is not None
+    assert cache.get_review("k", 18) is not None
+    assert cache.get_review("k", 20) is None
+
+    # A shallower store doesn't replace the deeper entry
+    cache.store_review("k", 12, _review())
+    assert cache._entries["k"]["depth"] == 18
+
+    # Adaptive reviews only serve adaptive requests
+    cache.store_review("a", 18, _review(), adaptive=True)
+    assert cache.get_review("a", 14) is None
+    assert cache.get_review("a", 14, adaptive=True) is not None
+    assert cache.get_stats()["hits"] == 3
+
+
+def test_perspective_is_derived_per_reader_from_one_entry():
+    cache = AnalysisCache()
+    computed = apply_review_perspective(_review(), "white")
+    cache.store_review("k", 14, computed)
+    assert "key_points" not in cache._entries["k"]["review"]
+
+    white = apply_review_perspective(cache.get_review("k", 14), "white")
+    black = apply_review_perspective(cache.get_review("k", 14), "black")
+    assert white["side_focus"] == "white" and black["side_focus"] == "black"
+    # Opponent labels dropped unless it blundered
+    assert [r["ply"] for r in white["key_points"]] == [3, 4]
+    assert [r["ply"] for r in black["key_points"]] == [2, 3, 4]
+    # Readers get private copies
+    white["ply_records"][0]["category"] = "blunder"
+    assert cache.get_review("k", 14)["ply_records"][0]["category"] == "good"
+
+
+def test_lru_evicts_least_recently_used():
+    cache = AnalysisCache(max_entries=2)
+    cache.store_review("a", 14, _review())
+    cache.store_review("b", 14, _review())
+    cache.get_review("a", 14)
+    cache.store_review("c", 14, _review())
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.get_stats()["evictions"] == 1
+
+
+class _Query:
+    def __init__(self, table):
+        self.table = table
+        self.filters = {}
+
+    def select(self, columns):
+        self.columns = columns
+        self.table.selects.append(columns)
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def limit(self, _n):
+        return self
+
+    def maybe_single(self):
+        return self
+
+    def execute(self):
+        rows = self.table.rows
+        if "game_review->review_meta->>content_key" in self.filters:
+            key = self.filters["game_review->review_meta->>content_key"]
+            data = [{"id": r["id"], "review_meta": r["game_review"]["review_meta"]} for r in rows if r["game_review"]["review_meta"]["content_key"] == key]
+        else:
+            data = next({"game_review": r["game_review"]} for r in rows if r["id"] == self.filters["id"])
+        return type("Result", (), {"data": data})()
+
+
+class _FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.selects = []
+        self.client = self
+
+    def table(self, _name):
+        return _Query(self)
+
+
+def test_supabase_fallback_reads_metadata_before_the_review():
+    def saved(row_id, depth):
+        review = apply_review_perspective(_review(), "white")
+        review["review_meta"] = {"content_key": "k", "depth": depth, "adaptive": False}
+        return {"id": row_id, "game_review": review}
+
+    db = _FakeSupabase([saved("g1", 12), saved("g2", 16)])
+    cache = AnalysisCache(supabase_client=db)
+
+    assert cache.get_review("k", 18) is None
+    assert db.selects == ["id, review_meta:game_review->review_meta"]  # review JSON never pulled
+
+    review = cache.get_review("k", 14)
+    assert review["review_meta"]["depth"] == 16 and "key_points" not in review
+    assert db.selects[-1] == "game_review"
+    assert cache.get_review("k", 16) is not None  # now served from memory
+    assert len(db.selects) == 3
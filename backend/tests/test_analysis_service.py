@@ -0,0 +1,66 @@
+"""
+AnalysisService: in-process analysis calls for ToolExecutor, with the
+HTTP service kept for remote deployments.
+"""
+
+import asyncio
+
+from fastapi import HTTPException
+
+from analysis_service import AnalysisService, HttpAnalysisService, resolve_analysis_service
+
+
+def _service(**overrides):
+    calls = []
+
+    async def analyze_position(fen, lines, depth, light_mode):
+        calls.append(("position", fen, lines, depth, light_mode))
+        return {"eval_cp": 42, "candidate_moves": [{"move": "e4"}], "pv": ("e4", "e5")}
+
+    async def analyze_move(fen, move_san, depth):
+        calls.append(("move", fen, move_san, depth))
+        raise HTTPException(status_code=400, detail="Invalid move notation: Kxe9")
+
+    fns = {"analyze_position_fn": analyze_position, "analyze_move_fn": analyze_move, **overrides}
+    return AnalysisService(**fns), calls
+
+
+def test_in_process_calls_return_native_results_and_error_dicts():
+    service, calls = _service()
+    result = asyncio.run(service.analyze_position("8/8/8/8/8/8/8/K6k w - - 0 1", lines=2, depth=12))
+    assert result["pv"] == ("e4", "e5")  # native object, no JSON round trip
+    assert calls[0] == ("position", "8/8/8/8/8/8/8/K6k w - - 0 1", 2, 12, False)
+
+    failed = asyncio.run(service.analyze_move("8/8/8/8/8/8/8/K6k w - - 0 1", "Kxe9", depth=14))
+    assert failed == {"error": "analyze_move failed: Invalid move notation: Kxe9"}
+
+
+def test_tree_search_uses_registered_local_implementation():
+    async def tree_search(thread_id, query, limit):
+        return {"results": [{"thread_id": thread_id, "query": query, "limit": limit}]}
+
+    service, _calls = _service(tree_search_fn=tree_search)
+    data = asyncio.run(service.tree_search("t1", "Nf3", limit=5))
+    assert data["results"] == [{"thread_id": "t1", "query": "Nf3", "limit": 5}]
+
+
+def test_resolve_prefers_local_unless_http_is_forced(monkeypatch):
+    service, _calls = _service()
+    monkeypatch.delenv("ANALYSIS_SERVICE_MODE", raising=False)
+    assert resolve_analysis_service(service) is service
+    assert isinstance(resolve_analysis_service(None), HttpAnalysisService)
+
+    monkeypatch.setenv("ANALYSIS_SERVICE_MODE", "http")
+    monkeypatch.setenv("BACKEND_URL", "http://analysis.internal:9000")
+    remote = resolve_analysis_service(service)
+    assert isinstance(remote, HttpAnalysisService) and remote.remote
+    assert remote.base_url == "http://analysis.internal:9000"
+
+
+def test_in_process_calls_clamp_to_route_bounds():
+    service, calls = _service()
+    asyncio.run(service.analyze_position("8/8/8/8/8/8/8/K6k w - - 0 1", lines=12, depth=40))
+    asyncio.run(service.analyze_position("8/8/8/8/8/8/8/K6k w - - 0 1", lines=0, depth=2))
+    asyncio.run(service.analyze_move("8/8/8/8/8/8/8/K6k w - - 0 1", "Kb2", depth=30))
+    assert [c[2:4] for c in calls[:2]] == [(5, 22), (1, 10)]
+    assert calls[2][3] == 20
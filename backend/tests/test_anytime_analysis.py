@@ -0,0 +1,150 @@
+"""
+AnytimeAnalysisHub: per-depth results, shared searches and early stopping,
+against a scripted fake engine.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import chess
+import chess.engine
+
+from anytime_analysis import AnytimeAnalysisHub, is_stable
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR w KQkq - 4 4"
+
+
+class _FakeAnalysis:
+    """Emits two multipv lines per depth, one depth per loop tick."""
+
+    def __init__(self, board, limit, multipv):
+        self.board = board
+        self.limit = limit
+        self.n_lines = multipv
+        self.multipv = []
+        self.stopped = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def stop(self):
+        self.stopped = True
+
+    def __aiter__(self):
+        return self._infos()
+
+    async def _infos(self):
+        best = self.board.parse_san("Qxf7#")
+        other = self.board.parse_san("Bb5")
+        for depth in range(1, self.limit.depth + 1):
+            await asyncio.sleep(0)
+            if self.stopped:
+                return
+            self.multipv = []
+            for idx, (move, cp) in enumerate([(best, 300 + depth), (other, -20)][: self.n_lines], start=1):
+                info = {
+                    "depth": depth,
+                    "multipv": idx,
+                    "score": chess.engine.PovScore(chess.engine.Cp(cp), chess.WHITE),
+                    "pv": [move],
+                    "nodes": depth * 1000,
+                }
+                self.multipv.append(info)
+                yield info
+
+
+class _FakeEngine:
+    def __init__(self):
+        self.searches = []
+
+    async def analysis(self, board, limit, multipv=1):
+        analysis = _FakeAnalysis(board, limit, multipv)
+        self.searches.append(analysis)
+        return analysis
+
+
+class _FakeQueue:
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def enqueue(self, fn, *args, timeout=None, **kwargs):
+        return await fn(*args, **kwargs)
+
+
+def _hub():
+    engine = _FakeEngine()
+
+    @asynccontextmanager
+    async def lease():
+        yield _FakeQueue(engine)
+
+    return AnytimeAnalysisHub(lease), engine
+
+
+async def _collect(gen):
+    return [event async for event in gen]
+
+
+def test_stream_publishes_every_depth_then_completes():
+    async def run():
+        hub, engine = _hub()
+        events = await _collect(hub.stream(FEN, depth=5, multipv=2))
+        kinds = [kind for kind, _ in events]
+        assert kinds == ["depth"] * 5 + ["complete"]
+        assert [payload.depth for _, payload in events[:5]] == [1, 2, 3, 4, 5]
+        first = events[0][1]
+        assert [line["pv_san"][0] for line in first.lines] == ["Qxf7#", "Bb5"]
+        assert first.lines[0]["eval_cp"] == 301
+        done = events[-1][1]
+        assert done.stop_reason == "depth_reached" and done.depth == 5
+        assert len(engine.searches) == 1
+
+    asyncio.run(run())
+
+
+def test_subscribers_share_one_search_and_late_joiner_gets_replay():
+    async def run():
+        hub, engine = _hub()
+        first = hub.stream(FEN, depth=6, multipv=2)
+        got_first = [await first.__anext__() for _ in range(3)]
+        second = await _collect(hub.stream(FEN.replace(" 4 4", " 0 9"), depth=4, multipv=2))
+        rest = await _collect(first)
+
+        assert len(engine.searches) == 1
+        assert [p.depth for k, p in second if k == "depth"] == [1, 2, 3, 4]
+        assert second[-1][1].shared is True
+        assert [p.depth for k, p in got_first + rest if k == "depth"] == [1, 2, 3, 4, 5, 6]
+
+        # Finished searches aren't reused
+        await _collect(hub.stream(FEN, depth=3, multipv=1))
+        assert len(engine.searches) == 2
+
+    asyncio.run(run())
+
+
+def test_stop_when_stable_ends_early_and_stops_the_search():
+    async def run():
+        hub, engine = _hub()
+        events = await _collect(hub.stream(FEN, depth=30, multipv=2, stop_when_stable=True))
+        done = events[-1][1]
+        assert done.stop_reason == "stable"
+        assert done.depth < 30
+        assert events[-2][1].stable is True
+        await asyncio.sleep(0.01)
+        assert engine.searches[0].stopped
+
+    asyncio.run(run())
+
+
+def test_is_stable_requires_same_best_move_and_settled_score():
+    def snap(depth, move, cp):
+        return {"depth": depth, "lines": [{"pv": [move], "eval_cp": cp}]}
+
+    settled = [snap(d, "e2e4", 30 + d) for d in range(8, 14)]
+    assert is_stable(settled)
+    assert not is_stable(settled[:-1] + [snap(13, "d2d4", 40)])
+    assert not is_stable(settled[:-1] + [snap(13, "e2e4", 120)])
+    assert not is_stable([snap(d, "e2e4", 30) for d in range(1, 6)])  # too shallow
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+from api.schemas.confidence import validate_response
+from confidence_engine import ConfidenceEngine, NodeState, NodeStore, replay_snapshots
+
+
+def _node(node_id: str, parent_id=None, move=None, role="pv", fen=None) -> NodeState:
+    return NodeState(
+        id=node_id,
+        parent_id=parent_id,
+        role=role,
+        ply_index=0,
+        move=move,
+        fen=fen or f"fen-{node_id}",
+        confidence=50,
+    )
+
+
+def test_indexes_follow_mutations():
+    store = NodeStore()
+    store["a"] = _node("a")
+    store["b"] = _node("b", parent_id="a", move="e4", fen="shared")
+    store["c"] = _node("c", parent_id="a", move="d4", role="branch-leaf", fen="shared")
+
+    assert [n.id for n in store.children_of("a")] == ["b", "c"]
+    assert store.child_by_move("a", "d4").id == "c"
+    assert store.find_by_fen("shared", exclude_id="b").id == "c"
+    assert store.count_role("pv") == 2
+    assert store.pv_red == 2 and store.pv_triangles == 0
+
+    store["b"].parent_id = "c"
+    store["a"].has_branches = True
+    store["a"].color = "green"
+    assert [n.id for n in store.children_of("a")] == ["c"]
+    assert store.child_by_move("c", "e4").id == "b"
+    assert store.pv_triangles == 1 and store.pv_red == 1
+    assert [n.id for n in store.with_color("green")] == ["a"]
+
+    del store["c"]
+    assert store.find_by_fen("shared").id == "b"
+    assert store.child_by_move("a", "d4") is None
+    assert store.count_role("branch-leaf") == 0
+
+
+def test_delta_snapshots_replay_to_full_views():
+    first = {"nodes": [{"id": "a", "v": 1}]}
+    second = {"delta": {"upserted": [{"id": "b", "v": 1}, {"id": "a", "v": 2}], "removed": []}}
+    third = {"delta": {"upserted": [], "removed": ["a"]}}
+    frames = replay_snapshots([first, second, third])
+    assert frames == [
+        [{"id": "a", "v": 1}],
+        [{"id": "a", "v": 2}, {"id": "b", "v": 1}],
+        [{"id": "b", "v": 1}],
+    ]
+
+
+def test_recorded_snapshots_validate_against_the_response_schema():
+    store = NodeStore()
+    store["a"] = _node("a")
+    store["b"] = _node("b", parent_id="a", move="e4")
+    engine = SimpleNamespace(order=["a", "b"], nodes=store, snapshots=[],
+                             iteration=0, min_pv_confidence=50, _compute_stats=lambda: {})
+    ConfidenceEngine._record_snapshot(engine, "initial")
+    store["b"].color = "blue"
+    ConfidenceEngine._record_snapshot(engine, "recolored")
+
+    nodes = [store[nid].to_payload() for nid in engine.order]
+    validate_response({"nodes": nodes, "snapshots": engine.snapshots})
+    assert [len(s["delta"]["upserted"]) for s in engine.snapshots] == [2, 1]
+    assert replay_snapshots(engine.snapshots)[-1] == nodes
+
+
+def test_snapshots_serialize_only_dirty_nodes():
+    store = NodeStore()
+    for i in range(50):
+        store[f"n{i}"] = _node(f"n{i}")
+    engine = SimpleNamespace(nodes=store, snapshots=[], iteration=0, min_pv_confidence=50, _compute_stats=lambda: {})
+    ConfidenceEngine._record_snapshot(engine, "initial")
+
+    store["n1"].confidence = 50  # unchanged value: not dirty
+    store["n2"].confidence = 80
+    store["n3"].metadata["branch_summary"] = {"count": 1}
+    store.touch("n3")
+    del store["n4"]
+    ConfidenceEngine._record_snapshot(engine, "changed")
+    ConfidenceEngine._record_snapshot(engine, "idle")
+
+    deltas = [s["delta"] for s in engine.snapshots]
+    assert len(deltas[0]["upserted"]) == 50
+    assert [n["id"] for n in deltas[1]["upserted"]] == ["n2", "n3"] and deltas[1]["removed"] == ["n4"]
+    assert deltas[2] == {"upserted": [], "removed": []}
+    assert replay_snapshots(engine.snapshots)[-1] == [store[f"n{i}"].to_payload() for i in range(50) if i != 4]
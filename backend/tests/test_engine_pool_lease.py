@@ -0,0 +1,58 @@
+"""
+EnginePool.lease(): a pooled engine behind the StockfishQueue interface,
+always handed back to the pool (used by /analyze_positions_batch).
+"""
+
+import asyncio
+
+import pytest
+
+from engine_pool import EngineLease, EnginePool, EngineStatus
+
+
+class _FakeEngine:
+    def __init__(self, name):
+        self.name = name
+
+    async def analyse(self, fen, delay=0.0):
+        await asyncio.sleep(delay)
+        return {"engine": self.name, "fen": fen}
+
+
+def _pool(size=2):
+    pool = EnginePool(pool_size=size)
+    for i in range(size):
+        pool.engines.append(_FakeEngine(i))
+        pool.available.put_nowait((i, pool.engines[i]))
+        pool.engine_status[i] = EngineStatus(id=i, is_available=True)
+    pool._initialized = True
+    return pool
+
+
+def test_lease_exposes_queue_interface_and_releases():
+    async def run():
+        pool = _pool(2)
+        async with pool.lease() as lease:
+            assert isinstance(lease, EngineLease)
+            assert pool.available.qsize() == 1
+            result = await lease.enqueue(lease.engine.analyse, "fen-a", timeout=5)
+            assert result == {"engine": lease.engine_id, "fen": "fen-a"}
+            with pytest.raises(asyncio.TimeoutError):
+                await lease.enqueue(lease.engine.analyse, "fen-b", delay=1.0, timeout=0.01)
+        assert pool.available.qsize() == 2
+        assert pool.engine_status[lease.engine_id].analyses_completed == 1
+
+    asyncio.run(run())
+
+
+def test_lease_released_when_body_raises():
+    async def run():
+        pool = _pool(1)
+        with pytest.raises(ValueError):
+            async with pool.lease():
+                raise ValueError("boom")
+        assert pool.available.qsize() == 1
+        async with pool.lease(timeout=0.1) as lease:
+            assert lease.engine_id == 0
+
+    asyncio.run(run())
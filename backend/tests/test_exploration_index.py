@@ -0,0 +1,83 @@
+"""
+Exploration move index: built alongside the exploration PGN, queried by the
+summariser instead of regex-parsing comments and replaying boards.
+"""
+
+import chess
+import chess.pgn
+
+from exploration_index import ExplorationIndex, build_exploration_index, line_tokens, record_node_deltas
+from investigator import InvestigationResult
+from summariser import Claim, Summariser
+
+
+def _exploration():
+    """1. e4 (1. d4 d5) e5 2. Nf3 (2. Bc4) Nc6, every move annotated like the Investigator does"""
+    game = chess.pgn.Game()
+    deltas = {}
+
+    def add(parent, san, gained=(), lost=(), roles_gained=(), roles_lost=()):
+        child = parent.add_variation(parent.board().parse_san(san))
+        child.comment = f"{{[gained: {', '.join(gained) or 'none'}], [lost: {', '.join(lost) or 'none'}], " \
+                        f"[roles_gained: none], [roles_lost: none], [threats: none]}}"
+        record_node_deltas(deltas, child, tags_gained=gained, tags_lost=lost,
+                           roles_gained=roles_gained, roles_lost=roles_lost)
+        return child
+
+    e4 = add(game, "e4", gained=["tag.center.e4"])
+    d4 = add(game, "d4", gained=["tag.center.d4"])
+    add(d4, "d5")
+    e5 = add(e4, "e5", gained=["tag.center.e5"])
+    nf3 = add(e5, "Nf3", gained=["tag.attack.e5"], roles_gained=["white_knight_f3:role.attacking.e5"])
+    add(e5, "Bc4", gained=["tag.diagonal.a2g8"])
+    add(nf3, "Nc6", lost=["tag.attack.e5"], roles_gained=["black_knight_c6:role.defending.e5"])
+    index = build_exploration_index(game, deltas, starting_tags=["tag.start"],
+                                    starting_roles={"white_king_e1": ["role.king.safe"]})
+    pgn = str(game.accept(chess.pgn.StringExporter(headers=True, variations=True, comments=True)))
+    return index, pgn
+
+
+def test_nodes_follow_pgn_text_order_with_fens():
+    data, pgn = _exploration()
+    index = ExplorationIndex(data)
+    parsed = Summariser(openai_client=None)._extract_tag_deltas_from_pgn(pgn)
+
+    # Same deltas in the same order as the comments; the text parse can't attribute moves reliably
+    assert [d["tags_gained"] for d in index.main_sequence()] == [d["tags_gained"] for d in parsed]
+    assert [d["move"] for d in index.main_sequence()] == ["1. e4", "1. d4", "1... d5", "1... e5", "2. Nf3", "2. Bc4", "2... Nc6"]
+    nc6 = index.follow(["e4", "e5", "g1f3", "Nc6"])[-1]
+    assert nc6["move"] == "2... Nc6" and nc6["ply"] == 4
+    assert chess.Board(nc6["fen_after"]) == chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+    assert index.mainline() == ["e4", "e5", "Nf3", "Nc6"] and index.mainline(2) == ["e4", "e5"]
+    assert index.starting_role_keys() == ["white_king_e1:role.king.safe"]
+
+
+def test_net_changes_cancel_along_the_line():
+    index = ExplorationIndex(_exploration()[0])
+    tags_gained, tags_lost, roles_gained, roles_lost = index.net_changes("1. e4 e5 2. Nf3 Nc6")
+    assert sorted(tags_gained) == ["tag.center.e4", "tag.center.e5"] and tags_lost == []
+    assert sorted(roles_gained) == ["black_knight_c6:role.defending.e5", "white_knight_f3:role.attacking.e5"]
+    assert index.net_changes("e4 e5 Qh5") is None  # leaves the tree -> caller falls back to replay
+    assert line_tokens("12... Nxe5+ 13. O-O *") == ["Nxe5", "O-O"]
+
+
+def test_summariser_reads_the_index_instead_of_the_pgn(monkeypatch):
+    data, pgn = _exploration()
+    summariser = Summariser(openai_client=None)
+
+    def _no_parse(*_a, **_kw):
+        raise AssertionError("PGN text should not be parsed when an index is attached")
+
+    monkeypatch.setattr(summariser, "_extract_tag_deltas_from_pgn", _no_parse)
+    monkeypatch.setattr(summariser, "_calculate_net_changes_from_pgn_sequence", _no_parse)
+    inv = InvestigationResult(pgn_exploration=pgn, exploration_index=data, evidence_pgn_line="e4 e5 Nf3")
+
+    seq = summariser._get_structured_deltas_from_inv(inv)
+    assert seq["starting_tags"] == ["tag.start"] and len(seq["main_sequence"]) == 7
+    assert summariser._exploration_sequence(InvestigationResult()) is None
+
+    claim = summariser._attach_rich_evidence(
+        Claim(summary="e4 grabs the centre", claim_type="positional_gain"), inv,
+        want_pgn_line=True, want_tags=False, want_two_move=False,
+    )
+    assert sorted(claim.evidence_payload.tags_gained_net) == ["tag.attack.e5", "tag.center.e4", "tag.center.e5"]
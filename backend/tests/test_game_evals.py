@@ -0,0 +1,127 @@
+"""
+Game evaluation batch API: stored reviews are reused, missing positions are
+analysed once across games, results come back as per-ply columns.
+"""
+
+import asyncio
+import io
+import math
+
+import chess
+import chess.engine
+import chess.pgn
+
+from cache.analysis_cache import AnalysisCache, pgn_clock_timestamps, review_cache_key
+from engine_pool import EnginePool
+from ply_columns import MISSING_EVAL
+from tools.critical_moments import find_critical_moments
+from tools.engine_correlation import engine_correlation
+from tools.game_evals import evaluate_games, game_metrics
+from tools.player_baseline import calculate_baseline_from_pgns
+
+SCHOLAR = '[White "alice"]\n[Black "bob"]\n\n1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0'
+KNIGHTS = '[White "bob"]\n[Black "alice"]\n\n1. e4 e5 2. Nf3 Nc6 *'
+CLOCKED = ('[White "alice"]\n[Black "bob"]\n\n1. e4 { [%clk 0:03:00] } 1... e5 { [%clk 0:02:58.5] } '
+           '2. Nf3 { [%clk 0:02:55] } 2... Nc6 { [%clk 0:02:51] } *')
+VALUES = {chess.PAWN: 100, chess.KNIGHT: 300, chess.BISHOP: 300, chess.ROOK: 500, chess.QUEEN: 900}
+
+
+def _material(board):
+    score = sum(VALUES.get(p.piece_type, 0) * (1 if p.color == board.turn else -1) for p in board.piece_map().values())
+    return score + (2 * board.legal_moves.count() if board.turn == chess.WHITE else 0)
+
+
+class _FakePool:
+    """analyze_single() with one-ply material (and mate) lines; records every FEN it is asked for"""
+
+    pool_size = 2
+
+    def __init__(self):
+        self.calls = []
+
+    def _lines(self, fen, multipv):
+        board = chess.Board(fen)
+        scored = []
+        for move in board.legal_moves:
+            board.push(move)
+            scored.append((10000 if board.is_checkmate() else -_material(board), move))
+            board.pop()
+        scored.sort(key=lambda item: (-item[0], item[1].uci()))
+        turn = board.turn
+        return [{"score": chess.engine.PovScore(chess.engine.Cp(cp), turn), "pv": [move], "depth": 12}
+                for cp, move in scored[:multipv]]
+
+    async def analyze_single(self, fen, depth=14, multipv=2):
+        self.calls.append(fen)
+        return {"success": True, "engine_id": 0, "result": self._lines(fen, multipv)}
+
+    def review(self, pgn):
+        """ply_records shaped like the game review's (raw_before / raw_after engine lines only)"""
+        game = chess.pgn.read_game(io.StringIO(pgn))
+        board = game.board()
+        records = []
+        for ply, move in enumerate(game.mainline_moves(), 1):
+            before = board.fen()
+            board.push(move)
+            after = board.fen()
+            raw_after = EnginePool._serialize_engine_info(self._lines(after, 2), 12) if board.legal_moves.count() else {}
+            records.append({"ply": ply, "fen_before": before, "fen_after": after,
+                            "raw_before": EnginePool._serialize_engine_info(self._lines(before, 2), 12),
+                            "raw_after": raw_after})
+        return {"ply_records": records}
+
+
+def test_stored_reviews_are_reused_and_shared_positions_analysed_once():
+    pool = _FakePool()
+    reviewed = {"pgn": SCHOLAR, "game_review": pool.review(SCHOLAR)}
+    scholar, knights = asyncio.run(evaluate_games([reviewed, KNIGHTS], depth=12, engine_pool=pool))
+
+    # The reviewed game needs no engine; KNIGHTS only pays for positions SCHOLAR didn't cover
+    assert scholar.from_engine == 0 and len(scholar) == 7
+    assert len(pool.calls) == len(set(pool.calls)) == 2  # after Nf3 and after Nc6; 1. e4 e5 comes from the review
+    assert knights.from_review == 3 and knights.from_engine == 2
+
+    # Qxf7# is the best move and mates: no loss; the final position needs no engine
+    assert scholar.uci[-1] == "h5f7" and scholar.played_rank[-1] == 1 and scholar.cp_loss[-1] == 0
+    assert scholar.played_eval_cp[-1] == 10000 and scholar.final_eval_cp == -10000
+    for i in range(len(scholar)):
+        gap = scholar.line_evals[i][0] - scholar.line_evals[i][1]
+        assert scholar.multipv_gap_cp[i] == gap and scholar.best_move_uci[i] == scholar.line_moves[i][0]
+        assert scholar.cp_loss[i] == max(0, scholar.eval_before_cp[i] - scholar.played_eval_cp[i])
+
+
+def test_without_engine_missing_positions_stay_missing():
+    [evals] = asyncio.run(evaluate_games([KNIGHTS]))
+    assert evals.from_engine == evals.from_review == 0
+    assert set(evals.eval_before_cp) == {MISSING_EVAL} and all(math.isnan(v) for v in evals.cp_loss)
+    assert asyncio.run(engine_correlation(KNIGHTS, exclude_book_moves=0)) == {"error": "No moves analyzed"}
+    assert asyncio.run(evaluate_games([{"id": "no-pgn"}]))[0].error == "Could not parse PGN"
+
+
+def test_tools_read_the_batch_columns():
+    pool = _FakePool()
+    metrics = asyncio.run(game_metrics([SCHOLAR, KNIGHTS], player="bob", engine_pool=pool))
+    assert [m["move_count"] for m in metrics] == [3, 2]  # bob is black in SCHOLAR, white in KNIGHTS
+    assert metrics[0]["blunder_count"] >= 1  # allowing Qxf7#
+
+    baseline = asyncio.run(calculate_baseline_from_pgns([SCHOLAR, KNIGHTS, KNIGHTS], engine_pool=pool, player="alice"))
+    assert baseline["games_analyzed"] == 3 and baseline["accuracy"]["n"] == 3
+
+    moments = asyncio.run(find_critical_moments(SCHOLAR, engine_pool=pool, threshold_cp=100))
+    assert moments["biggest_swing"]["move_num"] == 6  # 3... Nf6?? allows mate
+    correlation = asyncio.run(engine_correlation(SCHOLAR, exclude_book_moves=0, engine_pool=pool))
+    assert correlation["move_details"][-1]["played"] == "Qxf7#" and correlation["move_details"][-1]["rank"] == 1
+
+
+def test_clocked_games_find_reviews_stored_by_review_game():
+    pool = _FakePool()
+    game = chess.pgn.read_game(io.StringIO(CLOCKED))
+    timestamps = pgn_clock_timestamps(game)
+    assert timestamps == {1: 180.0, 2: 178.5, 3: 175.0, 4: 171.0}
+
+    # /review_game stores reviews under the clocked key
+    cache = AnalysisCache()
+    cache.store_review(review_cache_key(game, timestamps), 14, pool.review(CLOCKED))
+    [evals] = asyncio.run(evaluate_games([CLOCKED], engine_pool=pool, review_cache=cache))
+    assert evals.from_review == 5 and evals.from_engine == 0 and not pool.calls  # 4 plies + final position
+    assert cache.hits == 1 and cache.misses == 0
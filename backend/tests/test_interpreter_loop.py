@@ -4,6 +4,7 @@ Tests for the Multi-Pass Interpreter Loop
 
 import pytest
 import asyncio
+import time
 from typing import Dict, Any
 
 # Import the modules we're testing
@@ -31,6 +32,7 @@ from interpreter_loop import (
     ActionType,
     InterpreterAction,
     InterpreterState,
+    InterpreterLoop,
     ActionResult,
     PassRecord,
     InterpreterOutput
@@ -319,6 +321,117 @@ class TestInterpreterOutput:
         assert "insight" in output.insights
 
 
+class _TimedExecutor:
+    """Fake action executor: sleeps per action, records calls and concurrency"""
+    
+    def __init__(self, delay=0.05, fail_types=()):
+        self.delay = delay
+        self.fail_types = set(fail_types)
+        self.calls = []
+        self.running = {}
+        self.max_running = {}
+        self.seen_data = {}
+    
+    async def execute(self, action, accumulated_data=None):
+        kind = action.action_type.value
+        self.calls.append(action.id)
+        self.seen_data[action.id] = set(accumulated_data or {})
+        self.running[kind] = self.running.get(kind, 0) + 1
+        self.max_running[kind] = max(self.max_running.get(kind, 0), self.running[kind])
+        await asyncio.sleep(self.delay)
+        self.running[kind] -= 1
+        if kind in self.fail_types:
+            raise RuntimeError(f"{kind} failed")
+        return {"games": [{"id": action.id}]} if kind == "fetch" else {"value": action.id}
+
+
+def _action(action_type, depends_on=None, **params):
+    return InterpreterAction(action_type=action_type, params=params, reasoning="test", depends_on=depends_on)
+
+
+def _run_actions(executor, actions, state=None, **budget):
+    loop = InterpreterLoop(None, executor, ResourceBudget(max_retries_per_action=0, **budget))
+    state = state or InterpreterState.create("test", {})
+    results = asyncio.run(loop._execute_actions(actions, state))
+    return results, state
+
+
+class TestActionScheduling:
+    """Tests for the dependency-DAG action scheduler"""
+    
+    def test_branches_run_in_critical_path_time(self):
+        fetch = _action(ActionType.FETCH, username="alice")
+        search = _action(ActionType.SEARCH, query="london system")
+        baseline = _action(ActionType.COMPUTE, depends_on=fetch.id, type="baseline")
+        summary = _action(ActionType.COMPUTE, depends_on=search.id, type="summary")
+        executor = _TimedExecutor(delay=0.1)
+        
+        start = time.time()
+        results, _state = _run_actions(executor, [fetch, search, baseline, summary])
+        elapsed = time.time() - start
+        
+        assert all(r.success for r in results.values())
+        assert elapsed < 0.28  # two levels, not fetch/search + two sequential computes
+        assert executor.calls.index(baseline.id) > executor.calls.index(fetch.id)
+        # Dependents see their ancestors' results from this pass
+        assert f"fetch_1_{fetch.id}" in executor.seen_data[baseline.id]
+        assert f"fetch_1_{fetch.id}" not in executor.seen_data[summary.id]
+    
+    def test_parallelism_is_capped_per_resource_class(self):
+        actions = [_action(ActionType.ANALYZE, fen=f"fen {i}") for i in range(5)]
+        actions += [_action(ActionType.COMPUTE, type=f"t{i}") for i in range(3)]
+        executor = _TimedExecutor(delay=0.02)
+        results, _state = _run_actions(executor, actions, max_analyses=10, max_parallel_engine=2)
+        assert all(r.success for r in results.values())
+        assert executor.max_running["analyze"] == 2
+        assert executor.max_running["compute"] == 3
+    
+    def test_budget_counts_actions_in_flight(self):
+        actions = [_action(ActionType.FETCH, username=f"user{i}") for i in range(4)]
+        executor = _TimedExecutor()
+        results, state = _run_actions(executor, actions, max_fetches=2, max_parallel_fetch=4)
+        errors = sorted(r.error or "ok" for r in results.values())
+        assert errors == ["budget_exceeded", "budget_exceeded", "ok", "ok"]
+        assert state.usage.fetches == 2
+    
+    def test_results_are_memoized_across_passes(self):
+        executor = _TimedExecutor(delay=0)
+        first = [_action(ActionType.FETCH, username="Alice", count=10), _action(ActionType.COMPUTE, type="baseline")]
+        results, state = _run_actions(executor, first)
+        state.add_pass(first, results, [], 0)
+        
+        # Same fetch with different spelling, same compute (depends on accumulated data)
+        second = [_action(ActionType.FETCH, username=" alice", count=10, time_controls=None), _action(ActionType.COMPUTE, type="baseline")]
+        results, state = _run_actions(executor, second, state=state)
+        assert results[second[0].id].from_cache and results[second[0].id].data == {"games": [{"id": first[0].id}]}
+        assert not results[second[1].id].from_cache
+        assert executor.calls.count(first[0].id) == 1 and len(executor.calls) == 3
+        assert state.usage.fetches == 1 and state.usage.computes == 2
+    
+    def test_duplicate_actions_in_one_pass_execute_once(self):
+        executor = _TimedExecutor()
+        actions = [_action(ActionType.TEST_MOVE, fen="8/8/8/8/8/8/8/K6k w - - 0 1", move_san="Kb2"),
+                   _action(ActionType.TEST_MOVE, fen="8/8/8/8/8/8/8/K6k w - - 3 9", move_san="Kb2")]
+        results, _state = _run_actions(executor, actions)
+        assert len(executor.calls) == 1
+        assert sorted(r.from_cache for r in results.values()) == [False, True]
+    
+    def test_dependency_errors(self):
+        bad_fetch = _action(ActionType.FETCH, username="alice")
+        after_bad = _action(ActionType.COMPUTE, depends_on=bad_fetch.id, type="baseline")
+        orphan = _action(ActionType.COMPUTE, depends_on="missing", type="orphan")
+        loop_a = _action(ActionType.COMPUTE, type="a")
+        loop_b = _action(ActionType.COMPUTE, depends_on=loop_a.id, type="b")
+        loop_a.depends_on = loop_b.id
+        executor = _TimedExecutor(delay=0, fail_types={"fetch"})
+        results, _state = _run_actions(executor, [bad_fetch, after_bad, orphan, loop_a, loop_b])
+        assert results[bad_fetch.id].error == "fetch failed"
+        assert results[after_bad.id].error == "dependency_failed"
+        assert results[orphan.id].error == "dependency_not_found"
+        assert results[loop_a.id].error == results[loop_b.id].error == "dependency_cycle"
+        assert executor.calls == [bad_fetch.id]
+
+
 # Run tests if executed directly
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_response_cache import LLMResponseCache
+from llm_router import LLMRouter, LLMRouterConfig
+from pipeline_timer import request_trace
+
+
+def _router(tmp_path, calls, delay=0.0):
+    router = LLMRouter(LLMRouterConfig(vllm_model="test-model"))
+    router._response_cache = LLMResponseCache(cache_dir=str(tmp_path))
+    lock = threading.Lock()
+
+    def fake_complete(**kwargs):
+        time.sleep(delay)
+        with lock:
+            calls.append(kwargs["user_text"])
+        content = json.dumps({"echo": kwargs["user_text"]})
+        # Transcript bookkeeping as in the real call
+        skey = router.ensure_session(
+            task_id=kwargs["session_id"], subsession=kwargs["subsession"] or kwargs["stage"], system_prompt="sys"
+        )
+        router.sessions.append_user(skey, kwargs["user_text"])
+        router.sessions.append_assistant(skey, content)
+        return content, {"model": "gpt-4o-mini", "tokens_in": 1000, "tokens_out": 200}
+
+    router._complete_with_usage = fake_complete
+    return router
+
+
+def _ask(router, text, session, cache=True, stage="memory_compress", temperature=0.0, **kwargs):
+    return router.complete_json(
+        session_id=session, stage=stage, system_prompt="sys", user_text=text, provider="vllm",
+        temperature=temperature, cache=cache, **kwargs
+    )
+
+
+def test_identical_prompts_hit_cache_and_report_savings(tmp_path):
+    calls = []
+    router = _router(tmp_path, calls)
+    with request_trace("cache_test") as timer:
+        assert _ask(router, "fen A", "u1") == {"echo": "fen A"}
+        assert _ask(router, "fen A", "u2") == {"echo": "fen A"}
+        assert _ask(router, "fen B", "u3") == {"echo": "fen B"}
+        _ask(router, "fen A", "u4", cache=False)
+    assert calls == ["fen A", "fen B", "fen A"]
+
+    cache = timer.get_summary()["llm_stats"]["router:memory_compress"]["cache"]
+    assert (cache["hits"], cache["misses"]) == (1, 2)
+    assert cache["saved_tokens_in"] == 1000 and cache["saved_tokens_out"] == 200
+    assert cache["saved_cost_usd"] > 0
+
+    # Persisted: a fresh router reading the same directory serves it without a call
+    calls2 = []
+    assert _ask(_router(tmp_path, calls2), "fen B", "u5") == {"echo": "fen B"}
+    assert calls2 == []
+
+
+def test_concurrent_identical_calls_are_coalesced(tmp_path):
+    calls = []
+    router = _router(tmp_path, calls, delay=0.2)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(lambda i: _ask(router, "popular game", f"user{i}"), range(6)))
+    assert calls == ["popular game"]
+    assert all(r == {"echo": "popular game"} for r in results)
+
+
+def test_answers_are_only_replayed_into_the_same_prompt_and_sampling(tmp_path):
+    calls = []
+    router = _router(tmp_path, calls)
+    _ask(router, "fen A", "u1")
+    # Same text after a different transcript is a different prompt
+    _ask(router, "fen A", "u1")
+    router.append_user_visible(task_id="u2", text="another user's game", system_prompt="sys", subsession="memory_compress")
+    _ask(router, "fen A", "u2")
+    # Sampled calls are never cached
+    _ask(router, "fen A", "u3", temperature=0.7)
+    _ask(router, "fen A", "u4", temperature=None)
+    assert calls == ["fen A"] * 5
+
+    assert _ask(router, "fen A", "u5") == {"echo": "fen A"}
+    assert len(calls) == 5
+
+
+def test_rejected_answers_are_returned_but_not_cached(tmp_path):
+    calls = []
+    router = _router(tmp_path, calls)
+    reject = lambda d: d.get("echo") != "placeholder"
+    assert _ask(router, "placeholder", "u1", cache_validate=reject) == {"echo": "placeholder"}
+    assert _ask(router, "placeholder", "u2", cache_validate=reject) == {"echo": "placeholder"}
+    assert calls == ["placeholder", "placeholder"]
+
+
+def test_non_json_and_bounded_entries(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path), max_entries=2, memory_entries=1)
+    entry, source = cache.get_or_compute("bad", lambda: {"content": "oops", "cacheable": False})
+    assert source == "miss" and cache.get("bad") is None
+
+    for key in ("k1", "k2", "k3"):
+        cache.get_or_compute(key, lambda: {"content": "{}"})
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["k2.json", "k3.json"]
+    assert cache.get("k1") is None and cache.get("k2")["content"] == "{}"
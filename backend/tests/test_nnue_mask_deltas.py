@@ -0,0 +1,48 @@
+from nnue_bridge import SQUARES, compute_piece_contributions, parse_mask_all_line, pieces_from_fen
+
+FEN = "4k3/8/8/8/8/8/4P3/R3K3 w Q - 0 1"
+
+
+def _maskall_line() -> str:
+    total = ["-"] * 64
+    classical = ["-"] * 64
+    total[SQUARES.index("a1")], classical[SQUARES.index("a1")] = "480", "455"
+    total[SQUARES.index("e2")], classical[SQUARES.index("e2")] = "90", "100"
+    return f"info string maskall base_cp=612 base_classical_cp=590 total={','.join(total)} classical={','.join(classical)}"
+
+
+def test_parse_mask_all_line():
+    parsed = parse_mask_all_line(_maskall_line())
+    assert parsed["base_total_cp"] == 612
+    assert parsed["base_classical_cp"] == 590
+    assert len(parsed["total"]) == 64
+    assert parsed["total"][SQUARES.index("a1")] == 480
+    assert parsed["classical"][SQUARES.index("e1")] is None
+    assert parse_mask_all_line("info string maskpiece a1 piece=4 eval_cp=12") is None
+
+
+def test_contributions_from_mask_deltas():
+    dump = {"fen": FEN, "pieces": pieces_from_fen(FEN), "mask_deltas": parse_mask_all_line(_maskall_line())}
+    assert set(dump["pieces"]) == {"black_king_e8", "white_pawn_e2", "white_rook_a1", "white_king_e1"}
+
+    contrib = compute_piece_contributions(dump)
+    assert contrib["white_rook_a1"] == {
+        "nnue_contribution_cp": 25.0,
+        "classical_contribution_cp": 455.0,
+        "total_contribution_cp": 480.0,
+    }
+    assert contrib["white_pawn_e2"]["nnue_contribution_cp"] == -10.0
+    # Kings are never masked
+    assert contrib["white_king_e1"]["total_contribution_cp"] == 0.0
+
+
+def test_legacy_masked_dump_still_supported():
+    dump = {
+        "final_eval_cp": 100,
+        "classical_eval_cp": 80,
+        "masked_total": {"white_rook_a1": -400},
+        "masked_classical": {"white_rook_a1": -380},
+    }
+    contrib = compute_piece_contributions(dump)
+    assert contrib["white_rook_a1"]["total_contribution_cp"] == 500.0
+    assert contrib["white_rook_a1"]["classical_contribution_cp"] == 460.0
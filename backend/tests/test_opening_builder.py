@@ -0,0 +1,103 @@
+import asyncio
+
+import chess
+
+import opening_builder
+from opening_builder import VariationBuilder, build_opening_lesson
+
+
+class FakeExplorer:
+    """Explorer stub: every position offers the first few legal moves with fixed popularity."""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def query_position(self, fen, **_kwargs):
+        self.calls.append(fen)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        board = chess.Board(fen)
+        legal = sorted(board.legal_moves, key=lambda m: m.uci())[:3]
+        shares = [600, 250, 150]
+        moves = [
+            {"san": board.san(move), "uci": move.uci(), "white": share // 2, "draws": share // 4, "black": share // 4}
+            for move, share in zip(legal, shares)
+        ]
+        return {"white": 500, "draws": 250, "black": 250, "moves": moves}
+
+    async def parse_san_to_fen(self, moves_san):
+        board = chess.Board()
+        for san in moves_san:
+            board.push_san(san)
+        return board.fen()
+
+
+def test_identical_queries_share_one_request():
+    explorer = FakeExplorer()
+    builder = VariationBuilder(explorer)
+
+    async def run():
+        results = await asyncio.gather(*(builder._query(chess.STARTING_FEN) for _ in range(5)))
+        await builder.cancel_pending()
+        return results
+
+    results = asyncio.run(run())
+    assert explorer.calls == [chess.STARTING_FEN]
+    assert all(r is results[0] for r in results)
+
+
+def test_query_concurrency_is_bounded():
+    explorer = FakeExplorer()
+    builder = VariationBuilder(explorer, max_concurrency=2)
+    board = chess.Board()
+    fens = []
+    for move in list(board.legal_moves)[:8]:
+        board.push(move)
+        fens.append(board.fen())
+        board.pop()
+
+    async def run():
+        await asyncio.gather(*(builder._query(fen) for fen in fens))
+
+    asyncio.run(run())
+    assert len(explorer.calls) == 8
+    assert explorer.max_in_flight == 2
+
+
+def test_lesson_walks_alternates_concurrently(monkeypatch):
+    async def fake_resolve(query, explorer):
+        return {
+            "name": "Test Opening",
+            "eco": None,
+            "seed_fen": chess.STARTING_FEN,
+            "seed_moves_san": [],
+            "orientation": "white",
+        }
+
+    monkeypatch.setattr(opening_builder, "resolve_opening", fake_resolve)
+    explorer = FakeExplorer()
+    lesson = asyncio.run(build_opening_lesson("test", explorer))
+
+    main_moves = lesson["main_line_moves"]
+    assert 0 < len(main_moves) <= opening_builder.MAIN_LINE_DEPTH
+    # Main line replays legally from the seed position
+    board = chess.Board()
+    for san in main_moves:
+        board.push_san(san)
+
+    alternates = next(s for s in lesson["sections"] if s["type"] == "alternates")
+    assert alternates["branches"]
+    for branch in alternates["branches"]:
+        ply = int(branch["id"].split("_")[1])
+        assert ply < opening_builder.ALT_CHECK_PLIES
+        assert not branch["id"].endswith(f"_{main_moves[ply]}")
+    # Positions are never queried twice within one build, prefetches included
+    assert len(explorer.calls) == len(set(explorer.calls))
+    assert explorer.max_in_flight > 1
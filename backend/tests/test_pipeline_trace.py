@@ -0,0 +1,89 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pipeline_timer
+from pipeline_timer import (
+    bind_trace_context,
+    get_pipeline_timer,
+    get_trace,
+    recent_traces,
+    request_trace,
+)
+
+
+async def _handle(user_id: str, delay: float):
+    with request_trace("test_request", user_id=user_id) as timer:
+        with timer.span("layer:outer"):
+            await asyncio.sleep(delay)
+            # Child task inherits the request's timer and parent span
+            await asyncio.create_task(_child(user_id))
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                await loop.run_in_executor(pool, bind_trace_context(lambda: get_pipeline_timer().record_cache(user_id, True)))
+        return timer.trace_id
+
+
+async def _child(user_id: str):
+    timer = get_pipeline_timer()
+    with timer.span("layer:inner", {"user": user_id}):
+        timer.record_llm("stage", 0.1, tokens_in=10, tokens_out=5, model="m")
+
+
+def test_concurrent_requests_keep_separate_traces():
+    async def main():
+        return await asyncio.gather(_handle("a", 0.02), _handle("b", 0.0))
+
+    ids = asyncio.run(main())
+    assert get_pipeline_timer() is None
+
+    for trace_id, user in zip(ids, ("a", "b")):
+        trace = get_trace(trace_id)
+        assert trace["labels"] == {"user_id": user}
+        spans = {s["name"]: s for s in trace["spans"]}
+        assert spans["layer:inner"]["parent_id"] == spans["layer:outer"]["id"]
+        assert spans["layer:inner"]["metadata"] == {"user": user}
+        assert trace["summary"]["cache_stats"] == {f"{user}_hits": 1}
+        assert trace["summary"]["llm_stats"]["stage"]["count"] == 1
+
+    # "a" sleeps longer, so it finishes last and is newest
+    assert [t["trace_id"] for t in recent_traces(limit=2, name="test_request")] == ids
+    assert recent_traces(name="test_request", user_id="b")[0]["trace_id"] == ids[1]
+
+
+def test_disabled_and_file_export(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_timer, "TRACING_ENABLED", False)
+    with request_trace("off") as timer:
+        assert timer is None and get_pipeline_timer() is None
+
+    monkeypatch.setattr(pipeline_timer, "TRACING_ENABLED", True)
+    monkeypatch.setattr(pipeline_timer, "TRACE_FILE", str(tmp_path / "traces.jsonl"))
+    monkeypatch.setattr(pipeline_timer, "TRACE_CHROME_FILE", str(tmp_path / "trace.json"))
+    for _ in range(2):
+        with request_trace("exported") as timer:
+            with timer.span("step:a"):
+                pass
+
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["exported", "exported"]
+    chrome = (tmp_path / "trace.json").read_text()
+    events = json.loads(chrome.rstrip().rstrip(",") + "]")
+    assert [e["name"] for e in events] == ["step:a", "step:a"]
+    assert events[0]["ph"] == "X" and events[0]["cat"] == "step"
+
+
+def test_router_calls_are_counted_once():
+    from llm_planner import LLMPlanner
+    from llm_router import LLMRouter, LLMRouterConfig
+
+    router = LLMRouter(LLMRouterConfig(vllm_model="test-model"))
+    router.check_vllm_health = lambda **_kw: None
+    plan = '{"intent": "focus", "filters": {}, "metrics": ["opening_performance"]}'
+    router._create_chat_completion = lambda *, client, kwargs: (None, plan, 5.0, 20.0)
+
+    with request_trace("planner_request") as timer:
+        LLMPlanner(openai_client=None, llm_router=router).plan_analysis("How are my openings?", [])
+        llm_stats = timer.get_summary()["llm_stats"]
+    assert {layer: stats["count"] for layer, stats in llm_stats.items() if stats["count"]} == {
+        "router:personal_review_planner": 1
+    }
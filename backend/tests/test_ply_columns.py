@@ -0,0 +1,110 @@
+import json
+import math
+
+import pytest
+
+from ply_columns import PLY_COLUMNS_VERSION, decode_ply_columns, encode_ply_columns, encode_ply_columns_b64
+from profile_analytics.detailed_analytics import DetailedAnalyticsAggregator
+from profile_analytics.graph_data import build_graph_game_point
+from services.game_window_manager import GameWindowManager
+
+
+def _make_review(n_plies: int = 40) -> dict:
+    sans = ["e4", "Nf3", "Bb5", "O-O", "Re1", "d4", "Qxd4", "Kh1"]
+    categories = ["theory", "excellent", "good", "inaccuracy", "mistake", "blunder"]
+    phases = ["opening", "middlegame", "endgame"]
+    records = []
+    for i in range(n_plies):
+        tags = [
+            {"tag_name": f"tag.file.open.{'abcdefgh'[i % 8]}", "side": "white", "squares": ["a1"] * 20},
+            {"tag_name": "tag.bishop.pair", "side": "black"},
+            {"tag_name": "tag.bishop.pair", "side": "white"},
+        ][: 1 + i % 3]
+        records.append({
+            "ply": i + 1,
+            "side_moved": "white" if i % 2 == 0 else "black",
+            "san": sans[i % len(sans)],
+            "engine": {"eval_before_cp": (i * 37) % 400 - 200, "best_move_san": "Nc3"},
+            "cp_loss": (i * 13) % 250,
+            "accuracy_pct": 100 / (1 + (((i * 13) % 250) / 50) ** 0.7),
+            "category": categories[i % len(categories)],
+            "phase": phases[min(2, i // 15)],
+            "time_spent_s": None if i < 2 else float((i * 7) % 90) + 0.5,
+            "analyse": {"tags": tags, "themes": {"blob": "x" * 500}},
+            "raw_before": {"tags": tags[:1], "themes": {"blob": "y" * 500}},
+        })
+    return {
+        "metadata": {"player_color": "white", "result": "win", "time_control": "600+0"},
+        "stats": {
+            "overall_accuracy": 81.5,
+            "by_phase": {"opening": {"accuracy": 90.0}, "middlegame": {"accuracy": 75.0}},
+        },
+        "opening": {"name_final": "Ruy Lopez"},
+        "ply_records": records,
+    }
+
+
+def test_roundtrip_preserves_analytics_fields():
+    review = _make_review()
+    columns = decode_ply_columns(encode_ply_columns_b64(review))
+
+    assert columns.version == PLY_COLUMNS_VERSION
+    assert len(columns) == len(review["ply_records"])
+    assert columns.meta["metadata"]["player_color"] == "white"
+
+    for original, light in zip(review["ply_records"], columns.to_ply_records()):
+        assert light["ply"] == original["ply"]
+        assert light["side_moved"] == original["side_moved"]
+        assert light["san"] == original["san"]
+        assert light["category"] == original["category"]
+        assert light["phase"] == original["phase"]
+        assert light["cp_loss"] == original["cp_loss"]
+        assert light["engine"]["eval_before_cp"] == original["engine"]["eval_before_cp"]
+        assert light["accuracy_pct"] == pytest.approx(original["accuracy_pct"], abs=1e-4)
+        if original["time_spent_s"] is None:
+            assert "time_spent_s" not in light
+        else:
+            assert light["time_spent_s"] == pytest.approx(original["time_spent_s"])
+        assert [t["tag_name"] for t in light["analyse"]["tags"]] == [
+            t["tag_name"] for t in original["analyse"]["tags"]
+        ]
+
+
+def test_columnar_review_matches_json_analytics():
+    review = _make_review()
+    game_json = {"id": "g1", "result": "win", "game_date": "2025-01-02", "opening_name": "Ruy Lopez", "game_review": review}
+    game_cols = {**game_json, "game_review": decode_ply_columns(encode_ply_columns(review)).to_game_review()}
+
+    assert build_graph_game_point(game_cols, 0) == build_graph_game_point(game_json, 0)
+
+    aggregator = DetailedAnalyticsAggregator()
+    assert aggregator.aggregate([game_cols]) == aggregator.aggregate([game_json])
+
+    manager = GameWindowManager.__new__(GameWindowManager)
+    summary_json = manager.extract_pattern_summary(game_json)
+    summary_cols = manager.extract_pattern_summary({**game_json, "ply_columns": encode_ply_columns_b64(review)})
+    assert sorted(summary_cols["tags"]) == sorted(summary_json["tags"])
+    assert summary_cols["tag_frequencies"] == summary_json["tag_frequencies"]
+    assert summary_cols["phase_accuracy"].keys() == summary_json["phase_accuracy"].keys()
+
+
+def test_encoding_is_much_smaller_than_json():
+    review = _make_review(120)
+    assert len(encode_ply_columns_b64(review)) * 10 < len(json.dumps(review))
+
+
+def test_numpy_views_are_zero_copy():
+    np = pytest.importorskip("numpy")
+    review = _make_review()
+    columns = decode_ply_columns(encode_ply_columns(review))
+    arrays = columns.numpy()
+
+    assert arrays["cp_loss"].dtype == np.float32
+    assert not arrays["cp_loss"].flags.owndata
+    assert arrays["eval_cp"].tolist() == [r["engine"]["eval_before_cp"] for r in review["ply_records"]]
+    assert math.isnan(arrays["time_spent"][0])
+
+
+def test_rejects_foreign_buffers():
+    with pytest.raises(ValueError):
+        decode_ply_columns(b"NOPE" + b"\0" * 32)
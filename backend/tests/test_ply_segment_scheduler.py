@@ -0,0 +1,51 @@
+"""
+PlySegmentScheduler: contiguous ply segments per engine, walked backward,
+with work stealing once a segment runs dry.
+"""
+
+from engine_pool import PlySegmentScheduler
+
+
+def _drain(scheduler, order):
+    """Round-robin the given worker ids until everything is handed out."""
+    taken = {w: [] for w in set(order)}
+    active = list(order)
+    while active:
+        for w in list(active):
+            item = scheduler.next(w)
+            if item is None:
+                active.remove(w)
+            else:
+                taken[w].append(item)
+    return taken
+
+
+def test_segments_are_contiguous_and_walked_backward():
+    scheduler = PlySegmentScheduler(list(range(12)), 3)
+    taken = _drain(scheduler, [0, 1, 2])
+    assert taken == {0: [3, 2, 1, 0], 1: [7, 6, 5, 4], 2: [11, 10, 9, 8]}
+    assert scheduler.steals == 0
+
+
+def test_idle_worker_steals_earliest_half_of_largest_segment():
+    scheduler = PlySegmentScheduler(list(range(12)), 3)
+    # Worker 0 races through its segment while the others take one item each
+    assert [scheduler.next(0) for _ in range(4)] == [3, 2, 1, 0]
+    assert scheduler.next(1) == 7
+    assert scheduler.next(2) == 11
+    # Worker 1 has [4, 5, 6] left and worker 2 [8, 9, 10]: the first largest is stolen from
+    assert scheduler.next(0) == 5
+    assert scheduler.steals == 1
+    assert scheduler.next(1) == 6
+
+    taken = _drain(scheduler, [0, 1, 2])
+    everything = [3, 2, 1, 0, 7, 11, 5, 6] + [x for items in taken.values() for x in items]
+    assert sorted(everything) == list(range(12))
+
+
+def test_more_workers_than_items():
+    scheduler = PlySegmentScheduler(["a", "b"], 4)
+    assert scheduler.next(3) == "a"
+    assert scheduler.next(2) == "b"
+    assert scheduler.next(0) is None
+    assert PlySegmentScheduler([], 2).next(0) is None
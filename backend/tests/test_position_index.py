@@ -0,0 +1,108 @@
+from position_index import PositionIndex, PositionIndexRegistry
+from position_miner import PositionMiner
+
+
+def _row(i: int, **overrides) -> dict:
+    row = {
+        "id": f"p{i}",
+        "fen": f"fen-{i}",
+        "side_to_move": "white" if i % 2 == 0 else "black",
+        "phase": ["opening", "middlegame", "endgame"][i % 3],
+        "error_category": "blunder" if i % 4 == 0 else "mistake",
+        "error_side": "player",
+        "cp_loss": 100 + i * 10,
+        "opening_name": "Italian Game" if i % 2 else "Sicilian Defense",
+        "piece_blundered": "N" if i % 3 == 0 else "q",
+        "time_spent_s": [2, 10, 45, 400][i % 4],
+        "tags_start": ["tag.center.control", "tag.king.shield"] if i % 2 else ["tag.bishop.pair"],
+        "tags_after_played": ["tag.bishop.pair"],
+        "tags_after_best": ["tag.bishop.pair", "tag.fork"],
+        "tags_gained": ["tag.file.open.d"] if i % 5 == 0 else [],
+        "tags_lost": [],
+        "themes": {"initiative": 0.8, "space": 0} if i % 2 else None,
+        "last_used_in_drill": None,
+    }
+    row.update(overrides)
+    return row
+
+
+def _brute(rows, predicate, min_cp_loss=None):
+    return {r["id"] for r in rows if predicate(r) and (min_cp_loss is None or r["cp_loss"] >= min_cp_loss)}
+
+
+def test_multi_facet_queries_match_a_scan():
+    rows = [_row(i) for i in range(40)]
+    index = PositionIndex(rows)
+
+    got = {r["id"] for r in index.search(limit=100, phases=["middlegame"], piece="Knight", min_cp_loss=200)}
+    assert got == _brute(rows, lambda r: r["phase"] == "middlegame" and r["piece_blundered"] == "N", 200)
+
+    got = {r["id"] for r in index.search(limit=100, opening="italian", time_bucket="<5s", error_categories=["blunder"])}
+    assert got == _brute(rows, lambda r: "Italian" in r["opening_name"] and r["time_spent_s"] < 5 and r["error_category"] == "blunder")
+
+    assert index.count(tags_missed="tag.fork") == 40
+    assert index.count(tags_missed="tag.bishop.pair") == 0
+    assert index.count(themes=["initiative"]) == 20
+    assert index.count(themes=["space"]) == 0
+    assert index.count(tags_gained="tag.file.open.d", tags=["tag.bishop.pair"]) == len(
+        _brute(rows, lambda r: "tag.file.open.d" in r["tags_gained"] and "tag.bishop.pair" in r["tags_start"])
+    )
+
+
+def test_top_k_orders():
+    rows = [_row(i) for i in range(10)]
+    rows[3]["last_used_in_drill"] = "2025-01-01T00:00:00Z"
+    rows[9]["last_used_in_drill"] = "2025-01-02T00:00:00Z"
+    index = PositionIndex(rows)
+
+    assert [r["id"] for r in index.search(limit=3)] == ["p9", "p8", "p7"]
+    fresh = [r["id"] for r in index.search(limit=10, order="fresh")]
+    assert fresh[:2] == ["p8", "p7"]
+    assert fresh[-2:] == ["p3", "p9"]
+
+    ranked = index.search(limit=3, order="priority", focus_tags=["bishop"])
+    assert all(r["error_category"] == "blunder" for r in ranked[:2])
+    assert ranked[0]["priority"] >= ranked[-1]["priority"]
+
+
+def test_incremental_updates_move_postings():
+    index = PositionIndex([_row(0), _row(1)])
+    assert index.count(phases=["opening"]) == 1
+
+    index.upsert({"fen": "fen-0", "side_to_move": "white", "phase": "endgame", "id": "p0"})
+    assert index.count(phases=["opening"]) == 0
+    assert index.count(phases=["endgame"]) == 1
+    # Partial updates keep the other indexed fields
+    assert index.count(piece="knight") == 1
+
+    index.mark_used(["p1"], "2025-02-01T00:00:00Z")
+    assert index.search(limit=1, order="fresh")[0]["id"] == "p0"
+
+    assert index.remove("p0")
+    assert len(index) == 1
+    index.upsert(_row(7))
+    assert len(index) == 2
+    assert index.count(phases=["endgame"]) == 0
+
+
+def test_registry_loads_once_and_mines_saved_positions():
+    calls = []
+
+    def loader(user_id):
+        calls.append(user_id)
+        return [_row(i) for i in range(12)]
+
+    registry = PositionIndexRegistry(loader)
+    index = registry.get("u")
+    assert registry.get("u") is index
+    assert calls == ["u"]
+
+    registry.mark_used(["p2"], "2025-03-01T00:00:00Z")
+    assert index.search(limit=12, order="fresh")[-1]["id"] == "p2"
+
+    mined = PositionMiner().mine_saved_positions(index, max_positions=5, phase_filter="opening")
+    assert mined and all(p["phase"] == "opening" for p in mined)
+    assert mined[0]["category"] == "blunder"
+
+    registry.invalidate("u")
+    assert registry.peek("u") is None
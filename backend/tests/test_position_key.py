@@ -0,0 +1,47 @@
+import chess
+
+from position_key import canonical_fen, position_key, position_key_hex
+
+
+def test_move_counters_and_dead_en_passant_share_a_key():
+    board = chess.Board()
+    board.push_san("e4")
+    # python-chess keeps "e3" in the raw FEN even though no black pawn can capture
+    raw = board.fen(en_passant="fen")
+    assert " e3 " in raw
+    stripped = board.fen(en_passant="legal").replace(" 0 1", " 7 40")
+
+    assert position_key(raw) == position_key(stripped) == position_key(board)
+    assert canonical_fen(raw) == canonical_fen(stripped) == "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq -"
+    assert len(position_key_hex(raw)) == 16
+
+
+def test_live_en_passant_and_side_to_move_change_the_key():
+    board = chess.Board("rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 3")
+    board.push_san("c4")  # black d4 pawn can take en passant on c3
+    with_ep = board.fen()
+    without_ep = with_ep.replace(" c3 ", " - ")
+    assert position_key(with_ep) != position_key(without_ep)
+    assert canonical_fen(with_ep).endswith(" c3")
+
+    white = "8/8/8/8/8/8/8/K6k w - - 0 1"
+    assert position_key(white) != position_key(white.replace(" w ", " b "))
+
+
+def test_unparseable_fen_falls_back_to_stable_key():
+    junk = "not a fen at all"
+    assert position_key(junk) == position_key("not a  fen at\tall extra")
+    assert position_key(junk) != position_key("something else")
+    assert canonical_fen("") == ""
+    assert position_key(None) == position_key("")
+
+
+def test_investigation_cache_keys_agree_across_move_counters(tmp_path):
+    from investigation_cache import InvestigationCache
+
+    cache = InvestigationCache(cache_dir=str(tmp_path))
+    a = cache._get_cache_key("8/8/8/8/8/8/8/K6k w - - 0 1", "Kb2", "move")
+    b = cache._get_cache_key("8/8/8/8/8/8/8/K6k w - - 12 57", "Kb2", "move")
+    assert a == b
+    assert a.startswith(position_key_hex("8/8/8/8/8/8/8/K6k w - - 0 1"))
+    assert a != cache._get_cache_key("8/8/8/8/8/8/8/K6k w - - 0 1", "Kb1", "move")
@@ -0,0 +1,100 @@
+"""
+Overview snapshot: ingest-time feature extraction and the incrementally
+maintained materialized view.
+"""
+
+import chess
+
+from profile_overview_snapshot import (
+    OverviewSnapshotView,
+    _parse_user_clocks_from_pgn,
+    build_overview_snapshot,
+    extract_overview_features,
+)
+
+_MOVES = ["Nf3", "Nf6", "Ng1", "Ng8"]
+
+
+def _pgn(n_plies, start=180.0, burn=2.5):
+    board = chess.Board()
+    parts = []
+    clocks = {"white": start, "black": start}
+    for ply in range(n_plies):
+        san = _MOVES[ply % 4]
+        side = "white" if ply % 2 == 0 else "black"
+        clocks[side] = max(1.0, clocks[side] - burn * (1 + ply / 20))
+        secs = clocks[side]
+        clk = f"{int(secs // 3600)}:{int(secs % 3600 // 60):02d}:{secs % 60:04.1f}"
+        prefix = f"{ply // 2 + 1}. " if side == "white" else ""
+        parts.append(f"{prefix}{san} {{[%clk {clk}]}}")
+        board.push_san(san)
+    return "[Event \"t\"]\n\n" + " ".join(parts) + " *\n"
+
+
+def _game(i, result="win", plies=40, **extra):
+    return {
+        "id": f"g{i}",
+        "game_date": f"2026-01-{i + 1:02d}T12:00:00Z",
+        "user_color": "white" if i % 2 else "black",
+        "user_rating": 1500 + i,
+        "result": result,
+        "opening_name": "Reti Opening" if i % 3 else "Zukertort",
+        "accuracy_overall": 70.0 + i % 7,
+        "pgn": _pgn(plies, burn=1.0 + (i % 5)),
+        **extra,
+    }
+
+
+def _without_time(snapshot):
+    return {k: v for k, v in snapshot.items() if k != "generated_at"}
+
+
+def test_features_carry_clock_series_and_match_pgn_parse():
+    pgn = _pgn(24)
+    features = extract_overview_features(pgn, "black")
+    clocks = _parse_user_clocks_from_pgn(pgn, "black")
+    assert features["plies"] == 24 and features["clk_n"] == 12
+    assert features["clk"] == [int(round(c * 10)) for c in clocks]
+    assert 0.0 <= features["early_burn"] <= 1.0
+    assert extract_overview_features(None, "white")["plies"] is None
+
+
+def test_snapshot_from_stored_features_matches_pgn_snapshot():
+    games = [_game(i, result=("win", "loss", "draw")[i % 3], plies=40 if i % 4 else 110) for i in range(26)]
+    from_pgn = build_overview_snapshot([dict(g) for g in games])
+    stored = [{**g, "overview_features": extract_overview_features(g["pgn"], g["user_color"]), "pgn": None} for g in games]
+    assert _without_time(build_overview_snapshot(stored)) == _without_time(from_pgn)
+    assert from_pgn["time_style"]["label"] != "Insufficient data"
+
+
+def test_view_updates_incrementally_like_a_rebuild():
+    games = [_game(i, result=("win", "loss")[i % 2]) for i in range(12)]
+    view = OverviewSnapshotView.build(games[:10], window=10)
+    assert view.truncated and len(view.games) == 10
+    assert "pgn" not in view.games[0] and "clk" not in view.games[0]["overview_features"]
+
+    view.add_game(games[10])
+    view.add_game(games[11])
+    assert _without_time(view.snapshot) == _without_time(build_overview_snapshot(games, window=10))
+    assert view.snapshot_for(10) is view.snapshot
+    assert view.snapshot_for(5)["games_analyzed"] == 5
+    assert view.snapshot_for(20) is None  # older games not in the view
+
+    # Re-ingesting a game replaces it
+    view.add_game({**games[11], "result": "draw"})
+    assert view.snapshot["record"]["draws"] == 1 and len(view.games) == 10
+
+    # Compressing out of a truncated window needs a rebuild before it's served again
+    assert view.remove_game("g11")
+    assert not view.remove_game("g0")
+    assert view.needs_rebuild and view.snapshot_for(10) is None
+
+    restored = OverviewSnapshotView.from_row(view.to_row())
+    assert restored.games == view.games and restored.truncated
+
+
+def test_view_of_a_small_history_serves_larger_windows():
+    view = OverviewSnapshotView.build([_game(i) for i in range(3)], window=60)
+    assert not view.truncated
+    view.remove_game("g1")
+    assert view.snapshot_for(100)["games_analyzed"] == 2
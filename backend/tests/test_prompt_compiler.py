@@ -0,0 +1,119 @@
+"""
+Prompt compiler: compact encoding, FEN aliasing, cross-section references,
+priority-ordered token budgets, and local prompt-token measurement.
+"""
+
+import asyncio
+import json
+
+from investigator import InvestigationResult
+from llm_router import LLMRouter, LLMRouterConfig
+from pipeline_timer import request_trace
+from prompt_compiler import PromptCompiler, count_tokens, tokenizer_is_exact
+from summariser import Summariser
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+TAGS = [f"tag.center.control.e{i}" for i in range(12)]
+
+
+def test_sections_are_compact_deduplicated_and_aliased():
+    compiled = (
+        PromptCompiler()
+        .add("tags", TAGS, priority=10, label="Tags gained (net)")
+        .add("facts", {"fen": FEN, "eval": 0.123456, "note": None, "tags": TAGS}, priority=20, label="FACTS")
+        .add("context", {"start": {"fen": FEN}, "moves": []}, priority=30)
+        .add("empty", [], priority=40, empty_text="No deltas")
+        .compile()
+    )
+    assert compiled.legend == f"POSITIONS (FEN aliases used below):\n@fen1 = {FEN}"
+    assert json.loads(compiled["facts"]) == {"fen": "@fen1", "eval": 0.12, "tags": "<same as Tags gained (net)>"}
+    assert compiled["context"] == '{"start":{"fen":"@fen1"}}'
+    assert compiled["empty"] == "No deltas"
+    assert json.loads(compiled["tags"]) == TAGS  # first occurrence stays verbatim
+    assert compiled.references == 1 and compiled.aliases == 1
+
+
+def test_budget_is_spent_in_priority_order():
+    moves = [{"san": f"m{i}", "comment": f"move {i} keeps the bishop pair"} for i in range(80)]
+    compiled = (
+        PromptCompiler(budget_tokens=400)
+        .add("tags", TAGS, priority=10)
+        .add("moves", moves, priority=20, max_tokens=250)
+        .add("extra", {"details": moves}, priority=30)
+        .compile()
+    )
+    assert json.loads(compiled["tags"]) == TAGS
+    trimmed = json.loads(compiled["moves"])
+    assert trimmed[0] == moves[0] and trimmed[-1].startswith("… +") and len(trimmed) < 80
+    assert compiled.section_tokens["moves"] <= 250
+    assert compiled.trimmed == ["moves", "extra"] or compiled.omitted == ["extra"]
+    assert compiled.total_tokens <= 400
+
+
+def test_compact_rendering_costs_fewer_tokens_than_indented_json():
+    payload = {"evidence_eval": {"eval_start": 0.25, "eval_end": -1.5}, "tags": TAGS}
+    compact = PromptCompiler().add("p", payload).compile()["p"]
+    assert count_tokens(compact) < count_tokens(json.dumps(payload, indent=2))
+    assert count_tokens("") == 0 and count_tokens(compact) == count_tokens(compact)
+
+
+def test_router_measures_prompt_tokens_per_stage(monkeypatch):
+    router = LLMRouter(LLMRouterConfig(vllm_model="test-model", log_calls=False))
+    router.check_vllm_health = lambda **_kw: None
+    sent = []
+
+    def fake_completion(*, client, kwargs):
+        sent.append(kwargs["messages"][1]["content"])
+        return None, '{"ok": true}', 5.0, 20.0
+
+    monkeypatch.setattr(router, "_create_chat_completion", fake_completion)
+    with request_trace("prompt_tokens") as timer:
+        router.complete_json(session_id="s1", stage="summariser", system_prompt="sys", user_text="short", provider="vllm")
+        router.complete_json(session_id="s2", stage="summariser", system_prompt="sys", user_text="word " * 700, provider="vllm")
+
+    measured = timer.get_summary()["llm_stats"]["router:summariser"]["prompt_tokens"]
+    assert measured["measured"] == 2
+    assert measured["estimated"] == (0 if tokenizer_is_exact() else 2)
+    assert measured["histogram"] == {"<=256": 1, "<=1024": 1}
+    assert measured["total"] == sum(count_tokens("sys") + count_tokens(text) for text in sent)
+
+
+class _RepairRouter:
+    """Router stub: first summariser answer is a placeholder, the repair is usable"""
+
+    def __init__(self):
+        self.calls = []
+
+    def complete_json(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs["stage"] != "summariser":
+            return {}
+        if len([c for c in self.calls if c["stage"] == "summariser"]) == 1:
+            return {"core_message": "Analysis complete", "mechanism": "", "claims": []}
+        return {
+            "core_message": "e5 loses control of d5 after Nc3.",
+            "mechanism": "The pawn push gives up the d5 square.",
+            "claims": [],
+        }
+
+
+def test_low_quality_summary_is_repaired_without_resending_the_prompt(monkeypatch):
+    monkeypatch.setenv("SUMMARISER_PROOFREADER_ENABLED", "false")
+    router = _RepairRouter()
+    summariser = Summariser(openai_client=None, llm_router=router)
+    summariser.max_retries = 1
+    inv = InvestigationResult(
+        player_move="e5",
+        pv_after_move=["Nc3"],
+        evidence_pgn_line="e5 Nc3",
+        evidence_main_line_moves=["e5", "Nc3"],
+        evidence_eval_start=0.1,
+        evidence_eval_end=0.4,
+        evidence_eval_delta=0.3,
+    )
+    asyncio.run(summariser.summarise(inv, user_message="Is e5 good?"))
+
+    first, repair = [c for c in router.calls if c["stage"] == "summariser"][:2]
+    assert first["user_text"].startswith("COMMAND") and "SUMMARIZE_FINDINGS" in first["user_text"]
+    assert "REPAIR_SUMMARY" in repair["user_text"] and repair["cache"] is False
+    assert count_tokens(repair["user_text"]) * 10 < count_tokens(first["user_text"])
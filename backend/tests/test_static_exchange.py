@@ -0,0 +1,111 @@
+import random
+
+import chess
+
+from static_exchange import PIECE_VALUES, PositionSEE, position_see
+from tag_detector import detect_overworked_pieces_tags
+from threat_detector import detect_hanging_pieces
+
+
+def _reference(board: chess.Board, square: int, first=None, may_stop=False) -> int:
+    """Brute-force capture-only minimax over legal moves (the old engine helper's approach)."""
+    best = None
+    for move in board.legal_moves:
+        if move.to_square != square or not board.is_capture(move) or move.promotion or board.is_en_passant(move):
+            continue
+        if first is not None and move.from_square != first:
+            continue
+        value = PIECE_VALUES[board.piece_type_at(square)]
+        board.push(move)
+        result = value - _reference(board, square, may_stop=True)
+        board.pop()
+        best = result if best is None else max(best, result)
+    if best is None:
+        return 0
+    return max(best, 0) if may_stop else best
+
+
+def _random_positions(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    for _ in range(n):
+        board = chess.Board()
+        for _ in range(rng.randint(10, 60)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            captures = [m for m in moves if board.is_capture(m)]
+            board.push(rng.choice(captures) if captures and rng.random() < 0.3 else rng.choice(moves))
+        if not board.is_game_over():
+            yield board
+
+
+def test_xray_pins_and_king():
+    # Doubled rooks: the second rook x-rays through the first
+    board = chess.Board("3r3k/3p4/8/8/8/8/3R4/3RK3 w - - 0 1")
+    see = PositionSEE(board)
+    assert see.capture_gain(chess.Move.from_uci("d2d7")) == 1 - 5 + 5
+    assert see.gain(chess.D7, chess.WHITE) == 1
+    # Recapturing only trades rooks, so black stops after the pawn is taken
+    assert see.line(chess.D7, chess.WHITE) == [chess.Move.from_uci("d2d7")]
+
+    # The bishop on b2 is pinned to its king and can't leave the long diagonal
+    assert PositionSEE(chess.Board("7q/8/8/7k/8/p7/1B6/K7 w - - 0 1")).gain(chess.A3, chess.WHITE) == 0
+    assert PositionSEE(chess.Board("8/8/8/7k/8/p7/1B6/K7 w - - 0 1")).gain(chess.A3, chess.WHITE) == 1
+
+    # King may only recapture on an undefended square
+    board = chess.Board("4k3/3p4/8/8/8/8/8/3RK3 w - - 0 1")
+    assert PositionSEE(board).gain(chess.D7, chess.WHITE) == 0
+    board = chess.Board("4k3/3p4/3p4/8/8/8/8/3RK3 w - - 0 1")
+    assert PositionSEE(board).line(chess.D6, chess.WHITE) == [chess.Move.from_uci("d1d6")]
+
+
+def test_matches_brute_force_exchange_search():
+    checked = 0
+    for board in _random_positions(120):
+        see = PositionSEE(board)
+        for move in board.legal_moves:
+            if board.is_capture(move) and not move.promotion and not board.is_en_passant(move):
+                assert see.capture_gain(move) == _reference(board, move.to_square, first=move.from_square), (board.fen(), move)
+                assert see.gain(move.to_square, board.turn) == _reference(board, move.to_square, may_stop=True)
+                checked += 1
+    assert checked > 100
+
+
+def test_detectors_keep_their_output_and_share_the_memo():
+    for board in _random_positions(40, seed=3):
+        color = board.turn
+        expected = [
+            chess.square_name(sq)
+            for sq in chess.SQUARES
+            if board.color_at(sq) == (not color)
+            and len(board.attackers(color, sq)) > len(board.attackers(not color, sq)) > 0
+        ]
+        threats = detect_hanging_pieces(board, color)
+        assert [t["target_square"] for t in threats] == expected
+        assert all(t["see_gain"] == position_see(board).gain(chess.parse_square(t["target_square"]), color) for t in threats)
+
+        for tag in detect_overworked_pieces_tags(board):
+            defender = chess.parse_square(tag["squares"][0])
+            piece = board.piece_at(defender)
+            for defended in tag["defended_pieces"]:
+                sq = chess.parse_square(defended["square"])
+                assert board.color_at(sq) == piece.color
+                assert sq in board.attacks(defender) and board.is_attacked_by(not piece.color, sq)
+
+    assert position_see(board) is position_see(board.copy())
+
+
+def test_memo_survives_concurrent_eviction():
+    from concurrent.futures import ThreadPoolExecutor
+
+    import static_exchange
+
+    boards = list(_random_positions(static_exchange._MEMO_SIZE * 2, seed=7))
+
+    def lookup(offset):
+        for board in boards[offset:] + boards[:offset]:
+            assert position_see(board).board.board_fen() == board.board_fen()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lookup, range(0, len(boards), len(boards) // 8)))
+    assert len(static_exchange._memo) <= static_exchange._MEMO_SIZE
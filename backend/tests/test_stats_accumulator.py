@@ -0,0 +1,249 @@
+import json
+import random
+import statistics
+
+import pytest
+
+from personal_stats_manager import PersonalStatsManager
+from stats_accumulator import STATS_KEY, RunningStats, StatsAccumulator, TDigest
+
+
+def _make_review(seed: int, n_plies: int = 60) -> dict:
+    rng = random.Random(seed)
+    sans = ["e4", "Nf3", "Bb5", "O-O", "Re1", "d4", "Qxd4", "Kh1", "exd5"]
+    categories = ["excellent", "good", "inaccuracy", "mistake", "blunder"]
+    tag_pool = ["tag.bishop.pair", "tag.file.open.d", "Tag Center-Control", "tag.king.shield"]
+    records = []
+    for i in range(n_plies):
+        records.append({
+            "ply": i + 1,
+            "side_moved": "white" if i % 2 == 0 else "black",
+            "san": rng.choice(sans),
+            "accuracy_pct": rng.uniform(30, 100),
+            "category": rng.choice(categories),
+            "phase": "opening" if i < 16 else ("middlegame" if i < 44 else "endgame"),
+            "time_spent_s": rng.uniform(1, 200),
+            "analyse": {"tags": [{"tag_name": t} for t in rng.sample(tag_pool, rng.randint(0, 3))]},
+        })
+    return {
+        "metadata": {"player_color": "white", "result": rng.choice(["win", "loss", "draw"]), "time_control": "600+5"},
+        "stats": {"overall_accuracy": rng.uniform(60, 90), "by_phase": {"opening": {"accuracy": 88.0}}},
+        "opening": {"name_final": rng.choice(["Ruy Lopez", "Sicilian Defense"])},
+        "ply_records": records,
+    }
+
+
+def _rendered(accumulator: StatsAccumulator) -> dict:
+    stats = {}
+    accumulator.render_stats(stats)
+    for section in stats.values():
+        for entry in (section.values() if isinstance(section, dict) else []):
+            if isinstance(entry, dict):
+                entry.pop("game_ids", None)
+                for nested in entry.values():
+                    if isinstance(nested, dict):
+                        nested.pop("game_ids", None)
+    return stats
+
+
+def _assert_close(a, b):
+    if isinstance(a, dict):
+        assert a.keys() == b.keys()
+        for key in a:
+            _assert_close(a[key], b[key])
+    elif isinstance(a, list):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            _assert_close(x, y)
+    elif isinstance(a, float) or isinstance(b, float):
+        assert a == pytest.approx(b, abs=1e-6)
+    else:
+        assert a == b
+
+
+def test_removing_a_game_matches_never_adding_it():
+    reviews = {f"g{i}": _make_review(i) for i in range(4)}
+
+    full = StatsAccumulator()
+    for game_id, review in reviews.items():
+        full.add_game(game_id, review, f"2025-01-0{game_id[1:]}")
+    full.remove_game("g2")
+    # Survives a JSON round trip, as it does in personal_stats
+    full = StatsAccumulator(json.loads(json.dumps(full.to_dict())))
+
+    partial = StatsAccumulator()
+    for game_id in ("g0", "g1", "g3"):
+        partial.add_game(game_id, reviews[game_id], f"2025-01-0{game_id[1:]}")
+
+    _assert_close(full.totals, partial.totals)
+    rendered_full, rendered_partial = _rendered(full), _rendered(partial)
+    # The time digest is subtracted approximately (rebuilt only occasionally)
+    full_dist = rendered_full.pop("time_spent_distribution")
+    partial_dist = rendered_partial.pop("time_spent_distribution")
+    _assert_close(rendered_full, rendered_partial)
+    assert full_dist["count"] == partial_dist["count"]
+    for key in ("p25", "p50", "p75", "p90"):
+        assert full_dist[key] == pytest.approx(partial_dist[key], rel=0.05)
+
+
+def test_sliding_window_digest_tracks_a_fresh_build():
+    window = StatsAccumulator()
+    rebuilds = 0
+    rebuild = window._rebuild_digest
+
+    def counting_rebuild():
+        nonlocal rebuilds
+        rebuilds += 1
+        rebuild()
+
+    window._rebuild_digest = counting_rebuild
+    reviews = [_make_review(100 + i) for i in range(60)]
+    for i, review in enumerate(reviews):
+        window.add_game(f"g{i}", review)
+        if i >= 20:
+            window.remove_game(f"g{i - 20}")
+
+    fresh = StatsAccumulator()
+    for i in range(40, 60):
+        fresh.add_game(f"g{i}", reviews[i])
+    # 40 slides of a 20-game window: rebuilt about every 10 removals, not every render
+    assert rebuilds <= 5
+    assert window.time_digest().count == pytest.approx(fresh.time_digest().count)
+    for q in (0.25, 0.5, 0.75, 0.9):
+        assert window.time_digest().quantile(q) == pytest.approx(fresh.time_digest().quantile(q), rel=0.05)
+
+
+def test_habit_inputs_match_per_game_means():
+    review = _make_review(7)
+    accumulator = StatsAccumulator()
+    accumulator.add_game("g", review, "2025-02-03T10:00:00")
+    histories, phase_accs, baseline, tagged = accumulator.habit_inputs()
+
+    own = [r for r in review["ply_records"] if r["side_moved"] == "white"]
+    bishop = [r["accuracy_pct"] for r in own if any(t["tag_name"] == "tag.bishop.pair" for t in r["analyse"]["tags"])]
+    center = [r["accuracy_pct"] for r in own if any(t["tag_name"] == "Tag Center-Control" for t in r["analyse"]["tags"])]
+    endgame = [r["accuracy_pct"] for r in own if r["phase"] == "endgame"]
+
+    assert tagged == ["g"]
+    assert baseline == pytest.approx(review["stats"]["overall_accuracy"])
+    assert phase_accs["g"]["opening"] == 88.0
+    assert histories["tag.bishop.pair"] == [
+        {"game_id": "g", "game_date": "2025-02-03", "accuracy": round(statistics.mean(bishop), 1), "count": len(bishop)}
+    ]
+    assert histories["tag_center_control"][0]["count"] == len(center)
+    assert histories["phase_endgame"][0]["accuracy"] == round(statistics.mean(endgame), 1)
+
+
+def test_running_stats_and_digest():
+    rng = random.Random(3)
+    samples = [rng.expovariate(1 / 20) for _ in range(2000)]
+
+    running = RunningStats(len(samples), sum(samples), sum(x * x for x in samples))
+    assert running.mean == pytest.approx(statistics.mean(samples))
+    assert running.stdev == pytest.approx(statistics.stdev(samples))
+
+    left, right = TDigest(), TDigest()
+    for i, x in enumerate(samples):
+        (left if i % 2 else right).add(x)
+    left.merge(right)
+    assert left.count == len(samples)
+    assert len(left.centroids) < 200
+    for q in (0.25, 0.5, 0.9):
+        exact = sorted(samples)[int(q * len(samples))]
+        assert left.quantile(q) == pytest.approx(exact, rel=0.05)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.row = None
+        self.recalc_marked = False
+
+    def get_personal_stats(self, user_id):
+        return json.loads(json.dumps(self.row)) if self.row else None
+
+    def get_analyzed_games(self, user_id, limit=30):
+        return []
+
+    def update_personal_stats(self, user_id, stats, game_ids):
+        self.row = json.loads(json.dumps({"stats": stats, "game_ids": game_ids, "needs_recalc": False}))
+        return True
+
+    def mark_stats_for_recalc(self, user_id, game_ids):
+        self.recalc_marked = True
+        return True
+
+
+def test_manager_subtracts_removed_games_without_recalc():
+    reviews = {f"g{i}": _make_review(10 + i) for i in range(3)}
+
+    supabase = FakeSupabase()
+    manager = PersonalStatsManager(supabase)
+    for game_id, review in reviews.items():
+        assert manager.update_stats_from_game("u", game_id, review, "2025-03-01")
+    assert manager.remove_game_from_stats("u", "g1")
+    assert not supabase.recalc_marked
+
+    expected_supabase = FakeSupabase()
+    expected = PersonalStatsManager(expected_supabase)
+    for game_id in ("g0", "g2"):
+        expected.update_stats_from_game("u", game_id, reviews[game_id], "2025-03-01")
+
+    stats = manager.get_stats("u")
+    assert STATS_KEY not in stats
+    assert supabase.row["game_ids"] == ["g0", "g2"]
+    assert stats["total_games_analyzed"] == 2
+    for section in ("tag_accuracy", "phase_stats", "accuracy_by_piece", "accuracy_by_time_spent", "opening_stats"):
+        _assert_close(stats[section], expected.get_stats("u")[section])
+    assert all(g["game_id"] != "g1" for g in stats["piece_accuracy_detailed"]["per_game"])
+
+
+class WindowSupabase(FakeSupabase):
+    def __init__(self, reviews):
+        super().__init__()
+        self.reviews = reviews
+        self.fetched = []
+
+    def get_active_reviewed_game_refs(self, user_id, limit=30):
+        return [{"id": game_id, "game_date": "2025-04-01"} for game_id in list(self.reviews)[:limit]]
+
+    def get_games_ply_data(self, game_ids):
+        self.fetched.extend(game_ids)
+        return [{"id": game_id, "game_date": "2025-04-01", "game_review": self.reviews[game_id]} for game_id in game_ids]
+
+    def get_active_reviewed_games(self, user_id, limit=30, columnar=False):
+        return self.get_games_ply_data(list(self.reviews)[:limit])
+
+    def save_habit_trend_snapshots(self, user_id, batch):
+        return True
+
+
+def test_window_sync_reads_only_changed_games_and_habits_never_write():
+    reviews = {f"g{i}": _make_review(20 + i) for i in range(5)}
+    supabase = WindowSupabase(reviews)
+    manager = PersonalStatsManager(supabase)
+
+    # Nothing synced yet: the read path folds the window in memory only
+    first = manager.compute_habits("u")
+    assert supabase.row is None
+    assert sorted(set(supabase.fetched)) == sorted(reviews)
+    assert first["total_games"] == 5
+    assert any(h["name"] == "phase_middlegame" for h in first["all_habits"])
+
+    # Ingest side: sync reads each game once and saves
+    supabase.fetched = []
+    assert manager.sync_stats_window("u")
+    assert sorted(supabase.fetched) == sorted(reviews)
+
+    supabase.fetched = []
+    del reviews["g0"]
+    reviews["g5"] = _make_review(99)
+    assert manager.sync_stats_window("u")
+    assert supabase.fetched == ["g5"]
+    assert sorted(supabase.row["game_ids"]) == sorted(reviews)
+
+    supabase.fetched = []
+    saved = supabase.row
+    second = manager.compute_habits("u")
+    assert supabase.row is saved
+    assert "g0" not in supabase.fetched
+    assert second["total_games"] == 5
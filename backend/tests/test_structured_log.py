@@ -0,0 +1,74 @@
+"""
+Structured logging: per-module levels, lazy payloads, rate limiting,
+sampling and the queued stdout handler.
+"""
+
+import json
+
+import pytest
+
+import structured_log
+from structured_log import DEBUG, INFO, WARNING, get_logger
+
+
+@pytest.fixture(autouse=True)
+def _default_config():
+    structured_log.configure(level="INFO", levels={}, sample={}, use_queue=True)
+    yield
+    structured_log.configure(level="INFO", levels={}, sample={}, use_queue=True)
+
+
+def _lines(capsys):
+    structured_log.flush()
+    return [line for line in capsys.readouterr().out.splitlines() if line]
+
+
+def test_disabled_levels_never_build_the_payload(capsys):
+    log = get_logger("test_lazy")
+
+    def _expensive():
+        raise AssertionError("payload built for a disabled level")
+
+    log.debug(_expensive)
+    log.debug("prompt", text=_expensive)
+    assert not log.enabled_for(DEBUG) and log.enabled_for(INFO)
+
+    log.info(lambda: {"event": "node_dump", "nodes": 3}, stage="confidence")
+    log.warning("⚠️ slow call", ms=lambda: 1234)
+    assert _lines(capsys) == [
+        json.dumps({"event": "node_dump", "nodes": 3, "stage": "confidence"}),
+        "⚠️ slow call ms=1234",
+    ]
+
+
+def test_per_module_levels_apply_to_existing_loggers(capsys):
+    router, miner = get_logger("test_router"), get_logger("test_miner")
+    structured_log.configure(level="WARNING", levels={"test_router": "DEBUG"}, sample={}, use_queue=False)
+
+    router.debug("full prompt")
+    miner.info("position mined")
+    miner.warning("no positions")
+    assert _lines(capsys) == ["full prompt", "no positions"]
+    assert miner.enabled_for(WARNING) and not miner.enabled_for(INFO)
+
+
+def test_rate_limited_records_report_what_they_suppressed(capsys, monkeypatch):
+    log = get_logger("test_rate")
+    clock = iter([0.0, 1.0, 2.0, 11.0])
+    monkeypatch.setattr(structured_log.time, "monotonic", lambda: next(clock))
+
+    for ply in range(4):
+        log.warning(f"⚠️ error for ply {ply}", every=10.0, key="ply_error")
+    assert _lines(capsys) == ["⚠️ error for ply 0", "⚠️ error for ply 3 suppressed=2"]
+
+
+def test_sampling_keeps_a_fraction_but_never_drops_warnings(capsys, monkeypatch):
+    log = get_logger("test_sample")
+    structured_log.configure(level="INFO", levels={}, sample={"test_sample": 0.25}, use_queue=True)
+    rolls = iter([0.1, 0.5, 0.9, 0.2])
+    monkeypatch.setattr(structured_log.random, "random", lambda: next(rolls))
+
+    for i in range(4):
+        log.info(f"position {i}")
+    log.warning("⚠️ kept")
+    assert _lines(capsys) == ["position 0", "position 3", "⚠️ kept"]
@@ -0,0 +1,92 @@
+"""
+Tactics index: rating-band and theme lookups, the binary format, per-viewer
+seen state and reload on file change.
+"""
+
+import json
+import os
+
+from tactics_index import TacticsIndex, TacticsStore, encode_tactics, load_tactics_index
+
+
+def _puzzle(pid, rating, themes, **extra):
+    return {"id": pid, "rating": rating, "fen": f"fen-{pid}", "side_to_move": "white",
+            "prompt": "Find the best move", "solution_pv_san": "Qxf7#", "themes": themes, **extra}
+
+
+PUZZLES = [
+    _puzzle("p1500", 1500, ["fork"]),
+    _puzzle("p1200", 1200, ["pin", "mate"], source="club"),
+    _puzzle("p1300", 1300, ["fork"]),
+    _puzzle("p1300b", 1300, ["Mate"]),
+    _puzzle("p1800", 1800, ["mate"]),
+]
+
+
+def test_binary_format_roundtrips_and_indexes_by_rating_and_theme(tmp_path):
+    path = tmp_path / "tactics.idx"
+    path.write_bytes(encode_tactics(PUZZLES))
+    index = load_tactics_index(str(path))
+
+    assert len(index) == 5 and list(index.ratings) == [1200, 1300, 1300, 1500, 1800]
+    assert sorted(index.puzzle(i)["id"] for i in range(5)) == sorted(p["id"] for p in PUZZLES)
+    assert index.puzzle(0) == _puzzle("p1200", 1200, ["pin", "mate"], source="club")
+    assert index.puzzle(1)["id"] == "p1300"  # equal ratings keep file order
+
+    rows, ratings = index.theme_view(index.theme_code("MATE"))
+    assert [index.puzzle(r)["id"] for r in rows] == ["p1200", "p1300b", "p1800"]
+    assert index.band(ratings, 1250, 1800) == (1, 3)
+    assert index.theme_code("skewer") is None
+    assert len(TacticsIndex.from_puzzles([])) == 0
+
+
+def test_store_serves_unseen_puzzles_per_viewer_then_starts_over(tmp_path):
+    path = tmp_path / "tactics.json"
+    path.write_text(json.dumps(PUZZLES))
+    store = TacticsStore(str(path))
+
+    assert store.next_puzzle(1250, 1600)["id"] == "p1300"
+    assert store.next_puzzle(1250, 1600)["id"] == "p1300"  # no viewer: always the lowest-rated match
+    assert store.next_puzzle(1900, None) is None
+    assert store.next_puzzle(theme="skewer") is None
+    assert store.next_puzzle(1000, 1400, theme="fork")["id"] == "p1300"
+
+    served = [store.next_puzzle(1250, 1600, viewer="alice")["id"] for _ in range(4)]
+    assert served == ["p1300", "p1300b", "p1500", "p1300"]
+    assert store.next_puzzle(1250, 1600, viewer="bob")["id"] == "p1300"
+
+    # Seen puzzles are skipped across filters too
+    assert store.next_puzzle(theme="mate", viewer="bob")["id"] == "p1200"
+    assert store.next_puzzle(theme="mate", viewer="bob")["id"] == "p1300b"
+    assert store.next_puzzle(1300, 1300, viewer="bob")["id"] == "p1300"  # both seen: the band starts over
+
+
+def test_store_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / "tactics.idx"
+    path.write_bytes(encode_tactics(PUZZLES))
+    store = TacticsStore(str(path), check_interval=0)
+    assert store.next_puzzle(viewer="alice")["id"] == "p1200"
+    assert store.next_puzzle(viewer="alice")["id"] == "p1300"
+    assert store.reloads == 1
+
+    path.write_text(json.dumps([_puzzle("p1000", 1000, ["fork"])] + PUZZLES))
+    os.utime(path, ns=(1, 1))  # mtime resolution differs between filesystems
+    assert store.next_puzzle(viewer="alice")["id"] == "p1300b"  # not reloaded until refresh()
+    assert store.stale()
+    store.refresh()
+    assert store.reloads == 2
+    # Seen state belongs to the index it was built on and starts afresh
+    assert [store.next_puzzle(viewer="alice")["id"] for _ in range(3)] == ["p1000", "p1200", "p1300"]
+
+
+def test_seen_state_jumps_over_long_seen_runs():
+    puzzles = [_puzzle(f"p{i}", 1000 + i, ["fork"] if i % 2 else ["pin"]) for i in range(2000)]
+    store = TacticsStore("unused")
+    store._index = TacticsIndex.from_puzzles(puzzles)
+
+    # Seeing every fork puzzle marks them in the unfiltered view too
+    forks = [store.next_puzzle(theme="fork", viewer="v")["id"] for _ in range(1000)]
+    assert forks == [f"p{i}" for i in range(1, 2000, 2)]
+    unfiltered = [store.next_puzzle(viewer="v")["id"] for _ in range(1001)]
+    assert unfiltered == [f"p{i}" for i in range(0, 2000, 2)] + ["p0"]  # then the band starts over
+    assert store.next_puzzle(1500, 1503, viewer="v")["id"] == "p500"
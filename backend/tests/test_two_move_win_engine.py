@@ -190,6 +190,61 @@ class TestTwoMoveWinEngine(unittest.TestCase):
         # Ensure none of the targets is the move destination square (f3)
         self.assertNotIn("f3", targets, f"Discovered attack targets should not include moved-to square: {targets}")
 
+    def test_probing_leaves_board_untouched(self):
+        """Validation and discovered-attack probes push/pop on the caller's board."""
+        fen = "6k1/4q3/8/8/8/8/4B3/4R1K1 b - - 0 1"
+        board = chess.Board(fen)
+        board.push(board.parse_san("Kh8"))
+        stack = list(board.move_stack)
+        fen_before = board.fen()
+        move = chess.Move.from_uci("e2f3")
+        self.engine._validate_tactic(board, move, "discovered_attack", chess.WHITE)
+        self.engine._check_discovered_attack(board, move)
+        self.engine._see_refute_by_recapture(board, move, chess.WHITE)
+        self.assertEqual(board.fen(), fen_before)
+        self.assertEqual(board.move_stack, stack)
+
+    def test_gives_check_matches_python_chess(self):
+        """Bitboard gives-check agrees with board.gives_check, including flipped turns."""
+        fens = [
+            chess.STARTING_FEN,
+            "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+            "4k3/8/8/8/8/8/4R3/4K2B w - - 0 1",
+            "4k3/1P6/8/8/8/8/8/4K3 w - - 0 1",
+            "2r2b2/7n/3k2pr/p1pB2Pp/2pN1B1P/N1P2P2/1P6/5K1R w - - 0 34",
+        ]
+        for fen in fens:
+            for turn in (chess.WHITE, chess.BLACK):
+                board = chess.Board(fen)
+                board.turn = turn
+                for move in board.legal_moves:
+                    self.assertEqual(self.engine._gives_check(board, move), board.gives_check(move), f"{fen} {move}")
+
+    def test_scan_line_matches_per_ply_scans(self):
+        """scan_line returns one result per ply, identical to scanning each position separately."""
+        import asyncio
+        fen = "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5Q2/PPPP1PPP/RNB1K1NR b KQkq - 3 3"
+        line = ["Nd4", "Qxf7#"]
+        results = asyncio.run(self.engine.scan_line(fen, line))
+        self.assertEqual(len(results), 3)
+
+        board = chess.Board(fen)
+        fens = [board.fen()]
+        for san in line:
+            board.push_san(san)
+            fens.append(board.fen())
+        fresh = TwoMoveWinEngine()
+        for result, ply_fen in zip(results, fens):
+            expected = asyncio.run(fresh.scan_two_move_tactics(ply_fen, chess.Board(ply_fen).turn))
+            self.assertEqual(result.to_dict(), expected.to_dict())
+        # White to move after Nd4 can mate at once
+        self.assertTrue(any(c["sequence"] == ["Qxf7#"] for c in results[1].checkmates))
+
+        # A fixed side and an illegal move stop the line early
+        partial = asyncio.run(self.engine.scan_line(fen, ["Nd4", "Ke2", "Qxf7#"], side_to_move=chess.WHITE))
+        self.assertEqual(len(partial), 2)
+        self.assertTrue(partial[1].has_mate_threat)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -8,6 +8,8 @@ Each threat is returned as a tag with metadata for visualization and explanation
 import chess
 from typing import List, Dict, Optional, Set, Tuple
 
+from static_exchange import position_see
+
 
 # ============================================================================
 # 1. DIRECT MATERIAL THREATS
@@ -22,13 +24,14 @@ def detect_undefended_pieces(board: chess.Board, color: chess.Color) -> List[Dic
     enemy_color = not color
     piece_names = {chess.PAWN: 'Pawn', chess.KNIGHT: 'Knight', chess.BISHOP: 'Bishop',
                    chess.ROOK: 'Rook', chess.QUEEN: 'Queen', chess.KING: 'King'}
+    see = position_see(board)
     
-    for square in chess.SQUARES:
+    for square in chess.SquareSet(board.occupied_co[enemy_color]):
         piece = board.piece_at(square)
-        if piece and piece.color == enemy_color:
+        if piece:
             # Count attackers and defenders
-            attackers = board.attackers(color, square)
-            defenders = board.attackers(enemy_color, square)
+            attackers = see.attackers(color, square)
+            defenders = see.attackers(enemy_color, square)
             
             if len(attackers) > 0 and len(defenders) == 0:
                 # Get attacker details
@@ -48,7 +51,8 @@ def detect_undefended_pieces(board: chess.Board, color: chess.Color) -> List[Dic
                     "target_piece": piece.symbol(),
                     "target_piece_name": piece_names.get(piece.piece_type, 'Piece'),
                     "attackers": [chess.square_name(sq) for sq in attackers],
-                    "attacker_pieces": attacker_details
+                    "attacker_pieces": attacker_details,
+                    "see_gain": see.gain(square, color)
                 })
     
     return threats
@@ -65,6 +69,8 @@ def detect_capture_higher_value(board: chess.Board, color: chess.Color) -> List[
     piece_names = {chess.PAWN: 'Pawn', chess.KNIGHT: 'Knight', chess.BISHOP: 'Bishop',
                    chess.ROOK: 'Rook', chess.QUEEN: 'Queen', chess.KING: 'King'}
     
+    see = position_see(board)
+    
     for move in board.legal_moves:
         if board.is_capture(move):
             attacker = board.piece_at(move.from_square)
@@ -83,7 +89,8 @@ def detect_capture_higher_value(board: chess.Board, color: chess.Color) -> List[
                         "attacker_name": piece_names.get(attacker.piece_type, 'Piece'),
                         "victim": victim.symbol(),
                         "victim_name": piece_names.get(victim.piece_type, 'Piece'),
-                        "value_diff": victim_value - attacker_value
+                        "value_diff": victim_value - attacker_value,
+                        "see_gain": see.capture_gain(move)
                     })
     
     return threats
@@ -101,11 +108,13 @@ def detect_hanging_pieces(board: chess.Board, color: chess.Color) -> List[Dict]:
     piece_names = {chess.PAWN: 'Pawn', chess.KNIGHT: 'Knight', chess.BISHOP: 'Bishop',
                    chess.ROOK: 'Rook', chess.QUEEN: 'Queen', chess.KING: 'King'}
     
-    for square in chess.SQUARES:
+    see = position_see(board)
+    
+    for square in chess.SquareSet(board.occupied_co[enemy_color]):
         piece = board.piece_at(square)
-        if piece and piece.color == enemy_color:
-            attackers = board.attackers(color, square)
-            defenders = board.attackers(enemy_color, square)
+        if piece:
+            attackers = see.attackers(color, square)
+            defenders = see.attackers(enemy_color, square)
             
             if len(attackers) > len(defenders) > 0:
                 # Get piece details for attackers and defenders
@@ -140,7 +149,8 @@ def detect_hanging_pieces(board: chess.Board, color: chess.Color) -> List[Dict]:
                     "defenders": [chess.square_name(sq) for sq in defenders],
                     "attacker_pieces": attacker_details,
                     "defender_pieces": defender_details,
-                    "value": piece_values.get(piece.piece_type, 0)
+                    "value": piece_values.get(piece.piece_type, 0),
+                    "see_gain": see.gain(square, color)
                 })
     
     return threats
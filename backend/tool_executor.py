@@ -5,9 +5,11 @@ Routes and executes tool calls from LLM
 
 from typing import Dict, Any, Optional, List
 import json
-import os
 import asyncio
 
+from pipeline_timer import bind_trace_context
+from analysis_service import resolve_analysis_service
+
 
 def _safe_float(x, default: float = 0.0) -> float:
     """
@@ -165,6 +167,11 @@ class ToolExecutor:
         review_game_internal_fn=None,
         analyze_fen_fn=None,
         save_error_positions_fn=None,
+        # In-process AnalysisService from the server; without it, analysis tools call the backend over HTTP.
+        analysis_service=None,
+        # Shared EnginePool + review cache for the game-evaluation batch API (tools.game_evals)
+        engine_pool=None,
+        review_cache=None,
     ):
         self.engine_queue = engine_queue
         self.game_fetcher = game_fetcher
@@ -176,6 +183,9 @@ class ToolExecutor:
         self.openai_client = openai_client
         self.llm_router = llm_router
         self.game_window_manager = game_window_manager
+        self.analysis_service = resolve_analysis_service(analysis_service)
+        self.engine_pool = engine_pool
+        self.review_cache = review_cache
         
         # Initialize Personal Review System managers
         if supabase_client:
@@ -411,59 +421,33 @@ class ToolExecutor:
         lines = args.get("lines", 3)
         light_mode = args.get("light_mode", False)  # Default to full analysis (light_mode only for game review/retry)
         
-        print(f"   Analyzing position via /analyze_position endpoint (depth={depth}, lines={lines}, light_mode={light_mode})")
+        via = "HTTP" if self.analysis_service.remote else "in-process"
+        print(f"   Analyzing position via /analyze_position ({via}, depth={depth}, lines={lines}, light_mode={light_mode})")
         print(f"   FEN from args: {args.get('fen', 'none')}")
         print(f"   FEN from context.board_state: {context.get('board_state', 'none') if context else 'no context'}")
         print(f"   Using FEN: {fen}")
         
-        # Call the SAME /analyze_position endpoint the UI button uses
+        # Same /analyze_position pipeline the UI button uses
         # Use light_mode=False by default for full analysis
         # This gives us the full structured response with candidates, themes, threats
-        import aiohttp
+        result = await self.analysis_service.analyze_position(fen, lines=lines, depth=depth, light_mode=light_mode)
+        if result.get("error"):
+            print(f"   ❌ Error calling analyze_position: {result['error']}")
+            return {"error": result["error"]}
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                # Convert all parameters to strings for query params (aiohttp requires this)
-                params = {
-                    "fen": fen,
-                    "lines": str(lines),
-                    "depth": str(depth),
-                    "light_mode": "true" if light_mode else "false"  # Convert boolean to string
-                }
-                
-                # Use BACKEND_URL or NEXT_PUBLIC_BACKEND_URL if set, otherwise default to localhost with BACKEND_PORT
-                backend_url = os.getenv("BACKEND_URL") or os.getenv("NEXT_PUBLIC_BACKEND_URL")
-                if not backend_url:
-                    backend_port = int(os.getenv("BACKEND_PORT", "8001"))
-                    backend_url = f"http://localhost:{backend_port}"
-                async with session.get(
-                    f"{backend_url}/analyze_position",
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=60)
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        return {"error": f"Analysis failed: {error_text}"}
-                    
-                    result = await response.json()
-                    
-                    print(f"   ✅ Analysis complete via endpoint")
-                    print(f"      Eval: {result.get('eval_cp', 0)}cp")
-                    
-                    # Return the EXACT same format the endpoint returns
-                    # Frontend will know how to display this
-                    return {
-                        "success": True,
-                        "fen": fen,
-                        "endpoint_response": result,  # Full /analyze_position response
-                        "should_trigger_ui": True,  # Signal to frontend
-                        "eval_cp": result.get("eval_cp", 0),
-                        "candidate_moves": result.get("candidate_moves", [])
-                    }
+        print(f"   ✅ Analysis complete via {via} /analyze_position")
+        print(f"      Eval: {result.get('eval_cp', 0)}cp")
         
-        except Exception as e:
-            print(f"   ❌ Error calling analyze_position endpoint: {e}")
-            return {"error": str(e)}
+        # Return the EXACT same format the endpoint returns
+        # Frontend will know how to display this
+        return {
+            "success": True,
+            "fen": fen,
+            "endpoint_response": result,  # Full /analyze_position response
+            "should_trigger_ui": True,  # Signal to frontend
+            "eval_cp": result.get("eval_cp", 0),
+            "candidate_moves": result.get("candidate_moves", [])
+        }
     
     async def _analyze_move(self, args: Dict, context: Dict) -> Dict:
         """Analyze a specific move"""
@@ -543,27 +527,10 @@ class ToolExecutor:
         except Exception as e:
             return {"error": f"Invalid move notation '{move_san}': {str(e)}. Position: {fen[:60]}"}
         
-        # Tree-first: call backend /analyze_move which is rebased to D2/D16.
-        import aiohttp
-        try:
-            # Use BACKEND_URL or NEXT_PUBLIC_BACKEND_URL if set, otherwise default to localhost with BACKEND_PORT
-            backend_url = os.getenv("BACKEND_URL") or os.getenv("NEXT_PUBLIC_BACKEND_URL")
-            if not backend_url:
-                backend_port = int(os.getenv("BACKEND_PORT", "8001"))
-                backend_url = f"http://localhost:{backend_port}"
-            async with aiohttp.ClientSession() as session:
-                params = {"fen": fen, "move_san": move_san, "depth": int(depth)}
-                async with session.post(
-                    f"{backend_url}/analyze_move",
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=90),
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        return {"error": f"analyze_move failed: {error_text}"}
-                    result = await response.json()
-        except Exception as e:
-            return {"error": f"Error calling analyze_move endpoint: {str(e)}"}
+        # Tree-first: backend /analyze_move which is rebased to D2/D16.
+        result = await self.analysis_service.analyze_move(fen, move_san, depth=int(depth))
+        if result.get("error"):
+            return {"error": result["error"]}
 
         # Normalize to the tool’s expected compact shape (keep keys stable for downstream formatters)
         pmr = (result or {}).get("playedMoveReport") or {}
@@ -592,26 +559,10 @@ class ToolExecutor:
         if not query:
             return {"error": "tree_search requires query."}
 
-        import aiohttp
-        try:
-            # Use BACKEND_URL or NEXT_PUBLIC_BACKEND_URL if set, otherwise default to localhost with BACKEND_PORT
-            backend_url = os.getenv("BACKEND_URL") or os.getenv("NEXT_PUBLIC_BACKEND_URL")
-            if not backend_url:
-                backend_port = int(os.getenv("BACKEND_PORT", "8001"))
-                backend_url = f"http://localhost:{backend_port}"
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{backend_url}/board/tree/search",
-                    json={"thread_id": thread_id, "query": query, "limit": limit},
-                    timeout=aiohttp.ClientTimeout(total=30),
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        return {"error": f"tree_search failed: {error_text}"}
-                    data = await response.json()
-                    return {"success": True, "thread_id": thread_id, "query": query, "results": data.get("results", [])}
-        except Exception as e:
-            return {"error": f"tree_search error: {str(e)}"}
+        data = await self.analysis_service.tree_search(thread_id, query, limit=limit)
+        if data.get("error"):
+            return {"error": data["error"]}
+        return {"success": True, "thread_id": thread_id, "query": query, "results": data.get("results", [])}
     
     async def _review_full_game(self, args: Dict, status_callback = None, context: Dict = None) -> Dict:
         """Review complete game with rate limiting"""
@@ -1530,7 +1481,7 @@ Return ONLY valid JSON in this exact format:
                 import concurrent.futures as _cf
                 with _cf.ThreadPoolExecutor(max_workers=1) as pool:
                     parsed = await asyncio.wait_for(
-                        loop.run_in_executor(pool, call_llm_router),
+                        loop.run_in_executor(pool, bind_trace_context(call_llm_router)),
                         timeout=20.0
                     )
                 content = json.dumps(parsed, ensure_ascii=False)
@@ -1539,7 +1490,7 @@ Return ONLY valid JSON in this exact format:
                 import concurrent.futures as _cf
                 with _cf.ThreadPoolExecutor(max_workers=1) as pool:
                     response = await asyncio.wait_for(
-                        loop.run_in_executor(pool, call_openai),
+                        loop.run_in_executor(pool, bind_trace_context(call_openai)),
                         timeout=20.0
                     )
 
@@ -2287,14 +2238,14 @@ Write your response now based on the game data provided."""
                     narrative = await asyncio.wait_for(
                         loop.run_in_executor(
                             executor,
-                            lambda: self.llm_router.complete(
+                            bind_trace_context(lambda: self.llm_router.complete(
                                 session_id="default",
                                 stage="review_narrative",
                                 system_prompt=system_prompt,
                                 user_text=context,
                                 temperature=0.7,
                                 model="gpt-5",
-                            )
+                            ))
                         ),
                         timeout=20.0
                     )
@@ -3282,7 +3233,9 @@ Write your response now based on the game data provided."""
                 depth=depth,
                 top_n=top_n,
                 exclude_book_moves=exclude_book,
-                engine_queue=self.engine_queue
+                engine_pool=self.engine_pool,
+                game_review=args.get("game_review"),
+                review_cache=self.review_cache
             )
             
             return result
@@ -3293,15 +3246,26 @@ Write your response now based on the game data provided."""
     async def _calculate_baseline(self, args: Dict) -> Dict:
         """Calculate player baseline from games"""
         try:
-            from tools.player_baseline import calculate_baseline
+            from tools.player_baseline import calculate_baseline, calculate_baseline_from_pgns
             
             games = args.get("games", [])
             exclude_outliers = args.get("exclude_outliers", True)
             
-            result = await calculate_baseline(
-                games=games,
-                exclude_outliers=exclude_outliers
-            )
+            if args.get("pgns"):
+                # Raw games: evaluated in one batch (stored reviews first, then the engine pool)
+                result = await calculate_baseline_from_pgns(
+                    args["pgns"],
+                    engine_pool=self.engine_pool,
+                    depth=args.get("depth", 15),
+                    player=args.get("player"),
+                    review_cache=self.review_cache,
+                    exclude_outliers=exclude_outliers
+                )
+            else:
+                result = await calculate_baseline(
+                    games=games,
+                    exclude_outliers=exclude_outliers
+                )
             
             return result
             
@@ -3311,17 +3275,28 @@ Write your response now based on the game data provided."""
     async def _detect_anomalies(self, args: Dict) -> Dict:
         """Detect statistical anomalies in performance"""
         try:
-            from tools.anomaly_detection import detect_anomalies
+            from tools.anomaly_detection import detect_anomalies, detect_anomalies_from_pgns
             
             test_games = args.get("test_games", [])
             baseline = args.get("baseline", {})
             metrics = args.get("metrics")
             
-            result = await detect_anomalies(
-                test_games=test_games,
-                baseline=baseline,
-                metrics=metrics
-            )
+            if args.get("test_pgns"):
+                result = await detect_anomalies_from_pgns(
+                    args["test_pgns"],
+                    baseline=baseline,
+                    metrics=metrics,
+                    player=args.get("player"),
+                    engine_pool=self.engine_pool,
+                    depth=args.get("depth", 15),
+                    review_cache=self.review_cache
+                )
+            else:
+                result = await detect_anomalies(
+                    test_games=test_games,
+                    baseline=baseline,
+                    metrics=metrics
+                )
             
             return result
             
@@ -3675,7 +3650,7 @@ Write your response now based on the game data provided."""
             # If no pre-computed data, fetch games and build points
             if not games_data:
                 games = self.supabase_client.get_active_reviewed_games(
-                    user_id, limit=limit, include_full_review=True
+                    user_id, limit=limit, columnar=True
                 )
                 if not games:
                     return {"error": "No analyzed games found for user"}
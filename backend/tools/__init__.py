@@ -12,6 +12,7 @@ from .critical_moments import find_critical_moments, TOOL_CRITICAL_MOMENTS
 from .complexity_scorer import score_move_complexity, TOOL_COMPLEXITY_SCORER
 from .game_filters import fetch_games_filtered, TOOL_FETCH_GAMES_FILTERED
 from .peer_comparison import compare_to_peers, TOOL_PEER_COMPARISON
+from .game_evals import GameEvals, evaluate_games, game_metrics
 
 __all__ = [
     # Functions
@@ -25,6 +26,11 @@ __all__ = [
     'fetch_games_filtered',
     'compare_to_peers',
     
+    # Batch engine evaluations for the analytics tools
+    'GameEvals',
+    'evaluate_games',
+    'game_metrics',
+    
     # Tool schemas
     'TOOL_WEB_SEARCH',
     'TOOL_MULTI_DEPTH_ANALYZE',
@@ -3,9 +3,11 @@ Anomaly Detection Tool
 Detects statistical anomalies in player performance vs historical baseline
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 import math
 
+from .game_evals import game_metrics
+
 
 async def detect_anomalies(
     test_games: List[Dict],
@@ -102,6 +104,32 @@ async def detect_anomalies(
     }
 
 
+async def detect_anomalies_from_pgns(
+    pgns: List[Union[str, Dict]],
+    baseline: Dict,
+    metrics: List[str] = None,
+    player: Optional[str] = None,
+    engine_pool = None,
+    depth: int = 15,
+    exclude_book_plies: int = 0,
+    review_cache = None
+) -> Dict:
+    """
+    Detect anomalies in raw games, evaluated in one batch (see tools.game_evals).
+    
+    Args:
+        pgns: PGN strings, or game dicts with "pgn" and their stored "game_review"
+        baseline: Historical baseline from calculate_baseline()
+        player: Only count this player's moves (White/Black header)
+        Other args as in calculate_baseline_from_pgns()
+    """
+    test_games = await game_metrics(
+        pgns, player=player, skip_plies=exclude_book_plies,
+        depth=depth, engine_pool=engine_pool, review_cache=review_cache,
+    )
+    return await detect_anomalies(test_games, baseline, metrics)
+
+
 def _calculate_test_metrics(games: List[Dict], metrics: List[str]) -> Dict:
     """Calculate metrics from test games"""
     if not games:
@@ -4,13 +4,16 @@ Assesses the difficulty of finding correct moves in a position
 """
 
 import chess
+from array import array
 from typing import Dict, List, Optional, Literal
 
+from .game_evals import GameEvals, evaluate_positions
+
 
 async def score_move_complexity(
     fen: str,
     move: str = None,
-    engine_queue = None,
+    engine_pool = None,
     depth: int = 25
 ) -> Dict:
     """
@@ -19,7 +22,7 @@ async def score_move_complexity(
     Args:
         fen: Position in FEN notation
         move: Optional move to assess (in SAN or UCI)
-        engine_queue: Stockfish engine queue
+        engine_pool: Shared EnginePool
         depth: Analysis depth
         
     Returns:
@@ -59,42 +62,99 @@ async def score_move_complexity(
     
     # Analyze position
     analysis_result = None
-    if engine_queue:
+    if engine_pool:
         try:
-            analysis_result = await engine_queue.analyze(fen, depth=depth, num_lines=min(10, num_legal))
+            analysed = await evaluate_positions([fen], depth=depth, multipv=min(10, num_legal), engine_pool=engine_pool)
+            analysis_result = next(iter(analysed.values()), None)
         except Exception as e:
             print(f"Engine analysis error: {e}")
     
     # Extract move evaluations
     move_evals = []
-    if analysis_result and "lines" in analysis_result:
-        for line in analysis_result["lines"]:
+    if analysis_result:
+        for line in analysis_result["engine_info"]:
             pv = line.get("pv", [])
             if pv:
                 move_evals.append({
                     "move": pv[0],
-                    "eval": line.get("cp", 0)
+                    "eval": line.get("eval_cp", 0)
                 })
     
     # Calculate metrics
-    best_eval = move_evals[0]["eval"] if move_evals else 0
+    metrics = _position_metrics(board, [m["eval"] for m in move_evals], num_legal)
+    complexity_score = metrics["complexity_score"]
+    reasonable_moves = metrics["num_reasonable_moves"]
+    eval_spread = metrics["eval_spread"]
+    is_only_move = metrics["is_only_move"]
+    tactical_elements = metrics["tactical_elements"]
+    piece_tension = metrics["piece_tension"]
+    
+    # Map to category
+    complexity = _score_to_category(complexity_score)
+    
+    # Estimate human think time
+    time_expected = _estimate_think_time(complexity_score, len(tactical_elements))
+    
+    result = {
+        "complexity": complexity,
+        "complexity_score": round(complexity_score, 2),
+        "num_legal_moves": num_legal,
+        "num_reasonable_moves": reasonable_moves,
+        "eval_spread": eval_spread,
+        "is_only_move": is_only_move,
+        "tactical_elements": tactical_elements,
+        "piece_tension": round(piece_tension, 2),
+        "time_expected": round(time_expected, 1)
+    }
+    
+    # Assess specific move if provided
+    if move:
+        move_assessment = _assess_specific_move(board, move, move_evals, complexity_score)
+        result["move_assessment"] = move_assessment
+    
+    return result
+
+
+def complexity_score_from_evals(board: chess.Board, line_evals: List[int]) -> float:
+    """
+    0-1 complexity score from engine lines that were already computed
+    (centipawns, best line first), without running the engine again.
+    Same scale as score_move_complexity()["complexity_score"].
+    """
+    num_legal = board.legal_moves.count()
+    if num_legal == 0:
+        return 0
+    return _position_metrics(board, line_evals, num_legal)["complexity_score"]
+
+
+def game_complexity(evals: GameEvals) -> array:
+    """
+    Per-ply 0-1 complexity of a whole game from its batch evaluations
+    (stored or freshly analysed lines), without running the engine again.
+    """
+    return array("f", (
+        complexity_score_from_evals(chess.Board(fen), line_evals)
+        for fen, line_evals in zip(evals.fen_before, evals.line_evals)
+    ))
+
+
+def _position_metrics(board: chess.Board, evals: List[int], num_legal: int) -> Dict:
+    """Complexity inputs and score for a position, given line evals (best first)"""
+    best_eval = evals[0] if evals else 0
     
     # Count reasonable moves (within 50cp of best)
-    reasonable_moves = sum(
-        1 for m in move_evals 
-        if abs(m["eval"] - best_eval) <= 50
-    )
+    reasonable_moves = sum(1 for e in evals if abs(e - best_eval) <= 50)
     
     # Eval spread (difference between best and 5th best)
-    if len(move_evals) >= 5:
-        eval_spread = abs(best_eval - move_evals[4]["eval"])
-    elif len(move_evals) >= 2:
-        eval_spread = abs(best_eval - move_evals[-1]["eval"])
+    if len(evals) >= 5:
+        eval_spread = abs(best_eval - evals[4])
+    elif len(evals) >= 2:
+        eval_spread = abs(best_eval - evals[-1])
     else:
         eval_spread = 0
     
     # Is only move?
-    is_only_move = num_legal == 1 or (len(move_evals) >= 2 and abs(move_evals[0]["eval"] - move_evals[1]["eval"]) > 200)
+    is_only_move = num_legal == 1 or (len(evals) >= 2 and abs(evals[0] - evals[1]) > 200)
     
     # Tactical elements
     tactical_elements = _detect_tactical_elements(board)
@@ -108,30 +168,14 @@ async def score_move_complexity(
         is_only_move, len(tactical_elements), piece_tension
     )
     
-    # Map to category
-    complexity = _score_to_category(complexity_score)
-    
-    # Estimate human think time
-    time_expected = _estimate_think_time(complexity_score, len(tactical_elements))
-    
-    result = {
-        "complexity": complexity,
-        "complexity_score": round(complexity_score, 2),
-        "num_legal_moves": num_legal,
+    return {
+        "complexity_score": complexity_score,
         "num_reasonable_moves": reasonable_moves,
         "eval_spread": eval_spread,
         "is_only_move": is_only_move,
         "tactical_elements": tactical_elements,
-        "piece_tension": round(piece_tension, 2),
-        "time_expected": round(time_expected, 1)
+        "piece_tension": piece_tension,
     }
-    
-    # Assess specific move if provided
-    if move:
-        move_assessment = _assess_specific_move(board, move, move_evals, complexity_score)
-        result["move_assessment"] = move_assessment
-    
-    return result
 
 
 def _detect_tactical_elements(board: chess.Board) -> List[str]:
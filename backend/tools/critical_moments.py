@@ -4,19 +4,23 @@ Identifies key turning points in chess games
 """
 
 import chess
-import chess.pgn
-from io import StringIO
 from typing import Dict, List, Optional, Literal
 
+from ply_columns import MISSING_EVAL
+
+from .game_evals import evaluate_games
+
 
 async def find_critical_moments(
     pgn: str,
     threshold_cp: int = 100,
-    engine_queue = None,
+    engine_pool = None,
     depth: int = 20,
     include_missed_wins: bool = True,
     include_blunders: bool = True,
-    include_turning_points: bool = True
+    include_turning_points: bool = True,
+    game_review: Optional[Dict] = None,
+    review_cache = None
 ) -> Dict:
     """
     Identify critical moments in a game.
@@ -24,11 +28,13 @@ async def find_critical_moments(
     Args:
         pgn: PGN string of the game
         threshold_cp: Minimum CP swing to consider critical (default 100)
-        engine_queue: Stockfish engine queue
+        engine_pool: Shared EnginePool for positions without stored evals
         depth: Analysis depth
         include_missed_wins: Include missed winning chances
         include_blunders: Include major blunders
         include_turning_points: Include evaluation turning points
+        game_review: Stored review of this game (its engine lines are reused)
+        review_cache: AnalysisCache to look the review up in
         
     Returns:
         {
@@ -54,71 +60,30 @@ async def find_critical_moments(
             "biggest_swing": {"move_num": 23, "swing": 350}
         }
     """
-    # Parse PGN
-    try:
-        game = chess.pgn.read_game(StringIO(pgn))
-        if not game:
-            return {"error": "Could not parse PGN"}
-    except Exception as e:
-        return {"error": f"PGN parse error: {str(e)}"}
-    
-    # Collect all positions
-    board = game.board()
-    positions = []
-    moves = []
-    
-    for move in game.mainline_moves():
-        positions.append(board.fen())
-        moves.append(move)
-        board.push(move)
-    
-    positions.append(board.fen())  # Final position
-    
-    if not positions:
+    game = {"pgn": pgn, "game_review": game_review} if game_review else pgn
+    [evals] = await evaluate_games(
+        [game], depth=depth, multipv=3, engine_pool=engine_pool, review_cache=review_cache,
+    )
+    if evals.error:
+        return {"error": evals.error}
+    if not len(evals):
         return {"error": "No moves in game"}
     
-    # Analyze each position
-    evaluations = []
-    for fen in positions:
-        if engine_queue:
-            try:
-                result = await engine_queue.analyze(fen, depth=depth, num_lines=3)
-                if result and "lines" in result and result["lines"]:
-                    best_line = result["lines"][0]
-                    eval_cp = best_line.get("cp", 0)
-                    best_move = best_line.get("pv", [""])[0] if best_line.get("pv") else ""
-                    top_moves = [
-                        {"move": l.get("pv", [""])[0], "eval": l.get("cp", 0)}
-                        for l in result["lines"][:3]
-                    ]
-                    evaluations.append({
-                        "eval": eval_cp,
-                        "best_move": best_move,
-                        "top_moves": top_moves
-                    })
-                else:
-                    evaluations.append({"eval": 0, "best_move": "", "top_moves": []})
-            except:
-                evaluations.append({"eval": 0, "best_move": "", "top_moves": []})
-        else:
-            evaluations.append({"eval": 0, "best_move": "", "top_moves": []})
+    # Position evals (side to move), for phase detection
+    evaluations = [
+        {"eval": 0 if ev == MISSING_EVAL else ev}
+        for ev in list(evals.eval_before_cp) + [evals.final_eval_cp]
+    ]
     
     # Find critical moments
     critical_moments = []
     
-    for i in range(len(moves)):
-        fen_before = positions[i]
-        fen_after = positions[i + 1]
-        eval_before = evaluations[i]["eval"]
-        eval_after = evaluations[i + 1]["eval"]
-        best_move = evaluations[i]["best_move"]
-        played_move = moves[i]
-        
-        # Normalize for side to move
-        board_temp = chess.Board(fen_before)
-        if board_temp.turn == chess.BLACK:
-            eval_before = -eval_before
-            eval_after = -eval_after
+    for i in range(len(evals)):
+        # Both evals from the point of view of the side that moved
+        eval_before = evals.eval_before_cp[i]
+        eval_after = evals.played_eval_cp[i]
+        if MISSING_EVAL in (eval_before, eval_after):
+            continue
         
         # Calculate swing
         swing = eval_after - eval_before
@@ -139,12 +104,14 @@ async def find_critical_moments(
                 continue
             
             # Get SAN notation
-            played_san = board_temp.san(played_move)
+            fen_before = evals.fen_before[i]
+            played_san = evals.san[i]
+            best_move = evals.best_move_uci[i]
             best_san = ""
             if best_move:
                 try:
-                    best_san = board_temp.san(chess.Move.from_uci(best_move))
-                except:
+                    best_san = chess.Board(fen_before).san(chess.Move.from_uci(best_move))
+                except ValueError:
                     best_san = best_move
             
             description = _generate_description(
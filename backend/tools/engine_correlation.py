@@ -4,10 +4,10 @@ Measures how closely a player's moves match engine recommendations
 """
 
 import chess
-import chess.pgn
-from io import StringIO
+import math
 from typing import Dict, List, Optional, Literal
-import asyncio
+
+from .game_evals import evaluate_games
 
 
 async def engine_correlation(
@@ -16,7 +16,9 @@ async def engine_correlation(
     top_n: int = 3,
     exclude_book_moves: int = 10,
     exclude_forced: bool = True,
-    engine_queue = None
+    engine_pool = None,
+    game_review: Optional[Dict] = None,
+    review_cache = None
 ) -> Dict:
     """
     Calculate how closely player moves match engine's top choices.
@@ -27,7 +29,9 @@ async def engine_correlation(
         top_n: Match against top N engine moves
         exclude_book_moves: Skip first N moves (opening theory)
         exclude_forced: Exclude positions with only 1-2 legal moves
-        engine_queue: Stockfish engine queue
+        engine_pool: Shared EnginePool for positions without stored evals
+        game_review: Stored review of this game (its engine lines are reused)
+        review_cache: AnalysisCache to look the review up in
         
     Returns:
         {
@@ -56,31 +60,13 @@ async def engine_correlation(
             }
         }
     """
-    # Parse PGN
-    try:
-        game = chess.pgn.read_game(StringIO(pgn))
-        if not game:
-            return {"error": "Could not parse PGN"}
-    except Exception as e:
-        return {"error": f"PGN parse error: {str(e)}"}
-    
-    # Determine which side we're analyzing from headers
-    white = game.headers.get("White", "")
-    black = game.headers.get("Black", "")
-    
-    # Get all positions and moves
-    board = game.board()
-    positions = []
-    moves_played = []
-    
-    for move in game.mainline_moves():
-        positions.append({
-            "fen": board.fen(),
-            "turn": board.turn,
-            "legal_moves": len(list(board.legal_moves))
-        })
-        moves_played.append(move)
-        board.push(move)
+    game = {"pgn": pgn, "game_review": game_review} if game_review else pgn
+    [evals] = await evaluate_games(
+        [game], depth=depth, multipv=top_n + 2, min_lines=top_n,
+        engine_pool=engine_pool, review_cache=review_cache,
+    )
+    if evals.error:
+        return {"error": evals.error}
     
     # Results tracking
     move_details = []
@@ -99,7 +85,7 @@ async def engine_correlation(
     critical_matched = 0
     critical_total = 0
     
-    for idx, (pos, move) in enumerate(zip(positions, moves_played)):
+    for idx in range(len(evals)):
         move_num = idx + 1
         
         # Skip opening moves
@@ -107,87 +93,63 @@ async def engine_correlation(
             continue
         
         # Skip forced moves
-        if exclude_forced and pos["legal_moves"] <= 2:
+        if exclude_forced and evals.legal_moves[idx] <= 2:
             continue
         
-        fen = pos["fen"]
-        played_uci = move.uci()
-        played_san = _move_to_san(fen, move)
+        # Positions neither stored nor analysed can't be compared
+        line_moves = evals.line_moves[idx]
+        if not line_moves:
+            continue
         
-        # Analyze position
-        try:
-            if engine_queue:
-                analysis = await _analyze_for_correlation(
-                    engine_queue, fen, depth, top_n + 2
-                )
-            else:
-                # Placeholder analysis
-                analysis = {
-                    "top_moves": [],
-                    "complexity": "moderate"
-                }
-            
-            top_moves = analysis.get("top_moves", [])
-            complexity = analysis.get("complexity", "moderate")
-            
-            # Find rank of played move
-            rank = None
-            cp_loss = 0
-            for i, m in enumerate(top_moves):
-                if m.get("move") == played_uci:
-                    rank = i + 1
-                    if i > 0:
-                        cp_loss = abs(top_moves[0].get("eval", 0) - m.get("eval", 0))
-                    break
-            
-            if rank is None:
-                rank = len(top_moves) + 1  # Not in top moves
-            
-            matched_top1 = rank == 1
-            matched_top3 = rank <= top_n
-            
-            # Update stats
-            total_analyzed += 1
-            if matched_top1:
-                total_top1 += 1
-            if matched_top3:
-                total_top3 += 1
-            rank_sum += rank
-            
-            # Complexity tracking
-            complexity_breakdown[complexity]["total"] += 1
+        fen = evals.fen_before[idx]
+        top_moves = [{"move": m, "eval": e} for m, e in zip(line_moves, evals.line_evals[idx])]
+        complexity = _assess_complexity(chess.Board(fen), top_moves, evals.legal_moves[idx])
+        
+        # Rank of played move (not among the engine lines -> ranked just below them)
+        rank = evals.played_rank[idx] or len(top_moves) + 1
+        cp_loss = evals.cp_loss[idx]
+        cp_loss = 0 if math.isnan(cp_loss) else int(cp_loss)
+        
+        matched_top1 = rank == 1
+        matched_top3 = rank <= top_n
+        
+        # Update stats
+        total_analyzed += 1
+        if matched_top1:
+            total_top1 += 1
+        if matched_top3:
+            total_top3 += 1
+        rank_sum += rank
+        
+        # Complexity tracking
+        complexity_breakdown[complexity]["total"] += 1
+        if matched_top3:
+            complexity_breakdown[complexity]["matched"] += 1
+        
+        # Critical moves (hard/very_hard)
+        if complexity in ["hard", "very_hard"]:
+            critical_total += 1
             if matched_top3:
-                complexity_breakdown[complexity]["matched"] += 1
-            
-            # Critical moves (hard/very_hard)
-            if complexity in ["hard", "very_hard"]:
-                critical_total += 1
-                if matched_top3:
-                    critical_matched += 1
-            
-            # Build engine top 3 list
-            engine_top3_san = []
-            for m in top_moves[:top_n]:
-                try:
-                    san = _move_to_san(fen, chess.Move.from_uci(m.get("move", "")))
-                    engine_top3_san.append(san)
-                except:
-                    engine_top3_san.append(m.get("move", "?"))
-            
-            move_details.append({
-                "move_num": move_num,
-                "played": played_san,
-                "engine_top3": engine_top3_san,
-                "rank": rank,
-                "matched_top1": matched_top1,
-                "matched_top3": matched_top3,
-                "complexity": complexity,
-                "cp_loss": cp_loss
-            })
-            
-        except Exception as e:
-            print(f"Correlation analysis error at move {move_num}: {e}")
-            continue
+                critical_matched += 1
+        
+        # Build engine top 3 list
+        engine_top3_san = []
+        for m in line_moves[:top_n]:
+            try:
+                engine_top3_san.append(_move_to_san(fen, chess.Move.from_uci(m)))
+            except ValueError:
+                engine_top3_san.append(m or "?")
+        
+        move_details.append({
+            "move_num": move_num,
+            "played": evals.san[idx],
+            "engine_top3": engine_top3_san,
+            "rank": rank,
+            "matched_top1": matched_top1,
+            "matched_top3": matched_top3,
+            "complexity": complexity,
+            "cp_loss": cp_loss
+        })
     
     # Calculate final metrics
     if total_analyzed == 0:
@@ -216,41 +178,6 @@ async def engine_correlation(
     }
 
 
-async def _analyze_for_correlation(
-    engine_queue,
-    fen: str,
-    depth: int,
-    num_lines: int
-) -> Dict:
-    """Analyze position for correlation metrics"""
-    try:
-        board = chess.Board(fen)
-        legal_count = len(list(board.legal_moves))
-        
-        # Analyze
-        result = await engine_queue.analyze(fen, depth=depth, num_lines=num_lines)
-        
-        top_moves = []
-        if result and "lines" in result:
-            for line in result["lines"]:
-                pv = line.get("pv", [])
-                top_moves.append({
-                    "move": pv[0] if pv else "",
-                    "eval": line.get("cp", 0)
-                })
-        
-        # Determine complexity
-        complexity = _assess_complexity(board, top_moves, legal_count)
-        
-        return {
-            "top_moves": top_moves,
-            "complexity": complexity
-        }
-    
-    except Exception as e:
-        return {"top_moves": [], "complexity": "moderate"}
-
-
 def _assess_complexity(board: chess.Board, top_moves: List[Dict], legal_count: int) -> str:
     """
     Assess the complexity of a position.
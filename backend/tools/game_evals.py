@@ -0,0 +1,372 @@
+"""
+Game Evaluation Batch API
+Per-ply engine evaluations for many games at once, shared by the analytics tools
+
+Stored reviews are used first: every ply record carries the serialized engine
+lines of the position before (raw_before) and after (raw_after) its move, so
+a game that was already reviewed costs no engine time. Positions still
+missing are deduplicated across all games (openings repeat a lot) and
+analysed in parallel through the shared EnginePool. Each game comes back as
+columns (one entry per ply) that the statistical tools read directly.
+
+All evals are centipawns from the point of view of the side that moved;
+mates are clamped to ±10000 like the game review.
+"""
+
+import asyncio
+import math
+from array import array
+from dataclasses import dataclass, field
+from io import StringIO
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import chess
+import chess.pgn
+
+from cache.analysis_cache import pgn_clock_timestamps, review_cache_key
+from engine_pool import EnginePool
+from ply_columns import MISSING_EVAL
+from position_key import position_key
+from structured_log import get_logger
+
+_log = get_logger("game_evals")
+
+BLUNDER_CP = 200  # same threshold as the review's "blunder" category
+CRITICAL_GAP_CP = 50  # best line this far ahead of the second -> "critical_best" in the review
+
+_NUMPY_DTYPES = {"B": "u1", "H": "<u2", "i": "<i4", "f": "<f4"}
+
+GameInput = Union[str, Dict[str, Any]]
+
+
+@dataclass
+class GameEvals:
+    """
+    Columnar evaluations for one game; index i is the i-th mainline move.
+
+    Missing values: MISSING_EVAL in the integer eval columns, NaN in cp_loss,
+    0 in played_rank (played move not among the engine lines), None in
+    best_move_uci.
+    """
+    white: str = ""
+    black: str = ""
+    fen_before: List[str] = field(default_factory=list)
+    san: List[str] = field(default_factory=list)
+    uci: List[str] = field(default_factory=list)
+    side: array = field(default_factory=lambda: array("B"))            # 0 white, 1 black
+    legal_moves: array = field(default_factory=lambda: array("H"))
+    eval_before_cp: array = field(default_factory=lambda: array("i"))  # best line, mover POV
+    played_eval_cp: array = field(default_factory=lambda: array("i"))  # after the played move, mover POV
+    cp_loss: array = field(default_factory=lambda: array("f"))
+    multipv_gap_cp: array = field(default_factory=lambda: array("i"))  # best minus second-best line
+    played_rank: array = field(default_factory=lambda: array("H"))     # 1-based rank among engine lines
+    best_move_uci: List[Optional[str]] = field(default_factory=list)
+    line_moves: List[List[str]] = field(default_factory=list)          # first move of each engine line
+    line_evals: List[List[int]] = field(default_factory=list)          # eval of each engine line
+    final_eval_cp: int = MISSING_EVAL  # final position, side to move POV
+    from_review: int = 0  # positions served from stored reviews
+    from_engine: int = 0  # positions analysed for this batch
+    error: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.uci)
+
+    def numpy(self) -> Dict[str, Any]:
+        """Numeric columns as NumPy arrays (copies). Requires NumPy."""
+        import numpy as np
+
+        return {
+            name: np.frombuffer(getattr(self, name).tobytes(), dtype=np.dtype(_NUMPY_DTYPES[getattr(self, name).typecode]))
+            for name in ("side", "legal_moves", "eval_before_cp", "played_eval_cp", "cp_loss", "multipv_gap_cp", "played_rank")
+        }
+
+    def side_of(self, player: Optional[str]) -> Optional[int]:
+        """0/1 for the side `player` had in this game, None when they didn't play it (or no player given)."""
+        name = (player or "").strip().lower()
+        if not name:
+            return None
+        if self.white.strip().lower() == name:
+            return 0
+        if self.black.strip().lower() == name:
+            return 1
+        return None
+
+    def metrics(self, side: Optional[int] = None, skip_plies: int = 0) -> Dict[str, Any]:
+        """
+        Game-level metrics in the shape player_baseline / anomaly_detection read.
+
+        Args:
+            side: 0 white, 1 black, None both
+            skip_plies: Leading plies to ignore (book moves)
+        """
+        plies = [
+            i for i in range(skip_plies, len(self))
+            if (side is None or self.side[i] == side) and not math.isnan(self.cp_loss[i])
+        ]
+        if not plies:
+            return {"move_count": 0}
+        losses = [self.cp_loss[i] for i in plies]
+        blunders = sum(1 for loss in losses if loss >= BLUNDER_CP)
+        metrics = {
+            "accuracy": _accuracy(losses),
+            "cp_loss": round(sum(losses) / len(losses), 2),
+            "blunder_count": blunders,
+            "move_count": len(losses),
+            "blunder_rate": round(blunders / len(losses), 4),
+        }
+        critical = [
+            self.cp_loss[i] for i in plies
+            if self.multipv_gap_cp[i] != MISSING_EVAL and self.multipv_gap_cp[i] >= CRITICAL_GAP_CP
+        ]
+        if critical:
+            metrics["critical_accuracy"] = _accuracy(critical)
+        return metrics
+
+
+def _accuracy(losses: List[float]) -> float:
+    """Mean per-move accuracy, same curve as the review's accuracy_pct."""
+    return round(sum(100 / (1 + (loss / 50) ** 0.7) for loss in losses) / len(losses), 2)
+
+
+def _parse_game(game: GameInput) -> Optional[chess.pgn.Game]:
+    pgn = game if isinstance(game, str) else (game.get("pgn") or "")
+    if not pgn:
+        return None
+    try:
+        return chess.pgn.read_game(StringIO(pgn))
+    except Exception:
+        return None
+
+
+def _stored_ply_records(game: GameInput) -> List[Dict[str, Any]]:
+    if not isinstance(game, dict):
+        return []
+    review = game.get("game_review") if isinstance(game.get("game_review"), dict) else game
+    return review.get("ply_records") or []
+
+
+def _engine_entry(raw: Any) -> Optional[Dict[str, Any]]:
+    """Serialized engine lines (raw_before / raw_after shape) or None."""
+    if isinstance(raw, dict) and raw.get("engine_info") and "eval_cp" in raw and not raw.get("error"):
+        return raw
+    return None
+
+
+def _enough(entry: Dict[str, Any], min_lines: int, min_depth: Optional[int], legal: int) -> bool:
+    if len(entry["engine_info"]) < min(min_lines, legal):
+        return False
+    return min_depth is None or int(entry.get("search_depth") or 0) >= min_depth
+
+
+async def evaluate_positions(
+    fens: Iterable[str],
+    *,
+    depth: int = 18,
+    multipv: int = 2,
+    engine_pool: Optional[EnginePool] = None,
+    concurrency: Optional[int] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Analyse positions through the engine pool, at most `concurrency` at a time.
+
+    Returns:
+        {position_key: {"eval_cp", "best_move_uci", "engine_info", "search_depth"}};
+        positions the engine failed on are left out
+    """
+    unique: Dict[int, str] = {}
+    for fen in fens:
+        unique.setdefault(position_key(fen), fen)
+    if not unique or engine_pool is None:
+        return {}
+
+    # Bounded so hundreds of games don't queue past the pool's acquire timeout
+    semaphore = asyncio.Semaphore(max(1, concurrency or getattr(engine_pool, "pool_size", 4)))
+    results: Dict[int, Dict[str, Any]] = {}
+
+    async def _one(key: int, fen: str) -> None:
+        async with semaphore:
+            outcome = await engine_pool.analyze_single(fen, depth=depth, multipv=multipv)
+        if outcome.get("success") and outcome.get("result"):
+            results[key] = EnginePool._serialize_engine_info(outcome["result"], depth)
+        else:
+            _log.warning(f"   ⚠️ [GAME_EVALS] engine failed: {outcome.get('error')}", every=5.0, key="engine_failed")
+
+    await asyncio.gather(*(_one(key, fen) for key, fen in unique.items()))
+    return results
+
+
+async def evaluate_games(
+    games: List[GameInput],
+    *,
+    depth: int = 18,
+    multipv: int = 2,
+    min_lines: int = 1,
+    min_stored_depth: Optional[int] = None,
+    engine_pool: Optional[EnginePool] = None,
+    review_cache: Any = None,
+    concurrency: Optional[int] = None,
+) -> List[GameEvals]:
+    """
+    Evaluate every mainline move of every game.
+
+    Args:
+        games: PGN strings, or dicts with "pgn" and optionally the stored
+            review ("game_review" or top-level "ply_records")
+        depth: Engine depth for positions that must be analysed
+        multipv: Engine lines to request for those positions
+        min_lines: Lines a stored position needs to be reused (capped at its legal move count)
+        min_stored_depth: Minimum search depth of reused positions (None: any)
+        engine_pool: Shared EnginePool; without it missing positions stay missing
+        review_cache: AnalysisCache consulted for games without an attached review
+        concurrency: Parallel engine analyses (default: pool size)
+
+    Returns:
+        One GameEvals per input game, in input order
+    """
+    stored: Dict[int, Dict[str, Any]] = {}
+    parsed = [_parse_game(game) for game in games]
+    attached = [_stored_ply_records(game) for game in games]
+
+    # Reviews of the other games from the cache; lookups may hit Supabase, so they run in threads
+    lookups = [
+        asyncio.to_thread(_cached_ply_records, review_cache, pgn_game)
+        for pgn_game, records in zip(parsed, attached)
+        if not records and pgn_game is not None and review_cache is not None
+    ]
+    cached = await asyncio.gather(*lookups)
+
+    for records in attached + cached:
+        for record in records:
+            for fen_key, raw_key in (("fen_before", "raw_before"), ("fen_after", "raw_after")):
+                entry = _engine_entry(record.get(raw_key))
+                if entry is not None and record.get(fen_key):
+                    stored.setdefault(position_key(record[fen_key]), entry)
+
+    # Walk every game once: reuse stored positions that are good enough, collect the rest
+    walks = []
+    missing: Dict[int, str] = {}
+    for pgn_game in parsed:
+        if pgn_game is None:
+            walks.append(None)
+            continue
+        board = pgn_game.board()
+        plies = []
+        for move in pgn_game.mainline_moves():
+            plies.append((board.fen(), board.san(move), move.uci(), board.turn, board.legal_moves.count(), position_key(board)))
+            board.push(move)
+        final = (board.fen(), position_key(board), board.legal_moves.count(), board.is_checkmate())
+        walks.append((pgn_game, plies, final))
+        # Games ending in mate/stalemate (no legal moves): the final position needs no engine
+        for fen, _san, _uci, _turn, legal, key in plies + [(final[0], "", "", None, final[2], final[1])]:
+            entry = stored.get(key)
+            if legal and (entry is None or not _enough(entry, min_lines, min_stored_depth, legal)):
+                missing.setdefault(key, fen)
+
+    analysed = await evaluate_positions(
+        missing.values(), depth=depth, multipv=multipv, engine_pool=engine_pool, concurrency=concurrency,
+    )
+    _log.info(lambda: (
+        f"   📊 [GAME_EVALS] {len(games)} games: {len(stored)} stored positions, "
+        f"{len(analysed)}/{len(missing)} analysed at depth {depth}"
+    ))
+    return [_columns(walk, stored, analysed) for walk in walks]
+
+
+def _cached_ply_records(review_cache: Any, pgn_game: chess.pgn.Game) -> List[Dict[str, Any]]:
+    """
+    ply_records of a stored review of this game, if any.
+
+    /review_game keys reviews with the game's clock times, so those are tried
+    first; the clock-free key covers reviews made without timestamps.
+    """
+    timestamps = pgn_clock_timestamps(pgn_game)
+    keys = [review_cache_key(pgn_game, timestamps)]
+    if timestamps:
+        keys.append(review_cache_key(pgn_game))
+    for key in keys:
+        try:
+            review = review_cache.get_review(key, 0, adaptive=True)
+        except Exception as e:
+            _log.warning(f"   ⚠️ [GAME_EVALS] review cache lookup failed: {e}", every=5.0, key="review_cache")
+            continue
+        if review is not None:
+            return review.get("ply_records") or []
+    return []
+
+
+def _columns(walk, stored: Dict[int, Dict[str, Any]], analysed: Dict[int, Dict[str, Any]]) -> GameEvals:
+    if walk is None:
+        return GameEvals(error="Could not parse PGN")
+    pgn_game, plies, (_final_fen, final_key, final_legal, mated) = walk
+    evals = GameEvals(white=pgn_game.headers.get("White", ""), black=pgn_game.headers.get("Black", ""))
+
+    def _lookup(key: int) -> Optional[Dict[str, Any]]:
+        if key in analysed:
+            evals.from_engine += 1
+            return analysed[key]
+        if key in stored:
+            evals.from_review += 1
+            return stored[key]
+        return None
+
+    entries = [_lookup(key) for *_rest, key in plies]
+    if final_legal:
+        final_entry = _lookup(final_key)
+    else:
+        final_entry = {"eval_cp": -10000 if mated else 0, "engine_info": [], "best_move_uci": None}
+    after = entries[1:] + [final_entry]
+
+    for (fen, san, uci, turn, legal, _key), before, nxt in zip(plies, entries, after):
+        lines = (before or {}).get("engine_info") or []
+        moves = [line["pv"][0] if line.get("pv") else "" for line in lines]
+        scores = [int(line.get("eval_cp", 0)) for line in lines]
+        best = scores[0] if scores else MISSING_EVAL
+        played = -int(nxt["eval_cp"]) if nxt is not None else MISSING_EVAL
+        if nxt is None and uci in moves:
+            played = scores[moves.index(uci)]
+
+        evals.fen_before.append(fen)
+        evals.san.append(san)
+        evals.uci.append(uci)
+        evals.side.append(0 if turn == chess.WHITE else 1)
+        evals.legal_moves.append(legal)
+        evals.eval_before_cp.append(best)
+        evals.played_eval_cp.append(played)
+        evals.cp_loss.append(max(0, best - played) if MISSING_EVAL not in (best, played) else math.nan)
+        evals.multipv_gap_cp.append(scores[0] - scores[1] if len(scores) >= 2 else MISSING_EVAL)
+        evals.played_rank.append(moves.index(uci) + 1 if uci in moves else 0)
+        evals.best_move_uci.append((before or {}).get("best_move_uci") or (moves[0] if moves else None))
+        evals.line_moves.append(moves)
+        evals.line_evals.append(scores)
+
+    if final_entry is not None:
+        evals.final_eval_cp = int(final_entry["eval_cp"])
+    return evals
+
+
+async def game_metrics(
+    games: List[GameInput],
+    *,
+    player: Optional[str] = None,
+    skip_plies: int = 0,
+    **evaluate_kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate games in one batch and return per-game metrics
+    (accuracy, cp_loss, blunder_rate, critical_accuracy, ...) for the
+    baseline and anomaly tools.
+
+    With `player`, only their moves count and games they didn't play are
+    skipped; games without evaluated moves are skipped too.
+    """
+    results = []
+    for evals in await evaluate_games(games, **evaluate_kwargs):
+        if evals.error:
+            continue
+        side = evals.side_of(player)
+        if player and side is None:
+            continue
+        metrics = evals.metrics(side, skip_plies=skip_plies)
+        if metrics["move_count"]:
+            results.append(metrics)
+    return results
@@ -3,9 +3,11 @@ Player Baseline Tool
 Calculates a player's historical performance baseline from their games
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 import math
 
+from .game_evals import game_metrics
+
 
 async def calculate_baseline(
     games: List[Dict],
@@ -176,21 +178,34 @@ def _remove_outliers(values: List[float], k: float = 1.5) -> List[float]:
 
 
 async def calculate_baseline_from_pgns(
-    pgns: List[str],
-    engine_queue = None,
-    depth: int = 15
+    pgns: List[Union[str, Dict]],
+    engine_pool = None,
+    depth: int = 15,
+    player: Optional[str] = None,
+    exclude_book_plies: int = 0,
+    review_cache = None,
+    exclude_outliers: bool = True,
+    min_games: int = 10
 ) -> Dict:
     """
     Calculate baseline from raw PGN strings by analyzing each game.
     
-    This is a convenience wrapper that analyzes games then calculates baseline.
+    Games are evaluated in one batch (see tools.game_evals): stored reviews
+    are reused, the remaining positions are analysed in parallel.
+    
+    Args:
+        pgns: PGN strings, or game dicts with "pgn" and their stored "game_review"
+        engine_pool: Shared EnginePool for positions without stored evals
+        depth: Engine depth for those positions
+        player: Only count this player's moves (White/Black header)
+        exclude_book_plies: Leading plies to ignore in every game
+        review_cache: AnalysisCache to look stored reviews up in
     """
-    # This would need the review_game function to analyze each PGN
-    # For now, return a placeholder
-    return {
-        "error": "Use calculate_baseline() with pre-analyzed games",
-        "hint": "Analyze games with review_full_game first, then pass results"
-    }
+    games = await game_metrics(
+        pgns, player=player, skip_plies=exclude_book_plies,
+        depth=depth, engine_pool=engine_pool, review_cache=review_cache,
+    )
+    return await calculate_baseline(games, exclude_outliers=exclude_outliers, min_games=min_games)
 
 
 # Tool schema for LLM
@@ -2,12 +2,32 @@
 Two-Move Win Engine - Fast Tactical Scanner
 Purpose: Identify when wins/advantages or losses/disadvantages can materialize in 1-2 moves.
 Scans for open tactics, blocked tactics, captures, promotions, checkmates, and mate patterns.
+
+Probing is done in place: every scanner works on one shared board with
+push/pop (no board copies), legal moves are generated once per position, and
+tactic validations are memoized per (position, move, side) so the fork,
+skewer, discovered-attack, double-attack, pin and capture scanners share
+candidate results. scan_line() scans every ply of a PV on a single board.
 """
 
 import chess
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass, field
 
+from static_exchange import position_see
+
+# Bound for the per-engine legal-move / validation memos (cleared when full)
+_MEMO_SIZE = 4096
+
+
+def _board_key(board: chess.Board) -> Tuple:
+    """Position identity for memoization (pieces, side to move, castling, ep)."""
+    return (
+        board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+        board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK], board.promoted,
+        board.turn, board.castling_rights, board.ep_square,
+    )
+
 
 @dataclass
 class TwoMoveWinResult:
@@ -144,10 +164,66 @@ class TwoMoveWinEngine:
             chess.QUEEN: 'Queen',
             chess.KING: 'King'
         }
+        self._legal_memo: Dict[Tuple, Tuple[chess.Move, ...]] = {}
+        self._validation_memo: Dict[Tuple, Dict[str, Any]] = {}
+
+    def _legal_moves(self, board: chess.Board) -> Tuple[chess.Move, ...]:
+        """Legal moves of the current position, generated once per position."""
+        key = _board_key(board)
+        moves = self._legal_memo.get(key)
+        if moves is None:
+            if len(self._legal_memo) >= _MEMO_SIZE:
+                self._legal_memo.clear()
+            moves = tuple(board.legal_moves)
+            self._legal_memo[key] = moves
+        return moves
+
+    def _gives_check(
+        self,
+        board: chess.Board,
+        move: chess.Move,
+        king_attacked: Optional[bool] = None
+    ) -> bool:
+        """
+        board.gives_check() from attack masks, without pushing the move.
+
+        king_attacked: whether the opponent king is already attacked (only possible when
+        scanners flip the turn); pass board.was_into_check() when probing many moves.
+        """
+        if king_attacked is None:
+            king_attacked = board.was_into_check()
+        if king_attacked or board.is_castling(move) or board.is_en_passant(move):
+            return board.gives_check(move)
+        us = board.turn
+        king_bb = board.kings & board.occupied_co[not us]
+        if not king_bb:
+            return False
+        king = chess.msb(king_bb)
+        from_sq, to_sq = move.from_square, move.to_square
+        occupied = (board.occupied & ~chess.BB_SQUARES[from_sq]) | chess.BB_SQUARES[to_sq]
+        # Discovered check: only possible if from_square lies on a line between the king and one of our sliders
+        sliders = (board.bishops | board.rooks | board.queens) & board.occupied_co[us] & ~chess.BB_SQUARES[from_sq]
+        if chess.BB_RAYS[king][from_sq] & sliders:
+            if board.attackers_mask(us, king, occupied) & sliders:
+                return True
+        # Direct check by the moved (or promoted) piece from its destination
+        piece_type = move.promotion or board.piece_type_at(from_sq)
+        if piece_type == chess.PAWN:
+            return bool(chess.BB_PAWN_ATTACKS[us][to_sq] & king_bb)
+        if piece_type == chess.KNIGHT:
+            return bool(chess.BB_KNIGHT_ATTACKS[to_sq] & king_bb)
+        if piece_type not in (chess.BISHOP, chess.ROOK, chess.QUEEN) or not chess.BB_RAYS[king][to_sq]:
+            return False
+        attacks = 0
+        if piece_type != chess.ROOK:
+            attacks |= chess.BB_DIAG_ATTACKS[to_sq][chess.BB_DIAG_MASKS[to_sq] & occupied]
+        if piece_type != chess.BISHOP:
+            attacks |= (
+                chess.BB_RANK_ATTACKS[to_sq][chess.BB_RANK_MASKS[to_sq] & occupied]
+                | chess.BB_FILE_ATTACKS[to_sq][chess.BB_FILE_MASKS[to_sq] & occupied]
+            )
+        return bool(attacks & king_bb)
 
-        # SEE-style capture/recapture proof depth (plies). This intentionally ignores non-capture zwischenzug lines.
-        self._see_max_plies = 8
-    
     async def scan_two_move_tactics(
         self,
         fen: str,
@@ -165,42 +241,91 @@ class TwoMoveWinEngine:
             TwoMoveWinResult with all tactical findings
         """
         board = chess.Board(fen)
+        return self._scan_board(board, side_to_move)
+
+    async def scan_line(
+        self,
+        fen: str,
+        moves: Sequence[Union[str, chess.Move]],
+        side_to_move: Optional[chess.Color] = None
+    ) -> List[TwoMoveWinResult]:
+        """
+        Scan every ply of a line (e.g. a PV) in one call.
+
+        Args:
+            fen: FEN of the starting position
+            moves: SAN/UCI strings or chess.Move objects played from fen
+            side_to_move: Side to analyze at every ply; None scans for whichever
+                side is to move at that ply
+
+        Returns:
+            One TwoMoveWinResult per position: index 0 is the start, index i the
+            position after moves[:i]. Stops early at the first illegal move.
+        """
+        board = chess.Board(fen)
+        results = [self._scan_board(board, board.turn if side_to_move is None else side_to_move)]
+        for token in moves:
+            try:
+                if isinstance(token, chess.Move):
+                    move = token
+                else:
+                    try:
+                        move = board.parse_san(token)
+                    except ValueError:
+                        move = chess.Move.from_uci(token)
+                if not board.is_legal(move):
+                    break
+            except ValueError:
+                break
+            board.push(move)
+            results.append(self._scan_board(board, board.turn if side_to_move is None else side_to_move))
+        return results
+
+    def _scan_board(
+        self,
+        board: chess.Board,
+        side_to_move: chess.Color
+    ) -> TwoMoveWinResult:
+        """Run all scanners on `board` in place; the board is restored on return."""
+        original_turn = board.turn
         # Important: many detectors rely on board.turn; honor caller's side_to_move explicitly.
         # This allows safe scanning even if fen turn mismatches the requested side.
         board.turn = side_to_move
         result = TwoMoveWinResult()
         
-        # 1. Scan for open tactics (1-move deep)
-        result.open_tactics = self._scan_open_tactics(board, side_to_move)
-        
-        # 2. Scan for blocked tactics (2-move deep: clear + tactic)
-        result.blocked_tactics = self._scan_blocked_tactics(board, side_to_move)
-        
-        # 3. Scan for open captures
-        result.open_captures = self._scan_open_captures(board, side_to_move)
-        
-        # 4. Scan for closed captures
-        result.closed_captures = self._scan_closed_captures(board, side_to_move)
-        
-        # 5. Scan for promotions
-        result.promotions = self._scan_promotions(board, side_to_move)
-        
-        # 6. Scan for checkmates
-        result.checkmates = self._scan_checkmates(board, side_to_move)
-        
-        # 7. Scan for mate patterns
-        result.mate_patterns = self._scan_mate_patterns(board, side_to_move)
+        try:
+            # 1. Scan for open tactics (1-move deep)
+            result.open_tactics = self._scan_open_tactics(board, side_to_move)
+            
+            # 2. Scan for blocked tactics (2-move deep: clear + tactic)
+            result.blocked_tactics = self._scan_blocked_tactics(board, side_to_move)
+            
+            # 3. Scan for open captures
+            result.open_captures = self._scan_open_captures(board, side_to_move)
+            
+            # 4. Scan for closed captures
+            result.closed_captures = self._scan_closed_captures(board, side_to_move)
+            
+            # 5. Scan for promotions
+            result.promotions = self._scan_promotions(board, side_to_move)
+            
+            # 6. Scan for checkmates
+            result.checkmates = self._scan_checkmates(board, side_to_move)
+            
+            # 7. Scan for mate patterns
+            result.mate_patterns = self._scan_mate_patterns(board, side_to_move)
+            
+            # Check opponent's tactics (threats if the opponent were to move next),
+            # on the same board with the turn flipped.
+            board.turn = (not side_to_move)
+            opponent_tactics = self._scan_open_tactics(board, not side_to_move)
+        finally:
+            board.turn = original_turn
         
         # Set summary flags
         result.has_winning_tactic = any(
             t.get("threat_level") == "winning" for t in result.open_tactics
         )
-        
-        # Check opponent's tactics (threats if the opponent were to move next).
-        # We scan on a copy with turn flipped to avoid parse_san / legality mismatches.
-        opponent_board = chess.Board(fen)
-        opponent_board.turn = (not side_to_move)
-        opponent_tactics = self._scan_open_tactics(opponent_board, not side_to_move)
         result.has_losing_tactic = any(
             t.get("threat_level") == "winning" for t in opponent_tactics
         )
@@ -326,11 +451,11 @@ class TwoMoveWinEngine:
                     pass
             
             # Check for discovered attacks (check each move)
-            for move in board.legal_moves:
+            for move in self._legal_moves(board):
                 if board.turn == side:
-                    move_san = board.san(move)
                     discovered = self._check_discovered_attack(board, move)
                     if discovered:
+                        move_san = board.san(move)
                         # Validate discovered attack
                         validation = self._validate_tactic(board, move, "discovered_attack", side)
                         if validation["is_valid_tactic"]:
@@ -447,7 +572,7 @@ class TwoMoveWinEngine:
         # For each legal move, check if it unblocks a tactic
         # Ensure scan is for the right side
         board.turn = side
-        for move in board.legal_moves:
+        for move in self._legal_moves(board):
             if board.turn != side:
                 continue
             required_move_san = board.san(move)
@@ -457,9 +582,13 @@ class TwoMoveWinEngine:
             # Check if tactic is now available
             try:
                 from threat_analyzer import is_fork, is_skewer
+
+                # Only the scanning side's follow-ups count
+                if board.turn != side:
+                    continue
                 
                 # Check for fork after clearing
-                for follow_move in board.legal_moves:
+                for follow_move in self._legal_moves(board):
                     if board.turn == side:
                         if is_fork(board, follow_move):
                             # Validate the fork after clearing
@@ -481,7 +610,7 @@ class TwoMoveWinEngine:
                             break
                 
                 # Check for skewer after clearing
-                for follow_move in board.legal_moves:
+                for follow_move in self._legal_moves(board):
                     if board.turn == side:
                         if is_skewer(board, follow_move):
                             # Validate the skewer after clearing
@@ -519,7 +648,7 @@ class TwoMoveWinEngine:
         captures = []
         
         board.turn = side
-        for move in board.legal_moves:
+        for move in self._legal_moves(board):
             if board.turn != side:
                 continue
             
@@ -746,70 +875,72 @@ class TwoMoveWinEngine:
         """Scan for checkmate opportunities - VALIDATED (only forcing sequences)"""
         checkmates = []
         
-        # Check for mate in 1
+        # Check for mate in 1 (only checking moves can mate)
         board.turn = side
-        for move in board.legal_moves:
-            if board.turn != side:
+        king_attacked = board.was_into_check()
+        for move in self._legal_moves(board):
+            if board.turn != side or not self._gives_check(board, move, king_attacked):
                 continue
-            move_san = board.san(move)
             board.push(move)
-            if board.is_checkmate():
+            is_mate = board.is_checkmate()
+            board.pop()
+            if is_mate:
                 # Mate in 1 is always valid
                 checkmates.append({
                     "type": "mate_in_1",
-                    "sequence": [move_san],
+                    "sequence": [board.san(move)],
                     "pattern": "other",
                     "moves": 1,
                     "is_valid_tactic": True,
                     "forced_sequence_exists": True
                 })
-            board.pop()
         
         # Check for mate in 2 (only if forcing)
-        for move in board.legal_moves:
-            if board.turn != side:
+        for move in self._legal_moves(board):
+            if board.turn != side or not self._gives_check(board, move, king_attacked):
                 continue
             first_san = board.san(move)
             board.push(move)
-            if board.is_check():
-                # Check if opponent has very limited responses
-                responses = list(board.legal_moves)
-                if len(responses) <= 2:
-                    # Check if ALL defenses allow a mate-in-1 reply (forcing mate in 2)
-                    all_defenses_lose = True
-                    chosen_line = None  # [first, defense, mate]
-
-                    for defense in responses:
-                        defense_san = board.san(defense)
-                        board.push(defense)
-
-                        mate_reply = None
-                        for reply in board.legal_moves:
-                            reply_san = board.san(reply)
-                            board.push(reply)
-                            is_mate = board.is_checkmate()
-                            board.pop()
-                            if is_mate:
-                                mate_reply = reply_san
-                                break
+            # Check if opponent has very limited responses
+            responses = self._legal_moves(board)
+            if len(responses) <= 2:
+                # Check if ALL defenses allow a mate-in-1 reply (forcing mate in 2)
+                all_defenses_lose = True
+                chosen_line = None  # [first, defense, mate]
 
-                        board.pop()
+                for defense in responses:
+                    defense_san = board.san(defense)
+                    board.push(defense)
 
-                        if mate_reply is None:
-                            all_defenses_lose = False
+                    mate_reply = None
+                    reply_king_attacked = board.was_into_check()
+                    for reply in self._legal_moves(board):
+                        if not self._gives_check(board, reply, reply_king_attacked):
+                            continue
+                        board.push(reply)
+                        is_mate = board.is_checkmate()
+                        board.pop()
+                        if is_mate:
+                            mate_reply = board.san(reply)
                             break
-                        if chosen_line is None:
-                            chosen_line = [first_san, defense_san, mate_reply]
-
-                    if all_defenses_lose and chosen_line:
-                        checkmates.append({
-                            "type": "mate_in_2",
-                            "sequence": chosen_line,  # 3 plies: move, defense, mate
-                            "pattern": "other",
-                            "moves": 2,
-                            "is_valid_tactic": True,
-                            "forced_sequence_exists": True
-                        })
+
+                    board.pop()
+
+                    if mate_reply is None:
+                        all_defenses_lose = False
+                        break
+                    if chosen_line is None:
+                        chosen_line = [first_san, defense_san, mate_reply]
+
+                if all_defenses_lose and chosen_line:
+                    checkmates.append({
+                        "type": "mate_in_2",
+                        "sequence": chosen_line,  # 3 plies: move, defense, mate
+                        "pattern": "other",
+                        "moves": 2,
+                        "is_valid_tactic": True,
+                        "forced_sequence_exists": True
+                    })
             board.pop()
         
         return checkmates
@@ -852,6 +983,13 @@ class TwoMoveWinEngine:
         if mover_piece is None:
             return None
         mover_side = mover_piece.color
+        from_sq = move.from_square
+
+        # Only sliders whose line of attack currently ends on from_sq can be uncovered.
+        sliders = (board.rooks | board.bishops | board.queens) & board.occupied_co[mover_side]
+        sliders &= board.attackers_mask(mover_side, from_sq)
+        if not sliders:
+            return None
 
         # Compute SAN on the pre-move board (safe; caller also does this, but keep local).
         try:
@@ -859,8 +997,6 @@ class TwoMoveWinEngine:
         except Exception:
             return None
 
-        from_sq = move.from_square
-
         # Helper: ray iteration
         def _ray(start_sq: chess.Square, df: int, dr: int):
             f = chess.square_file(start_sq) + df
@@ -877,12 +1013,8 @@ class TwoMoveWinEngine:
         # Find discovered targets: slider is blocked FIRST by from_sq, and beyond is an enemy piece.
         candidates: List[tuple[chess.Square, chess.Square]] = []  # (slider_sq, target_sq)
 
-        for slider_sq in chess.SQUARES:
+        for slider_sq in chess.scan_forward(sliders):
             p = board.piece_at(slider_sq)
-            if not p or p.color != mover_side:
-                continue
-            if p.piece_type not in (chess.ROOK, chess.BISHOP, chess.QUEEN):
-                continue
 
             dirs = []
             if p.piece_type in (chess.ROOK, chess.QUEEN):
@@ -919,29 +1051,35 @@ class TwoMoveWinEngine:
             return None
 
         # Validate on the post-move position: the slider must actually attack the target.
-        post = board.copy(stack=False)
+        # Probe in place (push/pop) and restore the caller's turn afterwards.
+        original_turn = board.turn
+        depth = len(board.move_stack)
+        targets: List[str] = []
         try:
-            post.turn = mover_side
-            if move not in post.legal_moves:
+            board.turn = mover_side
+            if not board.is_legal(move):
                 return None
-            post.push(move)
-        except Exception:
-            return None
+            board.push(move)
 
-        targets: List[str] = []
-        for slider_sq, target_sq in candidates:
-            try:
-                # Slider piece must still exist and attack the target square.
-                slider_piece_post = post.piece_at(slider_sq)
-                target_piece_post = post.piece_at(target_sq)
-                if not slider_piece_post or slider_piece_post.color != mover_side:
-                    continue
-                if not target_piece_post or target_piece_post.color == mover_side:
+            for slider_sq, target_sq in candidates:
+                try:
+                    # Slider piece must still exist and attack the target square.
+                    slider_piece_post = board.piece_at(slider_sq)
+                    target_piece_post = board.piece_at(target_sq)
+                    if not slider_piece_post or slider_piece_post.color != mover_side:
+                        continue
+                    if not target_piece_post or target_piece_post.color == mover_side:
+                        continue
+                    if target_sq in board.attacks(slider_sq):
+                        targets.append(chess.square_name(target_sq))
+                except Exception:
                     continue
-                if target_sq in post.attacks(slider_sq):
-                    targets.append(chess.square_name(target_sq))
-            except Exception:
-                continue
+        except Exception:
+            return None
+        finally:
+            while len(board.move_stack) > depth:
+                board.pop()
+            board.turn = original_turn
 
         # Sanity gate: if we don't have real enemy targets, don't emit.
         targets = list(dict.fromkeys([t for t in targets if isinstance(t, str) and t]))
@@ -966,22 +1104,21 @@ class TwoMoveWinEngine:
         double_attacks = []
         
         board.turn = side
-        for move in board.legal_moves:
+        for move in self._legal_moves(board):
             if board.turn != side:
                 continue
-            move_san = board.san(move)
             board.push(move)
             # Count how many enemy pieces are attacked
             attacked_count = 0
             targets = []
-            for square in chess.SQUARES:
-                piece = board.piece_at(square)
-                if piece and piece.color != side:
-                    if board.is_attacked_by(side, square):
-                        attacked_count += 1
-                        targets.append(chess.square_name(square))
+            for square in chess.scan_forward(board.occupied_co[not side]):
+                if board.is_attacked_by(side, square):
+                    attacked_count += 1
+                    targets.append(chess.square_name(square))
+            board.pop()
             
             if attacked_count >= 2:
+                move_san = board.san(move)
                 double_attacks.append({
                     "type": "double_attack",
                     "move": move_san,
@@ -990,8 +1127,6 @@ class TwoMoveWinEngine:
                     "material_gain": 0.0,  # Unknown without deeper analysis
                     "threat_level": "equal"
                 })
-            
-            board.pop()
         
         return double_attacks
     
@@ -1098,8 +1233,28 @@ class TwoMoveWinEngine:
                 "rejection_reason": str or None
             }
         """
-        # Work on a copy so we never corrupt the caller's board state.
-        sim = board.copy(stack=False)
+        # Scanners re-validate the same candidate (fork, skewer, discovered, double attack,
+        # capture); the outcome only depends on position, move and side.
+        memo_key = (_board_key(board), tactic_move, side)
+        cached = self._validation_memo.get(memo_key)
+        if cached is None:
+            cached = self._probe_tactic(board, tactic_move, side)
+            if len(self._validation_memo) >= _MEMO_SIZE:
+                self._validation_memo.clear()
+            self._validation_memo[memo_key] = cached
+        return dict(cached)
+
+    def _probe_tactic(
+        self,
+        board: chess.Board,
+        tactic_move: chess.Move,
+        side: chess.Color
+    ) -> Dict[str, Any]:
+        """Uncached body of _validate_tactic."""
+        # Probe in place with push/pop; the caller's move stack and turn are restored below.
+        sim = board
+        original_turn = sim.turn
+        depth = len(sim.move_stack)
         result = {
             "is_valid_tactic": False,
             "forced_sequence_exists": False,
@@ -1112,7 +1267,7 @@ class TwoMoveWinEngine:
         try:
             # Step 1: Simulate the tactic move
             sim.turn = side
-            if tactic_move not in sim.legal_moves:
+            if not sim.is_legal(tactic_move):
                 result["rejection_reason"] = "illegal_move"
                 return result
             
@@ -1175,6 +1330,10 @@ class TwoMoveWinEngine:
         except Exception as e:
             # On any error, reject conservatively
             result["rejection_reason"] = f"validation_error: {str(e)}"
+        finally:
+            while len(sim.move_stack) > depth:
+                sim.pop()
+            sim.turn = original_turn
         
         return result
 
@@ -1189,89 +1348,39 @@ class TwoMoveWinEngine:
     ) -> Dict[str, Any]:
         """
         Check whether opponent can refute the tactic by immediately capturing the moved piece on its destination square,
-        using capture-only minimax (SEE-style) on that square.
+        using static exchange evaluation on that square (static_exchange, x-ray aware).
         """
+        sim = board
+        original_turn = sim.turn
+        depth = len(sim.move_stack)
         try:
-            sim = board.copy(stack=False)
             sim.turn = side
-            if tactic_move not in sim.legal_moves:
+            if not sim.is_legal(tactic_move):
                 return {"refuted": False, "net_if_recaptured": None, "refutation_line": None}
 
             sim.push(tactic_move)
             dest_sq = tactic_move.to_square
 
+            see = position_see(sim)
+            opponent = not side
             # If opponent has no capture on destination square, no simple recapture refutation exists.
-            opp_caps = [m for m in sim.legal_moves if sim.is_capture(m) and m.to_square == dest_sq]
-            if not opp_caps:
+            if not see.is_attacked_by(opponent, dest_sq):
                 return {"refuted": False, "net_if_recaptured": 0.0, "refutation_line": None}
 
-            net, line = self._see_best_line(
-                sim,
-                target_sq=dest_sq,
-                perspective_side=side,
-                plies=0,
-                max_plies=self._see_max_plies
-            )
-            return {"refuted": net < 0, "net_if_recaptured": net, "refutation_line": line}
+            opponent_gain = see.gain(dest_sq, opponent)
+            line = None
+            if opponent_gain > 0:
+                line = []
+                for move in see.line(dest_sq, opponent):
+                    line.append(sim.san(move) if sim.is_legal(move) else move.uci())
+                    sim.push(move)
+            return {"refuted": opponent_gain > 0, "net_if_recaptured": float(-opponent_gain), "refutation_line": line}
         except Exception:
             return {"refuted": False, "net_if_recaptured": None, "refutation_line": None}
-
-    def _see_best_line(
-        self,
-        board: chess.Board,
-        target_sq: int,
-        perspective_side: chess.Color,
-        plies: int,
-        max_plies: int
-    ) -> Tuple[float, List[str]]:
-        """
-        Capture-only minimax exchange evaluator on one square.
-        Returns (net material for perspective_side, SAN line).
-        """
-        if plies >= max_plies:
-            return 0.0, []
-
-        victim_piece = board.piece_at(target_sq)
-        if victim_piece is None:
-            return 0.0, []
-
-        legal_caps = [m for m in board.legal_moves if board.is_capture(m) and m.to_square == target_sq]
-        if not legal_caps:
-            return 0.0, []
-
-        side_to_move = board.turn
-        best_val = -1e9 if side_to_move == perspective_side else 1e9
-        best_line: List[str] = []
-
-        for move in legal_caps:
-            victim = board.piece_at(target_sq)
-            if victim is None:
-                continue
-            cap_val = float(self.piece_values.get(victim.piece_type, 0))
-            signed = cap_val if side_to_move == perspective_side else -cap_val
-
-            try:
-                san = board.san(move)
-            except Exception:
-                san = move.uci()
-
-            board.push(move)
-            cont_val, cont_line = self._see_best_line(board, target_sq, perspective_side, plies + 1, max_plies)
-            board.pop()
-
-            total = signed + cont_val
-            if side_to_move == perspective_side:
-                if total > best_val:
-                    best_val = total
-                    best_line = [san] + cont_line
-            else:
-                if total < best_val:
-                    best_val = total
-                    best_line = [san] + cont_line
-
-        if best_val == 1e9 or best_val == -1e9:
-            return 0.0, []
-        return best_val, best_line
+        finally:
+            while len(sim.move_stack) > depth:
+                sim.pop()
+            sim.turn = original_turn
     
     def _find_best_defense(
         self,
@@ -1288,7 +1397,7 @@ class TwoMoveWinEngine:
         if board.turn != defending_side:
             return None
         
-        legal_moves = list(board.legal_moves)
+        legal_moves = self._legal_moves(board)
         if not legal_moves:
             return None
 
@@ -1328,21 +1437,17 @@ class TwoMoveWinEngine:
             board.push(defense_move)
 
             # Attacker best reply (bounded): captures + checks + promotions
-            replies = []
-            for m in board.legal_moves:
-                if board.is_capture(m):
-                    replies.append(m)
-                    continue
-                # check moves
-                board.push(m)
-                gives_check = board.is_check()
-                board.pop()
-                if gives_check or m.promotion:
-                    replies.append(m)
+            legal_replies = self._legal_moves(board)
+            king_attacked = board.was_into_check()
+            checking = {m for m in legal_replies if self._gives_check(board, m, king_attacked)}
+            replies = [
+                m for m in legal_replies
+                if board.is_capture(m) or m.promotion or m in checking
+            ]
 
             # If nothing interesting, still consider a small sample of legal moves
             if not replies:
-                replies = list(board.legal_moves)[:8]
+                replies = list(legal_replies[:8])
 
             # Rank replies by MVV-LVA-ish (captures) and checks
             def _reply_rank(m: chess.Move) -> float:
@@ -1354,26 +1459,23 @@ class TwoMoveWinEngine:
                         r += 100.0 * float(self.piece_values.get(vic.piece_type, 0))
                     if vic and att:
                         r += 20.0 * float(self.piece_values.get(vic.piece_type, 0) - self.piece_values.get(att.piece_type, 0))
-                # checks
-                board.push(m)
-                if board.is_checkmate():
-                    r += 10000.0
-                elif board.is_check():
-                    r += 500.0
-                board.pop()
+                # checks (only checking moves need to be played to test for mate)
+                if m in checking:
+                    board.push(m)
+                    r += 10000.0 if board.is_checkmate() else 500.0
+                    board.pop()
                 return r
 
             replies.sort(key=_reply_rank, reverse=True)
             replies = replies[:12]
 
+            # Material after each reply follows from what it captures/promotes to
+            material_now = self._calculate_material(board, attacker_side)
             best_gain = -1e18
             for rmove in replies:
-                board.push(rmove)
-                material_after = self._calculate_material(board, attacker_side)
-                gain = material_after - material_before
+                gain = material_now + self._move_material_delta(board, rmove) - material_before
                 if gain > best_gain:
                     best_gain = gain
-                board.pop()
 
             # Defender wants to minimize attacker's gain
             material_component = -1000.0 * best_gain
@@ -1401,7 +1503,7 @@ class TwoMoveWinEngine:
         Designed to surface intermediate checks, queen/rook wins, and multi-attacks.
         """
         # Only score moves that are legal in the provided position.
-        if move not in board.legal_moves:
+        if not board.is_legal(move):
             return -1e9
 
         score = 0.0
@@ -1438,13 +1540,11 @@ class TwoMoveWinEngine:
             mover_side = not board.turn  # side that played `move`
             attacked_valuable = 0
             attacked_value_sum = 0.0
-            for sq in chess.SQUARES:
-                p = board.piece_at(sq)
-                if p and p.color != mover_side:
-                    v = float(self.piece_values.get(p.piece_type, 0))
-                    if v >= 3 and board.is_attacked_by(mover_side, sq):
-                        attacked_valuable += 1
-                        attacked_value_sum += v
+            valuable = (board.knights | board.bishops | board.rooks | board.queens) & board.occupied_co[not mover_side]
+            for sq in chess.scan_forward(valuable):
+                if board.is_attacked_by(mover_side, sq):
+                    attacked_valuable += 1
+                    attacked_value_sum += float(self.piece_values.get(board.piece_type_at(sq), 0))
             if attacked_valuable >= 2:
                 score += 300.0 + 75.0 * attacked_value_sum
             elif attacked_valuable == 1:
@@ -1505,7 +1605,7 @@ class TwoMoveWinEngine:
         """
         Find if there's a forced capture (check or only capture available).
         """
-        legal_moves = list(board.legal_moves)
+        legal_moves = self._legal_moves(board)
         if not legal_moves:
             return None
         
@@ -1525,13 +1625,11 @@ class TwoMoveWinEngine:
             # Only one capture and few moves - likely forced
             return captures[0]
         
-        # Check for captures that win material
+        # Check for captures that win material (exchange on the square included)
+        see = position_see(board)
         for move in captures:
-            attacker = board.piece_at(move.from_square)
-            victim = board.piece_at(move.to_square)
-            if attacker and victim:
-                if self.piece_values.get(victim.piece_type, 0) > self.piece_values.get(attacker.piece_type, 0):
-                    return move
+            if see.capture_gain(move) > 0:
+                return move
         
         return None
     
@@ -1542,15 +1640,36 @@ class TwoMoveWinEngine:
     ) -> float:
         """Calculate material balance for given side (in pawns)"""
         material = 0.0
-        
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece and piece.color == side:
-                material += self.piece_values.get(piece.piece_type, 0)
-            elif piece and piece.color != side:
-                material -= self.piece_values.get(piece.piece_type, 0)
+        own = board.occupied_co[side]
+        enemy = board.occupied_co[not side]
+        for piece_type, bb in (
+            (chess.PAWN, board.pawns),
+            (chess.KNIGHT, board.knights),
+            (chess.BISHOP, board.bishops),
+            (chess.ROOK, board.rooks),
+            (chess.QUEEN, board.queens),
+        ):
+            value = self.piece_values.get(piece_type, 0)
+            material += value * (chess.popcount(bb & own) - chess.popcount(bb & enemy))
         
         return material
+
+    def _move_material_delta(
+        self,
+        board: chess.Board,
+        move: chess.Move
+    ) -> float:
+        """Material change for the side to move if it plays `move` (captures + promotion)."""
+        delta = 0.0
+        if board.is_en_passant(move):
+            delta += self.piece_values[chess.PAWN]
+        else:
+            victim = board.piece_type_at(move.to_square)
+            if victim is not None and board.color_at(move.to_square) != board.turn:
+                delta += self.piece_values.get(victim, 0)
+        if move.promotion:
+            delta += self.piece_values.get(move.promotion, 0) - self.piece_values[chess.PAWN]
+        return delta
     
     def _estimate_material_gain(
         self,
@@ -1,11 +1,11 @@
 import os
 import subprocess
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from nnue_loader import load_latest
 from classical_eval_parser import parse_classical_terms
-from piece_attribution import compute_piece_attribution
+from piece_attribution import compute_piece_attribution, masked_from_deltas
 
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -76,6 +76,59 @@ def run_mask_eval(fen: str, square: str, engine_path: str = DEFAULT_ENGINE_PATH,
     return float(masked_cp)
 
 
+def parse_mask_all(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse an ``info string maskall ...`` line into the same shape as the dump's
+    ``mask_deltas``: base evals plus 64-entry delta lists (a1..h8, None = not masked).
+    """
+    if "info string maskall" not in line or "total=" not in line:
+        return None
+    fields = dict(tok.split("=", 1) for tok in line.split() if "=" in tok)
+
+    def deltas(raw: str) -> List[Optional[int]]:
+        return [None if v == "-" else int(v) for v in raw.split(",")]
+
+    try:
+        return {
+            "base_total_cp": int(fields["base_cp"]),
+            "base_classical_cp": int(fields["base_classical_cp"]),
+            "total": deltas(fields["total"]),
+            "classical": deltas(fields["classical"]),
+        }
+    except (KeyError, ValueError):
+        return None
+
+
+def run_mask_all(fen: str, engine_path: str = DEFAULT_ENGINE_PATH) -> Dict[str, Any]:
+    """
+    Run Stockfish's batched ``maskall`` command: the base eval and every
+    single-piece mask (NNUE and classical) in one engine call.
+    """
+    commands = [
+        "uci",
+        f"position fen {fen}",
+        "maskall",
+        "quit",
+    ]
+    proc = subprocess.Popen(
+        [engine_path],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if not proc.stdin:
+        raise RuntimeError("Failed to open Stockfish stdin")
+    proc.stdin.write("\n".join(commands) + "\n")
+    proc.stdin.flush()
+    out, _ = proc.communicate(timeout=30)
+    for line in out.splitlines():
+        parsed = parse_mask_all(line)
+        if parsed is not None:
+            return parsed
+    raise RuntimeError(f"Could not parse maskall output for {fen}")
+
+
 def extract_square_from_pid(piece_id: str) -> Optional[str]:
     # piece ids are like "white_knight_g1"
     parts = piece_id.split("_")
@@ -102,25 +155,25 @@ def analyze_position(fen: str, engine_path: str = DEFAULT_ENGINE_PATH, dump_dir:
     base_total_cp = float(dump.get("final_eval_cp", 0.0))
     base_classical_cp = float(dump.get("classical_eval_cp", 0.0))
 
-    # Prefer masked data from dump if present; otherwise fallback to subprocess masking
+    # Prefer the dump's per-square deltas, then its per-piece masked evals;
+    # otherwise fall back to one batched maskall call
     masked_total: Dict[str, float] = {}
     masked_classical: Dict[str, float] = {}
+    mask_deltas = dump.get("mask_deltas")
     dump_masked_total = dump.get("masked_total") or {}
     dump_masked_classical = dump.get("masked_classical") or {}
-    if dump_masked_total and dump_masked_classical:
+    if mask_deltas:
+        masked_total, masked_classical = masked_from_deltas(dump, mask_deltas, base_total_cp, base_classical_cp)
+    elif dump_masked_total and dump_masked_classical:
         masked_total = {k: float(v) for k, v in dump_masked_total.items()}
         masked_classical = {k: float(v) for k, v in dump_masked_classical.items()}
     else:
-        for pid, meta in (dump.get("pieces", {}) or {}).items():
-            sq = meta.get("square") or extract_square_from_pid(pid)
-            if not sq:
-                continue
-            try:
-                masked_total[pid] = run_mask_eval(fen, sq, engine_path=engine_path, use_nnue=True)
-                masked_classical[pid] = run_mask_eval(fen, sq, engine_path=engine_path, use_nnue=False)
-            except Exception:
-                # Skip on error; leave zero contribution
-                continue
+        try:
+            mask_deltas = run_mask_all(fen, engine_path=engine_path)
+            masked_total, masked_classical = masked_from_deltas(dump, mask_deltas, base_total_cp, base_classical_cp)
+        except Exception:
+            # Leave zero contributions on error
+            pass
 
     piece_profile = compute_piece_attribution(
         dump,
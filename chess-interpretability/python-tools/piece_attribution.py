@@ -1,4 +1,7 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+SQUARES = [f + r for r in "12345678" for f in "abcdefgh"]  # a1..h8, engine square order
 
 
 def compute_piece_attribution(
@@ -34,3 +37,32 @@ def compute_piece_attribution(
         }
     return result
 
+
+
+def masked_from_deltas(
+    dump: Dict[str, Any],
+    mask_deltas: Dict[str, Any],
+    base_total_cp: float,
+    base_classical_cp: float,
+) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Turn the engine's compact per-square delta vectors (``mask_deltas`` in the
+    dump, or the parsed ``maskall`` line) into masked_total/masked_classical
+    dicts for compute_piece_attribution. Squares the engine did not mask
+    (kings, masks leaving the side to move in check) are left out, so their
+    contribution is 0.
+    """
+    total: List[Optional[int]] = mask_deltas.get("total") or []
+    classical: List[Optional[int]] = mask_deltas.get("classical") or []
+    masked_total: Dict[str, float] = {}
+    masked_classical: Dict[str, float] = {}
+    for pid, meta in (dump.get("pieces", {}) or {}).items():
+        square = meta.get("square")
+        if square not in SQUARES:
+            continue
+        idx = SQUARES.index(square)
+        if idx < len(total) and total[idx] is not None:
+            masked_total[pid] = base_total_cp - float(total[idx])
+        if idx < len(classical) and classical[idx] is not None:
+            masked_classical[pid] = base_classical_cp - float(classical[idx])
+    return masked_total, masked_classical
@@ -150,7 +150,19 @@ export default function MessageBubble({ role, content, rawData, timestamp, curre
   const getSnapshotFrames = (conf: any): any[][] => {
     if (!conf) return [];
     if (Array.isArray(conf.snapshots) && conf.snapshots.length > 0) {
-      return conf.snapshots.map((snap: any) => (Array.isArray(snap.nodes) ? snap.nodes : []));
+      // Snapshots are deltas (upserted/removed since the previous one); replay them
+      // into full frames. Older payloads carry a full node list per snapshot.
+      const view = new Map<string, any>();
+      return conf.snapshots.map((snap: any) => {
+        if (Array.isArray(snap.nodes)) {
+          view.clear();
+          snap.nodes.forEach((node: any) => view.set(node.id, node));
+        } else {
+          (snap.delta?.removed || []).forEach((id: string) => view.delete(id));
+          (snap.delta?.upserted || []).forEach((node: any) => view.set(node.id, node));
+        }
+        return Array.from(view.values());
+      });
     }
     if (Array.isArray(conf.steps) && conf.steps.length > 0) {
       return conf.steps;
@@ -0,0 +1,11 @@
+-- Migration 036: Columnar Ply Data
+-- Compact, versioned per-game encoding of game_review.ply_records (see backend/ply_columns.py)
+-- Analytics read this instead of downloading and parsing the full game_review JSON
+
+-- Base64 of the binary ply-columns buffer (eval, cp_loss, accuracy, time spent, phase,
+-- move category, SAN and dictionary-encoded tag IDs per ply, plus game-level meta)
+ALTER TABLE public.games 
+ADD COLUMN IF NOT EXISTS ply_columns TEXT;
+
+-- Comments
+COMMENT ON COLUMN public.games.ply_columns IS 'Base64 columnar encoding of game_review.ply_records (PLYC format, versioned). Written alongside game_review; backfill with scripts/backfill_ply_columns.py.';
@@ -0,0 +1,10 @@
+-- Migration 037: Review cache content-key index
+-- Index for the content-addressed review cache (backend/cache/analysis_cache.py)
+-- Reviews carry game_review.review_meta = {content_key, depth, adaptive}; the cache
+-- looks up saved reviews of the same game (any user, any import) by content_key
+
+CREATE INDEX IF NOT EXISTS idx_games_review_content_key
+  ON public.games ((game_review->'review_meta'->>'content_key'))
+  WHERE review_type = 'full' AND game_review IS NOT NULL;
+
+COMMENT ON INDEX idx_games_review_content_key IS 'Lookup of saved game reviews by content key (start position + moves + clocks) for review cache hits';
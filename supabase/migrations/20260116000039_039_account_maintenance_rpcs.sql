@@ -0,0 +1,53 @@
+-- Migration 039: Set-based account maintenance
+-- account_maintenance_counts: active/unanalyzed game counts for a batch of users in one grouped query
+-- compress_games: semi-forget many games of one user in a single UPDATE
+
+CREATE OR REPLACE FUNCTION public.account_maintenance_counts(p_user_ids uuid[])
+RETURNS TABLE(user_id uuid, active_games bigint, unanalyzed_games bigint)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT
+    u.user_id,
+    -- Same predicates as GameWindowManager.count_active_games / get_unanalyzed_games_count
+    COUNT(g.id) FILTER (WHERE g.analyzed_at IS NOT NULL AND g.compressed_at IS NULL) AS active_games,
+    COUNT(g.id) FILTER (WHERE g.analyzed_at IS NULL AND g.archived_at IS NULL) AS unanalyzed_games
+  FROM unnest(p_user_ids) AS u(user_id)
+  LEFT JOIN public.games g ON g.user_id = u.user_id
+  GROUP BY u.user_id;
+$$;
+
+-- p_games: [{"id": uuid, "pattern_summary": jsonb}, ...]
+CREATE OR REPLACE FUNCTION public.compress_games(p_user_id uuid, p_games jsonb)
+RETURNS TABLE(id uuid)
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE public.games AS g
+  SET
+    game_review = NULL,
+    pgn = NULL,
+    eval_trace = NULL,
+    time_trace = NULL,
+    key_points = NULL,
+    ply_columns = NULL,
+    pattern_summary = x.pattern_summary,
+    compressed_at = NOW()
+  FROM jsonb_to_recordset(p_games) AS x(id uuid, pattern_summary jsonb)
+  WHERE g.id = x.id
+    AND g.user_id = p_user_id
+    AND g.compressed_at IS NULL
+  RETURNING g.id;
+$$;
+
+-- Backend (service role) only
+REVOKE ALL ON FUNCTION public.account_maintenance_counts(uuid[]) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.compress_games(uuid, jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.account_maintenance_counts(uuid[]) TO service_role;
+GRANT EXECUTE ON FUNCTION public.compress_games(uuid, jsonb) TO service_role;
+
+COMMENT ON FUNCTION public.account_maintenance_counts(uuid[]) IS 'Active and unanalyzed game counts per user for the account maintenance sweep';
+COMMENT ON FUNCTION public.compress_games(uuid, jsonb) IS 'Compress (semi-forget) a batch of games: drop full review/PGN/traces/ply columns, keep pattern_summary';